@@ -53,28 +53,30 @@ def render_forecasting(stats):
     """Affiche les projections de cashflow basées sur l'IA."""
     st.subheader("🔮 Intelligence Prédictive & Cashflow Pipeline")
     
-    from ai.predictor import AIPredictor
-    predictor = AIPredictor()
+    from ai.cashflow_forecast import CashflowForecaster, load_open_disputes
     
-    df = pd.DataFrame(stats)
-    # Simulation des dossiers "en cours"
-    total_pending_amount = max(5000, df['total_requested'].sum() - df['total_recovered'].sum())
-    
-    mock_disputes = [
-        {'carrier': 'Colissimo', 'dispute_type': 'late_delivery', 'amount_recoverable': total_pending_amount * 0.4},
-        {'carrier': 'UPS', 'dispute_type': 'lost', 'amount_recoverable': total_pending_amount * 0.3},
-        {'carrier': 'Chronopost', 'dispute_type': 'damaged', 'amount_recoverable': total_pending_amount * 0.3},
-    ]
-    
-    forecasts = predictor.get_forecasted_cashflow(mock_disputes)
+    # Simulation Monte-Carlo des litiges ouverts (probabilité et délai par dossier)
+    pending_disputes = load_open_disputes(get_db_manager())
+    forecasts = CashflowForecaster(weeks=12).simulate(pending_disputes, n_simulations=2000)
     
     col1, col2, col3 = st.columns(3)
     with col1:
         render_premium_metric("📦 Pipeline Total (En cours)", f"{forecasts['total_potential_raw']:,.2f}€", "Gross Volume", icon="📦", progress=30)
     with col2:
-        render_premium_metric("🎯 Recouvrement Attendu (IA)", f"{forecasts['weighted_expected_recovery']:,.2f}€", "Weighted Probability", icon="🎯", progress=52)
+        render_premium_metric("🎯 Recouvrement Attendu (IA)", f"{forecasts['total']['p50']:,.2f}€", "Médiane (P50)", icon="🎯", progress=52)
     with col3:
-        render_premium_metric("🛡️ Estimation Prudente", f"{forecasts['conservative_estimate']:,.2f}€", "-10% safety margin", icon="🛡️", progress=45)
+        render_premium_metric("🛡️ Estimation Prudente", f"{forecasts['total']['p10']:,.2f}€", "Scénario P10", icon="🛡️", progress=45)
+    
+    if pending_disputes:
+        cumulative = forecasts['cumulative']
+        fig = go.Figure([
+            go.Scatter(x=forecasts['weeks'], y=cumulative['p90'], line=dict(width=0), showlegend=False, hoverinfo='skip'),
+            go.Scatter(x=forecasts['weeks'], y=cumulative['p10'], fill='tonexty', line=dict(width=0),
+                       fillcolor='rgba(99, 102, 241, 0.2)', name='P10 - P90'),
+            go.Scatter(x=forecasts['weeks'], y=cumulative['p50'], line=dict(color='#6366f1'), name='P50'),
+        ])
+        fig.update_layout(title="Encaissements cumulés prévus (par semaine)", yaxis_title="€", height=350)
+        st.plotly_chart(fig, width='stretch')
     
     from src.ui.theme import render_premium_info
     render_premium_info("Ces prédictions sont mises à jour en temps réel en fonction des performances actuelles des transporteurs.", icon="🔮")
@@ -69,17 +69,12 @@ conn = db.get_connection()
 clients_df = pd.read_sql_query("SELECT id, email, company_name, created_at FROM clients ORDER BY created_at DESC LIMIT 10", conn)
 
 if not clients_df.empty:
-    # Calculer les scores en temps réel pour l'admin
-    scores = []
-    labels = []
-    for _, row in clients_df.iterrows():
-        score = scorer.calculate_client_risk_score(row['id'])
-        label_info = scorer.get_client_trust_label(score)
-        scores.append(score)
-        labels.append(label_info['label'])
+    # Calculer les scores en temps réel pour l'admin (une requête pour tous les clients affichés)
+    risk_scores = scorer.score_all_clients(clients_df['id'].tolist())
+    scores = [risk_scores.get(client_id, 0) for client_id in clients_df['id']]
     
     clients_df['Score Risque'] = scores
-    clients_df['Confiance'] = labels
+    clients_df['Confiance'] = [scorer.get_client_trust_label(score)['label'] for score in scores]
     
     # Affichage stylisé (Streamlit table does not support background colors easily, use dataframe styling or columns)
     st.dataframe(clients_df, width='stretch')
@@ -3,8 +3,18 @@ Analyze scraped Trustpilot data to extract real-world dispute patterns.
 
 This script processes the scraped reviews and generates insights
 to improve the dispute detection engine.
+
+JSON Lines files (.jsonl) are streamed through ReviewAnalysisPipeline:
+patterns and sentiment are extracted in worker processes and statistics
+are aggregated incrementally, so large corpora use bounded memory.
+
+Usage:
+    python analyze_trustpilot_data.py [--data-file data/scraped/trustpilot_comprehensive.jsonl]
+                                      [--workers 4] [--chunk-size 1000]
+    python analyze_trustpilot_data.py --convert   # legacy .json export -> .jsonl
 """
 
+import argparse
 import json
 import sys
 from pathlib import Path
@@ -14,30 +24,41 @@ import statistics
 
 sys.path.insert(0, 'src')
 from scrapers.utils.text_processor import DisputePatternExtractor
+from scrapers.utils.review_pipeline import ReviewAnalysisPipeline, convert_to_jsonl, extract_keywords
 
 
 class TrustpilotDataAnalyzer:
     """Analyze Trustpilot reviews to extract dispute patterns."""
     
-    def __init__(self, data_file: str = 'data/scraped/trustpilot_comprehensive.json'):
+    def __init__(self, data_file: str = 'data/scraped/trustpilot_comprehensive.json',
+                 workers: int = None, chunk_size: int = 1000):
         """
         Initialize analyzer.
         
         Args:
-            data_file: Path to scraped Trustpilot data
+            data_file: Path to scraped Trustpilot data (.json, or .jsonl to stream)
+            workers: Worker processes for .jsonl files (default: CPU count)
+            chunk_size: Reviews per worker task for .jsonl files
         """
         self.data_file = Path(data_file)
         self.reviews = []
+        self.results = None
         self.processor = DisputePatternExtractor()
+        self.streaming = self.data_file.suffix == '.jsonl'
+        self.pipeline = ReviewAnalysisPipeline(workers=workers, chunk_size=chunk_size)
         
         self._load_data()
     
     def _load_data(self):
-        """Load scraped data from JSON file."""
+        """Load scraped data from JSON file (JSON Lines files are streamed later)."""
         if not self.data_file.exists():
             print(f"❌ Data file not found: {self.data_file}")
             return
         
+        if self.streaming:
+            print(f"✅ Streaming reviews from {self.data_file}")
+            return
+        
         with open(self.data_file, 'r', encoding='utf-8') as f:
             content = json.load(f)
             self.reviews = content.get('data', [])
@@ -51,6 +72,9 @@ class TrustpilotDataAnalyzer:
         Returns:
             Dictionary with analysis results
         """
+        if self.streaming and self.data_file.exists():
+            return self._analyze_stream()
+        
         if not self.reviews:
             print("⚠️ No reviews to analyze")
             return {}
@@ -69,6 +93,26 @@ class TrustpilotDataAnalyzer:
             'top_keywords': self._analyze_keywords()
         }
         
+        self.results = results
+        self._print_report(results)
+        self._save_insights(results)
+        
+        return results
+    
+    def _analyze_stream(self) -> Dict:
+        """Run the analysis with the streaming pipeline (.jsonl input)."""
+        results = self.pipeline.run_file(self.data_file)
+        if not results['total_reviews']:
+            print("⚠️ No reviews to analyze")
+            return {}
+        
+        print("\n" + "="*60)
+        print("📊 TRUSTPILOT DATA ANALYSIS")
+        print("="*60)
+        print(f"  {results['total_reviews']} reviews analyzed in {results['elapsed']:.1f}s "
+              f"({self.pipeline.workers} workers)")
+        
+        self.results = results
         self._print_report(results)
         self._save_insights(results)
         
@@ -124,20 +168,7 @@ class TrustpilotDataAnalyzer:
         for review in self.reviews:
             patterns = review.get('patterns', {})
             for delay in patterns.get('delay_mentions', []):
-                value = delay['value']
-                unit = delay['unit']
-                
-                # Convert to days
-                if 'heure' in unit:
-                    days = value / 24
-                elif 'semaine' in unit:
-                    days = value * 7
-                elif 'mois' in unit:
-                    days = value * 30
-                else:
-                    days = value
-                
-                all_delays.append(days)
+                all_delays.append(self.processor.delay_in_days(delay))
         
         if not all_delays:
             return {'count': 0}
@@ -172,28 +203,8 @@ class TrustpilotDataAnalyzer:
         """Extract most common keywords from reviews."""
         all_words = []
         
-        # Common French stopwords to exclude
-        stopwords = {
-            'le', 'la', 'les', 'de', 'du', 'des', 'un', 'une',
-            'et', 'ou', 'mais', 'donc', 'car', 'que', 'qui',
-            'cette', 'ce', 'ces', 'mon', 'ma', 'mes', 'ton', 'ta',
-            'son', 'sa', 'ses', 'je', 'tu', 'il', 'elle', 'nous',
-            'vous', 'ils', 'elles', 'dans', 'sur', 'pour', 'par',
-            'avec', 'sans', 'est', 'sont', 'été', 'avoir', 'être'
-        }
-        
         for review in self.reviews:
-            text = review.get('text', '').lower()
-            words = text.split()
-            
-            # Filter and clean
-            words = [
-                w.strip('.,!?;:()[]{}\"\'') 
-                for w in words 
-                if len(w) > 3 and w.strip('.,!?;:()[]{}\"\'') not in stopwords
-            ]
-            
-            all_words.extend(words)
+            all_words.extend(extract_keywords(review.get('text', '')))
         
         top_30 = Counter(all_words).most_common(30)
         
@@ -261,19 +272,26 @@ class TrustpilotDataAnalyzer:
         
         print(f"\n✅ Insights saved to {output_file}")
     
-    def generate_detection_rules(self) -> List[str]:
+    def generate_detection_rules(self, results: Dict = None) -> List[str]:
         """
         Generate recommended detection rules based on analysis.
         
+        Args:
+            results: Output of analyze_all (default: last analysis, or the loaded reviews)
+        
         Returns:
             List of suggested rules as strings
         """
-        if not self.reviews:
+        results = results or self.results
+        if results:
+            patterns = results['pattern_statistics']
+            delays = results['delay_statistics']
+        elif self.reviews:
+            patterns = self._analyze_patterns()
+            delays = self._analyze_delays()
+        else:
             return []
         
-        patterns = self._analyze_patterns()
-        delays = self._analyze_delays()
-        
         rules = []
         
         # Rule based on delay frequency
@@ -313,7 +331,22 @@ class TrustpilotDataAnalyzer:
 
 def main():
     """Run analysis."""
-    analyzer = TrustpilotDataAnalyzer()
+    parser = argparse.ArgumentParser(description='Analyze scraped Trustpilot reviews')
+    parser.add_argument('--data-file', default='data/scraped/trustpilot_comprehensive.json',
+                        help='Scraped reviews (.json export or .jsonl stream)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for .jsonl files (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Reviews per worker task')
+    parser.add_argument('--convert', action='store_true',
+                        help='Convert the .json export to .jsonl before analyzing')
+    args = parser.parse_args()
+    
+    data_file = args.data_file
+    if args.convert:
+        data_file = str(convert_to_jsonl(data_file))
+        print(f"✅ Converted to {data_file}")
+    
+    analyzer = TrustpilotDataAnalyzer(data_file, workers=args.workers, chunk_size=args.chunk_size)
     
     # Run full analysis
     results = analyzer.analyze_all()
@@ -321,7 +354,7 @@ def main():
     # Generate recommended rules
     print("\n💡 RECOMMENDED DETECTION RULES")
     print("="*60)
-    rules = analyzer.generate_detection_rules()
+    rules = analyzer.generate_detection_rules(results)
     
     if rules:
         print("\nSuggested additions to dispute_detector.py:\n")
@@ -10,7 +10,7 @@ sys.path.insert(0, os.path.join(root_dir, 'src'))
 sys.path.insert(0, root_dir)
 
 from auth.credentials_manager import CredentialsManager
-from analytics.metrics_calculator import MetricsCalculator
+from analytics.metrics_calculator import get_metrics_calculator
 from onboarding.onboarding_manager import OnboardingManager
 from onboarding_functions import render_onboarding
 from ui.theme import apply_premium_theme, render_premium_metric
@@ -151,16 +151,15 @@ def main():
     import pandas as pd
     disputes_df = pd.DataFrame(claims_data)
     
-    # Calculate metrics (needed for Dashboard page)
+    # Calculate metrics (needed for Dashboard page): SQL aggregates, cached
+    # until the client's data changes
     curr = st.session_state.get('currency', 'EUR')
-    total_recoverable = disputes_df['total_recoverable'].sum() if not disputes_df.empty else 0
-    disputes_count = len(disputes_df) if not disputes_df.empty else 0
-    
-    # Calculate recovered amount from accepted claims
-    recovered_amount = 0
-    if not disputes_df.empty:
-        accepted_claims = disputes_df[disputes_df['status'] == 'accepted']
-        recovered_amount = accepted_claims['accepted_amount'].sum() if not accepted_claims.empty else 0
+    metrics_calculator = get_metrics_calculator(db_manager)
+    kpis = metrics_calculator.get_client_kpis(client_id) if client_id else metrics_calculator.empty_kpis()
+    evolution = metrics_calculator.get_client_temporal_evolution(client_id, period_days=90) if client_id else None
+    total_recoverable = sum(carrier['total_value'] for carrier in kpis['by_carrier'].values())
+    disputes_count = kpis['total_claims']
+    recovered_amount = kpis['total_recovered']
     
     # Calculate dynamic success rate
     success_rate = 0
@@ -169,8 +168,8 @@ def main():
             success_rate = min(int((recovered_amount / total_recoverable) * 100), 100)
         else:
             # Calculate based on statuses
-            accepted_count = len(disputes_df[disputes_df['status'] == 'accepted']) if not disputes_df.empty else 0
-            success_rate = min(int((accepted_count / disputes_count) * 100), 100) if disputes_count > 0 else 0
+            accepted_count = kpis['by_status'].get('accepted', 0)
+            success_rate = min(int((accepted_count / disputes_count) * 100), 100)
     
     recoverable_progress = min(int((total_recoverable / 10000) * 100), 100) if total_recoverable > 0 else 0
     disputes_progress = min(int((disputes_count / 50) * 100), 100) if disputes_count > 0 else 0
@@ -239,7 +238,7 @@ def main():
     
     elif active_page == 'Reports':
         # Reports & Analytics page
-        render_reports_page(disputes_df)
+        render_reports_page(disputes_df, kpis=kpis, evolution=evolution)
     
     elif active_page == 'Settings':
         # Settings page
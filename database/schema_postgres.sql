@@ -73,6 +73,52 @@ CREATE TABLE IF NOT EXISTS claims (
 CREATE INDEX IF NOT EXISTS idx_claims_reference ON claims(claim_reference);
 CREATE INDEX IF NOT EXISTS idx_claims_client ON claims(client_id);
 CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(status);
+CREATE INDEX IF NOT EXISTS idx_claims_follow_up ON claims(status, submitted_at, last_follow_up_at);
+CREATE INDEX IF NOT EXISTS idx_claims_updated ON claims(updated_at);
+-- Table: Claim Deadlines (Échéances de relance et délais légaux)
+CREATE TABLE IF NOT EXISTS claim_deadlines (
+    claim_id INTEGER NOT NULL,
+    kind TEXT NOT NULL, -- follow_up, legal_response
+    due_at TIMESTAMP NOT NULL,
+    level INTEGER DEFAULT 0,
+    carrier TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (claim_id, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_deadlines_due ON claim_deadlines(due_at);
+-- Table: Client Data Versions (incrémentée à chaque écriture, invalide les caches de KPI)
+CREATE TABLE IF NOT EXISTS client_data_versions (
+    client_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+-- Table: Claims Daily Rollup (agrégats journaliers, maintenus à chaque écriture de réclamation)
+CREATE TABLE IF NOT EXISTS claims_daily_rollup (
+    client_id INTEGER NOT NULL,
+    carrier TEXT NOT NULL,
+    status TEXT NOT NULL,
+    day DATE NOT NULL, -- jour de soumission (de création si non soumise)
+    is_submitted INTEGER NOT NULL DEFAULT 0,
+    claims_count INTEGER NOT NULL DEFAULT 0,
+    total_value REAL NOT NULL DEFAULT 0, -- somme amount_requested
+    total_recovered REAL NOT NULL DEFAULT 0, -- somme accepted_amount
+    PRIMARY KEY (client_id, carrier, status, day, is_submitted)
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_day ON claims_daily_rollup(day);
+-- Table: Client Statistics (matérialisée, rafraîchie à chaque écriture ; remplace la vue pour l'admin)
+CREATE TABLE IF NOT EXISTS client_statistics_materialized (
+    client_id INTEGER PRIMARY KEY,
+    email TEXT,
+    total_claims INTEGER DEFAULT 0,
+    accepted_claims INTEGER DEFAULT 0,
+    rejected_claims INTEGER DEFAULT 0,
+    pending_claims INTEGER DEFAULT 0,
+    total_requested REAL DEFAULT 0,
+    total_recovered REAL DEFAULT 0,
+    total_paid_to_client REAL DEFAULT 0,
+    total_disputes_detected INTEGER DEFAULT 0,
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
 -- Table: Disputes
 CREATE TABLE IF NOT EXISTS disputes (
     id SERIAL PRIMARY KEY,
@@ -129,6 +175,25 @@ CREATE TABLE IF NOT EXISTS notifications (
     related_claim_id INTEGER REFERENCES claims(id) ON DELETE
     SET NULL
 );
+-- Table: Email Outbox
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id SERIAL PRIMARY KEY,
+    to_email TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    html_body TEXT NOT NULL,
+    text_body TEXT,
+    attachments TEXT, -- JSON list of file paths
+    category TEXT, -- disputes_detected, claim_submitted, ...
+    notification_id INTEGER, -- notifications.id
+    status TEXT DEFAULT 'pending', -- pending, sending, sent, dead
+    attempts INTEGER DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMP NOT NULL,
+    next_attempt_at TIMESTAMP NOT NULL,
+    claimed_at TIMESTAMP,
+    sent_at TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON email_outbox(status, next_attempt_at);
 -- Table: Activity Logs
 CREATE TABLE IF NOT EXISTS activity_logs (
     id SERIAL PRIMARY KEY,
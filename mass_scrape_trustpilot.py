@@ -3,13 +3,25 @@ Mass scraping script for collecting comprehensive Trustpilot data.
 
 This script scrapes reviews from all 6 major carriers with a goal of 1000+ reviews
 to extract robust real-world dispute patterns.
+
+By default the crawl is incremental: carriers are fetched concurrently,
+unchanged pages answer 304 and pagination stops at reviews collected by a
+previous run (state in data/scraped/trustpilot_crawl_state.json). New
+reviews are appended to data/scraped/trustpilot_comprehensive.jsonl.
+
+Usage:
+    python mass_scrape_trustpilot.py           # incremental async crawl
+    python mass_scrape_trustpilot.py --full    # sequential full re-crawl
 """
 
 import sys
 sys.path.insert(0, 'src')
 
 from scrapers.trustpilot_scraper import TrustpilotScraper
+from scrapers.utils.crawl_state import CrawlState
 from scrapers.utils.text_processor import DisputePatternExtractor
+import argparse
+import asyncio
 import logging
 import json
 from pathlib import Path
@@ -21,9 +33,39 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+CRAWL_STATE_FILE = 'data/scraped/trustpilot_crawl_state.json'
+
+
+def scrape_incremental(scraper: TrustpilotScraper, carriers, max_pages: int, min_rating: int):
+    """Collect only the reviews published since the last run."""
+    state = CrawlState(CRAWL_STATE_FILE)
+    
+    print("🚀 Démarrage du scraping incrémental (transporteurs en parallèle)...\n")
+    new_reviews = asyncio.run(scraper.scrape_async(
+        carriers=carriers,
+        max_pages=max_pages,
+        min_rating=min_rating,
+        state=state
+    ))
+    
+    # Reviews first, then the state: an interrupted run is simply re-crawled
+    if new_reviews:
+        scraper.save_jsonl(new_reviews, 'trustpilot_comprehensive.jsonl', append=True)
+    state.save()
+    
+    print(f"\n✅ {len(new_reviews)} NOUVEAUX AVIS")
+    if new_reviews:
+        print("💾 Ajoutés à: data/scraped/trustpilot_comprehensive.jsonl")
+    print("\n🎯 Prochaine étape: Analyser avec analyze_trustpilot_data.py --data-file data/scraped/trustpilot_comprehensive.jsonl")
+
 
 def main():
     """Run comprehensive Trustpilot scraping."""
+    parser = argparse.ArgumentParser(description='Collect Trustpilot carrier reviews')
+    parser.add_argument('--full', action='store_true',
+                        help='Re-crawl every page sequentially instead of the incremental async crawl')
+    args = parser.parse_args()
+    
     print("="*70)
     print("🕷️  TRUSTPILOT MASS SCRAPING - COLLECTING REAL DISPUTE DATA")
     print("="*70)
@@ -42,6 +84,11 @@ def main():
     max_pages_per_carrier = 10  # 10 pages * ~20 avis/page * 6 carriers = ~1200 avis
     min_rating = 3  # Only 1-3 star reviews (more likely to have disputes)
     
+    if not args.full:
+        scrape_incremental(scraper, carriers, max_pages_per_carrier, min_rating)
+        print("\n" + "="*70)
+        return
+    
     all_reviews = []
     
     print("🚀 Démarrage du scraping...\n")
@@ -74,6 +121,8 @@ def main():
     if all_reviews:
         output_file = Path('data/scraped/trustpilot_comprehensive.json')
         scraper.save_data(all_reviews, 'trustpilot_comprehensive.json')
+        # Streamable copy for the parallel analysis pipeline
+        scraper.save_jsonl(all_reviews, 'trustpilot_comprehensive.jsonl')
         
         print(f"\n💾 Données sauvegardées: {output_file}")
         
@@ -89,7 +138,7 @@ def main():
         print(f"  - Pertes mentionnées: {loss_count} ({loss_count/len(all_reviews)*100:.1f}%)")
         print(f"  - Dommages mentionnés: {damage_count} ({damage_count/len(all_reviews)*100:.1f}%)")
         
-        print("\n🎯 Prochaine étape: Analyser avec analyze_trustpilot_data.py")
+        print("\n🎯 Prochaine étape: Analyser avec analyze_trustpilot_data.py --data-file data/scraped/trustpilot_comprehensive.jsonl")
     
     print("\n" + "="*70)
 
@@ -0,0 +1,34 @@
+"""
+Backfill Script: Rebuild the claims_daily_rollup and client statistics tables
+
+The daily rollup (one row per client, carrier, status and day) and the
+materialized client statistics are kept up to date by DatabaseManager on
+every write. Run this script after importing data outside of
+DatabaseManager, or to rebuild both tables from scratch.
+
+Usage:
+    python scripts/backfill_daily_rollup.py [--db-path database/main.db]
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.database_manager import DatabaseManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the claims daily rollup and client statistics')
+    parser.add_argument('--db-path', default=None, help='SQLite database (default: database/main.db)')
+    args = parser.parse_args()
+
+    db = DatabaseManager(db_path=args.db_path)
+    # Reconstruit le rollup journalier puis les statistiques qui en dépendent
+    clients = db.refresh_client_statistics(full=True)
+    print(f"✅ Daily rollup and client statistics rebuilt: {clients} clients")
+
+
+if __name__ == "__main__":
+    main()
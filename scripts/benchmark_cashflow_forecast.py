@@ -0,0 +1,63 @@
+"""
+Benchmark: Monte-Carlo cashflow forecast
+
+Simulates N synthetic open disputes × S runs (100k × 10k by default) with
+CashflowForecaster and prints the elapsed time and the P10/P50/P90 bands.
+Memory stays bounded by --max-cells per block.
+
+Usage:
+    python scripts/benchmark_cashflow_forecast.py [--disputes 100000] [--simulations 10000] [--workers 4]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ai.predictor import AIPredictor
+from src.ai.cashflow_forecast import CashflowForecaster
+
+
+def synthetic_disputes(n, rng):
+    carriers = rng.choice(list(AIPredictor.CARRIER_COEFFICIENTS), n)
+    types = rng.choice(list(AIPredictor.TYPE_COEFFICIENTS), n)
+    amounts = np.round(rng.lognormal(4.0, 1.0, n), 2)
+    elapsed = rng.integers(0, 15, n)
+    return [
+        {'carrier': c, 'dispute_type': t, 'amount_recoverable': float(a), 'days_elapsed': float(e)}
+        for c, t, a, e in zip(carriers, types, amounts, elapsed)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Monte-Carlo cashflow forecast')
+    parser.add_argument('--disputes', type=int, default=100_000, help='Open disputes')
+    parser.add_argument('--simulations', type=int, default=10_000, help='Monte-Carlo runs')
+    parser.add_argument('--weeks', type=int, default=12, help='Forecast horizon (weeks)')
+    parser.add_argument('--max-cells', type=int, default=2_000_000, help='Cells per simulation block')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Simulation threads')
+    args = parser.parse_args()
+
+    disputes = synthetic_disputes(args.disputes, np.random.default_rng(0))
+    forecaster = CashflowForecaster(weeks=args.weeks, max_cells=args.max_cells, workers=args.workers)
+
+    start = time.perf_counter()
+    result = forecaster.simulate(disputes, n_simulations=args.simulations, seed=1)
+    elapsed = time.perf_counter() - start
+
+    cells = args.disputes * args.simulations
+    print(f"{args.disputes} disputes x {args.simulations} runs ({args.workers} workers): "
+          f"{elapsed:.2f}s, {cells / elapsed / 1e6:.0f}M cells/s")
+    print(f"Expected recovery: {result['expected_recovery']:,.2f}€")
+    total = result['total']
+    print(f"Total  P10={total['p10']:,.2f}€  P50={total['p50']:,.2f}€  P90={total['p90']:,.2f}€")
+    for week, p10, p50, p90 in zip(result['weeks'], *(result['cumulative'][k] for k in ('p10', 'p50', 'p90'))):
+        print(f"  {week}  cumulative P10={p10:,.0f}€  P50={p50:,.0f}€  P90={p90:,.0f}€")
+
+
+if __name__ == "__main__":
+    main()
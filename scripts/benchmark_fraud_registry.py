@@ -0,0 +1,103 @@
+"""
+Benchmark: Fraud registry index vs point queries
+
+Fills a temporary SQLite database with N global_fraud_registry entries
+(1M by default), then compares the per-order SQL lookups with the in-memory
+FraudRegistryIndex (with and without the Bloom filter front).
+
+Usage:
+    python scripts/benchmark_fraud_registry.py [--entries 1000000] [--orders 10000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.database_manager import DatabaseManager
+from src.analytics.risk_check_service import RiskCheckService, FraudRegistryIndex, ORDER_ENTITIES
+
+LEVELS = ['low', 'medium', 'high', 'critical']
+
+
+def _entity_value(entity_type, i):
+    if entity_type == 'email':
+        return f"user{i}@example.com"
+    if entity_type == 'phone':
+        return f"+33{i:09d}"
+    return f"{i} rue de la Paix, 75002 Paris"
+
+
+def fill_registry(db, entries):
+    conn = db.get_connection()
+    rows = (
+        (entity_type, _entity_value(entity_type, i), LEVELS[i % 4], 'Benchmark', 1)
+        for i in range(entries)
+        for entity_type in [ORDER_ENTITIES[i % 3][0]]
+    )
+    conn.executemany("""
+        INSERT INTO global_fraud_registry (entity_type, entity_value, risk_level, reason, reported_by_client_id)
+        VALUES (?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+
+
+def make_orders(entries, count, hit_ratio=0.1):
+    orders = []
+    for _ in range(count):
+        i = random.randrange(entries) if random.random() < hit_ratio else entries + random.randrange(entries)
+        orders.append({field: _entity_value(entity_type, i) for entity_type, field in ORDER_ENTITIES})
+    return orders
+
+
+def sql_check(db, orders):
+    """Ancien chemin : une requête par entité et par commande."""
+    conn = db.get_connection()
+    try:
+        for order in orders:
+            for entity_type, field in ORDER_ENTITIES:
+                conn.execute(
+                    "SELECT risk_level, reason FROM global_fraud_registry WHERE entity_type = ? AND entity_value = ?",
+                    (entity_type, order[field])
+                ).fetchone()
+    finally:
+        conn.close()
+
+
+def _timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<40} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the in-memory fraud registry index')
+    parser.add_argument('--entries', type=int, default=1_000_000, help='Registry entries')
+    parser.add_argument('--orders', type=int, default=10_000, help='Orders to check')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_path=os.path.join(tmp, 'bench.db'))
+        _timed(f"Fill registry ({args.entries} rows)", lambda: fill_registry(db, args.entries))
+        orders = make_orders(args.entries, args.orders)
+
+        _timed(f"SQL point queries ({args.orders} orders)", lambda: sql_check(db, orders))
+
+        for bloom in (False, True):
+            name = 'index + bloom' if bloom else 'index'
+            index = FraudRegistryIndex(db, bloom=bloom)
+            _timed(f"Build {name}", index.refresh)
+            service = RiskCheckService(db_manager=db, index=index)
+            results = _timed(f"check_orders_risk, {name}", lambda: service.check_orders_risk(orders))
+            flagged = sum(1 for r in results if r['reasons'])
+            print(f"{'':<40} {flagged} orders flagged")
+
+
+if __name__ == "__main__":
+    main()
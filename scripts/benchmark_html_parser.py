@@ -0,0 +1,117 @@
+"""
+Benchmark: Trustpilot review page parsing, BeautifulSoup vs lxml fast path
+
+Parses saved review pages with each TrustpilotScraper parsing mode and
+reports pages per second and peak memory (RSS growth of a fresh process
+holding every parsed page). Uses the *.html files of --pages-dir when
+present, otherwise synthetic pages shaped like Trustpilot review pages
+(20 review cards inside navigation, scripts and footer markup).
+
+Usage:
+    python scripts/benchmark_html_parser.py [--pages-dir data/scraped/pages] [--pages 200]
+"""
+
+import os
+import sys
+import glob
+import time
+import random
+import argparse
+import resource
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scrapers.trustpilot_scraper import TrustpilotScraper
+
+MODES = {
+    'BeautifulSoup (full tree)': {'parser': 'soup'},
+    'BeautifulSoup (parse_only)': {'parser': 'soup', 'parse_only': True},
+    'lxml + compiled XPath': {'parser': 'lxml'},
+}
+
+WORDS = ("colis livraison retard perdu abîmé service client remboursement semaine jours "
+         "commande suivi relais facture transporteur jamais reçu attente").split()
+
+
+def synthetic_page(rng: random.Random, page: int) -> bytes:
+    nav = "".join(f'<li class="nav-item"><a href="/categories/{i}">Catégorie {i}</a></li>' for i in range(300))
+    cards = []
+    for i in range(20):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120)))
+        cards.append(
+            f'<article class="paper_paper styles_reviewCard" data-review-id="{page}-{i}">'
+            f'<div class="styles_consumerDetails"><span class="typography_name">Client {i}</span></div>'
+            f'<div class="star-rating_starRating" data-service-review-rating="{rng.randint(1, 5)}">'
+            f'<img alt="stars"/></div><time datetime="2026-01-{1 + i % 28:02d}T10:00:00Z"></time>'
+            f'<h2 class="typography_title">Avis {i}</h2>'
+            f'<p class="typography_content">{text} {rng.randint(1, 30)} jours de retard</p>'
+            f'<div class="styles_actions">' + '<button class="btn">Utile</button>' * 5 + '</div></article>'
+        )
+    script = "<script>" + "var x = {};" * 5000 + "</script>"
+    footer = "".join(f'<div class="footer-col"><a href="/f/{i}">Lien {i}</a></div>' for i in range(200))
+    return (f'<html><head><title>Avis</title>{script}</head><body><nav><ul>{nav}</ul></nav>'
+            f'<main><section class="reviews">{"".join(cards)}</section></main>'
+            f'<footer>{footer}</footer></body></html>').encode('utf-8')
+
+
+def load_pages(pages_dir: str, count: int):
+    files = sorted(glob.glob(os.path.join(pages_dir, '*.html')))
+    if files:
+        pages = []
+        for path in files:
+            with open(path, 'rb') as f:
+                pages.append(f.read())
+        print(f"Pages: {len(pages)} saved pages from {pages_dir}")
+        return [pages[i % len(pages)] for i in range(max(count, len(pages)))]
+
+    rng = random.Random(0)
+    print(f"Pages: {count} synthetic review pages ({pages_dir} has no *.html)")
+    return [synthetic_page(rng, i) for i in range(count)]
+
+
+def _run_mode(options, pages, queue):
+    scraper = TrustpilotScraper(rate_limit=1000, **options)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    documents, reviews = [], 0
+    for content in pages:
+        document = scraper.parse_document(content)
+        reviews += len(scraper._parse_review_cards(document, 'colissimo'))
+        documents.append(document)  # Held to measure the memory of parsed pages
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, reviews, (peak - baseline) / 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Trustpilot page parsing')
+    parser.add_argument('--pages-dir', default='data/scraped/pages')
+    parser.add_argument('--pages', type=int, default=200, help='Minimum number of pages')
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages_dir, args.pages)
+    size = sum(len(p) for p in pages) / len(pages) / 1024
+    print(f"Average page size: {size:.0f} KB\n")
+
+    # Every mode must extract the same reviews
+    reference = None
+    for label, options in MODES.items():
+        scraper = TrustpilotScraper(rate_limit=1000, **options)
+        reviews = [scraper._parse_review_cards(scraper.parse_document(p), 'colissimo') for p in pages[:5]]
+        assert reference is None or reviews == reference, label
+        reference = reviews
+
+    context = multiprocessing.get_context('fork')
+    print(f"  {'mode':<28} {'time':>8} {'pages/s':>9} {'reviews':>8} {'peak RSS':>10}")
+    for label, options in MODES.items():
+        queue = context.Queue()
+        process = context.Process(target=_run_mode, args=(options, pages, queue))
+        process.start()
+        elapsed, reviews, memory = queue.get()
+        process.join()
+        print(f"  {label:<28} {elapsed:7.2f}s {len(pages) / elapsed:9.1f} {reviews:8d} {memory:8.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: Keyword matcher throughput on the scraped Trustpilot corpus
+
+Compares per-keyword `in` scans with each KeywordMatcher backend on the
+DisputePatternExtractor lexicon, then on a larger lexicon where the single
+pass pays off. Uses data/scraped/trustpilot_comprehensive.json when present,
+otherwise a synthetic corpus built from the same vocabulary.
+
+Usage:
+    python scripts/benchmark_keyword_matcher.py [--data-file data/scraped/trustpilot_comprehensive.json] [--texts 20000]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scrapers.utils.keyword_matcher import KeywordMatcher, AHOCORASICK_AVAILABLE
+from src.scrapers.utils.text_processor import DisputePatternExtractor
+
+FILLER = ("bonjour commande livraison colis service client produit semaine depuis toujours "
+          "appel réponse site suivi numéro adresse point relais facture vendeur").split()
+
+
+def load_corpus(data_file, count):
+    if os.path.exists(data_file):
+        with open(data_file, 'r', encoding='utf-8') as f:
+            texts = [review.get('text', '') for review in json.load(f).get('data', [])]
+        if texts:
+            print(f"Corpus: {len(texts)} reviews from {data_file}")
+            return [texts[i % len(texts)] for i in range(max(count, len(texts)))]
+
+    rng = random.Random(0)
+    extractor = DisputePatternExtractor()
+    keywords = [k for group in (extractor.DELAY_KEYWORDS, extractor.LOSS_KEYWORDS, extractor.DAMAGE_KEYWORDS)
+                for k in group] + [k for names in extractor.CARRIERS.values() for k in names]
+    print(f"Corpus: {count} synthetic reviews ({data_file} not found)")
+    return [
+        " ".join(rng.choice(keywords) if rng.random() < 0.05 else rng.choice(FILLER)
+                 for _ in range(rng.randint(15, 120)))
+        for _ in range(count)
+    ]
+
+
+def _timed(label, func, count):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:7.3f}s  {count / elapsed:10,.0f} texts/s")
+    return result
+
+
+def compare(lexicon, texts):
+    lowered = [text.lower() for text in texts]
+    expected = _timed("per-keyword scans", lambda: [
+        {c for c, keywords in lexicon.items() if any(k in t for k in keywords)} for t in lowered
+    ], len(texts))
+    backends = ['scan', 'regex'] + (['ahocorasick'] if AHOCORASICK_AVAILABLE else [])
+    for backend in backends:
+        matcher = KeywordMatcher(lexicon, backend=backend)
+        result = _timed(f"matcher ({backend})", lambda: matcher.match_batch(lowered), len(texts))
+        assert result == expected, backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the multi-keyword matcher')
+    parser.add_argument('--data-file', default='data/scraped/trustpilot_comprehensive.json')
+    parser.add_argument('--texts', type=int, default=20_000, help='Minimum number of texts')
+    args = parser.parse_args()
+
+    texts = load_corpus(args.data_file, args.texts)
+    extractor = DisputePatternExtractor()
+    lexicon = {
+        'delay': extractor.DELAY_KEYWORDS, 'loss': extractor.LOSS_KEYWORDS,
+        'damage': extractor.DAMAGE_KEYWORDS, 'proof': extractor.PROOF_KEYWORDS,
+    }
+    lexicon.update({f'carrier:{name}': keywords for name, keywords in extractor.CARRIERS.items()})
+
+    print(f"\nDispute lexicon ({sum(len(k) for k in lexicon.values())} keywords):")
+    compare(lexicon, texts)
+
+    rng = random.Random(1)
+    large = dict(lexicon)
+    large['extra'] = {"".join(rng.choice("abcdefghijlmnoprstuvé") for _ in range(rng.randint(5, 10)))
+                      for _ in range(1000)}
+    print(f"\nLarge lexicon ({sum(len(k) for k in large.values())} keywords):")
+    compare(large, texts)
+
+    print("\nFull pattern extraction:")
+    _timed("extract_patterns_batch", lambda: extractor.extract_patterns_batch(texts), len(texts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Benchmark: rejection letter OCR, legacy multi-angle vs orientation detection
+
+The legacy strategy runs Tesseract at 0°, -90° and 90° on every image and
+concatenates the three outputs. The current OCRProcessor detects the text
+orientation first (projection profiles, Tesseract OSD when ambiguous) and
+only tries other angles when the OCR confidence is low.
+
+Reports, per strategy: time per document, Tesseract runs per document, word
+recall against the ground truth and agreement of the detected rejection
+reason. A second table isolates the text format change at the upright
+angle: image_to_string (former output) vs the image_to_data words rebuilt
+line by line (_ocr_at_angle), with the share of documents where both give
+the same rejection reason. Uses the images of --fixtures-dir (each with a .txt ground truth of
+the same name) when present, otherwise synthetic letters rendered at random
+rotations. Without a Tesseract executable, only the orientation detection
+is measured.
+
+Usage:
+    python scripts/benchmark_ocr_orientation.py [--fixtures-dir data/ocr_fixtures] [--documents 24]
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont
+
+from src.scrapers import ocr_processor
+from src.scrapers.ocr_processor import OCRProcessor, _rotate
+
+LETTERS = {
+    'weight_match': "Après vérification, le poids réel du colis lors du transit correspond au poids déclaré.",
+    'bad_signature': "La signature ne correspond pas à celle du destinataire enregistrée sur le bordereau.",
+    'deadline_expired': "Votre demande d'indemnisation est rejetée car le délai de réclamation de 30 jours est dépassé.",
+    'bad_packaging': "Nous n'avons pas pu valider votre demande pour cause d'emballage insuffisant.",
+    'wrong_address': "Le colis n'a pu être remis car l'adresse de livraison était incorrecte.",
+}
+HEADER = [
+    "Service Réclamations - Direction Qualité",
+    "Objet : réponse à votre réclamation n° {number}",
+    "Madame, Monsieur,",
+]
+FOOTER = [
+    "Nous vous prions d'agréer, Madame, Monsieur, nos salutations distinguées.",
+    "Le Service Clients",
+]
+WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _wrap(text: str, width: int = 60):
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    return lines + [line]
+
+
+def synthetic_fixtures(count: int):
+    """Letters rendered at 150 dpi (A4) and rotated by a random multiple of 90°."""
+    rng = random.Random(0)
+    font = ImageFont.load_default(size=22)
+    fixtures = []
+    for i in range(count):
+        reason = rng.choice(sorted(LETTERS))
+        lines = [line.format(number=rng.randint(10000, 99999)) for line in HEADER]
+        lines += _wrap(LETTERS[reason]) + [""] + FOOTER
+        image = Image.new('L', (1240, 1754), 255)
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate(lines):
+            draw.text((100, 150 + row * 48), line, fill=0, font=font)
+        rotation = rng.choice([0, 0, 90, -90, 180])
+        fixtures.append({
+            'name': f"letter_{i:03d}_{rotation}",
+            'image': _rotate(image, rotation),
+            'truth': "\n".join(lines),
+            'reason': reason,
+            'rotation': rotation,
+        })
+    print(f"Fixtures: {count} synthetic letters")
+    return fixtures
+
+
+def load_fixtures(fixtures_dir: str, count: int):
+    paths = sorted(
+        path for pattern in ('*.png', '*.jpg', '*.jpeg') for path in glob.glob(os.path.join(fixtures_dir, pattern))
+    )
+    fixtures = []
+    for path in paths:
+        truth_path = os.path.splitext(path)[0] + '.txt'
+        if not os.path.exists(truth_path):
+            continue
+        with open(truth_path, 'r', encoding='utf-8') as f:
+            truth = f.read()
+        fixtures.append({'name': os.path.basename(path), 'image': Image.open(path), 'truth': truth,
+                         'reason': None, 'rotation': None})
+    if not fixtures:
+        return synthetic_fixtures(count)
+    print(f"Fixtures: {len(fixtures)} images with ground truth from {fixtures_dir}")
+    return fixtures
+
+
+def word_recall(text: str, truth: str) -> float:
+    expected = set(WORD.findall(truth.lower()))
+    found = set(WORD.findall(text.lower()))
+    return len(expected & found) / len(expected) if expected else 1.0
+
+
+def legacy_ocr(image):
+    """Former extract_all_from_file strategy: three full OCR runs, concatenated."""
+    import pytesseract
+    full_text = ""
+    for angle in (0, -90, 90):
+        rotated_img = image.rotate(angle, expand=True).convert('L')
+        full_text += f"\n--- Angle {angle}° ---\n" + pytesseract.image_to_string(rotated_img, config=ocr_processor.OCR_CONFIG)
+    return full_text, 3
+
+
+def orientation_ocr(processor, image):
+    result = processor.ocr_image(image)
+    return result['text'], len(result['attempts'])
+
+
+def upright_angle(processor, fixture) -> int:
+    """Correction angle of a fixture (known rotation, otherwise detected)."""
+    if fixture['rotation'] is not None:
+        return 180 if fixture['rotation'] == 180 else -fixture['rotation']
+    return processor.detect_orientation(fixture['image'].convert('L'))['angles'][0]
+
+
+def benchmark_text_format(processor, fixtures):
+    """image_to_string vs image_to_data rebuilt lines, both at the upright angle."""
+    import pytesseract
+    recall_string = recall_data = same_reason = 0.0
+    for fixture in fixtures:
+        image = fixture['image'].convert('L')
+        angle = upright_angle(processor, fixture)
+        string_text = pytesseract.image_to_string(_rotate(image, angle), config=ocr_processor.OCR_CONFIG)
+        data_text, _ = processor._ocr_at_angle(image, angle)
+        recall_string += word_recall(string_text, fixture['truth'])
+        recall_data += word_recall(data_text, fixture['truth'])
+        same_reason += (processor.analyze_rejection_text(string_text)['reason_key']
+                        == processor.analyze_rejection_text(data_text)['reason_key'])
+    n = len(fixtures)
+    print(f"\nText format at the upright angle ({n} documents):")
+    print(f"  {'output':<32} {'recall':>7}")
+    print(f"  {'image_to_string':<32} {recall_string / n:7.1%}")
+    print(f"  {'image_to_data, rebuilt lines':<32} {recall_data / n:7.1%}")
+    print(f"  same rejection reason: {same_reason / n:.1%}")
+
+
+def benchmark_orientation(processor, fixtures):
+    labelled = [f for f in fixtures if f['rotation'] is not None]
+    if not labelled:
+        return
+    start = time.perf_counter()
+    correct = 0
+    for fixture in labelled:
+        angle = processor.detect_orientation(fixture['image'])['angles'][0]
+        correct += angle == upright_angle(processor, fixture)
+    elapsed = time.perf_counter() - start
+    print(f"Orientation detection: {correct}/{len(labelled)} correct, "
+          f"{elapsed / len(labelled) * 1000:.1f} ms per document\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark rejection letter OCR strategies')
+    parser.add_argument('--fixtures-dir', default='data/ocr_fixtures')
+    parser.add_argument('--documents', type=int, default=24, help='Synthetic letters when no fixtures')
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures_dir, args.documents)
+    processor = OCRProcessor()
+    processor.model = None  # Regex analysis only, deterministic
+    benchmark_orientation(processor, fixtures)
+
+    if not ocr_processor.TESSERACT_AVAILABLE:
+        print("pytesseract / Pillow not installed: OCR comparison skipped")
+        return
+    ocr_processor._configure_tesseract()
+    try:
+        ocr_processor.pytesseract.get_tesseract_version()
+    except Exception as e:
+        print(f"Tesseract unavailable ({e.__class__.__name__}): OCR comparison skipped")
+        return
+
+    strategies = {
+        'legacy (3 angles, concatenated)': legacy_ocr,
+        'orientation + early exit': lambda image: orientation_ocr(processor, image),
+    }
+    print(f"  {'strategy':<32} {'s/doc':>7} {'runs/doc':>9} {'recall':>7} {'reason ok':>10}")
+    for label, strategy in strategies.items():
+        elapsed = runs = recall = reasons = 0.0
+        for fixture in fixtures:
+            start = time.perf_counter()
+            text, attempts = strategy(fixture['image'])
+            elapsed += time.perf_counter() - start
+            runs += attempts
+            recall += word_recall(text, fixture['truth'])
+            expected = fixture['reason'] or processor.analyze_rejection_text(fixture['truth'])['reason_key']
+            reasons += processor.analyze_rejection_text(text)['reason_key'] == expected
+        n = len(fixtures)
+        print(f"  {label:<32} {elapsed / n:7.2f} {runs / n:9.2f} {recall / n:7.1%} {reasons / n:10.1%}")
+
+    benchmark_text_format(processor, fixtures)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Training Script: Fit the AIPredictor success model on historical claims
+
+Fits a logistic regression on resolved claims (carrier, dispute type,
+amount, store country), reports holdout calibration against the current
+heuristic, then refits on all claims and writes the .npz artifact loaded by
+AIPredictor at startup.
+
+Usage:
+    python scripts/train_success_model.py [--db-path database/main.db] [--output data/models/success_model.npz]
+"""
+
+import os
+import sys
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.database_manager import DatabaseManager
+from src.ai.predictor import AIPredictor
+from src.ai.success_model import DEFAULT_MODEL_PATH, SuccessModel, calibration_report, load_training_data
+
+
+def _subset(data, indices):
+    return {key: [values[i] for i in indices] for key, values in data.items()}
+
+
+def _fit(data, l2):
+    return SuccessModel.fit(data['carrier'], data['dispute_type'], data['amount'], data['country'],
+                            data['label'], l2=l2)
+
+
+def _records(data):
+    return [
+        {'carrier': c, 'dispute_type': t, 'amount_recoverable': a, 'country': n}
+        for c, t, a, n in zip(data['carrier'], data['dispute_type'], data['amount'], data['country'])
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the claim success model')
+    parser.add_argument('--db-path', default=None, help='SQLite database (default: database/main.db)')
+    parser.add_argument('--output', default=DEFAULT_MODEL_PATH, help='Model artifact path')
+    parser.add_argument('--holdout', type=float, default=0.2, help='Share of claims kept for evaluation')
+    parser.add_argument('--l2', type=float, default=1.0, help='L2 regularization')
+    parser.add_argument('--min-samples', type=int, default=50, help='Minimum resolved claims')
+    args = parser.parse_args()
+
+    data = load_training_data(DatabaseManager(db_path=args.db_path))
+    total = len(data['label'])
+    if total < args.min_samples:
+        print(f"❌ Only {total} resolved claims (minimum {args.min_samples}), model not trained")
+        sys.exit(1)
+
+    order = np.random.default_rng(42).permutation(total)
+    split = int(total * (1 - args.holdout))
+    train, test = _subset(data, order[:split]), _subset(data, order[split:])
+
+    if test['label']:
+        model = _fit(train, args.l2)
+        heuristic = AIPredictor(model_path=None)
+        print(f"Holdout evaluation ({len(test['label'])} claims):")
+        for name, predictor in (('heuristic', heuristic), ('model', AIPredictor(model=model))):
+            report = calibration_report(test['label'], predictor.predict_success_batch(_records(test)))
+            print(f"  {name:<10} brier={report['brier']:.4f} log_loss={report['log_loss']:.4f} ece={report['ece']:.4f}")
+
+    model = _fit(data, args.l2)
+    model.save(args.output)
+    print(f"✅ Model trained on {total} claims saved to {args.output} ({os.path.getsize(args.output)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 
 import logging
 import random
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from src.ai.success_model import DEFAULT_MODEL_PATH, SuccessModel, load_success_model
 
 logger = logging.getLogger(__name__)
 
@@ -32,14 +36,19 @@ class AIPredictor:
         'invalid_pod': 0.90     # Facile si signature absente
     }
 
-    def predict_success(self, dispute_data: Dict[str, Any]) -> Dict[str, Any]:
+    def __init__(self, model: Optional[SuccessModel] = None, model_path: Optional[str] = DEFAULT_MODEL_PATH):
         """
-        Calcule la probabilité de succès et le délai de remboursement.
+        Args:
+            model: Modèle de succès déjà chargé
+            model_path: Artefact entraîné (scripts/train_success_model.py). Sans
+                artefact (ou None), les coefficients du marché ci-dessus sont utilisés.
         """
-        carrier = dispute_data.get('carrier', 'Unknown')
-        d_type = dispute_data.get('dispute_type', 'lost')
-        amount = dispute_data.get('amount_recoverable', 0.0)
-        
+        if model is None and model_path:
+            model = load_success_model(model_path)
+        self.model = model
+
+    def _heuristic_probability(self, carrier: str, d_type: str, amount: float):
+        """Retourne (proba de base transporteur × type, proba ajustée au montant)."""
         # Logique de base : Proba = (Base Carrier * Base Type)
         base_proba = self.CARRIER_COEFFICIENTS.get(carrier, 0.70) * self.TYPE_COEFFICIENTS.get(d_type, 0.75)
         
@@ -50,14 +59,34 @@ class AIPredictor:
         elif amount > 200:
             amount_penalty = 0.05
             
-        final_proba = max(0.1, min(0.99, base_proba - amount_penalty))
-        
-        # Prédiction du délai (jours)
-        base_days = 7
+        return base_proba, max(0.1, min(0.99, base_proba - amount_penalty))
+
+    def predict_days(self, carrier: str) -> int:
+        """Délai moyen de remboursement (jours) pour un transporteur."""
         if carrier == 'Chronopost' or carrier == 'UPS':
-            base_days = 4
+            return 4
         elif carrier == 'Colissimo' or carrier == 'Mondial Relay':
-            base_days = 12
+            return 12
+        return 7
+
+    def predict_success(self, dispute_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Calcule la probabilité de succès et le délai de remboursement.
+        """
+        carrier = dispute_data.get('carrier', 'Unknown')
+        d_type = dispute_data.get('dispute_type', 'lost')
+        amount = dispute_data.get('amount_recoverable', 0.0)
+        
+        if self.model is not None:
+            final_proba = max(0.01, min(0.99, float(self.model.predict_records([dispute_data])[0])))
+            reasoning = (f"Modèle entraîné sur {self.model.metadata.get('samples', 0)} litiges résolus : "
+                         f"{final_proba*100:.0f}% de succès estimé pour {carrier} sur les {d_type}.")
+        else:
+            base_proba, final_proba = self._heuristic_probability(carrier, d_type, amount)
+            reasoning = f"Basé sur un taux de succès de {base_proba*100:.0f}% pour {carrier} sur les {d_type}."
+        
+        # Prédiction du délai (jours)
+        base_days = self.predict_days(carrier)
             
         # Aléatoire léger pour le réalisme (+/- 2 jours) 
         predicted_days = base_days + random.randint(-2, 2)
@@ -66,18 +95,30 @@ class AIPredictor:
             "probability": round(final_proba, 2),
             "predicted_days": max(2, predicted_days),
             "confidence_score": 0.85, # Confiance du modèle IA
-            "reasoning": f"Basé sur un taux de succès de {base_proba*100:.0f}% pour {carrier} sur les {d_type}."
+            "reasoning": reasoning
         }
 
+    def predict_success_batch(self, disputes: List[Dict[str, Any]]) -> np.ndarray:
+        """Probabilités de succès d'un lot de litiges (vectorisé si un modèle est chargé)."""
+        if not disputes:
+            return np.zeros(0)
+        if self.model is not None:
+            return np.clip(self.model.predict_records(disputes), 0.01, 0.99)
+        return np.array([
+            self._heuristic_probability(d.get('carrier', 'Unknown'), d.get('dispute_type', 'lost'),
+                                        d.get('amount_recoverable', 0.0))[1]
+            for d in disputes
+        ])
+
     def get_forecasted_cashflow(self, disputes: list) -> Dict[str, Any]:
         """Calcule le cashflow attendu pondéré par la probabilité."""
         total_potential = 0.0
         weighted_potential = 0.0
         
-        for d in disputes:
+        probabilities = np.round(self.predict_success_batch(disputes), 2)
+        for d, probability in zip(disputes, probabilities):
             total_potential += d.get('amount_recoverable', 0.0)
-            prediction = self.predict_success(d)
-            weighted_potential += d.get('amount_recoverable', 0.0) * prediction['probability']
+            weighted_potential += d.get('amount_recoverable', 0.0) * float(probability)
             
         return {
             "total_potential_raw": total_potential,
@@ -0,0 +1,270 @@
+"""
+Success Model - Logistic regression trained on historical claim outcomes.
+
+Replaces the hard-coded carrier/type coefficients of AIPredictor with a
+compact model fitted offline (NumPy, Newton/IRLS) on the claims table:
+carrier, dispute type, amount and store country. The model is serialized
+to a small .npz artifact, loaded once per process, and scores batches with
+a single vectorized gather.
+"""
+
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = os.path.join('data', 'models', 'success_model.npz')
+
+# Issues prises en compte pour l'entraînement (les litiges ouverts sont ignorés)
+SUCCESS_STATUSES = ('accepted', 'recovered', 'paid', 'success')
+FAILURE_STATUSES = ('rejected',)
+
+UNKNOWN = '__other__'
+CATEGORICAL_FEATURES = ('carrier', 'dispute_type', 'country')
+
+
+def _normalize(feature: str, value: Any) -> str:
+    value = str(value or '').strip()
+    return value.upper() if feature == 'country' else value.lower()
+
+
+def _amount_feature(amounts) -> np.ndarray:
+    return np.log1p(np.clip(np.asarray(amounts, dtype=float), 0.0, None))
+
+
+def calibration_report(labels: Sequence[int], probabilities: Sequence[float], bins: int = 10) -> Dict[str, float]:
+    """
+    Mesures de calibration d'un jeu de probabilités.
+
+    Returns:
+        brier, log_loss et ece (expected calibration error)
+    """
+    y = np.asarray(labels, dtype=float)
+    p = np.clip(np.asarray(probabilities, dtype=float), 1e-6, 1 - 1e-6)
+    if not len(y):
+        return {'brier': 0.0, 'log_loss': 0.0, 'ece': 0.0}
+
+    bucket = np.minimum((p * bins).astype(int), bins - 1)
+    ece = 0.0
+    for b in range(bins):
+        mask = bucket == b
+        if mask.any():
+            ece += mask.mean() * abs(y[mask].mean() - p[mask].mean())
+
+    return {
+        'brier': float(np.mean((p - y) ** 2)),
+        'log_loss': float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))),
+        'ece': float(ece)
+    }
+
+
+class SuccessModel:
+    """Régression logistique sur (transporteur, type, montant, pays)."""
+
+    def __init__(self, vocabularies: Dict[str, List[str]], weights: np.ndarray,
+                 amount_mean: float = 0.0, amount_std: float = 1.0, metadata: Optional[Dict] = None):
+        """
+        Args:
+            vocabularies: Modalités connues par variable (UNKNOWN en première position)
+            weights: [biais, poids des modalités..., poids du montant]
+            amount_mean, amount_std: Standardisation de log(1 + montant)
+            metadata: Informations d'entraînement (échantillons, calibration...)
+        """
+        self.vocabularies = vocabularies
+        self.weights = np.asarray(weights, dtype=float)
+        self.amount_mean = amount_mean
+        self.amount_std = amount_std or 1.0
+        self.metadata = metadata or {}
+
+        # Position de chaque modalité dans le vecteur de poids
+        self._index: Dict[str, Dict[str, int]] = {}
+        offset = 1
+        for feature in CATEGORICAL_FEATURES:
+            self._index[feature] = {value: offset + i for i, value in enumerate(vocabularies[feature])}
+            offset += len(vocabularies[feature])
+        self._amount_index = offset
+
+    @property
+    def n_features(self) -> int:
+        return self._amount_index + 1
+
+    # ========================================
+    # ENCODAGE
+    # ========================================
+
+    def _category_indices(self, feature: str, values: Iterable[Any]) -> np.ndarray:
+        index = self._index[feature]
+        unknown = index[UNKNOWN]
+        return np.fromiter(
+            (index.get(_normalize(feature, v), unknown) for v in values), dtype=np.intp
+        )
+
+    def _encode(self, carriers, dispute_types, amounts, countries):
+        columns = [
+            self._category_indices('carrier', carriers),
+            self._category_indices('dispute_type', dispute_types),
+            self._category_indices('country', countries)
+        ]
+        amount = (_amount_feature(amounts) - self.amount_mean) / self.amount_std
+        return columns, amount
+
+    def _design_matrix(self, carriers, dispute_types, amounts, countries) -> np.ndarray:
+        columns, amount = self._encode(carriers, dispute_types, amounts, countries)
+        X = np.zeros((len(amount), self.n_features))
+        rows = np.arange(len(amount))
+        X[:, 0] = 1.0
+        for column in columns:
+            X[rows, column] = 1.0
+        X[:, self._amount_index] = amount
+        return X
+
+    # ========================================
+    # INFÉRENCE
+    # ========================================
+
+    def predict_proba(self, carriers, dispute_types, amounts, countries=None) -> np.ndarray:
+        """Probabilités de succès d'un lot (listes alignées)."""
+        if countries is None:
+            countries = ['FR'] * len(amounts)
+        columns, amount = self._encode(carriers, dispute_types, amounts, countries)
+        w = self.weights
+        logits = w[0] + w[columns[0]] + w[columns[1]] + w[columns[2]] + w[self._amount_index] * amount
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def predict_records(self, records: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Probabilités de succès d'une liste de litiges (dicts AIPredictor)."""
+        return self.predict_proba(
+            [r.get('carrier') for r in records],
+            [r.get('dispute_type') for r in records],
+            [r.get('amount_recoverable', r.get('amount_requested')) or 0.0 for r in records],
+            [r.get('country') or 'FR' for r in records]
+        )
+
+    # ========================================
+    # ENTRAÎNEMENT
+    # ========================================
+
+    @classmethod
+    def fit(cls, carriers, dispute_types, amounts, countries, labels,
+            l2: float = 1.0, min_count: int = 5, max_iter: int = 50, tol: float = 1e-6) -> 'SuccessModel':
+        """
+        Ajuste le modèle par Newton (IRLS) avec régularisation L2.
+
+        Les modalités vues moins de min_count fois sont regroupées dans UNKNOWN.
+        """
+        y = np.asarray(labels, dtype=float)
+        if len(y) == 0:
+            raise ValueError("Aucun litige résolu pour entraîner le modèle")
+
+        raw = {'carrier': carriers, 'dispute_type': dispute_types, 'country': countries}
+        vocabularies = {}
+        for feature in CATEGORICAL_FEATURES:
+            values, counts = np.unique([_normalize(feature, v) for v in raw[feature]], return_counts=True)
+            vocabularies[feature] = [UNKNOWN] + [str(v) for v, c in zip(values, counts) if c >= min_count and v != UNKNOWN]
+
+        log_amounts = _amount_feature(amounts)
+        model = cls(vocabularies, np.zeros(1), float(log_amounts.mean()), float(log_amounts.std()))
+        X = model._design_matrix(carriers, dispute_types, amounts, countries)
+
+        penalty = np.full(X.shape[1], l2)
+        penalty[0] = 0.0  # Pas de régularisation sur le biais
+        w = np.zeros(X.shape[1])
+        for iteration in range(max_iter):
+            p = 1.0 / (1.0 + np.exp(-(X @ w)))
+            gradient = X.T @ (p - y) + penalty * w
+            hessian = (X * (p * (1 - p))[:, None]).T @ X + np.diag(penalty) + 1e-9 * np.eye(len(w))
+            step = np.linalg.solve(hessian, gradient)
+            w -= step
+            if np.max(np.abs(step)) < tol:
+                break
+
+        model.weights = w
+        model.metadata = {
+            'samples': int(len(y)),
+            'positive_rate': float(y.mean()),
+            'iterations': iteration + 1,
+            'l2': l2
+        }
+        return model
+
+    # ========================================
+    # SÉRIALISATION
+    # ========================================
+
+    def save(self, path: str = DEFAULT_MODEL_PATH) -> str:
+        """Écrit le modèle dans un artefact .npz (quelques Ko)."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        meta = {
+            'vocabularies': self.vocabularies,
+            'amount_mean': self.amount_mean,
+            'amount_std': self.amount_std,
+            'metadata': self.metadata
+        }
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, weights=self.weights, meta=np.array(json.dumps(meta)))
+        os.replace(tmp_path, path)
+        logger.info(f"Success model saved to {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> 'SuccessModel':
+        with np.load(path, allow_pickle=False) as artifact:
+            meta = json.loads(str(artifact['meta']))
+            weights = artifact['weights']
+        return cls(meta['vocabularies'], weights, meta['amount_mean'], meta['amount_std'], meta['metadata'])
+
+
+@lru_cache(maxsize=None)
+def load_success_model(path: str = DEFAULT_MODEL_PATH) -> Optional[SuccessModel]:
+    """Charge l'artefact une seule fois par process (None s'il n'a pas été entraîné)."""
+    if not os.path.exists(path):
+        return None
+    try:
+        model = SuccessModel.load(path)
+        logger.info(f"Success model loaded from {path} ({model.metadata.get('samples', 0)} samples)")
+        return model
+    except Exception as e:
+        logger.error(f"Error loading success model {path}: {e}")
+        return None
+
+
+def load_training_data(db_manager) -> Dict[str, list]:
+    """
+    Litiges résolus de la table claims, avec le pays de la boutique.
+
+    Returns:
+        Listes alignées carrier, dispute_type, amount, country, label
+    """
+    statuses = SUCCESS_STATUSES + FAILURE_STATUSES
+    conn = db_manager.get_connection()
+    try:
+        cursor = db_manager._execute(conn, f"""
+            SELECT c.carrier, c.dispute_type, c.amount_requested,
+                   COALESCE(s.country, 'FR') AS country, LOWER(c.status) AS status
+            FROM claims c
+            LEFT JOIN stores s ON s.id = c.store_id
+            WHERE LOWER(c.status) IN ({', '.join('?' for _ in statuses)})
+        """, statuses)
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    return {
+        'carrier': [row[0] for row in rows],
+        'dispute_type': [row[1] for row in rows],
+        'amount': [row[2] or 0.0 for row in rows],
+        'country': [row[3] for row in rows],
+        'label': [1 if row[4] in SUCCESS_STATUSES else 0 for row in rows]
+    }
+
+
+def train_from_db(db_manager, **fit_kwargs) -> SuccessModel:
+    """Entraîne le modèle sur l'historique des réclamations."""
+    data = load_training_data(db_manager)
+    return SuccessModel.fit(data['carrier'], data['dispute_type'], data['amount'], data['country'],
+                            data['label'], **fit_kwargs)
@@ -2,6 +2,6 @@
 Analytics package for advanced metrics and predictions.
 """
 
-from .metrics_calculator import MetricsCalculator
+from .metrics_calculator import MetricsCalculator, get_metrics_calculator
 
-__all__ = ['MetricsCalculator']
+__all__ = ['MetricsCalculator', 'get_metrics_calculator']
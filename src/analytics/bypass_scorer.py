@@ -1,18 +1,67 @@
 
+import time
 import logging
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Valeurs par défaut basées sur les benchmarks du marché
+DEFAULT_SUCCESS_RATES = {
+    'late_delivery': 0.95,
+    'lost': 0.85,
+    'damaged': 0.45,
+    'invalid_pod': 0.30
+}
+
+# Nombre minimum de dossiers pour utiliser l'historique d'un couple transporteur/type
+MIN_HISTORY = 5
+
+# Matrice transporteur × type partagée par le process, par base : {clé base: (chargée à, matrice)}
+_success_matrices: Dict[str, Tuple[float, Dict[Tuple[str, str], Tuple[int, int]]]] = {}
+_matrices_lock = threading.Lock()
+
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    """Normalise un timestamp SQLite (str) ou Postgres (datetime)."""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
 class BypassScorer:
     """
     Moteur de scoring IA (Heuristique & Statistique) pour la détection de fraude/bypass
     et l'estimation des chances de succès.
     """
     
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, matrix_ttl: float = 900.0):
+        """
+        Args:
+            db_manager: Gestionnaire de BDD
+            matrix_ttl: Durée (s) avant rechargement de la matrice de succès
+        """
         self.db = db_manager
+        self.matrix_ttl = matrix_ttl
+
+    @staticmethod
+    def _risk_score(alerts_count: int, suspicious_claims: int, created_at: Any) -> float:
+        """Formule du score de risque à partir des compteurs d'un client."""
+        score = 0
+        
+        # Chaque alerte ajoute 25 points
+        score += min(alerts_count * 25, 50)
+        
+        # Dossiers où on a détecté un bypass mais le client n'a pas mis à jour
+        score += min(suspicious_claims * 15, 40)
+        
+        # Ancienneté (plus le client est ancien sans incident, plus on a confiance)
+        created = _to_datetime(created_at)
+        if created and (datetime.now() - created).days > 90:  # Vétéran (3 mois)
+            score -= 10
+        
+        return max(0, min(score, 100))
 
     def calculate_client_risk_score(self, client_id: int) -> float:
         """
@@ -23,71 +72,107 @@ class BypassScorer:
         - Historique de détection de bypass (alertes système)
         - Volume de réclamations vs âge du compte
         """
-        score = 0
+        return self.score_all_clients([client_id]).get(client_id, 0)
+
+    def score_all_clients(self, client_ids: Optional[Iterable[int]] = None) -> Dict[int, float]:
+        """
+        Calcule le score de risque de tous les clients (ou d'une liste) en une requête.
+        
+        Les alertes et réclamations suspectes sont agrégées par client
+        (GROUP BY), puis la formule de calculate_client_risk_score est appliquée.
+        
+        Args:
+            client_ids: Clients à scorer (tous si None)
+            
+        Returns:
+            {client_id: score de 0 à 100}
+        """
+        params: List[Any] = []
+        where = ""
+        if client_ids is not None:
+            ids = list(client_ids)
+            if not ids:
+                return {}
+            where = f"WHERE c.id IN ({', '.join('?' for _ in ids)})"
+            params.extend(ids)
         
-        # 1. Analyse de l'historique des alertes
         conn = self.db.get_connection()
         try:
-            alerts_count = conn.execute(
-                "SELECT COUNT(*) FROM system_alerts WHERE related_resource_type = 'client' AND related_resource_id = ? AND alert_type = 'bypass_detected'",
-                (client_id,)
-            ).fetchone()[0]
-            
-            # Chaque alerte ajoute 25 points
-            score += min(alerts_count * 25, 50)
-            
-            # 2. Analyse des réclamations suspectes (non-déclarées)
-            # Dossiers où on a détecté un bypass mais le client n'a pas mis à jour
-            suspicious_claims = conn.execute("""
-                SELECT COUNT(*) FROM claims 
-                WHERE client_id = ? 
-                AND payment_status = 'unpaid' 
-                AND automation_status = 'action_required'
-            """, (client_id,)).fetchone()[0]
-            
-            score += min(suspicious_claims * 15, 40)
-            
-            # 3. Ancienneté (plus le client est ancien sans incident, plus on a confiance)
-            client = conn.execute("SELECT created_at FROM clients WHERE id = ?", (client_id,)).fetchone()
-            if client:
-                created_at = datetime.fromisoformat(client[0])
-                days_active = (datetime.now() - created_at).days
-                if days_active > 90: # Vétéran (3 mois)
-                    score -= 10
-                    
+            cursor = self.db._execute(conn, f"""
+                SELECT c.id, c.created_at,
+                       COALESCE(a.alerts_count, 0) AS alerts_count,
+                       COALESCE(s.suspicious_claims, 0) AS suspicious_claims
+                FROM clients c
+                LEFT JOIN (
+                    SELECT related_resource_id AS client_id, COUNT(*) AS alerts_count
+                    FROM system_alerts
+                    WHERE related_resource_type = 'client' AND alert_type = 'bypass_detected'
+                    GROUP BY related_resource_id
+                ) a ON a.client_id = c.id
+                LEFT JOIN (
+                    SELECT client_id, COUNT(*) AS suspicious_claims
+                    FROM claims
+                    WHERE payment_status = 'unpaid' AND automation_status = 'action_required'
+                    GROUP BY client_id
+                ) s ON s.client_id = c.id
+                {where}
+            """, tuple(params))
+            rows = cursor.fetchall()
         finally:
             conn.close()
-            
-        return max(0, min(score, 100))
+        
+        return {row[0]: self._risk_score(row[2], row[3], row[1]) for row in rows}
 
-    def estimate_success_probability(self, carrier: str, dispute_type: str) -> float:
+    # ========================================
+    # MATRICE DE SUCCÈS TRANSPORTEUR × TYPE
+    # ========================================
+
+    def _matrix_key(self) -> str:
+        return str(getattr(self.db, 'pg_url', None) if self.db.db_type == 'postgres' else self.db.db_path)
+
+    def refresh_success_matrix(self) -> Dict[Tuple[str, str], Tuple[int, int]]:
         """
-        Prédit la probabilité de succès (0.0 à 1.0) basée sur les données historiques.
+        Recharge la matrice (acceptés, total) par transporteur et type de litige.
+        
+        Returns:
+            {(carrier, dispute_type): (accepted, total)}
         """
-        # Historique par transporteur/type
         conn = self.db.get_connection()
         try:
-            stats = conn.execute("""
-                SELECT 
-                    SUM(CASE WHEN status = 'accepted' THEN 1 ELSE 0 END) as accepted,
-                    COUNT(*) as total
-                FROM claims 
-                WHERE carrier = ? AND dispute_type = ?
-            """, (carrier, dispute_type)).fetchone()
-            
-            if stats and stats[1] > 5: # Besoin d'un minimum de data
-                return stats[0] / stats[1]
-            
-            # Valeurs par défaut basées sur les benchmarks du marché
-            defaults = {
-                'late_delivery': 0.95,
-                'lost': 0.85,
-                'damaged': 0.45,
-                'invalid_pod': 0.30
-            }
-            return defaults.get(dispute_type, 0.50)
+            cursor = self.db._execute(conn, """
+                SELECT carrier, dispute_type,
+                       SUM(CASE WHEN status = 'accepted' THEN 1 ELSE 0 END) AS accepted,
+                       COUNT(*) AS total
+                FROM claims
+                GROUP BY carrier, dispute_type
+            """)
+            matrix = {(row[0], row[1]): (int(row[2] or 0), int(row[3])) for row in cursor.fetchall()}
         finally:
             conn.close()
+        
+        with _matrices_lock:
+            _success_matrices[self._matrix_key()] = (time.monotonic(), matrix)
+        logger.info(f"Success matrix refreshed: {len(matrix)} carrier/type pairs")
+        return matrix
+
+    def get_success_matrix(self) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        """Matrice de succès en cache, rechargée après matrix_ttl secondes."""
+        with _matrices_lock:
+            cached = _success_matrices.get(self._matrix_key())
+        if cached is None or time.monotonic() - cached[0] > self.matrix_ttl:
+            return self.refresh_success_matrix()
+        return cached[1]
+
+    def estimate_success_probability(self, carrier: str, dispute_type: str) -> float:
+        """
+        Prédit la probabilité de succès (0.0 à 1.0) basée sur les données historiques.
+        """
+        # Historique par transporteur/type
+        accepted, total = self.get_success_matrix().get((carrier, dispute_type), (0, 0))
+        if total > MIN_HISTORY:  # Besoin d'un minimum de data
+            return accepted / total
+        
+        return DEFAULT_SUCCESS_RATES.get(dispute_type, 0.50)
 
     def get_client_trust_label(self, score: float) -> Dict[str, str]:
         """Retourne un label et une couleur pour le dashboard admin."""
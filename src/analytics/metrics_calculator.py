@@ -2,24 +2,115 @@
 Analytics - Metrics Calculator
 
 Calculates advanced KPIs and statistics for the recovery system.
+
+Two engines compute the same KPIs:
+- calculate_kpis(): pandas, from a list of dispute/claim dicts
+- calculate_kpis_sql(): aggregate SQL on the claims table (SQLite or
+  Postgres), only the GROUP BY rows leave the database
+
+get_client_kpis() / get_client_temporal_evolution() serve the SQL results
+from an LRU cache (metrics_cache). Each entry records the client's data
+version (DatabaseManager.get_data_version), bumped by every claim/dispute
+write, so only the entries of a modified client are recomputed.
 """
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from copy import deepcopy
+from datetime import datetime, timedelta, date
+from typing import Dict, Hashable, List, Optional, Any, Tuple
 import logging
 import random
+import threading
 
 logger = logging.getLogger(__name__)
 
+SUCCESS_STATUSES = ('accepted', 'recovered', 'paid', 'success')
+RECOVERED_STATUSES = ('accepted', 'recovered', 'paid')
+OPEN_STATUSES = ('pending', 'submitted', 'under_review')
+
+
+def claim_to_dispute(claim: Dict) -> Dict:
+    """Map a claims row to the dispute fields used by calculate_kpis()."""
+    return {
+        'claim_reference': claim.get('claim_reference'),
+        'order_id': claim.get('order_id'),
+        'carrier': claim.get('carrier') or 'unknown',
+        'status': claim.get('status') or 'pending',
+        'claim_value': claim.get('amount_requested') or 0.0,
+        'amount_recovered': claim.get('accepted_amount') or 0.0,
+        'submitted_at': claim.get('submitted_at'),
+        'resolved_at': claim.get('response_received_at'),
+    }
+
+
+class KPICache:
+    """Thread-safe LRU of computed metrics, each tagged with a data version."""
+
+    def __init__(self, maxsize: int = 256):
+        """
+        Args:
+            maxsize: Maximum number of cached results (memory bound)
+        """
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Hashable, Tuple[int, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        """Cached value for key if it was computed at this data version, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[1]
+            if entry is not None:
+                # Données du client modifiées depuis le calcul
+                del self._entries[key]
+                self.stats['invalidations'] += 1
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, key: Hashable, version: int, value: Any):
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters, current size and hit rate (0-1)."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class MetricsCalculator:
     """Calculate advanced metrics and KPIs for recovery analytics."""
     
-    def __init__(self):
-        """Initialize metrics calculator."""
-        self.metrics_cache = {}
+    def __init__(self, db_manager=None, cache_size: int = 256):
+        """
+        Initialize metrics calculator.
+        
+        Args:
+            db_manager: DatabaseManager used by the cached SQL metrics (global one by default)
+            cache_size: Maximum number of cached results
+        """
+        self.db = db_manager
+        self.metrics_cache = KPICache(cache_size)
         logger.info("MetricsCalculator initialized")
     
     def calculate_kpis(self, disputes: List[Dict]) -> Dict:
@@ -33,7 +124,7 @@ class MetricsCalculator:
             Dictionary with KPIs
         """
         if not disputes:
-            return self._empty_kpis()
+            return self.empty_kpis()
         
         df = pd.DataFrame(disputes)
         
@@ -59,8 +150,7 @@ class MetricsCalculator:
         if 'status' not in df.columns or len(df) == 0:
             return 0.0
         
-        success_statuses = ['accepted', 'recovered', 'paid', 'success']
-        successful = df[df['status'].str.lower().isin(success_statuses)]
+        successful = df[df['status'].str.lower().isin(SUCCESS_STATUSES)]
         
         return (len(successful) / len(df)) * 100
     
@@ -86,8 +176,7 @@ class MetricsCalculator:
         
         # Fallback: estimate from claim values
         if 'claim_value' in df.columns and 'status' in df.columns:
-            success_statuses = ['accepted', 'recovered', 'paid']
-            successful = df[df['status'].str.lower().isin(success_statuses)]
+            successful = df[df['status'].str.lower().isin(RECOVERED_STATUSES)]
             return successful['claim_value'].sum()
         
         return 0.0
@@ -100,11 +189,13 @@ class MetricsCalculator:
     
     def _calculate_roi(self, df: pd.DataFrame) -> float:
         """Calculate ROI for client (money recovered / time invested)."""
-        total_recovered = self._calculate_total_recovered(df)
-        
+        return self._roi(self._calculate_total_recovered(df), len(df))
+    
+    def _roi(self, total_recovered: float, claims_count: int) -> float:
+        """ROI from the recovered total and the number of claims."""
         # Assume each claim takes 10 min of client time at setup
         # Then fully automated (0 time)
-        setup_time_hours = (len(df) * 10) / 60  # minutes to hours
+        setup_time_hours = (claims_count * 10) / 60  # minutes to hours
         
         # Value of time: €30/hour assumption
         time_value = setup_time_hours * 30
@@ -146,8 +237,8 @@ class MetricsCalculator:
         status_counts = df['status'].value_counts().to_dict()
         return status_counts
     
-    def _empty_kpis(self) -> Dict:
-        """Return empty KPIs structure."""
+    def empty_kpis(self) -> Dict:
+        """Return empty KPIs structure (no claims, or no client selected)."""
         return {
             'total_claims': 0,
             'success_rate': 0.0,
@@ -158,7 +249,213 @@ class MetricsCalculator:
             'by_carrier': {},
             'by_status': {}
         }
-    
+
+    # ========================================
+    # SQL ENGINE (aggregates computed by the database)
+    # ========================================
+
+    def _claims_filter(self, client_id: Optional[int], start: Optional[str], end: Optional[str]):
+        """WHERE clause and params for the claims of a client / period (None = all)."""
+        clauses, params = [], []
+        if client_id is not None:
+            clauses.append("client_id = ?")
+            params.append(client_id)
+        if start is not None:
+            clauses.append("created_at >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("created_at < ?")
+            params.append(end)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, tuple(params)
+
+    def _days_expression(self, db_manager) -> str:
+        """SQL expression of the whole days between submission and response."""
+        if db_manager.db_type == 'postgres':
+            return "EXTRACT(DAY FROM (response_received_at - submitted_at))"
+        return "CAST(julianday(response_received_at) - julianday(submitted_at) AS INTEGER)"
+
+    def calculate_kpis_sql(
+        self,
+        db_manager,
+        client_id: Optional[int] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> Dict:
+        """
+        Calculate the calculate_kpis() KPIs with aggregate SQL on the claims table.
+
+        Claims are read as claim_to_dispute() maps them (claim_value =
+        amount_requested, amount_recovered = accepted_amount, resolved_at =
+        response_received_at). Only one row per (carrier, status) is fetched.
+
+        Args:
+            db_manager: DatabaseManager (SQLite or Postgres)
+            client_id: Restrict to one client (None = all clients, admin view)
+            start: Claims created at or after this date (ISO)
+            end: Claims created before this date (ISO)
+
+        Returns:
+            Dictionary with KPIs (same structure as calculate_kpis)
+        """
+        where, params = self._claims_filter(client_id, start, end)
+        days = self._days_expression(db_manager)
+
+        conn = db_manager.get_connection()
+        try:
+            cursor = db_manager._execute(conn, f"""
+                SELECT COALESCE(carrier, 'unknown') AS carrier,
+                       COALESCE(status, 'pending') AS status,
+                       COUNT(*) AS claims_count,
+                       SUM(COALESCE(amount_requested, 0)) AS total_value,
+                       SUM(COALESCE(accepted_amount, 0)) AS total_recovered,
+                       COUNT(response_received_at) AS resolved_count,
+                       SUM({days}) AS days_sum,
+                       COUNT({days}) AS days_count
+                FROM claims
+                {where}
+                GROUP BY COALESCE(carrier, 'unknown'), COALESCE(status, 'pending')
+            """, params)
+            rows = [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+        if not rows:
+            return self.empty_kpis()
+
+        total = sum(row['claims_count'] for row in rows)
+        total_value = sum(float(row['total_value'] or 0) for row in rows)
+        total_recovered = sum(float(row['total_recovered'] or 0) for row in rows)
+        successful = sum(row['claims_count'] for row in rows if row['status'].lower() in SUCCESS_STATUSES)
+        resolved = sum(row['resolved_count'] for row in rows)
+        days_count = sum(row['days_count'] for row in rows)
+        days_sum = sum(float(row['days_sum'] or 0) for row in rows)
+
+        if resolved == 0:
+            avg_processing = 5.0  # Default estimate (same as the pandas path)
+        else:
+            avg_processing = days_sum / days_count if days_count else float('nan')
+
+        by_carrier: Dict[str, Dict] = {}
+        by_status: Dict[str, int] = {}
+        for row in rows:
+            carrier = by_carrier.setdefault(row['carrier'], {'count': 0, 'total_value': 0.0, 'successful': 0})
+            carrier['count'] += row['claims_count']
+            carrier['total_value'] += float(row['total_value'] or 0)
+            if row['status'].lower() in SUCCESS_STATUSES:
+                carrier['successful'] += row['claims_count']
+            by_status[row['status']] = by_status.get(row['status'], 0) + row['claims_count']
+
+        for metrics in by_carrier.values():
+            successful_count = metrics.pop('successful')
+            metrics['avg_value'] = metrics['total_value'] / metrics['count']
+            metrics['success_rate'] = (successful_count / metrics['count']) * 100
+
+        return {
+            'total_claims': total,
+            'success_rate': (successful / total) * 100,
+            'average_processing_time': avg_processing,
+            'total_recovered': total_recovered,
+            'average_claim_value': total_value / total,
+            'roi_client': self._roi(total_recovered, total),
+            'by_carrier': by_carrier,
+            'by_status': by_status
+        }
+
+    def get_temporal_evolution_sql(
+        self,
+        db_manager,
+        client_id: Optional[int] = None,
+        period_days: int = 30
+    ) -> Dict:
+        """
+        get_temporal_evolution() read from the claims_daily_rollup table.
+
+        The rollup holds one row per (client, carrier, status, day), so the
+        query reads at most one aggregated row per day of the period instead
+        of every claim. The period starts at the beginning of the cutoff day.
+
+        Args:
+            db_manager: DatabaseManager (SQLite or Postgres)
+            client_id: Restrict to one client (None = all clients)
+            period_days: Time period (30, 90, 365)
+
+        Returns:
+            Dictionary with daily data for charts
+        """
+        cutoff_day = (datetime.now() - timedelta(days=period_days)).date().isoformat()
+        clauses, params = ["is_submitted = 1", "day >= ?"], [cutoff_day]
+        if client_id is not None:
+            clauses.append("client_id = ?")
+            params.append(client_id)
+
+        conn = db_manager.get_connection()
+        try:
+            cursor = db_manager._execute(conn, f"""
+                SELECT day, SUM(claims_count) AS claims_count, SUM(total_value) AS amount
+                FROM claims_daily_rollup
+                WHERE {' AND '.join(clauses)}
+                GROUP BY day
+                ORDER BY day
+            """, tuple(params))
+            rows = [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+        dates, claims, amounts, cumulative = [], [], [], []
+        running = 0.0
+        for row in rows:
+            day_value = row['day']
+            if isinstance(day_value, str):
+                day_value = datetime.strptime(day_value, '%Y-%m-%d').date()
+            running += float(row['amount'] or 0)
+            dates.append(day_value)
+            claims.append(int(row['claims_count']))
+            amounts.append(float(row['amount'] or 0))
+            cumulative.append(running)
+
+        return {'dates': dates, 'claims': claims, 'amounts': amounts, 'cumulative': cumulative}
+
+    # ========================================
+    # CACHED METRICS
+    # ========================================
+
+    def _get_db(self):
+        if self.db is None:
+            from src.database.database_manager import get_db_manager
+            self.db = get_db_manager()
+        return self.db
+
+    def _cached(self, key: Tuple, client_id: Optional[int], compute) -> Any:
+        """Serve key from the cache if the client's data version did not change."""
+        version = self._get_db().get_data_version(client_id)
+        value = self.metrics_cache.get(key, version)
+        if value is None:
+            value = compute()
+            self.metrics_cache.put(key, version, value)
+        # Copie : l'appelant peut modifier le résultat sans altérer le cache
+        return deepcopy(value)
+
+    def get_client_kpis(self, client_id: Optional[int] = None, start: Optional[str] = None,
+                        end: Optional[str] = None) -> Dict:
+        """calculate_kpis_sql() through the cache, keyed by client and period."""
+        return self._cached(
+            ('kpis', client_id, start, end), client_id,
+            lambda: self.calculate_kpis_sql(self._get_db(), client_id, start, end)
+        )
+
+    def get_client_temporal_evolution(self, client_id: Optional[int] = None,
+                                      period_days: int = 30) -> Dict:
+        """get_temporal_evolution_sql() through the cache, keyed by client, period and day."""
+        return self._cached(
+            ('evolution', client_id, period_days, date.today()), client_id,
+            lambda: self.get_temporal_evolution_sql(self._get_db(), client_id, period_days)
+        )
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit rate and counters of the metrics cache."""
+        return self.metrics_cache.get_stats()
+
     def get_temporal_evolution(
         self,
         disputes: List[Dict],
@@ -270,6 +567,27 @@ class MetricsCalculator:
         return pd.DataFrame(data)
     
 
+# Instances globales, une par base de données
+_metrics_calculators: Dict[Optional[str], MetricsCalculator] = {}
+_metrics_calculators_lock = threading.Lock()
+
+def get_metrics_calculator(db_manager=None) -> MetricsCalculator:
+    """
+    MetricsCalculator partagé par le process (son cache survit aux reruns Streamlit).
+
+    Args:
+        db_manager: DatabaseManager lu par les métriques (base globale si None) ;
+            un calculateur par fichier de base
+    """
+    key = getattr(db_manager, 'db_path', None)
+    with _metrics_calculators_lock:
+        calculator = _metrics_calculators.get(key)
+        if calculator is None:
+            calculator = MetricsCalculator(db_manager)
+            _metrics_calculators[key] = calculator
+        return calculator
+
+
 # Test
 if __name__ == "__main__":
     calculator = MetricsCalculator()
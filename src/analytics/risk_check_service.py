@@ -1,49 +1,235 @@
 
+import math
+import time
+import hashlib
 import logging
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from src.database.database_manager import get_db_manager
 
 logger = logging.getLogger(__name__)
 
+# Entités vérifiées pour chaque commande : (type dans le registre, champ de la commande)
+ORDER_ENTITIES = [
+    ('email', 'customer_email'),
+    ('address', 'delivery_address'),
+    ('phone', 'customer_phone')
+]
+
+
+def _entity_key(entity_type: str, value: str) -> int:
+    """Clé hachée 64 bits d'une entité (type + valeur)."""
+    digest = hashlib.blake2b(f"{entity_type}\x1f{value}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class BloomFilter:
+    """Filtre de Bloom sur les clés 64 bits (double hachage), sans faux négatifs."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.capacity = capacity
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: int):
+        h1, h2 = key & 0xFFFFFFFF, (key >> 32) | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: int):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: int) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class FraudRegistryIndex:
+    """
+    Index mémoire du registre global de fraude.
+    
+    Une table de hachage par type d'entité (clé = empreinte 64 bits de la valeur).
+    Le rechargement est incrémental : seules les lignes d'id supérieur à la
+    dernière version chargée sont lues. Un rechargement complet a lieu si des
+    lignes ont disparu du registre, et au moins toutes les full_refresh_interval
+    secondes pour prendre en compte les UPDATE en place (risk_level, reason),
+    que l'incrémental ne voit pas. Il est construit à part puis substitué :
+    les recherches concurrentes ne voient jamais un index à moitié chargé.
+    """
+
+    def __init__(self, db_manager, refresh_interval: float = 30.0,
+                 bloom: bool = False, bloom_error_rate: float = 0.01,
+                 full_refresh_interval: float = 600.0):
+        """
+        Args:
+            db_manager: Gestionnaire de BDD
+            refresh_interval: Délai (s) entre deux vérifications de version
+            bloom: Active le filtre de Bloom devant les tables (rejets rapides)
+            bloom_error_rate: Taux de faux positifs visé pour le filtre
+            full_refresh_interval: Délai (s) maximal entre deux rechargements complets
+        """
+        self.db = db_manager
+        self.refresh_interval = refresh_interval
+        self.full_refresh_interval = full_refresh_interval
+        self.use_bloom = bloom
+        self.bloom_error_rate = bloom_error_rate
+        self.entries: Dict[str, Dict[int, Tuple[str, str]]] = {}
+        self.bloom: Optional[BloomFilter] = None
+        self.version = 0
+        self.last_check: Optional[float] = None
+        self.last_full_refresh: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.entries.values())
+
+    def _load(self, conn, since_id: int, max_id: int, tables: Dict[str, Dict[int, Tuple[str, str]]],
+              bloom: Optional[BloomFilter]) -> int:
+        """Charge les lignes d'id ]since_id, max_id] dans tables (et bloom)."""
+        cursor = self.db._execute(conn, """
+            SELECT entity_type, entity_value, risk_level, reason
+            FROM global_fraud_registry WHERE id > ? AND id <= ?
+        """, (since_id, max_id))
+        bloom_add = bloom.add if bloom is not None else None
+        loaded = 0
+        while True:
+            rows = cursor.fetchmany(10000)
+            if not rows:
+                break
+            for entity_type, value, level, reason in rows:
+                entries = tables.get(entity_type)
+                if entries is None:
+                    entries = tables[entity_type] = {}
+                key = _entity_key(entity_type, value)
+                entries[key] = (level, reason)
+                if bloom_add:
+                    bloom_add(key)
+            loaded += len(rows)
+        return loaded
+
+    def _reload(self, conn, max_id: int, count: int) -> int:
+        """Rechargement complet, construit à part puis substitué à l'index courant."""
+        tables: Dict[str, Dict[int, Tuple[str, str]]] = {}
+        bloom = BloomFilter(max(count * 2, 1024), self.bloom_error_rate) if self.use_bloom else None
+        loaded = self._load(conn, 0, max_id, tables, bloom)
+        self.entries, self.bloom, self.version = tables, bloom, max_id
+        self.last_full_refresh = time.monotonic()
+        return loaded
+
+    def _rebuild_bloom(self, capacity: int):
+        self.bloom = BloomFilter(max(capacity * 2, 1024), self.bloom_error_rate)
+        for entries in self.entries.values():
+            for key in entries:
+                self.bloom.add(key)
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Synchronise l'index avec le registre.
+        
+        Args:
+            full: Recharge tout le registre (lignes modifiées en place comprises)
+        
+        Returns:
+            Nombre de lignes chargées
+        """
+        with self._lock:
+            conn = self.db.get_connection()
+            try:
+                cursor = self.db._execute(conn, "SELECT COALESCE(MAX(id), 0), COUNT(*) FROM global_fraud_registry")
+                max_id, count = cursor.fetchone()
+                
+                if full or self.last_full_refresh is None or max_id < self.version:
+                    loaded = self._reload(conn, max_id, count)
+                else:
+                    loaded = self._load(conn, self.version, max_id, self.entries, self.bloom) \
+                        if max_id > self.version else 0
+                    self.version = max_id
+                    # Lignes supprimées : l'incrémental ne les voit pas, on recharge tout
+                    if len(self) > count:
+                        loaded = self._reload(conn, max_id, count)
+            finally:
+                conn.close()
+            
+            if self.bloom is not None and len(self) > self.bloom.capacity:
+                self._rebuild_bloom(len(self))
+            self.last_check = time.monotonic()
+        
+        if loaded:
+            logger.info(f"Fraud registry index: {loaded} rows loaded (version {self.version}, {len(self)} entries)")
+        return loaded
+
+    def refresh_if_stale(self):
+        """
+        Vérifie la version du registre si refresh_interval est écoulé, et
+        recharge tout si full_refresh_interval est écoulé.
+        """
+        now = time.monotonic()
+        if self.last_full_refresh is None or now - self.last_full_refresh >= self.full_refresh_interval:
+            self.refresh(full=True)
+        elif self.last_check is None or now - self.last_check >= self.refresh_interval:
+            self.refresh()
+
+    def lookup(self, entity_type: str, value: str) -> Optional[Tuple[str, str]]:
+        """Retourne (risk_level, reason) si l'entité est dans le registre."""
+        key = _entity_key(entity_type, value)
+        if self.bloom is not None and key not in self.bloom:
+            return None
+        entries = self.entries.get(entity_type)
+        return entries.get(key) if entries else None
+
+
+# Index partagés par base dans le process
+_indexes: Dict[str, FraudRegistryIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_fraud_index(db_manager, **kwargs) -> FraudRegistryIndex:
+    """Retourne l'index du registre de fraude partagé pour cette base."""
+    key = str(db_manager.pg_url if db_manager.db_type == 'postgres' else db_manager.db_path)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = FraudRegistryIndex(db_manager, **kwargs)
+        return _indexes[key]
+
+
 class RiskCheckService:
     """Service d'analyse de risque pré-expédition."""
     
-    def __init__(self, db_manager=None):
+    def __init__(self, db_manager=None, index: Optional[FraudRegistryIndex] = None):
         self.db = db_manager or get_db_manager()
+        self.index = index if index is not None else get_fraud_index(self.db)
 
     def check_order_risk(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analyse une commande pour détecter des risques de fraude ou de litige futur.
         """
-        email = order_data.get('customer_email')
-        address = order_data.get('delivery_address')
-        phone = order_data.get('customer_phone')
+        self.index.refresh_if_stale()
+        return self._check(order_data)
+
+    def check_orders_risk(self, orders: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analyse un lot de commandes (ex: une synchronisation complète).
         
+        L'index est synchronisé une seule fois pour tout le lot.
+        """
+        self.index.refresh_if_stale()
+        return [self._check(order_data) for order_data in orders]
+
+    def _check(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
         risk_score = 0
         reasons = []
         
         # 1. Véron dans le registre global de fraude
-        entities = [
-            ('email', email),
-            ('address', address),
-            ('phone', phone)
-        ]
-        
-        conn = self.db.get_connection()
-        for entity_type, value in entities:
+        for entity_type, field in ORDER_ENTITIES:
+            value = order_data.get(field)
             if not value: continue
             
-            match = conn.execute(
-                "SELECT risk_level, reason FROM global_fraud_registry WHERE entity_type = ? AND entity_value = ?",
-                (entity_type, value)
-            ).fetchone()
-            
+            match = self.index.lookup(entity_type, value)
             if match:
-                level = match['risk_level']
+                level, reason = match
                 risk_score += self._level_to_score(level)
-                reasons.append(f"Entity {entity_type} matched in fraud registry: {match['reason']}")
-        
-        conn.close()
+                reasons.append(f"Entity {entity_type} matched in fraud registry: {reason}")
         
         # 2. Analyse comportementale simple (Multi-commandes rapides)
         # (Simulation de logique métier)
@@ -77,3 +263,4 @@ class RiskCheckService:
             logger.info(f"Fraud reported: {entity_type}={entity_value}")
         finally:
             conn.close()
+        self.index.refresh()
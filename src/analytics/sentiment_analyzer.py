@@ -2,6 +2,8 @@
 import logging
 from typing import Dict, Any, List
 
+from src.scrapers.utils.keyword_matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
 class SentimentAnalyzer:
@@ -10,19 +12,25 @@ class SentimentAnalyzer:
     Identifie les clients frustrés ou mécontents pour priorisation.
     """
     
+    # Mots-clés de frustration (Simulation Lexicale)
+    NEGATIVE_WORDS = ['énervé', 'mécontent', 'inacceptable', 'scandaleux', 'remboursement immédiat', 'avocat', 'plainte', 'nul']
+    POSITIVE_WORDS = ['merci', 'super', 'génial', 'rapide', 'efficace', 'parfait']
+    
+    def __init__(self):
+        # Lexique compilé une seule fois (un passage par texte)
+        self.matcher = KeywordMatcher.for_lexicon({
+            'negative': self.NEGATIVE_WORDS,
+            'positive': self.POSITIVE_WORDS
+        })
+    
     def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """
         Analyse le sentiment du texte.
         Retourne un score de sentiment (-1.0 à 1.0) et des labels.
         """
-        text_lower = text.lower()
-        
-        # Mots-clés de frustration (Simulation Lexicale)
-        negative_words = ['énervé', 'mécontent', 'inacceptable', 'scandaleux', 'remboursement immédiat', 'avocat', 'plainte', 'nul']
-        positive_words = ['merci', 'super', 'génial', 'rapide', 'efficace', 'parfait']
-        
-        neg_count = sum(1 for word in negative_words if word in text_lower)
-        pos_count = sum(1 for word in positive_words if word in text_lower)
+        counts = self.matcher.count(text.lower())
+        neg_count = counts.get('negative', 0)
+        pos_count = counts.get('positive', 0)
         
         score = 0
         if neg_count > 0:
@@ -51,9 +59,13 @@ class SentimentAnalyzer:
             "detected_frustration": neg_count > 0
         }
 
+    def analyze_sentiment_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Analyse le sentiment d'une liste de textes."""
+        return [self.analyze_sentiment(text) for text in texts]
+
     def batch_analyze_tickets(self, tickets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Analyse une liste de tickets et ajoute les métadonnées de sentiment."""
-        for ticket in tickets:
-            content = ticket.get('preview', '') + " " + ticket.get('subject', '')
-            ticket['sentiment_analysis'] = self.analyze_sentiment(content)
+        contents = [ticket.get('preview', '') + " " + ticket.get('subject', '') for ticket in tickets]
+        for ticket, analysis in zip(tickets, self.analyze_sentiment_batch(contents)):
+            ticket['sentiment_analysis'] = analysis
         return tickets
@@ -0,0 +1,451 @@
+"""
+DeadlineScheduler - Planificateur d'échéances des réclamations.
+
+Au lieu de rescanner périodiquement toute la table claims, chaque dossier
+enregistre sa prochaine échéance au moment de la soumission ou d'une escalade :
+- relance (J+7, J+14, J+21 selon le niveau d'escalade)
+- délai légal de réponse du transporteur (LEGAL_RESPONSE_TIMES)
+
+Les échéances sont persistées dans la table indexée claim_deadlines. Un tas
+(heap) en mémoire contient les échéances de la fenêtre à venir, ce qui permet
+au processus de dormir exactement jusqu'à la prochaine échéance. Une échéance
+n'est supprimée qu'une fois traitée ; en cas d'échec elle est reprogrammée
+avec un délai croissant.
+
+Usage:
+    python -m src.automation.deadline_scheduler --mode backfill    # dossiers déjà soumis
+    python -m src.automation.deadline_scheduler --mode continuous  # boucle du planificateur
+"""
+
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.automation.claim_automation import LEGAL_RESPONSE_TIMES
+from src.automation.follow_up_manager import FollowUpManager
+from src.database.database_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Jours depuis la soumission pour chaque niveau de relance
+ESCALATION_DELAYS = {level: days for level, days, _ in FollowUpManager.ESCALATION_LEVELS}
+
+KIND_FOLLOW_UP = 'follow_up'
+KIND_LEGAL_RESPONSE = 'legal_response'
+
+# Reprogrammation d'une échéance dont le traitement a échoué
+RETRY_BASE_DELAY = timedelta(minutes=1)
+RETRY_MAX_DELAY = timedelta(hours=6)
+
+
+def legal_response_days(carrier: str) -> int:
+    """Délai légal de réponse (en jours) pour un transporteur."""
+    return LEGAL_RESPONSE_TIMES.get((carrier or '').lower(), LEGAL_RESPONSE_TIMES['default'])
+
+
+def _to_datetime(value: Any) -> datetime:
+    """Normalise un timestamp SQLite (str) ou Postgres (datetime)."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+class DeadlineScheduler:
+    """File d'échéances persistée (claim_deadlines) avec un tas en mémoire."""
+
+    def __init__(self, db_manager: DatabaseManager = None,
+                 window: timedelta = timedelta(hours=1), max_loaded: int = 10000):
+        """
+        Initialize scheduler.
+
+        Args:
+            db_manager: Gestionnaire de BDD (table claim_deadlines, créée par sa migration)
+            window: Horizon des échéances chargées dans le tas en mémoire
+            max_loaded: Nombre maximum d'échéances chargées à la fois
+        """
+        self.db = db_manager or DatabaseManager()
+        self.window = window
+        self.max_loaded = max_loaded
+
+        self._heap: List[Tuple[datetime, int, str, int]] = []
+        # Échéance courante par (claim_id, kind) : les entrées obsolètes du tas sont ignorées
+        self._entries: Dict[Tuple[int, str], Tuple[datetime, int]] = {}
+        self._loaded_until: Optional[datetime] = None
+        # Échecs consécutifs par (claim_id, kind), pour le délai de reprogrammation
+        self._failures: Dict[Tuple[int, str], int] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+    # ========================================
+    # ENREGISTREMENT DES ÉCHÉANCES
+    # ========================================
+
+    def schedule_claim(self, claim_id: int, carrier: str, submitted_at: Any,
+                       follow_up_level: int = 0) -> Dict[str, Optional[datetime]]:
+        """
+        Enregistre les prochaines échéances d'un dossier soumis ou escaladé.
+
+        Args:
+            claim_id: ID de la réclamation
+            carrier: Transporteur (détermine le délai légal de réponse)
+            submitted_at: Date de soumission
+            follow_up_level: Niveau d'escalade déjà atteint (0 à 3)
+
+        Returns:
+            Dict {kind: due_at} des échéances enregistrées (None si aucune)
+        """
+        submitted = _to_datetime(submitted_at)
+        next_level = (follow_up_level or 0) + 1
+
+        scheduled = {KIND_FOLLOW_UP: None, KIND_LEGAL_RESPONSE: None}
+
+        if next_level in ESCALATION_DELAYS:
+            due = submitted + timedelta(days=ESCALATION_DELAYS[next_level])
+            self.schedule(claim_id, KIND_FOLLOW_UP, due, level=next_level, carrier=carrier)
+            scheduled[KIND_FOLLOW_UP] = due
+        else:
+            self.cancel(claim_id, KIND_FOLLOW_UP)
+
+        # Le délai légal court depuis la soumission : enregistré une seule fois
+        if not follow_up_level:
+            legal_due = submitted + timedelta(days=legal_response_days(carrier))
+            self.schedule(claim_id, KIND_LEGAL_RESPONSE, legal_due, level=0, carrier=carrier)
+            scheduled[KIND_LEGAL_RESPONSE] = legal_due
+            self.db.update_claim(claim_id, response_deadline=legal_due.date().isoformat())
+
+        return scheduled
+
+    def schedule(self, claim_id: int, kind: str, due_at: datetime,
+                 level: int = 0, carrier: str = None):
+        """Enregistre (ou remplace) une échéance et réveille la boucle si besoin."""
+        conn = self.db.get_connection()
+        try:
+            self.db._execute(conn, """
+                INSERT INTO claim_deadlines (claim_id, kind, due_at, level, carrier, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (claim_id, kind) DO UPDATE SET
+                    due_at = excluded.due_at,
+                    level = excluded.level,
+                    carrier = excluded.carrier,
+                    updated_at = excluded.updated_at
+            """, (claim_id, kind, due_at.isoformat(), level, carrier, datetime.now().isoformat()))
+            conn.commit()
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._entries.pop((claim_id, kind), None)
+            if self._loaded_until is not None and due_at <= self._loaded_until:
+                self._entries[(claim_id, kind)] = (due_at, level)
+                heapq.heappush(self._heap, (due_at, claim_id, kind, level))
+                if self._heap[0][1:3] == (claim_id, kind):
+                    self._wakeup.set()
+
+    def cancel(self, claim_id: int, kind: str = None):
+        """Supprime les échéances d'un dossier (toutes si kind est None)."""
+        conn = self.db.get_connection()
+        try:
+            if kind:
+                self.db._execute(conn, "DELETE FROM claim_deadlines WHERE claim_id = ? AND kind = ?", (claim_id, kind))
+            else:
+                self.db._execute(conn, "DELETE FROM claim_deadlines WHERE claim_id = ?", (claim_id,))
+            conn.commit()
+        finally:
+            conn.close()
+
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == claim_id and (kind is None or k[1] == kind)]:
+                del self._entries[key]
+
+    # ========================================
+    # CONSOMMATION DES ÉCHÉANCES
+    # ========================================
+
+    def _load_window(self, now: datetime):
+        """Recharge dans le tas les échéances de la fenêtre [.., now + window]."""
+        until = now + self.window
+        conn = self.db.get_connection()
+        try:
+            cursor = self.db._execute(conn, """
+                SELECT claim_id, kind, due_at, level FROM claim_deadlines
+                WHERE due_at <= ?
+                ORDER BY due_at
+                LIMIT ?
+            """, (until.isoformat(), self.max_loaded))
+            rows = [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+        heap = []
+        entries = {}
+        for row in rows:
+            due = _to_datetime(row['due_at'])
+            entries[(row['claim_id'], row['kind'])] = (due, row['level'])
+            heap.append((due, row['claim_id'], row['kind'], row['level']))
+        heapq.heapify(heap)
+
+        # Fenêtre tronquée par max_loaded : on ne couvre que jusqu'à la dernière échéance chargée
+        if len(rows) >= self.max_loaded:
+            until = _to_datetime(rows[-1]['due_at'])
+
+        self._heap = heap
+        self._entries = entries
+        self._loaded_until = until
+
+    def _prune_heap(self):
+        """Retire du sommet du tas les entrées remplacées ou annulées."""
+        while self._heap:
+            due, claim_id, kind, level = self._heap[0]
+            if self._entries.get((claim_id, kind)) == (due, level):
+                return
+            heapq.heappop(self._heap)
+
+    def next_due_at(self, now: datetime = None) -> Optional[datetime]:
+        """Prochaine échéance connue (None si aucune dans la fenêtre chargée)."""
+        now = now or datetime.now()
+        with self._lock:
+            if self._loaded_until is None or now >= self._loaded_until:
+                self._load_window(now)
+            self._prune_heap()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime = None) -> List[Dict[str, Any]]:
+        """
+        Retire du tas et retourne toutes les échéances arrivées à terme.
+
+        Les lignes restent dans claim_deadlines jusqu'à complete() (ou sont
+        reprogrammées par retry()) : une échéance n'est jamais perdue si son
+        traitement échoue ou si le process s'arrête entre-temps.
+
+        Returns:
+            Liste de dicts {claim_id, kind, due_at, level}
+        """
+        now = now or datetime.now()
+        due_items = []
+        with self._lock:
+            if self._loaded_until is None or now >= self._loaded_until:
+                self._load_window(now)
+            while True:
+                self._prune_heap()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                due, claim_id, kind, level = heapq.heappop(self._heap)
+                del self._entries[(claim_id, kind)]
+                due_items.append({'claim_id': claim_id, 'kind': kind, 'due_at': due, 'level': level})
+        return due_items
+
+    def complete(self, deadline: Dict[str, Any]):
+        """Supprime une échéance traitée avec succès."""
+        conn = self.db.get_connection()
+        try:
+            # due_at dans la condition : une échéance reprogrammée entre-temps est conservée
+            self.db._execute(
+                conn,
+                "DELETE FROM claim_deadlines WHERE claim_id = ? AND kind = ? AND due_at = ?",
+                (deadline['claim_id'], deadline['kind'], deadline['due_at'].isoformat())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        with self._lock:
+            self._failures.pop((deadline['claim_id'], deadline['kind']), None)
+
+    def retry(self, deadline: Dict[str, Any], now: datetime = None) -> datetime:
+        """
+        Reprogramme une échéance dont le traitement a échoué (délai doublé à chaque échec).
+
+        Returns:
+            Nouvelle date d'échéance
+        """
+        now = now or datetime.now()
+        key = (deadline['claim_id'], deadline['kind'])
+        with self._lock:
+            failures = self._failures.get(key, 0)
+            self._failures[key] = failures + 1
+        delay = min(RETRY_BASE_DELAY * (2 ** failures), RETRY_MAX_DELAY)
+        retry_at = now + delay
+
+        conn = self.db.get_connection()
+        try:
+            cursor = self.db._execute(conn, """
+                UPDATE claim_deadlines SET due_at = ?, updated_at = ?
+                WHERE claim_id = ? AND kind = ? AND due_at = ?
+            """, (retry_at.isoformat(), now.isoformat(), key[0], key[1], deadline['due_at'].isoformat()))
+            updated = cursor.rowcount
+            conn.commit()
+        finally:
+            conn.close()
+
+        # Pas de ligne modifiée : l'échéance a été reprogrammée ou annulée entre-temps
+        if updated:
+            with self._lock:
+                if self._loaded_until is not None and retry_at <= self._loaded_until:
+                    self._entries[key] = (retry_at, deadline['level'])
+                    heapq.heappush(self._heap, (retry_at, key[0], key[1], deadline['level']))
+        return retry_at
+
+    def process_due(self, handler: Callable[[Dict[str, Any]], Any], now: datetime = None) -> Dict[str, int]:
+        """
+        Traite les échéances arrivées à terme : supprimées si handler réussit,
+        reprogrammées sinon.
+
+        Returns:
+            Dict {'handled': n, 'failed': n}
+        """
+        stats = {'handled': 0, 'failed': 0}
+        for deadline in self.pop_due(now):
+            try:
+                handler(deadline)
+            except Exception as e:
+                retry_at = self.retry(deadline)
+                stats['failed'] += 1
+                logger.error(f"Deadline handler failed for claim {deadline['claim_id']}: {e} "
+                             f"(retry at {retry_at.isoformat()})")
+            else:
+                self.complete(deadline)
+                stats['handled'] += 1
+        return stats
+
+    # ========================================
+    # REPRISE DES DOSSIERS EXISTANTS
+    # ========================================
+
+    def backfill_from_claims(self, batch_size: int = 500) -> int:
+        """
+        Enregistre les échéances des dossiers déjà soumis (créés avant le planificateur).
+
+        Les échéances existantes sont conservées. À lancer une fois après le
+        déploiement (--mode backfill).
+
+        Returns:
+            Nombre d'échéances ajoutées
+        """
+        added = 0
+        last_id = 0
+        conn = self.db.get_connection()
+        try:
+            while True:
+                cursor = self.db._execute(conn, """
+                    SELECT id, carrier, submitted_at, follow_up_level FROM claims
+                    WHERE status = 'submitted' AND submitted_at IS NOT NULL AND id > ?
+                    ORDER BY id
+                    LIMIT ?
+                """, (last_id, batch_size))
+                rows = [dict(row) for row in cursor.fetchall()]
+                if not rows:
+                    break
+                now = datetime.now().isoformat()
+                for row in rows:
+                    submitted = _to_datetime(row['submitted_at'])
+                    next_level = (row['follow_up_level'] or 0) + 1
+                    deadlines = []
+                    if next_level in ESCALATION_DELAYS:
+                        deadlines.append((KIND_FOLLOW_UP, submitted + timedelta(days=ESCALATION_DELAYS[next_level]),
+                                          next_level))
+                    legal_due = submitted + timedelta(days=legal_response_days(row['carrier']))
+                    deadlines.append((KIND_LEGAL_RESPONSE, legal_due, 0))
+                    for kind, due_at, level in deadlines:
+                        cursor = self.db._execute(conn, """
+                            INSERT INTO claim_deadlines (claim_id, kind, due_at, level, carrier, updated_at)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                            ON CONFLICT (claim_id, kind) DO NOTHING
+                        """, (row['id'], kind, due_at.isoformat(), level, row['carrier'], now))
+                        added += max(cursor.rowcount, 0)
+                    self.db._execute(
+                        conn, "UPDATE claims SET response_deadline = ? WHERE id = ? AND response_deadline IS NULL",
+                        (legal_due.date().isoformat(), row['id'])
+                    )
+                conn.commit()
+                last_id = rows[-1]['id']
+        finally:
+            conn.close()
+
+        with self._lock:
+            # Le tas sera rechargé avec les échéances ajoutées
+            self._loaded_until = None
+        self._wakeup.set()
+        logger.info(f"Deadline backfill: {added} deadlines added")
+        return added
+
+    def seconds_until_next(self, now: datetime = None) -> float:
+        """Durée d'attente jusqu'à la prochaine échéance ou la fin de la fenêtre chargée."""
+        now = now or datetime.now()
+        next_due = self.next_due_at(now)
+        wake_at = min(next_due, self._loaded_until) if next_due else self._loaded_until
+        return max(0.0, (wake_at - now).total_seconds())
+
+    def run(self, handler: Callable[[Dict[str, Any]], None]):
+        """
+        Boucle bloquante : dort jusqu'à la prochaine échéance puis appelle handler.
+
+        Args:
+            handler: Fonction appelée pour chaque échéance arrivée à terme
+                (une exception reprogramme l'échéance)
+        """
+        self._stopped.clear()
+        logger.info("DeadlineScheduler started")
+        while not self._stopped.is_set():
+            self.process_due(handler)
+
+            timeout = self.seconds_until_next()
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+        logger.info("DeadlineScheduler stopped")
+
+    def stop(self):
+        """Arrête la boucle run()."""
+        self._stopped.set()
+        self._wakeup.set()
+
+
+# Instances globales, une par base de données
+_schedulers: Dict[Optional[str], DeadlineScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+def get_deadline_scheduler(db_manager: DatabaseManager = None) -> DeadlineScheduler:
+    """Planificateur partagé par le process pour une base (base par défaut si None)."""
+    key = getattr(db_manager, 'db_path', None)
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = DeadlineScheduler(db_manager)
+            _schedulers[key] = scheduler
+        return scheduler
+
+
+def main():
+    import argparse
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Claim Deadline Scheduler')
+    parser.add_argument(
+        '--mode',
+        choices=['continuous', 'once', 'backfill'],
+        default='continuous',
+        help='Run mode: continuous (sleep until each deadline), once (process due deadlines), '
+             'backfill (schedule deadlines of already submitted claims)'
+    )
+    args = parser.parse_args()
+
+    manager = FollowUpManager()
+    scheduler = get_deadline_scheduler(manager.db)
+    if args.mode == 'backfill':
+        print(f"{scheduler.backfill_from_claims()} deadlines added")
+    elif args.mode == 'once':
+        print(scheduler.process_due(manager.handle_deadline))
+    else:
+        try:
+            manager.run_scheduler(scheduler)
+        except KeyboardInterrupt:
+            scheduler.stop()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -13,73 +13,191 @@ class FollowUpManager:
     """Gère les relances et l'escalade juridique des dossiers stagnants."""
     
 
-    def __init__(self, db_manager: DatabaseManager = None):
+    # Niveaux d'escalade (follow_up_level cible, jours depuis la soumission, clé de stats)
+    ESCALATION_LEVELS = (
+        (3, 21, "formal_notices"),
+        (2, 14, "warnings"),
+        (1, 7, "status_requests"),
+    )
+
+    # Colonnes nécessaires aux workers d'escalade (pas de SELECT c.*)
+    CLAIM_COLUMNS = (
+        "id", "client_id", "claim_reference", "order_id", "carrier",
+        "dispute_type", "amount_requested", "currency", "tracking_number",
+        "customer_name", "delivery_address", "submitted_at", "follow_up_level",
+    )
+
+    def __init__(self, db_manager: DatabaseManager = None, batch_size: int = 500, generator=None):
         self.db = db_manager or DatabaseManager()
         from src.workers.task_queue import TaskQueue
         self.queue = TaskQueue()
-        
+        self.batch_size = batch_size
+        self._generator = generator
+
+    @property
+    def generator(self):
+        """Générateur des mises en demeure (mode template), créé au premier lot J+21."""
+        if self._generator is None:
+            from src.reports.legal_document_generator import LegalDocumentGenerator
+            self._generator = LegalDocumentGenerator(use_templates=True)
+        return self._generator
+
+    def _prepare_formal_notices(self, claims: List[Dict[str, Any]]) -> List[tuple]:
+        """
+        Génère les mises en demeure d'un lot en parallèle (generate_formal_notices_batch).
+
+        Returns:
+            Un tuple (dossier, chemin du PDF) par tâche ; chemin None si la
+            génération a échoué (le worker régénère alors le PDF)
+        """
+        try:
+            documents = self.generator.generate_formal_notices_batch(claims)['documents']
+        except Exception as e:
+            logger.error(f"Génération du lot de mises en demeure impossible : {e}")
+            documents = {}
+        return [(claim, documents.get(claim['claim_reference'])) for claim in claims]
+
+    def _build_planning_query(self) -> str:
+        """Requête calculant le niveau d'escalade cible directement en SQL."""
+        columns = ", ".join(f"c.{col}" for col in self.CLAIM_COLUMNS)
+        level_cases = "\n".join(
+            f"                    WHEN c.submitted_at <= ? AND COALESCE(c.follow_up_level, 0) < {level} THEN {level}"
+            for level, _, _ in self.ESCALATION_LEVELS
+        )
+        return f"""
+            SELECT * FROM (
+                SELECT {columns}, s.country,
+                CASE
+{level_cases}
+                END AS target_level
+                FROM claims c
+                LEFT JOIN stores s ON c.store_id = s.id
+                WHERE c.status = 'submitted'
+                AND c.submitted_at <= ?
+                AND (c.last_follow_up_at IS NULL OR c.last_follow_up_at < ?)
+                AND COALESCE(c.follow_up_level, 0) < 3
+                AND c.id > ?
+            ) planned
+            WHERE target_level IS NOT NULL
+            ORDER BY id
+            LIMIT ?
+        """
+
     def process_follow_ups(self) -> Dict[str, int]:
         """
         Analyse tous les dossiers soumis et déclenche les relances nécessaires.
         
+        Le niveau d'escalade (J+7, J+14, J+21) est calculé en SQL et les
+        dossiers sont parcourus par lots (pagination par id) puis mis en file
+        d'attente en une seule transaction par lot. Les mises en demeure d'un
+        lot sont générées ensemble avant la mise en file.
+        
         Returns:
             Dict avec le compte des actions effectuées (mises en file d'attente).
         """
-        stats = {"status_requests": 0, "warnings": 0, "formal_notices": 0}
-        
-        # 1. Récupérer les dossiers en attente de réponse du transporteur
-        # On utilise une requête SQL directe pour filtrer par date
+        from src.workers.email_workers import execute_status_request, execute_warning, execute_formal_notice
+
+        workers = {
+            3: execute_formal_notice,
+            2: execute_warning,
+            1: execute_status_request,
+        }
+        stats = {key: 0 for _, _, key in self.ESCALATION_LEVELS}
+        stat_keys = {level: key for level, _, key in self.ESCALATION_LEVELS}
+
+        now = datetime.now()
+        thresholds = [(now - timedelta(days=days)).isoformat() for _, days, _ in self.ESCALATION_LEVELS]
+        seven_days_ago = thresholds[-1]
+        query = self._build_planning_query()
+
+        last_id = 0
+        while True:
+            conn = self.db.get_connection()
+            try:
+                cursor = self.db._execute(
+                    conn, query,
+                    (*thresholds, seven_days_ago, seven_days_ago, last_id, self.batch_size)
+                )
+                batch = [dict(row) for row in cursor.fetchall()]
+            finally:
+                conn.close()
+
+            if not batch:
+                break
+
+            by_level: Dict[int, List[tuple]] = {}
+            for claim in batch:
+                level = claim.pop('target_level')
+                by_level.setdefault(level, []).append((claim,))
+
+            if 3 in by_level:
+                by_level[3] = self._prepare_formal_notices([args[0] for args in by_level[3]])
+
+            for level, args_list in by_level.items():
+                stats[stat_keys[level]] += self.queue.add_tasks(workers[level], args_list)
+
+            last_id = batch[-1]['id']
+            if len(batch) < self.batch_size:
+                break
+
+        logger.info(f"Follow-ups queued: {stats}")
+        return stats
+
+    def handle_deadline(self, deadline: Dict[str, Any]) -> str:
+        """
+        Traite une échéance émise par le DeadlineScheduler.
+
+        Args:
+            deadline: Dict {claim_id, kind, due_at, level}
+
+        Returns:
+            Clé de stats de l'action effectuée, ou None
+        """
+        from src.automation.deadline_scheduler import KIND_FOLLOW_UP, KIND_LEGAL_RESPONSE
+
+        columns = ", ".join(f"c.{col}" for col in self.CLAIM_COLUMNS)
         conn = self.db.get_connection()
         try:
-            # Dossiers soumis depuis plus de 7 jours sans action
-            query = """
-                SELECT c.*, s.country 
+            cursor = self.db._execute(conn, f"""
+                SELECT {columns}, s.country
                 FROM claims c
                 LEFT JOIN stores s ON c.store_id = s.id
-                WHERE c.status = 'submitted' 
-                AND (c.last_follow_up_at IS NULL OR c.last_follow_up_at < ?)
-                AND c.submitted_at < ?
-            """
-            # On vérifie les dossiers soumis il y a au moins 7 jours
-            seven_days_ago = (datetime.now() - timedelta(days=7)).isoformat()
-            
-            cursor = conn.execute(query, (seven_days_ago, seven_days_ago))
-            claims = [dict(row) for row in cursor.fetchall()]
+                WHERE c.id = ? AND c.status = 'submitted'
+            """, (deadline['claim_id'],))
+            row = cursor.fetchone()
         finally:
             conn.close()
-            
-        for claim in claims:
-            action_taken = self._evaluate_and_trigger(claim)
-            if action_taken:
-                stats[action_taken] += 1
-                logger.info(f"Task queued: {action_taken} for {claim['claim_reference']}")
-                
-        return stats
 
-    def _evaluate_and_trigger(self, claim: Dict[str, Any]) -> str:
-        """Détermine le niveau d'escalade pour un dossier spécifique."""
-        submitted_at = datetime.fromisoformat(claim['submitted_at'])
-        days_since_submission = (datetime.now() - submitted_at).days
-        current_level = claim.get('follow_up_level', 0)
-        
-        from src.workers.email_workers import execute_status_request, execute_warning, execute_formal_notice
-        
-        # Logique d'escalade J+7, J+14, J+21
-        if days_since_submission >= 21 and current_level < 3:
-            # Niveau 3: Mise en Demeure
-            self.queue.add_task(execute_formal_notice, claim)
-            return "formal_notices"
-        elif days_since_submission >= 14 and current_level < 2:
-            # Niveau 2: Dernier avertissement (Warning)
-            self.queue.add_task(execute_warning, claim)
-            return "warnings"
-        elif days_since_submission >= 7 and current_level < 1:
-            # Niveau 1: Demande de statut (Status Request)
-            self.queue.add_task(execute_status_request, claim)
-            return "status_requests"
-            
+        # Dossier clôturé ou ayant reçu une réponse entre-temps
+        if not row:
+            return None
+        claim = dict(row)
+
+        if deadline['kind'] == KIND_LEGAL_RESPONSE:
+            self.db.update_claim(claim['id'], automation_status='action_required')
+            logger.warning(f"Délai légal de réponse dépassé pour {claim['claim_reference']} ({claim['carrier']})")
+            return "legal_deadlines"
+
+        if deadline['kind'] == KIND_FOLLOW_UP and (claim.get('follow_up_level') or 0) < deadline['level']:
+            from src.workers.email_workers import execute_status_request, execute_warning, execute_formal_notice
+            workers = {3: execute_formal_notice, 2: execute_warning, 1: execute_status_request}
+            stat_keys = {level: key for level, _, key in self.ESCALATION_LEVELS}
+            self.queue.add_task(workers[deadline['level']], claim)
+            return stat_keys[deadline['level']]
+
         return None
 
+    def run_scheduler(self, scheduler=None):
+        """
+        Traite les échéances au fil de l'eau, sans rescanner la table claims.
+
+        Args:
+            scheduler: DeadlineScheduler à utiliser (celui du process pour la même BDD si None)
+        """
+        from src.automation.deadline_scheduler import get_deadline_scheduler
+        scheduler = scheduler or get_deadline_scheduler(self.db)
+        scheduler.run(self.handle_deadline)
+
     # Les méthodes _trigger_* originales sont supprimées car la logique est déplacée dans email_workers.py
     # et gérée par la queue
 
@@ -136,9 +254,7 @@ class FollowUpManager:
         finally:
             conn.close()
 
-if __name__ == "__main__":
-    # Test rapide
-    manager = FollowUpManager()
-    print("VÉRIFICATION DES RELANCES...")
-    # stats = manager.process_follow_ups()
-    # print(f"Actions effectuées: {stats}")
+if __name__ == "__main__":  # pragma: no cover
+    # Point d'entrée : python -m src.automation.deadline_scheduler [--mode backfill|once|continuous]
+    from src.automation.deadline_scheduler import main
+    main()
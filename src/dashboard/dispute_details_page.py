@@ -216,10 +216,13 @@ def _render_evidence_section(dispute_data):
 
             # C. Trigger OCR / Analysis
             from src.scrapers.ocr_processor import OCRProcessor
-            ocr_processor = OCRProcessor()
+            from src.scrapers.utils.ocr_cache import get_ocr_cache
+            # Cache persistant : un rerun ne relance pas l'OCR sur le même fichier.
+            # Pas de pool de pages : un fork depuis le thread Streamlit n'est pas sûr.
+            ocr_processor = OCRProcessor(cache=get_ocr_cache(), pdf_workers=1)
             
-            # Extract Text & Attachments
-            extracted_text, attachments = ocr_processor.extract_all_from_file(local_path, uploaded_evidence.name)
+            # Extract Text & Attachments, and analyze (PDF read up to the page giving the reason)
+            extracted_text, attachments, analysis = ocr_processor.analyze_file(local_path, uploaded_evidence.name)
             
             # Save extracted attachments
             for att in attachments:
@@ -233,9 +236,6 @@ def _render_evidence_section(dispute_data):
                             f.write(att['content'])
                 st.toast(f"📎 Pièce jointe extraite : {att['filename']}")
             
-            # Analyze
-            analysis = ocr_processor.analyze_rejection_text(extracted_text)
-            
             # Store in session state for feedback
             st.session_state.last_analysis = {
                 'text': extracted_text,
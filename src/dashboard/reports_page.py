@@ -4,15 +4,18 @@ Reports page for analytics, timeline and statistics.
 This module provides comprehensive analytics and reporting capabilities:
 - Advanced dispute analytics with visualizations
 - Timeline of recent events (chronological history)
+- Download of the monthly PDF reports produced by the overnight batch
 - Stagnation detection and automatic escalation interface
 
 Functions:
     render_reports_page: Main entry point for reports page
     render_analytics_tab: Display analytics charts and statistics
     render_timeline: Show chronological event history
+    render_monthly_reports: Serve the pre-generated monthly PDF reports
     render_stagnation_escalation_section: USP feature for automatic legal escalation
 """
 
+import os
 from typing import List, Dict, Any, Optional
 import streamlit as st
 import pandas as pd
@@ -25,13 +28,17 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-def render_reports_page(disputes_df: pd.DataFrame) -> None:
+def render_reports_page(disputes_df: pd.DataFrame, kpis: Optional[Dict] = None,
+                        evolution: Optional[Dict] = None) -> None:
     """
     Render complete reports page with analytics and timeline.
     
     Args:
         disputes_df: DataFrame containing dispute data with columns:
                     - order_id, carrier, status, total_recoverable, etc.
+        kpis: Client KPIs from MetricsCalculator.get_client_kpis (optional)
+        evolution: Client temporal evolution from
+                   MetricsCalculator.get_client_temporal_evolution (optional)
     
     Returns:
         None
@@ -43,15 +50,59 @@ def render_reports_page(disputes_df: pd.DataFrame) -> None:
     st.markdown('<div class="section-header">📈 Reports & Analytics</div>', unsafe_allow_html=True)
     
     # Analytics tab with charts
-    render_analytics_tab(disputes_df)
+    render_analytics_tab(disputes_df, kpis=kpis, evolution=evolution)
     
     st.markdown("---")
     
     # Timeline of events
     render_timeline()
+    
+    st.markdown("---")
+    
+    # Monthly PDF reports (generated overnight)
+    render_monthly_reports()
+
+
+def render_monthly_reports() -> None:
+    """
+    Offer the client's monthly PDF reports for download.
+    
+    Reports are produced overnight by src/reports/monthly_report_batch.py;
+    this only serves the stored files, nothing is rendered inline.
+    
+    Returns:
+        None
+    """
+    st.markdown("### 📄 Rapports Mensuels")
+    
+    client_id = st.session_state.get('client_id')
+    if not client_id:
+        return
+    
+    try:
+        from src.reports.monthly_report_batch import MonthlyReportBatch
+        reports = [r for r in MonthlyReportBatch(workers=1).list_reports(client_id) if os.path.exists(r['pdf_path'])]
+    except Exception as e:
+        logger.warning(f"Monthly reports unavailable: {e}")
+        reports = []
+    
+    if not reports:
+        st.info("Votre rapport mensuel sera disponible après le prochain traitement nocturne.")
+        return
+    
+    for report in reports:
+        with open(report['pdf_path'], 'rb') as f:
+            st.download_button(
+                label=f"📥 Rapport {report['month']} ({report['claims_count']} réclamations)",
+                data=f.read(),
+                file_name=os.path.basename(report['pdf_path']),
+                mime='application/pdf',
+                key=f"monthly_report_{report['month']}"
+            )
 
 
-def render_analytics_tab(disputes_df: pd.DataFrame) -> None:
+def render_analytics_tab(disputes_df: pd.DataFrame, kpis: Optional[Dict] = None,
+                         evolution: Optional[Dict] = None) -> None:
     """
     Render analytics with charts and statistics.
     
@@ -60,6 +111,8 @@ def render_analytics_tab(disputes_df: pd.DataFrame) -> None:
     
     Args:
         disputes_df: DataFrame with dispute data
+        kpis: Client KPIs from the metrics calculator (optional)
+        evolution: Client temporal evolution from the metrics calculator (optional)
     
     Returns:
         None
@@ -68,7 +121,7 @@ def render_analytics_tab(disputes_df: pd.DataFrame) -> None:
         The actual analytics logic is in src.dashboard.ui_functions
     """
     from src.dashboard.ui_functions import render_analytics_tab as render_analytics
-    render_analytics(disputes_df)
+    render_analytics(disputes_df, kpis=kpis, evolution=evolution)
 
 
 def render_timeline() -> None:
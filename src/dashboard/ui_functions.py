@@ -290,12 +290,15 @@ def render_disputes_table_modern(disputes_df):
     st.markdown('</div>', unsafe_allow_html=True)
 
 
-def render_analytics_tab(disputes_df):
+def render_analytics_tab(disputes_df, kpis=None, evolution=None):
     """
     Render advanced analytics tab.
     
     Args:
         disputes_df (pd.DataFrame): DataFrame containing disputes data.
+        kpis (dict, optional): SQL KPIs of the client (MetricsCalculator.get_client_kpis).
+        evolution (dict, optional): Daily claims of the client
+            (MetricsCalculator.get_client_temporal_evolution).
     """
     st.markdown("### 📊 Analytics")
     st.info("Advanced analytics and insights about your disputes")
@@ -308,10 +311,21 @@ def render_analytics_tab(disputes_df):
     col1, col2 = st.columns(2)
     
     with col1:
-        st.metric("Total Disputes", len(disputes_df))
+        st.metric("Total Disputes", kpis['total_claims'] if kpis else len(disputes_df))
     
     with col2:
-        st.metric("Total Recoverable", f"{disputes_df['total_recoverable'].sum():,.2f} EUR")
+        if kpis:
+            total_recoverable = kpis['average_claim_value'] * kpis['total_claims']
+        else:
+            total_recoverable = disputes_df['total_recoverable'].sum()
+        st.metric("Total Recoverable", f"{total_recoverable:,.2f} EUR")
+    
+    if evolution and evolution['dates']:
+        st.markdown("#### Claimed amount over time")
+        st.line_chart(pd.DataFrame(
+            {'Cumulative (EUR)': evolution['cumulative']},
+            index=pd.to_datetime(evolution['dates'])
+        ))
 
 
 def render_history_tab():
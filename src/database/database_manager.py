@@ -49,6 +49,7 @@ class DatabaseManager:
             self._ensure_database_exists()
         else:
             logger.info("Using PostgreSQL Backend (Supabase/Neon)")
+            self._ensure_postgres_tables()
     
     def _ensure_database_exists(self):
         """Créer la base et les tables si elles n'existent pas."""
@@ -83,17 +84,138 @@ class DatabaseManager:
                     # Si c'est la base de test, on injecte un client admin par défaut pour éviter le crash
                     if 'test' in self.db_path.lower():
                         conn.execute("INSERT OR IGNORE INTO clients (email, full_name) VALUES ('admin@refundly.ai', 'Admin Test')")
+                        self._refresh_client_statistics(conn)
                         conn.commit()
                         
                     logger.info(f"Database initialized successfully at {self.db_path}")
                 else:
                     logger.error(f"Schema file not found at {schema_path}")
+            else:
+                self._ensure_series_tables(conn)
         except Exception as e:
             logger.error(f"Error initializing database: {e}")
             # Ne pas raise ici pour laisser une chance, mais c'est critique
         finally:
             conn.close()
     
+    def _ensure_postgres_tables(self):
+        """Bases Postgres existantes : tables ajoutées depuis (le schéma initial est appliqué à part)."""
+        try:
+            conn = self.get_connection()
+        except Exception as e:
+            logger.error(f"Error connecting to PostgreSQL: {e}")
+            return
+        try:
+            self._ensure_series_tables(conn)
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error migrating PostgreSQL database: {e}")
+        finally:
+            conn.close()
+    
+    def _table_exists(self, conn, table: str) -> bool:
+        if self.db_type == 'postgres':
+            query = "SELECT 1 FROM information_schema.tables WHERE table_schema = current_schema() AND table_name = ?"
+        else:
+            query = "SELECT name FROM sqlite_master WHERE type='table' AND name=?"
+        return self._execute(conn, query, (table,)).fetchone() is not None
+    
+    def _ensure_series_tables(self, conn):
+        """
+        Tables et index ajoutés après la création d'une base (SQLite ou Postgres).
+        
+        Les agrégats (rollup journalier, statistiques matérialisées) sont
+        remplis à partir des réclamations existantes quand leur table est créée.
+        """
+        # Index de planification des relances (bases créées avant son ajout au schéma)
+        self._execute(
+            conn, "CREATE INDEX IF NOT EXISTS idx_claims_follow_up ON claims(status, submitted_at, last_follow_up_at)"
+        )
+        # Index du rafraîchissement delta des statistiques
+        self._execute(conn, "CREATE INDEX IF NOT EXISTS idx_claims_updated ON claims(updated_at)")
+        # Bases créées avant l'ajout de la table de versions
+        self._execute(conn, """
+            CREATE TABLE IF NOT EXISTS client_data_versions (
+                client_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        rollup_missing = not self._table_exists(conn, 'claims_daily_rollup')
+        self._execute(conn, """
+            CREATE TABLE IF NOT EXISTS claims_daily_rollup (
+                client_id INTEGER NOT NULL,
+                carrier TEXT NOT NULL,
+                status TEXT NOT NULL,
+                day DATE NOT NULL,
+                is_submitted INTEGER NOT NULL DEFAULT 0,
+                claims_count INTEGER NOT NULL DEFAULT 0,
+                total_value REAL NOT NULL DEFAULT 0,
+                total_recovered REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (client_id, carrier, status, day, is_submitted)
+            )
+        """)
+        self._execute(conn, "CREATE INDEX IF NOT EXISTS idx_rollup_day ON claims_daily_rollup(day)")
+        # Échéances des réclamations (DeadlineScheduler)
+        self._execute(conn, """
+            CREATE TABLE IF NOT EXISTS claim_deadlines (
+                claim_id INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                due_at TIMESTAMP NOT NULL,
+                level INTEGER DEFAULT 0,
+                carrier TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (claim_id, kind)
+            )
+        """)
+        self._execute(conn, "CREATE INDEX IF NOT EXISTS idx_deadlines_due ON claim_deadlines(due_at)")
+        # File d'envoi des emails (partagée par tous les process sur Postgres)
+        id_column = "id SERIAL PRIMARY KEY" if self.db_type == 'postgres' else "id INTEGER PRIMARY KEY AUTOINCREMENT"
+        self._execute(conn, f"""
+            CREATE TABLE IF NOT EXISTS email_outbox (
+                {id_column},
+                to_email TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                html_body TEXT NOT NULL,
+                text_body TEXT,
+                attachments TEXT,
+                category TEXT,
+                notification_id INTEGER,
+                status TEXT DEFAULT 'pending',
+                attempts INTEGER DEFAULT 0,
+                last_error TEXT,
+                created_at TIMESTAMP NOT NULL,
+                next_attempt_at TIMESTAMP NOT NULL,
+                claimed_at TIMESTAMP,
+                sent_at TIMESTAMP
+            )
+        """)
+        self._execute(conn, "CREATE INDEX IF NOT EXISTS idx_outbox_due ON email_outbox(status, next_attempt_at)")
+        statistics_missing = not self._table_exists(conn, 'client_statistics_materialized')
+        self._execute(conn, """
+            CREATE TABLE IF NOT EXISTS client_statistics_materialized (
+                client_id INTEGER PRIMARY KEY,
+                email TEXT,
+                total_claims INTEGER DEFAULT 0,
+                accepted_claims INTEGER DEFAULT 0,
+                rejected_claims INTEGER DEFAULT 0,
+                pending_claims INTEGER DEFAULT 0,
+                total_requested REAL DEFAULT 0,
+                total_recovered REAL DEFAULT 0,
+                total_paid_to_client REAL DEFAULT 0,
+                total_disputes_detected INTEGER DEFAULT 0,
+                refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.commit()
+        # Tables ajoutées à une base existante : remplissage initial
+        if rollup_missing:
+            self._backfill_daily_rollup(conn)
+            conn.commit()
+        if rollup_missing or statistics_missing:
+            self._refresh_client_statistics(conn)
+            conn.commit()
+    
     def get_connection(self):
         """Obtenir une connexion à la base de données (SQLite ou Postgres)."""
         if self.db_type == 'sqlite':
@@ -156,6 +278,142 @@ class DatabaseManager:
         return cursor
 
     
+    # ========================================
+    # VERSIONS DE DONNÉES (invalidation des caches)
+    # ========================================
+    
+    def _bump_data_version(self, conn, client_id: int = None, claim_id: int = None):
+        """
+        Incrémente la version de données d'un client, dans la transaction de l'écriture.
+        
+        Args:
+            conn: Connexion de l'écriture en cours (commit par l'appelant)
+            client_id: Client modifié
+            claim_id: Ou réclamation modifiée (le client est retrouvé par sous-requête)
+        """
+        upsert = """
+            ON CONFLICT (client_id) DO UPDATE SET
+                version = client_data_versions.version + 1,
+                updated_at = excluded.updated_at
+        """
+        now = datetime.now()
+        if claim_id is not None:
+            self._execute(conn, """
+                INSERT INTO client_data_versions (client_id, version, updated_at)
+                SELECT client_id, 1, ? FROM claims WHERE id = ?
+            """ + upsert, (now, claim_id))
+        else:
+            self._execute(conn, """
+                INSERT INTO client_data_versions (client_id, version, updated_at)
+                VALUES (?, 1, ?)
+            """ + upsert, (client_id, now))
+    
+    def get_data_version(self, client_id: int = None) -> int:
+        """
+        Version de données d'un client (0 s'il n'a jamais été modifié).
+        
+        Sans client_id, renvoie la somme des versions : elle change à chaque
+        écriture, quel que soit le client (vues admin).
+        """
+        conn = self.get_connection()
+        try:
+            if client_id is None:
+                cursor = self._execute(conn, "SELECT COALESCE(SUM(version), 0) FROM client_data_versions")
+            else:
+                cursor = self._execute(conn, "SELECT version FROM client_data_versions WHERE client_id = ?", (client_id,))
+            row = cursor.fetchone()
+            return int(row[0]) if row and row[0] is not None else 0
+        finally:
+            conn.close()
+    
+    # ========================================
+    # ROLLUP JOURNALIER DES RÉCLAMATIONS
+    # ========================================
+    
+    def _get_rollup_claim(self, conn, claim_id: int) -> Optional[Dict[str, Any]]:
+        """Colonnes d'une réclamation utilisées par claims_daily_rollup."""
+        cursor = self._execute(conn, """
+            SELECT client_id, carrier, status, submitted_at, created_at, amount_requested, accepted_amount
+            FROM claims WHERE id = ?
+        """, (claim_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    
+    def _apply_claim_rollup(self, conn, claim: Optional[Dict[str, Any]], sign: int):
+        """
+        Ajoute (sign=1) ou retire (sign=-1) une réclamation de claims_daily_rollup.
+        
+        Le jour est celui de la soumission, ou de la création tant que la
+        réclamation n'est pas soumise (is_submitted = 0).
+        """
+        if not claim:
+            return
+        submitted = claim.get('submitted_at')
+        day = str(submitted or claim.get('created_at') or datetime.now())[:10]
+        key = (claim['client_id'], claim.get('carrier') or 'unknown', claim.get('status') or 'pending',
+               day, 1 if submitted else 0)
+        amount = float(claim.get('amount_requested') or 0)
+        recovered = float(claim.get('accepted_amount') or 0)
+        
+        self._execute(conn, """
+            INSERT INTO claims_daily_rollup (
+                client_id, carrier, status, day, is_submitted,
+                claims_count, total_value, total_recovered
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (client_id, carrier, status, day, is_submitted) DO UPDATE SET
+                claims_count = claims_daily_rollup.claims_count + excluded.claims_count,
+                total_value = claims_daily_rollup.total_value + excluded.total_value,
+                total_recovered = claims_daily_rollup.total_recovered + excluded.total_recovered
+        """, key + (sign, sign * amount, sign * recovered))
+        if sign < 0:
+            self._execute(conn, """
+                DELETE FROM claims_daily_rollup
+                WHERE client_id = ? AND carrier = ? AND status = ? AND day = ? AND is_submitted = ?
+                  AND claims_count <= 0
+            """, key)
+    
+    def _backfill_daily_rollup(self, conn, client_id: int = None) -> int:
+        """Recalcule claims_daily_rollup depuis la table claims, pour un client (tous si None), sans commit."""
+        if self.db_type == 'postgres':
+            day = "CAST(COALESCE(submitted_at, created_at) AS DATE)"
+        else:
+            day = "substr(COALESCE(submitted_at, created_at), 1, 10)"
+        if client_id is None:
+            client_filter, params = "", ()
+        else:
+            client_filter, params = "WHERE client_id = ?", (client_id,)
+        self._execute(conn, f"DELETE FROM claims_daily_rollup {client_filter}", params)
+        cursor = self._execute(conn, f"""
+            INSERT INTO claims_daily_rollup (
+                client_id, carrier, status, day, is_submitted,
+                claims_count, total_value, total_recovered
+            )
+            SELECT client_id, COALESCE(carrier, 'unknown'), COALESCE(status, 'pending'), {day},
+                   CASE WHEN submitted_at IS NULL THEN 0 ELSE 1 END,
+                   COUNT(*), SUM(COALESCE(amount_requested, 0)), SUM(COALESCE(accepted_amount, 0))
+            FROM claims
+            {client_filter}
+            GROUP BY client_id, COALESCE(carrier, 'unknown'), COALESCE(status, 'pending'), {day},
+                     CASE WHEN submitted_at IS NULL THEN 0 ELSE 1 END
+        """, params)
+        return cursor.rowcount
+    
+    def rebuild_daily_rollup(self) -> int:
+        """
+        Reconstruit entièrement claims_daily_rollup (backfill).
+        
+        Returns:
+            Nombre de lignes d'agrégats écrites
+        """
+        conn = self.get_connection()
+        try:
+            rows = self._backfill_daily_rollup(conn)
+            conn.commit()
+            logger.info(f"Daily rollup rebuilt: {rows} rows")
+            return rows
+        finally:
+            conn.close()
+    
     # ========================================
     # CLIENTS
     # ========================================
@@ -175,7 +433,8 @@ class DatabaseManager:
                 new_id = cursor.fetchone()[0]
             else:
                 new_id = cursor.lastrowid
-                
+            
+            self._refresh_client_statistics(conn, new_id)
             conn.commit()
             logger.info(f"Client created: {email}")
             return new_id
@@ -264,6 +523,9 @@ class DatabaseManager:
             ))
             
             new_id = cursor.fetchone()[0] if self.db_type == 'postgres' else cursor.lastrowid
+            self._apply_claim_rollup(conn, self._get_rollup_claim(conn, new_id), 1)
+            self._bump_data_version(conn, client_id=client_id)
+            self._refresh_client_statistics(conn, client_id)
             conn.commit()
             logger.info(f"Claim created: {claim_reference}")
             return new_id
@@ -306,7 +568,13 @@ class DatabaseManager:
         
         conn = self.get_connection()
         try:
+            previous = self._get_rollup_claim(conn, claim_id)
             self._execute(conn, f"UPDATE claims SET {set_clause} WHERE id = ?", tuple(values))
+            self._apply_claim_rollup(conn, previous, -1)
+            self._apply_claim_rollup(conn, self._get_rollup_claim(conn, claim_id), 1)
+            self._bump_data_version(conn, claim_id=claim_id)
+            if previous:
+                self._refresh_client_statistics(conn, previous['client_id'])
             conn.commit()
             logger.info(f"Claim {claim_id} updated")
         finally:
@@ -365,6 +633,8 @@ class DatabaseManager:
             ))
             
             new_id = cursor.fetchone()[0] if self.db_type == 'postgres' else cursor.lastrowid
+            self._bump_data_version(conn, client_id=client_id)
+            self._refresh_client_statistics(conn, client_id)
             conn.commit()
             logger.info(f"Dispute created for client {client_id}: {order_id}")
             return new_id
@@ -418,6 +688,8 @@ class DatabaseManager:
             cursor = self._execute(conn, query, (claim_id, client_id, total_amount, client_share, platform_fee, payment_method))
             
             new_id = cursor.fetchone()[0] if self.db_type == 'postgres' else cursor.lastrowid
+            self._bump_data_version(conn, client_id=client_id)
+            self._refresh_client_statistics(conn, client_id)
             conn.commit()
             logger.info(f"Payment created for claim {claim_id}")
             return new_id
@@ -439,6 +711,10 @@ class DatabaseManager:
         conn = self.get_connection()
         try:
             self._execute(conn, f"UPDATE payments SET {set_clause} WHERE id = ?", tuple(values))
+            row = self._execute(conn, "SELECT client_id FROM payments WHERE id = ?", (payment_id,)).fetchone()
+            if row:
+                self._bump_data_version(conn, client_id=row[0])
+                self._refresh_client_statistics(conn, row[0])
             conn.commit()
             logger.info(f"Payment {payment_id} updated")
         finally:
@@ -471,6 +747,28 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def update_notification_status(self, notification_ids: List[int], status: str,
+                                   error_message: str = None):
+        """Mettre à jour le statut de notifications (livraison par l'outbox email)."""
+        if not notification_ids:
+            return
+        conn = self.get_connection()
+        try:
+            placeholders = ','.join('?' * len(notification_ids))
+            if status == 'sent':
+                self._execute(conn, f"""
+                    UPDATE notifications SET status = ?, sent_at = CURRENT_TIMESTAMP, error_message = NULL
+                    WHERE id IN ({placeholders})
+                """, (status, *notification_ids))
+            else:
+                self._execute(conn, f"""
+                    UPDATE notifications SET status = ?, error_message = ?
+                    WHERE id IN ({placeholders})
+                """, (status, error_message, *notification_ids))
+            conn.commit()
+        finally:
+            conn.close()
+    
     # ========================================
     # ACTIVITY LOGS
     # ========================================
@@ -499,21 +797,155 @@ class DatabaseManager:
     # STATISTICS
     # ========================================
     
+    _STATISTICS_COLUMNS = (
+        "client_id, email, total_claims, accepted_claims, rejected_claims, pending_claims, "
+        "total_requested, total_recovered, total_paid_to_client, total_disputes_detected"
+    )
+    
+    def _refresh_client_statistics(self, conn, client_id: int = None) -> int:
+        """
+        Recalcule client_statistics_materialized pour un client (tous si None), sans commit.
+        
+        Les réclamations sont lues dans claims_daily_rollup (quelques lignes par
+        client et par jour), les litiges et paiements via leurs index client_id.
+        Chaque table est agrégée séparément : pas de produit cartésien entre
+        réclamations, paiements et litiges.
+        """
+        if client_id is None:
+            claims_filter = payments_filter = disputes_filter = ""
+            client_filter, params = "1 = 1", (datetime.now(),)
+        else:
+            claims_filter = "WHERE client_id = ?"
+            payments_filter = "AND client_id = ?"
+            disputes_filter = "WHERE client_id = ?"
+            client_filter = "c.id = ?"
+            params = (datetime.now(), client_id, client_id, client_id, client_id)
+        
+        cursor = self._execute(conn, f"""
+            INSERT INTO client_statistics_materialized (
+                {self._STATISTICS_COLUMNS}, refreshed_at
+            )
+            SELECT c.id, c.email,
+                   COALESCE(r.total_claims, 0), COALESCE(r.accepted_claims, 0),
+                   COALESCE(r.rejected_claims, 0), COALESCE(r.pending_claims, 0),
+                   COALESCE(r.total_requested, 0), COALESCE(r.total_recovered, 0),
+                   COALESCE(p.total_paid, 0), COALESCE(d.total_disputes, 0), ?
+            FROM clients c
+            LEFT JOIN (
+                SELECT client_id,
+                       SUM(claims_count) AS total_claims,
+                       SUM(CASE WHEN status = 'accepted' THEN claims_count ELSE 0 END) AS accepted_claims,
+                       SUM(CASE WHEN status = 'rejected' THEN claims_count ELSE 0 END) AS rejected_claims,
+                       SUM(CASE WHEN status = 'pending' THEN claims_count ELSE 0 END) AS pending_claims,
+                       SUM(total_value) AS total_requested,
+                       SUM(CASE WHEN status = 'accepted' THEN total_recovered ELSE 0 END) AS total_recovered
+                FROM claims_daily_rollup {claims_filter}
+                GROUP BY client_id
+            ) r ON r.client_id = c.id
+            LEFT JOIN (
+                SELECT client_id, SUM(client_share) AS total_paid
+                FROM payments WHERE payment_status = 'completed' {payments_filter}
+                GROUP BY client_id
+            ) p ON p.client_id = c.id
+            LEFT JOIN (
+                SELECT client_id, COUNT(*) AS total_disputes
+                FROM disputes {disputes_filter}
+                GROUP BY client_id
+            ) d ON d.client_id = c.id
+            WHERE {client_filter}
+            ON CONFLICT (client_id) DO UPDATE SET
+                email = excluded.email,
+                total_claims = excluded.total_claims,
+                accepted_claims = excluded.accepted_claims,
+                rejected_claims = excluded.rejected_claims,
+                pending_claims = excluded.pending_claims,
+                total_requested = excluded.total_requested,
+                total_recovered = excluded.total_recovered,
+                total_paid_to_client = excluded.total_paid_to_client,
+                total_disputes_detected = excluded.total_disputes_detected,
+                refreshed_at = excluded.refreshed_at
+        """, params)
+        return cursor.rowcount
+    
+    def refresh_client_statistics(self, client_ids: List[int] = None, since: datetime = None,
+                                  full: bool = False) -> int:
+        """
+        Rafraîchit les statistiques matérialisées.
+        
+        Les écritures de DatabaseManager les tiennent déjà à jour ; ce
+        rafraîchissement sert aux écritures faites hors de cette classe
+        (migrations, synchro cloud, SQL direct sur Postgres).
+        
+        Args:
+            client_ids: Clients à rafraîchir
+            since: Rafraîchissement delta : clients dont les réclamations
+                   (updated_at), litiges (detected_at), paiements ou fiche
+                   client ont changé depuis cette date
+            full: Reconstruction complète (rollup journalier compris)
+            
+        Returns:
+            Nombre de clients rafraîchis
+        """
+        conn = self.get_connection()
+        try:
+            if full or (client_ids is None and since is None):
+                self._backfill_daily_rollup(conn)
+                refreshed = self._refresh_client_statistics(conn)
+            else:
+                ids = set(client_ids or [])
+                if since is not None:
+                    ids.update(self._changed_client_ids(conn, since))
+                # Rollup du client d'abord : les statistiques sont lues dedans
+                for client_id in sorted(ids):
+                    self._backfill_daily_rollup(conn, client_id)
+                    self._refresh_client_statistics(conn, client_id)
+                refreshed = len(ids)
+            conn.commit()
+            logger.info(f"Client statistics refreshed: {refreshed} clients")
+            return refreshed
+        finally:
+            conn.close()
+    
+    def _changed_client_ids(self, conn, since: datetime) -> List[int]:
+        """
+        Clients dont les données sources ont changé depuis `since`.
+        
+        Lu dans les tables sources (et non dans client_data_versions, que
+        seules les écritures de DatabaseManager tiennent à jour) : une
+        écriture externe doit renseigner claims.updated_at pour être vue.
+        """
+        # CURRENT_TIMESTAMP est à la seconde : ne pas manquer la seconde de `since`
+        since = since.replace(microsecond=0)
+        cursor = self._execute(conn, """
+            SELECT client_id FROM claims WHERE updated_at >= ?
+            UNION SELECT client_id FROM disputes WHERE detected_at >= ?
+            UNION SELECT client_id FROM payments WHERE created_at >= ? OR paid_at >= ?
+            UNION SELECT id FROM clients WHERE created_at >= ? OR updated_at >= ?
+        """, (since,) * 6)
+        return [row[0] for row in cursor.fetchall()]
+    
     def get_client_statistics(self, client_id: int) -> Dict[str, Any]:
         """Récupérer les statistiques d'un client."""
         conn = self.get_connection()
         try:
-            cursor = self._execute(conn, "SELECT * FROM client_statistics WHERE client_id = ?", (client_id,))
-            row = cursor.fetchone()
+            query = f"SELECT {self._STATISTICS_COLUMNS} FROM client_statistics_materialized WHERE client_id = ?"
+            row = self._execute(conn, query, (client_id,)).fetchone()
+            if row is None:
+                # Client créé hors de DatabaseManager : calcul à la demande
+                self._refresh_client_statistics(conn, client_id)
+                conn.commit()
+                row = self._execute(conn, query, (client_id,)).fetchone()
             return dict(row) if row else None
         finally:
             conn.close()
     
     def get_all_statistics(self) -> List[Dict[str, Any]]:
-        """Récupérer les statistiques de tous les clients (admin)."""
+        """Récupérer les statistiques de tous les clients (admin), une ligne pré-calculée par client."""
         conn = self.get_connection()
         try:
-            cursor = self._execute(conn, "SELECT * FROM client_statistics")
+            cursor = self._execute(
+                conn, f"SELECT {self._STATISTICS_COLUMNS} FROM client_statistics_materialized ORDER BY client_id"
+            )
             return [dict(row) for row in cursor.fetchall()]
         finally:
             conn.close()
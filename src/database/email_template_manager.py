@@ -7,10 +7,14 @@ tout en gardant les variables dynamiques et l'automation.
 
 import sqlite3
 import json
+import time
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 import logging
 
+from src.email_service.template_engine import CompiledTemplate, TemplateCache, compile_template
+
 logger = logging.getLogger(__name__)
 
 
@@ -223,9 +227,24 @@ class EmailTemplateManager:
         'order_id', 'submission_date', 'date', 'location'
     ]
     
-    def __init__(self, db_path: str = "database/recours_ecommerce.db"):
-        """Initialise le gestionnaire de templates."""
+    def __init__(self, db_path: str = "database/recours_ecommerce.db",
+                 cache_size: int = 256, version_check_interval: float = 30.0):
+        """
+        Initialise le gestionnaire de templates.
+        
+        Args:
+            db_path: Chemin de la base SQLite
+            cache_size: Nombre de templates compilés gardés en cache (LRU)
+            version_check_interval: Secondes entre deux vérifications de la version
+                des templates d'un client (modifications faites par un autre process)
+        """
         self.db_path = db_path
+        self.version_check_interval = version_check_interval
+        # Clé : (client_id, template_type, language, version)
+        self._cache = TemplateCache(maxsize=cache_size)
+        # client_id -> (version, vérifiée à)
+        self._client_versions: Dict[int, tuple] = {}
+        self._versions_lock = threading.Lock()
         self._ensure_table_exists()
     
     def _ensure_table_exists(self):
@@ -268,7 +287,34 @@ class EmailTemplateManager:
         Returns:
             Dict avec 'subject' et 'body_html'
         """
-        # Essayer de récupérer le template personnalisé
+        compiled = self.get_compiled_template(template_type, language, client_id)
+        return {'subject': compiled['subject'].source, 'body': compiled['body'].source}
+    
+    def get_compiled_template(self, template_type: str, language: str = 'FR',
+                              client_id: Optional[int] = None) -> Dict[str, CompiledTemplate]:
+        """
+        Récupère un template compilé depuis le cache LRU.
+        
+        La base n'est interrogée qu'au premier rendu, puis au plus une fois par
+        version_check_interval pour détecter une modification faite ailleurs.
+        
+        Returns:
+            Dict avec 'subject' et 'body' compilés
+        """
+        version = self._get_client_version(client_id)
+        
+        def load():
+            template = self._load_template(template_type, language, client_id)
+            return {
+                'subject': compile_template(template['subject']),
+                'body': compile_template(template['body'])
+            }
+        
+        return self._cache.get_or_load((client_id, template_type, language, version), load)
+    
+    def _load_template(self, template_type: str, language: str,
+                       client_id: Optional[int]) -> Dict[str, str]:
+        """Template personnalisé du client, sinon template par défaut."""
         if client_id:
             custom_template = self._get_custom_template(client_id, template_type, language)
             if custom_template:
@@ -277,6 +323,51 @@ class EmailTemplateManager:
         # Fallback sur le template par défaut
         return self._get_default_template(template_type, language)
     
+    def _get_client_version(self, client_id: Optional[int]) -> Any:
+        """Version des templates d'un client (nombre + dernière modification)."""
+        if not client_id:
+            return None
+        
+        now = time.monotonic()
+        with self._versions_lock:
+            cached = self._client_versions.get(client_id)
+        if cached and now - cached[1] < self.version_check_interval:
+            return cached[0]
+        
+        conn = None
+        version = None
+        try:
+            conn = sqlite3.connect(self.db_path)
+            row = conn.execute("""
+                SELECT COUNT(*), MAX(updated_at) FROM email_templates WHERE client_id = ?
+            """, (client_id,)).fetchone()
+            version = (row[0], row[1])
+        except Exception as e:
+            logger.error(f"Error fetching template version: {e}")
+        finally:
+            if conn:
+                conn.close()
+        
+        with self._versions_lock:
+            self._client_versions[client_id] = (version, now)
+        return version
+    
+    def invalidate(self, client_id: Optional[int] = None):
+        """
+        Vide le cache des templates compilés d'un client (ou de tous).
+        
+        Appelé après chaque modification depuis la page templates.
+        """
+        with self._versions_lock:
+            if client_id is None:
+                self._client_versions.clear()
+            else:
+                self._client_versions.pop(client_id, None)
+        if client_id is None:
+            self._cache.clear()
+        else:
+            self._cache.invalidate(lambda key: key[0] == client_id)
+    
     def _get_custom_template(self, client_id: int, template_type: str, 
                             language: str) -> Optional[Dict[str, str]]:
         """Récupère un template personnalisé depuis la DB."""
@@ -334,6 +425,7 @@ class EmailTemplateManager:
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (client_id, template_type, language, subject, body_html, datetime.now()))
             conn.commit()
+            self.invalidate(client_id)
             logger.info(f"Template saved: client_id={client_id}, type={template_type}, lang={language}")
             return True
         except Exception as e:
@@ -353,6 +445,7 @@ class EmailTemplateManager:
                 WHERE client_id = ? AND template_type = ? AND language = ?
             """, (client_id, template_type, language))
             conn.commit()
+            self.invalidate(client_id)
             logger.info(f"Template deleted: client_id={client_id}, type={template_type}, lang={language}")
             return True
         except Exception as e:
@@ -368,7 +461,7 @@ class EmailTemplateManager:
         Rend un template avec les données réelles.
         
         Args:
-            template: Template avec subject et body
+            template: Template avec subject et body (texte ou compilé)
             claim_data: Données de la réclamation
             company_name: Nom de l'entreprise
         
@@ -394,12 +487,18 @@ class EmailTemplateManager:
             'location': claim_data.get('location', 'Paris')
         }
         
-        # Rendre le subject et le body
-        subject = template['subject'].format(**variables)
-        body = template['body'].format(**variables)
+        # Rendre le subject et le body (compilés une seule fois par texte de template)
+        subject = self._compiled(template['subject']).render(variables)
+        body = self._compiled(template['body']).render(variables)
         
         return {'subject': subject, 'body': body}
     
+    @staticmethod
+    def _compiled(template: Any) -> CompiledTemplate:
+        if isinstance(template, CompiledTemplate):
+            return template
+        return compile_template(template)
+    
     def get_all_templates(self, client_id: int) -> List[Dict[str, Any]]:
         """Récupère tous les templates d'un client."""
         conn = None
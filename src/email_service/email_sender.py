@@ -7,13 +7,27 @@ Sends automated emails for onboarding, OAuth links, and notifications.
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from functools import lru_cache
 from typing import Dict, Optional
 from pathlib import Path
 import logging
 
+from .smtp_pool import get_smtp_pool
+from .template_engine import compile_template
+
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=64)
+def _read_template_file(template_path: str) -> Optional[str]:
+    """Read a template file once per process (None if missing)."""
+    path = Path(template_path)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
 class EmailSender:
     """Send automated emails to clients."""
     
@@ -24,7 +38,9 @@ class EmailSender:
         smtp_user: Optional[str] = None,
         smtp_password: Optional[str] = None,
         from_email: Optional[str] = None,
-        from_name: str = "Agent IA Recouvrement"
+        from_name: str = "Agent IA Recouvrement",
+        use_starttls: bool = True,
+        outbox=None
     ):
         """
         Initialize email sender.
@@ -36,6 +52,8 @@ class EmailSender:
             smtp_password: SMTP password
             from_email: Sender email address
             from_name: Sender display name
+            use_starttls: Upgrade the SMTP connection with STARTTLS
+            outbox: EmailOutbox to queue emails instead of sending inline (optional)
         """
         self.smtp_host = smtp_host
         self.smtp_port = smtp_port
@@ -43,6 +61,8 @@ class EmailSender:
         self.smtp_password = smtp_password
         self.from_email = from_email or smtp_user
         self.from_name = from_name
+        self.use_starttls = use_starttls
+        self.outbox = outbox
         
         self.templates_dir = Path(__file__).parent.parent / 'email' / 'templates'
     
@@ -56,11 +76,10 @@ class EmailSender:
         Returns:
             Template content
         """
-        template_path = self.templates_dir / f"{template_name}.html"
+        content = _read_template_file(str(self.templates_dir / f"{template_name}.html"))
         
-        if template_path.exists():
-            with open(template_path, 'r', encoding='utf-8') as f:
-                return f.read()
+        if content is not None:
+            return content
         else:
             logger.warning(f"Template not found: {template_name}")
             return ""
@@ -76,11 +95,81 @@ class EmailSender:
         Returns:
             Rendered template
         """
-        for key, value in variables.items():
-            placeholder = f"{{{{{key}}}}}"  # {{variable_name}}
-            template = template.replace(placeholder, str(value))
+        # {{variable_name}} placeholders, located once per template text
+        return compile_template(template, 'mustache').render(variables)
+    
+    def build_message(
+        self,
+        to_email: str,
+        subject: str,
+        html_body: str,
+        text_body: Optional[str] = None,
+        attachments: Optional[list] = None
+    ) -> MIMEMultipart:
+        """
+        Build the MIME message for an email.
+        
+        Args:
+            to_email: Recipient email address
+            subject: Email subject
+            html_body: HTML email body
+            text_body: Plain text fallback (optional)
+            attachments: List of file paths to attach (optional)
+            
+        Returns:
+            MIME message ready to send
+        """
+        from email.mime.base import MIMEBase
+        from email import encoders
+        import os
+        
+        # Create message
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = f"{self.from_name} <{self.from_email}>"
+        msg['To'] = to_email
+        
+        # Attach text and HTML versions
+        if text_body:
+            part1 = MIMEText(text_body, 'plain')
+            msg.attach(part1)
+        
+        part2 = MIMEText(html_body, 'html')
+        msg.attach(part2)
+        
+        # Attach files if provided
+        if attachments:
+            for file_path in attachments:
+                if not os.path.exists(file_path):
+                    logger.warning(f"Attachment not found: {file_path}")
+                    continue
+                
+                with open(file_path, 'rb') as f:
+                    part = MIMEBase('application', 'octet-stream')
+                    part.set_payload(f.read())
+                    encoders.encode_base64(part)
+                    
+                    filename = os.path.basename(file_path)
+                    part.add_header(
+                        'Content-Disposition',
+                        f'attachment; filename="{filename}"'
+                    )
+                    msg.attach(part)
+                    logger.info(f"Attached file: {filename}")
+        
+        return msg
+    
+    def deliver(self, msg: MIMEMultipart):
+        """
+        Send a built message over a pooled SMTP session.
         
-        return template
+        Raises:
+            smtplib.SMTPException / OSError on delivery failure
+        """
+        get_smtp_pool(
+            self.smtp_host, self.smtp_port, self.smtp_user, self.smtp_password,
+            starttls=self.use_starttls
+        ).send_message(msg)
     
     def send_email(
         self, 
@@ -88,70 +177,41 @@ class EmailSender:
         subject: str, 
         html_body: str,
         text_body: Optional[str] = None,
-        attachments: Optional[list] = None
+        attachments: Optional[list] = None,
+        notification_id: Optional[int] = None
     ) -> bool:
         """
         Send an email.
         
+        With an outbox, the rendered email is queued and delivered later by
+        the outbox worker (src/workers/outbox_worker.py).
+        
         Args:
             to_email: Recipient email address
             subject: Email subject
             html_body: HTML email body
             text_body: Plain text fallback (optional)
             attachments: List of file paths to attach (optional)
+            notification_id: Logged notification updated by the outbox on delivery (optional)
             
         Returns:
-            True if successful, False otherwise
+            True if successful (or queued), False otherwise
         """
+        if self.outbox is not None:
+            try:
+                self.outbox.enqueue(to_email, subject, html_body, text_body, attachments,
+                                    notification_id=notification_id)
+                return True
+            except Exception as e:
+                logger.error(f"Failed to queue email: {e}")
+                return False
+        
         if not all([self.smtp_user, self.smtp_password, self.from_email]):
             logger.error("SMTP credentials not configured")
             return False
         
         try:
-            # Import for attachments
-            from email.mime.base import MIMEBase
-            from email import encoders
-            import os
-            
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = to_email
-            
-            # Attach text and HTML versions
-            if text_body:
-                part1 = MIMEText(text_body, 'plain')
-                msg.attach(part1)
-            
-            part2 = MIMEText(html_body, 'html')
-            msg.attach(part2)
-            
-            # Attach files if provided
-            if attachments:
-                for file_path in attachments:
-                    if not os.path.exists(file_path):
-                        logger.warning(f"Attachment not found: {file_path}")
-                        continue
-                    
-                    with open(file_path, 'rb') as f:
-                        part = MIMEBase('application', 'octet-stream')
-                        part.set_payload(f.read())
-                        encoders.encode_base64(part)
-                        
-                        filename = os.path.basename(file_path)
-                        part.add_header(
-                            'Content-Disposition',
-                            f'attachment; filename="{filename}"'
-                        )
-                        msg.attach(part)
-                        logger.info(f"Attached file: {filename}")
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            self.deliver(self.build_message(to_email, subject, html_body, text_body, attachments))
             
             logger.info(f"Email sent successfully to {to_email}")
             return True
@@ -332,7 +392,8 @@ class EmailSender:
         client_name: str,
         disputes_count: int,
         total_amount: float,
-        disputes_summary: list
+        disputes_summary: list,
+        notification_id: Optional[int] = None
     ) -> bool:
         """
         Send email notification about new disputes detected.
@@ -343,6 +404,7 @@ class EmailSender:
             disputes_count: Number of disputes
             total_amount: Total recoverable amount
             disputes_summary: List of dispute dictionaries
+            notification_id: Logged notification to update on delivery (optional)
             
         Returns:
             True if successful
@@ -358,7 +420,7 @@ class EmailSender:
             disputes_summary=disputes_summary
         )
         
-        return self.send_email(to_email, subject, html_body)
+        return self.send_email(to_email, subject, html_body, notification_id=notification_id)
     
     def send_claim_submitted_email(
         self,
@@ -368,7 +430,8 @@ class EmailSender:
         carrier: str,
         amount_requested: float,
         order_id: str,
-        submission_method: str
+        submission_method: str,
+        notification_id: Optional[int] = None
     ) -> bool:
         """
         Send email notification about claim submitted.
@@ -381,6 +444,7 @@ class EmailSender:
             amount_requested: Amount requested
             order_id: Order ID
             submission_method: Submission method (api/portal)
+            notification_id: Logged notification to update on delivery (optional)
             
         Returns:
             True if successful
@@ -398,7 +462,7 @@ class EmailSender:
             submission_method=submission_method
         )
         
-        return self.send_email(to_email, subject, html_body)
+        return self.send_email(to_email, subject, html_body, notification_id=notification_id)
     
     def send_claim_accepted_email(
         self,
@@ -476,33 +540,39 @@ class EmailSender:
 
 
 # Helper functions for convenient access
+# (pass outbox=get_outbox() to queue the email instead of sending it inline)
 def send_disputes_detected_email(client_email: str, disputes_count: int,
-                                 total_amount: float, disputes_summary: list) -> bool:
+                                 total_amount: float, disputes_summary: list,
+                                 outbox=None, notification_id: Optional[int] = None) -> bool:
     """Helper function to send disputes detected email."""
     import os
     sender = EmailSender(
         smtp_user=os.getenv('GMAIL_SENDER'),
         smtp_password=os.getenv('GMAIL_APP_PASSWORD'),
-        from_email=os.getenv('GMAIL_SENDER')
+        from_email=os.getenv('GMAIL_SENDER'),
+        outbox=outbox
     )
     return sender.send_disputes_detected_email(
         to_email=client_email,
         client_name=client_email.split('@')[0].title(),
         disputes_count=disputes_count,
         total_amount=total_amount,
-        disputes_summary=disputes_summary
+        disputes_summary=disputes_summary,
+        notification_id=notification_id
     )
 
 
 def send_claim_submitted_email(client_email: str, claim_reference: str,
                                carrier: str, amount_requested: float,
-                               order_id: str, submission_method: str) -> bool:
+                               order_id: str, submission_method: str,
+                               outbox=None, notification_id: Optional[int] = None) -> bool:
     """Helper function to send claim submitted email."""
     import os
     sender = EmailSender(
         smtp_user=os.getenv('GMAIL_SENDER'),
         smtp_password=os.getenv('GMAIL_APP_PASSWORD'),
-        from_email=os.getenv('GMAIL_SENDER')
+        from_email=os.getenv('GMAIL_SENDER'),
+        outbox=outbox
     )
     return sender.send_claim_submitted_email(
         to_email=client_email,
@@ -511,19 +581,22 @@ def send_claim_submitted_email(client_email: str, claim_reference: str,
         carrier=carrier,
         amount_requested=amount_requested,
         order_id=order_id,
-        submission_method=submission_method
+        submission_method=submission_method,
+        notification_id=notification_id
     )
 
 
 def send_claim_accepted_email(client_email: str, claim_reference: str,
                               carrier: str, accepted_amount: float,
-                              client_share: float, platform_fee: float) -> bool:
+                              client_share: float, platform_fee: float,
+                              outbox=None) -> bool:
     """Helper function to send claim accepted email."""
     import os
     sender = EmailSender(
         smtp_user=os.getenv('GMAIL_SENDER'),
         smtp_password=os.getenv('GMAIL_APP_PASSWORD'),
-        from_email=os.getenv('GMAIL_SENDER')
+        from_email=os.getenv('GMAIL_SENDER'),
+        outbox=outbox
     )
     return sender.send_claim_accepted_email(
         to_email=client_email,
@@ -537,13 +610,15 @@ def send_claim_accepted_email(client_email: str, claim_reference: str,
 
 
 def send_claim_rejected_email(client_email: str, claim_reference: str,
-                              carrier: str, rejection_reason: str) -> bool:
+                              carrier: str, rejection_reason: str,
+                              outbox=None) -> bool:
     """Helper function to send claim rejected email."""
     import os
     sender = EmailSender(
         smtp_user=os.getenv('GMAIL_SENDER'),
         smtp_password=os.getenv('GMAIL_APP_PASSWORD'),
-        from_email=os.getenv('GMAIL_SENDER')
+        from_email=os.getenv('GMAIL_SENDER'),
+        outbox=outbox
     )
     return sender.send_claim_rejected_email(
         to_email=client_email,
@@ -16,6 +16,7 @@ import smtplib
 
 from src.utils.i18n import get_i18n_text, format_currency
 from src.database.email_template_manager import EmailTemplateManager
+from src.email_service.smtp_pool import SMTPConnectionPool, get_smtp_pool
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +31,8 @@ class EscalationEmailHandler:
         smtp_user: Optional[str] = None,
         smtp_password: Optional[str] = None,
         from_email: Optional[str] = None,
-        from_name: str = "Recours E-commerce - Service Juridique"
+        from_name: str = "Recours E-commerce - Service Juridique",
+        template_manager: Optional[EmailTemplateManager] = None
     ):
         """
         Initialize escalation email handler.
@@ -42,6 +44,7 @@ class EscalationEmailHandler:
             smtp_password: SMTP password
             from_email: Sender email address
             from_name: Sender display name
+            template_manager: Gestionnaire de templates partagé (créé à la demande si None)
         """
         # Configuration SMTP générique (priorité aux vars d'env, fallback sur Gmail pour compatibilité)
         self.smtp_host = smtp_host or os.getenv('SMTP_HOST', 'smtp.gmail.com')
@@ -66,6 +69,34 @@ class EscalationEmailHandler:
         # Sécurité pour les tests : si TEST_MODE est actif, on ne contacte pas les transporteurs
         self.test_mode = os.getenv('TEST_MODE', 'False').lower() == 'true'
         self.test_recipient = os.getenv('TEST_EMAIL_RECIPIENT', self.from_email)
+        
+        # Ressources réutilisées d'un email à l'autre
+        self._template_manager = template_manager
+        self._logo_data: Optional[bytes] = None
+        self._logo_loaded = False
+
+    @property
+    def template_manager(self) -> EmailTemplateManager:
+        """Gestionnaire de templates, construit une seule fois par handler."""
+        if self._template_manager is None:
+            self._template_manager = EmailTemplateManager()
+        return self._template_manager
+
+    def _get_smtp_pool(self) -> SMTPConnectionPool:
+        """Pool SMTP partagé par tous les handlers du process pour ce compte."""
+        return get_smtp_pool(self.smtp_host, self.smtp_port, self.smtp_user, self.smtp_password)
+
+    def _get_logo_data(self) -> Optional[bytes]:
+        """Logo inline, lu une seule fois depuis le disque."""
+        if not self._logo_loaded:
+            logo_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'static', 'refundly_logo.png')
+            if os.path.exists(logo_path):
+                with open(logo_path, 'rb') as f:
+                    self._logo_data = f.read()
+            else:
+                logger.warning(f"Logo not found at {logo_path}")
+            self._logo_loaded = True
+        return self._logo_data
 
     def _get_safe_recipient(self, carrier: str) -> str:
         """Retourne l'email du destinataire (réel ou test)."""
@@ -182,9 +213,9 @@ class EscalationEmailHandler:
         lang: str
     ) -> str:
         """Crée le sujet de l'email via le Template Manager."""
-        template_manager = EmailTemplateManager()
+        template_manager = self.template_manager
         client_id = claim.get('client_id')
-        template = template_manager.get_template(email_type, lang, client_id=client_id)
+        template = template_manager.get_compiled_template(email_type, lang, client_id=client_id)
         rendered = template_manager.render_template(template, claim)
         return rendered['subject']
     
@@ -195,9 +226,9 @@ class EscalationEmailHandler:
         lang: str
     ) -> str:
         """Crée le corps HTML de l'email via le Template Manager."""
-        template_manager = EmailTemplateManager()
+        template_manager = self.template_manager
         client_id = claim.get('client_id')
-        template = template_manager.get_template(email_type, lang, client_id=client_id)
+        template = template_manager.get_compiled_template(email_type, lang, client_id=client_id)
         
         # Enrichir les données de la claim avec une localisation si manquante
         if 'location' not in claim:
@@ -222,8 +253,6 @@ class EscalationEmailHandler:
             logger.error("SMTP credentials not configured")
             return False
         
-        logo_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'static', 'refundly_logo.png')
-        
         try:
             # 1. Root container (mixed) pour supporter body + attachments
             msg = MIMEMultipart('mixed')
@@ -239,17 +268,14 @@ class EscalationEmailHandler:
             msg_related.attach(MIMEText(html_body, 'html'))
             
             # 2.2 Logo Inline
-            if os.path.exists(logo_path):
-                with open(logo_path, 'rb') as f:
-                    img_data = f.read()
-                    from email.mime.image import MIMEImage
-                    img = MIMEImage(img_data)
-                    # Define the image ID as referenced in the HTML
-                    img.add_header('Content-ID', '<refundly_logo>')
-                    img.add_header('Content-Disposition', 'inline', filename='refundly_logo.png')
-                    msg_related.attach(img)
-            else:
-                logger.warning(f"Logo not found at {logo_path}")
+            img_data = self._get_logo_data()
+            if img_data:
+                from email.mime.image import MIMEImage
+                img = MIMEImage(img_data)
+                # Define the image ID as referenced in the HTML
+                img.add_header('Content-ID', '<refundly_logo>')
+                img.add_header('Content-Disposition', 'inline', filename='refundly_logo.png')
+                msg_related.attach(img)
 
             # 3. PDF Attachment (attached to Root Mixed)
             if attachment_path:
@@ -269,11 +295,8 @@ class EscalationEmailHandler:
                 else:
                     logger.error(f"Fichier PDF non trouvé : {attachment_path}")
             
-            # Envoyer l'email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            # Envoyer l'email via une session SMTP partagée (pool)
+            self._get_smtp_pool().send_message(msg)
             
             logger.info(f"Email d'escalade envoyé à {to_email} pour {claim_ref}")
             return True
@@ -0,0 +1,253 @@
+"""
+Email outbox - persistent queue of rendered emails.
+
+Callers enqueue fully rendered messages and return immediately; a separate
+sender process (src/workers/outbox_worker.py, the `outbox` process of the
+Procfile) delivers them in batches over pooled SMTP sessions, with
+per-message retries and dead-lettering. Messages live in the email_outbox
+table of the main database, so producers and senders may run on different
+dynos or containers.
+
+A message may carry the id of its row in the notifications table (logged as
+'queued' by the caller); that row follows the delivery: 'sent' once
+delivered, 'failed' once dead-lettered.
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _to_datetime(value: Any) -> datetime:
+    """Normalize a SQLite (str) or Postgres (datetime) timestamp."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+class EmailOutbox:
+    """
+    A persistent email outbox, stored in the email_outbox table of the main
+    database (SQLite, or Postgres shared by every dyno/container).
+
+    Status lifecycle: pending -> sending -> sent
+                                        \\-> pending (retry) -> ... -> dead
+    """
+
+    def __init__(self, db_manager=None, max_attempts: int = 5,
+                 retry_base_seconds: int = 60):
+        """
+        Initialize outbox.
+
+        Args:
+            db_manager: DatabaseManager holding the email_outbox table and the
+                notifications log (global instance by default, opened on first use)
+            max_attempts: Attempts before a message is dead-lettered
+            retry_base_seconds: First retry delay (doubled at each attempt)
+        """
+        self._db_manager = db_manager
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+
+    @property
+    def db(self):
+        if self._db_manager is None:
+            from src.database.database_manager import get_db_manager
+            self._db_manager = get_db_manager()
+        return self._db_manager
+
+    def _run(self, query: str, params: tuple = (), fetch: bool = False):
+        """Execute one statement in its own transaction (rows as dicts if fetch)."""
+        conn = self.db.get_connection()
+        try:
+            cursor = self.db._execute(conn, query, params)
+            result = [dict(row) for row in cursor.fetchall()] if fetch else cursor.rowcount
+            conn.commit()
+            return result
+        finally:
+            conn.close()
+
+    def _update_notifications(self, notification_ids: List[int], status: str,
+                              error_message: Optional[str] = None):
+        """Report the delivery status on the notifications log (never fails the send path)."""
+        if not notification_ids:
+            return
+        try:
+            self.db.update_notification_status(notification_ids, status, error_message)
+        except Exception as e:
+            logger.warning(f"Could not update notifications {notification_ids} to '{status}': {e}")
+
+    def enqueue(self, to_email: str, subject: str, html_body: str,
+                text_body: Optional[str] = None, attachments: Optional[List[str]] = None,
+                category: Optional[str] = None, notification_id: Optional[int] = None) -> int:
+        """
+        Add a rendered email to the outbox.
+
+        Args:
+            notification_id: notifications row updated when the email is sent or dead-lettered
+
+        Returns:
+            Outbox message ID
+        """
+        now = datetime.now()
+        query = """
+            INSERT INTO email_outbox (
+                to_email, subject, html_body, text_body, attachments,
+                category, notification_id, created_at, next_attempt_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        if self.db.db_type == 'postgres':
+            query += " RETURNING id"
+        conn = self.db.get_connection()
+        try:
+            cursor = self.db._execute(conn, query, (
+                to_email, subject, html_body, text_body,
+                json.dumps(attachments) if attachments else None,
+                category, notification_id, now, now
+            ))
+            message_id = cursor.fetchone()[0] if self.db.db_type == 'postgres' else cursor.lastrowid
+            conn.commit()
+        finally:
+            conn.close()
+        logger.info(f"Email {message_id} queued for {to_email}")
+        return message_id
+
+    def claim_batch(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Atomically mark up to `limit` due messages as 'sending' and return them.
+        """
+        now = datetime.now()
+        # One statement: concurrent senders never claim the same message
+        # (SKIP LOCKED on Postgres, database write lock on SQLite)
+        lock = "FOR UPDATE SKIP LOCKED" if self.db.db_type == 'postgres' else ""
+        rows = self._run(f"""
+            UPDATE email_outbox SET status = 'sending', claimed_at = ?
+            WHERE id IN (
+                SELECT id FROM email_outbox
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                ORDER BY id
+                LIMIT ?
+                {lock}
+            )
+            RETURNING *
+        """, (now, now, limit), fetch=True)
+
+        batch = []
+        for message in sorted(rows, key=lambda row: row['id']):
+            message['attachments'] = json.loads(message['attachments']) if message['attachments'] else None
+            batch.append(message)
+        return batch
+
+    def mark_sent(self, message_ids: List[int]):
+        """Mark delivered messages (and their notifications)."""
+        if not message_ids:
+            return
+        placeholders = ','.join('?' * len(message_ids))
+        self._run(f"""
+            UPDATE email_outbox SET status = 'sent', sent_at = ?, attempts = attempts + 1
+            WHERE id IN ({placeholders})
+        """, (datetime.now(), *message_ids))
+        notification_ids = [
+            row['notification_id'] for row in self._run(
+                f"SELECT notification_id FROM email_outbox "
+                f"WHERE id IN ({placeholders}) AND notification_id IS NOT NULL",
+                tuple(message_ids), fetch=True
+            )
+        ]
+        self._update_notifications(notification_ids, 'sent')
+
+    def mark_failed(self, message: Dict[str, Any], error: str):
+        """Schedule a retry with exponential backoff, or dead-letter the message."""
+        attempts = message['attempts'] + 1
+        if attempts >= self.max_attempts:
+            status = 'dead'
+            next_attempt = datetime.now()
+            logger.error(f"Email {message['id']} to {message['to_email']} dead-lettered: {error}")
+        else:
+            status = 'pending'
+            next_attempt = datetime.now() + timedelta(seconds=self.retry_base_seconds * 2 ** (attempts - 1))
+            logger.warning(f"Email {message['id']} failed (attempt {attempts}), retry at {next_attempt}: {error}")
+
+        self._run("""
+            UPDATE email_outbox
+            SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?
+            WHERE id = ?
+        """, (status, attempts, error, next_attempt, message['id']))
+
+        # Retried messages keep their notification 'queued'
+        if status == 'dead' and message.get('notification_id'):
+            self._update_notifications([message['notification_id']], 'failed', error)
+
+    def requeue_stale(self, older_than: timedelta = timedelta(minutes=10)) -> int:
+        """Put back 'sending' messages left behind by a crashed sender."""
+        return self._run("""
+            UPDATE email_outbox SET status = 'pending'
+            WHERE status = 'sending' AND claimed_at < ?
+        """, (datetime.now() - older_than,))
+
+    def requeue_dead(self) -> int:
+        """Give dead-lettered messages a new chance (manual replay)."""
+        notification_ids = [
+            row['notification_id'] for row in self._run(
+                "SELECT notification_id FROM email_outbox WHERE status = 'dead' AND notification_id IS NOT NULL",
+                fetch=True
+            )
+        ]
+        requeued = self._run("""
+            UPDATE email_outbox
+            SET status = 'pending', attempts = 0, next_attempt_at = ?
+            WHERE status = 'dead'
+        """, (datetime.now(),))
+        self._update_notifications(notification_ids, 'queued')
+        return requeued
+
+    def get_metrics(self, window: timedelta = timedelta(hours=1)) -> Dict[str, Any]:
+        """
+        Queue depth per status and delivery latency/throughput over `window`.
+
+        Returns:
+            Dict avec counts par statut, latence moyenne/p95 (secondes) et débit (emails/min)
+        """
+        counts = {
+            row['status']: row['n']
+            for row in self._run("SELECT status, COUNT(*) AS n FROM email_outbox GROUP BY status", fetch=True)
+        }
+        rows = self._run("""
+            SELECT created_at, sent_at FROM email_outbox
+            WHERE status = 'sent' AND sent_at >= ?
+        """, (datetime.now() - window,), fetch=True)
+
+        latencies = sorted(
+            (_to_datetime(row['sent_at']) - _to_datetime(row['created_at'])).total_seconds()
+            for row in rows
+        )
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+
+        return {
+            'pending': counts.get('pending', 0),
+            'sending': counts.get('sending', 0),
+            'sent': counts.get('sent', 0),
+            'dead': counts.get('dead', 0),
+            'avg_latency_seconds': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            'p95_latency_seconds': round(p95, 3),
+            'throughput_per_minute': round(len(latencies) / (window.total_seconds() / 60), 2),
+        }
+
+
+# Instances globales, une par base de données
+_outboxes: Dict[Optional[str], EmailOutbox] = {}
+_outboxes_lock = threading.Lock()
+
+def get_outbox(db_manager=None) -> EmailOutbox:
+    """Obtenir l'outbox du process pour une base (base globale si None)."""
+    key = getattr(db_manager, 'db_path', None)
+    with _outboxes_lock:
+        outbox = _outboxes.get(key)
+        if outbox is None:
+            outbox = EmailOutbox(db_manager)
+            _outboxes[key] = outbox
+        return outbox
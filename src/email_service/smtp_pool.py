@@ -0,0 +1,274 @@
+"""
+SMTP connection pool shared by all email senders.
+
+Opening an SMTP session (TCP + STARTTLS/SSL + LOGIN) costs about a second and
+providers throttle accounts that reconnect for every message. The pool keeps
+authenticated sessions open and reuses them:
+- keepalive with NOOP before reusing an idle session
+- transparent reconnect when the server dropped the session
+- per-connection message cap (sessions are recycled after N messages)
+- per-provider send rate limit shared by every pool of the same host
+"""
+
+import smtplib
+import socket
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a session is considered dead and worth one reconnect.
+# Not OSError: every SMTPException subclasses it, including refused recipients.
+RECONNECT_ERRORS = (
+    smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+    ConnectionError, socket.timeout, socket.gaierror
+)
+
+# Answers from a live server: retrying on a fresh session would repeat them
+SMTP_REPLY_ERRORS = (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)
+
+
+class ProviderRateLimiter:
+    """Minimum spacing between two sends to the same SMTP provider."""
+
+    def __init__(self, messages_per_second: float):
+        self.min_interval = 1.0 / messages_per_second
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the next send slot is available."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _PooledConnection:
+    """An open SMTP session with usage bookkeeping."""
+
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """Pool of authenticated SMTP sessions for one (host, port, user)."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        use_ssl: bool = False,
+        starttls: bool = True,
+        max_connections: int = 2,
+        max_messages_per_connection: int = 100,
+        keepalive_interval: float = 30.0,
+        timeout: float = 30.0,
+        rate_limiter: Optional[ProviderRateLimiter] = None
+    ):
+        """
+        Initialize SMTP pool.
+
+        Args:
+            host: SMTP server host
+            port: SMTP server port
+            user: SMTP username (no LOGIN if None)
+            password: SMTP password
+            use_ssl: Use implicit SSL (SMTP_SSL, port 465)
+            starttls: Upgrade plain connections with STARTTLS
+            max_connections: Maximum number of idle sessions kept open
+            max_messages_per_connection: Recycle a session after this many messages
+            keepalive_interval: Idle seconds after which a NOOP checks the session
+            timeout: Socket timeout in seconds
+            rate_limiter: Shared per-provider send rate limiter (optional)
+        """
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_ssl = use_ssl
+        self.starttls = starttls and not use_ssl
+        self.max_connections = max_connections
+        self.max_messages_per_connection = max_messages_per_connection
+        self.keepalive_interval = keepalive_interval
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+
+        self._idle: List[_PooledConnection] = []
+        self._lock = threading.Lock()
+        self.stats = {'connections_opened': 0, 'reconnects': 0, 'messages_sent': 0}
+
+    def _connect(self) -> _PooledConnection:
+        """Open and authenticate a new SMTP session."""
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                server.starttls()
+        if self.user and self.password:
+            server.login(self.user, self.password)
+
+        with self._lock:
+            self.stats['connections_opened'] += 1
+        logger.debug(f"SMTP session opened to {self.host}:{self.port}")
+        return _PooledConnection(server)
+
+    @staticmethod
+    def _close(conn: _PooledConnection):
+        """Close a session, ignoring errors from an already dead socket."""
+        try:
+            conn.server.quit()
+        except Exception:
+            try:
+                conn.server.close()
+            except Exception:
+                pass
+
+    def _is_alive(self, conn: _PooledConnection) -> bool:
+        """NOOP check for sessions idle longer than keepalive_interval."""
+        if time.monotonic() - conn.last_used < self.keepalive_interval:
+            return True
+        try:
+            return conn.server.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _acquire(self) -> _PooledConnection:
+        """Take an idle live session or open a new one."""
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect()
+            if self._is_alive(conn):
+                return conn
+            self._close(conn)
+
+    def _release(self, conn: _PooledConnection):
+        """Return a session to the pool, or close it if capped or pool is full."""
+        conn.last_used = time.monotonic()
+        if conn.messages_sent >= self.max_messages_per_connection:
+            self._close(conn)
+            return
+        with self._lock:
+            if len(self._idle) < self.max_connections:
+                self._idle.append(conn)
+                return
+        self._close(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        """
+        Borrow a session. A session that raised is discarded instead of returned.
+        """
+        conn = self._acquire()
+        try:
+            yield conn.server
+        except Exception:
+            self._close(conn)
+            raise
+        else:
+            self._release(conn)
+
+    def send_message(self, msg, from_addr: Optional[str] = None,
+                     to_addrs: Optional[List[str]] = None):
+        """
+        Send an email.message.Message over a pooled session.
+
+        Retries once on a fresh session if the pooled one was disconnected.
+        Other SMTP errors (refused recipient, data error...) are raised as is.
+        """
+        if self.rate_limiter:
+            self.rate_limiter.wait()
+
+        for attempt in range(2):
+            conn = self._acquire()
+            try:
+                conn.server.send_message(msg, from_addr=from_addr, to_addrs=to_addrs)
+            except SMTP_REPLY_ERRORS:
+                self._close(conn)
+                raise
+            except RECONNECT_ERRORS as e:
+                self._close(conn)
+                if attempt:
+                    raise
+                with self._lock:
+                    self.stats['reconnects'] += 1
+                logger.warning(f"SMTP session to {self.host} lost ({e}), reconnecting")
+                continue
+            except Exception:
+                self._close(conn)
+                raise
+
+            conn.messages_sent += 1
+            with self._lock:
+                self.stats['messages_sent'] += 1
+            self._release(conn)
+            return
+
+    def close(self):
+        """Close every idle session."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+
+
+# Pools and rate limiters shared by the whole process
+_pools: Dict[Tuple[str, int, Optional[str], bool], SMTPConnectionPool] = {}
+_rate_limiters: Dict[str, ProviderRateLimiter] = {}
+_registry_lock = threading.Lock()
+
+# Default per-provider send rates (messages per second)
+PROVIDER_RATE_LIMITS = {
+    'smtp.gmail.com': 1.0,
+}
+DEFAULT_RATE_LIMIT = 5.0
+
+
+def get_smtp_pool(host: str, port: int, user: Optional[str] = None,
+                  password: Optional[str] = None, use_ssl: bool = False,
+                  starttls: bool = True, **kwargs) -> SMTPConnectionPool:
+    """
+    Get the process-wide pool for (host, port, user, use_ssl, starttls), creating it if needed.
+
+    All pools to the same host share one ProviderRateLimiter.
+    """
+    starttls = starttls and not use_ssl
+    key = (host, port, user, use_ssl, starttls)
+    with _registry_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            limiter = _rate_limiters.get(host)
+            if limiter is None:
+                limiter = ProviderRateLimiter(PROVIDER_RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT))
+                _rate_limiters[host] = limiter
+            pool = SMTPConnectionPool(
+                host, port, user=user, password=password, use_ssl=use_ssl,
+                starttls=starttls, rate_limiter=limiter, **kwargs
+            )
+            _pools[key] = pool
+        elif password and pool.password != password:
+            pool.password = password
+        return pool
+
+
+def close_all_pools():
+    """Close and forget every pool (shutdown, tests)."""
+    with _registry_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+        _rate_limiters.clear()
+    for pool in pools:
+        pool.close()
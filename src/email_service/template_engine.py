@@ -0,0 +1,158 @@
+"""
+Template engine for email rendering.
+
+Templates are parsed once into a compiled form (literal chunks + pre-located
+placeholders), so rendering is a single join instead of one full-string pass
+per variable. Two placeholder syntaxes are used in the codebase:
+- 'format':   {variable}   (EmailTemplateManager, str.format compatible)
+- 'mustache': {{variable}} (EmailSender file templates)
+
+Compiled templates are kept in an LRU cache (TemplateCache).
+"""
+
+import re
+import string
+import threading
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MUSTACHE_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+
+
+class CompiledTemplate:
+    """A template parsed once, rendered many times."""
+
+    __slots__ = ('source', 'syntax', '_literals', '_fields', '_use_format')
+
+    def __init__(self, source: str, syntax: str = 'format'):
+        """
+        Parse a template.
+
+        Args:
+            source: Template text
+            syntax: 'format' ({var}) or 'mustache' ({{var}})
+
+        Raises:
+            ValueError: Malformed 'format' template (same error as str.format)
+        """
+        self.source = source
+        self.syntax = syntax
+        self._literals: List[str] = []
+        # (name, conversion, format_spec) pour chaque placeholder
+        self._fields: List[Tuple[str, Optional[str], str]] = []
+        self._use_format = False
+
+        if syntax == 'format':
+            self._parse_format(source)
+        elif syntax == 'mustache':
+            self._parse_mustache(source)
+        else:
+            raise ValueError(f"Unknown template syntax: {syntax}")
+
+    def _parse_format(self, source: str):
+        literal = []
+        for text, name, spec, conversion in string.Formatter().parse(source):
+            literal.append(text)
+            if name is None:
+                continue
+            if not name.isidentifier() or (spec and '{' in spec):
+                # Champs indexés / specs imbriquées : rendu délégué à str.format
+                self._use_format = True
+                return
+            self._literals.append(''.join(literal))
+            self._fields.append((name, conversion, spec or ''))
+            literal = []
+        self._literals.append(''.join(literal))
+
+    def _parse_mustache(self, source: str):
+        parts = _MUSTACHE_PATTERN.split(source)
+        # split() alterne texte / nom capturé
+        self._literals = parts[0::2]
+        self._fields = [(name, None, '') for name in parts[1::2]]
+
+    @property
+    def variables(self) -> List[str]:
+        """Placeholder names, in order of appearance."""
+        return [name for name, _, _ in self._fields]
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        """
+        Render the template.
+
+        'format' templates raise KeyError on a missing variable (like str.format);
+        'mustache' templates leave unknown placeholders untouched.
+        """
+        if self._use_format:
+            return self.source.format(**variables)
+
+        literals = self._literals
+        out = [literals[0]]
+        for i, (name, conversion, spec) in enumerate(self._fields, start=1):
+            if self.syntax == 'mustache':
+                value = str(variables[name]) if name in variables else '{{' + name + '}}'
+            else:
+                value = variables[name]
+                if conversion == 'r':
+                    value = repr(value)
+                elif conversion == 'a':
+                    value = ascii(value)
+                elif conversion == 's':
+                    value = str(value)
+                value = format(value, spec)
+            out.append(value)
+            out.append(literals[i])
+        return ''.join(out)
+
+
+@lru_cache(maxsize=512)
+def compile_template(source: str, syntax: str = 'format') -> CompiledTemplate:
+    """Compile a template, memoized on its text."""
+    return CompiledTemplate(source, syntax)
+
+
+class TemplateCache:
+    """Thread-safe LRU cache of compiled templates."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling loader() on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._entries[key]
+            self.stats['misses'] += 1
+
+        value = loader()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+        return value
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches predicate; returns the count."""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
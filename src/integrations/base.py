@@ -9,12 +9,24 @@ from typing import List, Dict, Optional, Any
 from datetime import datetime
 import logging
 
+import requests
+
+from src.scrapers.utils.rate_limiter import RateLimitedSession, get_rate_limiter
+
 logger = logging.getLogger(__name__)
 
 
 class BaseConnector(ABC):
     """Abstract base connector for e-commerce platforms."""
     
+    # API rate limit (requests per second and burst), per store. Hosted
+    # platforms override it with their published quota. The default is for
+    # self-hosted stores (WooCommerce, PrestaShop, Magento), which publish no
+    # quota: the merchant's own server answers, often on shared hosting, so
+    # requests are spaced evenly instead of sent in bursts.
+    RATE_LIMIT = 5.0
+    RATE_LIMIT_BURST = 1
+    
     def __init__(self, credentials: Dict[str, Any]):
         """
         Initialize the connector with platform credentials.
@@ -26,6 +38,23 @@ class BaseConnector(ABC):
         self.platform_name = self.__class__.__name__.replace('Connector', '')
         logger.info(f"Initializing {self.platform_name} connector")
     
+    def _create_session(self) -> requests.Session:
+        """
+        Create an HTTP session throttled by the platform rate limit.
+        
+        Every connector of the same store (base_url) shares one limiter in the
+        process, and across processes when RATE_LIMIT_STATE_PATH is set.
+        
+        Returns:
+            requests.Session waiting for a token before each request
+        """
+        limiter = get_rate_limiter(
+            f"connector:{self.platform_name.lower()}:{self.base_url}",
+            requests_per_second=self.RATE_LIMIT,
+            burst=self.RATE_LIMIT_BURST
+        )
+        return RateLimitedSession(limiter)
+    
     @abstractmethod
     def authenticate(self) -> bool:
         """
@@ -20,6 +20,10 @@ class BigCommerceConnector(BaseConnector):
     
     API_VERSION = "v2"
     
+    # Standard/Plus plan quota: 150 requests per 30 s window (4.5/s + 10 = 145 max per window)
+    RATE_LIMIT = 4.5
+    RATE_LIMIT_BURST = 10
+    
     def __init__(self, credentials: Dict[str, Any]):
         """
         Initialize BigCommerce connector.
@@ -41,7 +45,7 @@ class BigCommerceConnector(BaseConnector):
             raise ValueError("store_hash is required")
         
         self.base_url = f"https://api.bigcommerce.com/stores/{self.store_hash}/{self.API_VERSION}"
-        self.session = requests.Session()
+        self.session = self._create_session()
         
         if self.access_token:
             self.session.headers.update({
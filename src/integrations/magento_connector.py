@@ -40,7 +40,7 @@ class MagentoConnector(BaseConnector):
             raise ValueError("store_url is required")
         
         self.base_url = f"{self.store_url}/rest/{self.API_VERSION}"
-        self.session = requests.Session()
+        self.session = self._create_session()
         
         # If access_token not provided, generate it
         if not self.access_token and self.username and self.password:
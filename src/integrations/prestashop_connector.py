@@ -4,7 +4,6 @@ PrestaShop Webservice APIconnector.
 Uses API Key authentication for order retrieval.
 """
 
-import requests
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 import logging
@@ -34,7 +33,7 @@ class PrestaShopConnector(BaseConnector):
             raise ValueError("store_url and api_key are required")
         
         self.base_url = f"{self.store_url}/api"
-        self.session = requests.Session()
+        self.session = self._create_session()
         self.session.auth = (self.api_key, '')  # API key as username, empty password
     
     def authenticate(self) -> bool:
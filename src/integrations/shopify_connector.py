@@ -24,6 +24,10 @@ class ShopifyConnector(BaseConnector):
     # Required scopes for order access
     SCOPES = "read_orders,read_shipping,read_fulfillments"
     
+    # REST Admin API leaky bucket: 40 requests, refilled at 2 per second
+    RATE_LIMIT = 2.0
+    RATE_LIMIT_BURST = 40
+    
     def __init__(self, credentials: Dict[str, Any]):
         """
         Initialize Shopify connector.
@@ -49,7 +53,7 @@ class ShopifyConnector(BaseConnector):
             self.shop_domain = f"{self.shop_domain}.myshopify.com"
         
         self.base_url = f"https://{self.shop_domain}/admin/api/{self.API_VERSION}"
-        self.session = requests.Session()
+        self.session = self._create_session()
         
         if self.access_token:
             self.session.headers.update({
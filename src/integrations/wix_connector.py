@@ -4,7 +4,6 @@ Wix eCommerce REST API connector.
 Uses OAuth 2.0 or API key for authentication.
 """
 
-import requests
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 import logging
@@ -17,6 +16,10 @@ logger = logging.getLogger(__name__)
 class WixConnector(BaseConnector):
     """Wix eCommerce API connector."""
     
+    # Wix REST quota: 200 requests per minute per site (3/s + 20 = 200 max per minute)
+    RATE_LIMIT = 3.0
+    RATE_LIMIT_BURST = 20
+    
     def __init__(self, credentials: Dict[str, Any]):
         """
         Initialize Wix connector.
@@ -33,7 +36,7 @@ class WixConnector(BaseConnector):
             raise ValueError("site_id and access_token are required")
         
         self.base_url = "https://www.wixapis.com"
-        self.session = requests.Session()
+        self.session = self._create_session()
         self.session.headers.update({
             'Authorization': self.access_token,
             'Content-Type': 'application/json'
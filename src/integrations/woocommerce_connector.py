@@ -39,11 +39,12 @@ class WooCommerceConnector(BaseConnector):
         
         self.base_url = f"{self.store_url}/wp-json/{self.API_VERSION}"
         self.auth = HTTPBasicAuth(self.consumer_key, self.consumer_secret)
+        self.session = self._create_session()
     
     def authenticate(self) -> bool:
         """Test authentication by fetching system status."""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/system_status",
                 auth=self.auth,
                 timeout=10
@@ -90,7 +91,7 @@ class WooCommerceConnector(BaseConnector):
         
         while True:
             try:
-                response = requests.get(
+                response = self.session.get(
                     f"{self.base_url}/orders",
                     params=params,
                     auth=self.auth,
@@ -126,7 +127,7 @@ class WooCommerceConnector(BaseConnector):
     def get_order_details(self, order_id: str) -> Dict[str, Any]:
         """Get detailed information for a specific order."""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/orders/{order_id}",
                 auth=self.auth,
                 timeout=10
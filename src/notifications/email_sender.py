@@ -12,6 +12,8 @@ from typing import Optional
 import logging
 from datetime import datetime
 
+from src.email_service.smtp_pool import get_smtp_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -69,10 +71,12 @@ class EmailSender:
             html_part = MIMEText(html_content, 'html', 'utf-8')
             msg.attach(html_part)
             
-            # Send email
-            with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port) as server:
-                server.login(self.sender_email, self.sender_password)
-                server.sendmail(self.sender_email, to_email, msg.as_string())
+            # Send email over a pooled SMTP_SSL session
+            pool = get_smtp_pool(
+                self.smtp_server, self.smtp_port,
+                self.sender_email, self.sender_password, use_ssl=True
+            )
+            pool.send_message(msg, from_addr=self.sender_email, to_addrs=[to_email])
             
             logger.info(f"✅ Email sent to {to_email}: {subject}")
             return True
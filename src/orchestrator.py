@@ -221,6 +221,13 @@ class AutoRecoveryOrchestrator:
                 automation_status='automated' if status == 'submitted' else 'manual_intervention_required',
                 skill_used='api' if self._has_api_access(carrier) else 'portal'
             )
+
+            if status == 'submitted':
+                try:
+                    from src.automation.deadline_scheduler import get_deadline_scheduler
+                    get_deadline_scheduler(db).schedule_claim(claim_id, carrier, datetime.now())
+                except Exception as e:
+                    logger.warning(f"Could not schedule deadlines for claim {claim_id}: {e}")
             
             # Enrich result with database ID
             submission_result['claim_id'] = claim_id
@@ -355,34 +362,42 @@ class AutoRecoveryOrchestrator:
         """Send notification to client about claim submission."""
         try:
             from src.email_service import send_claim_submitted_email
+            from src.email_service.outbox import get_outbox
             db = self.db
             client_email = dispute.get('client_email')
             submission = result.get('submission', {})
             
             if client_email and submission:
-                send_claim_submitted_email(
-                    client_email=client_email,
-                    claim_reference=submission.get('claim_reference', 'N/A'),
-                    carrier=dispute.get('carrier'),
-                    amount_requested=dispute.get('total_recoverable'),
-                    order_id=dispute.get('order_id'),
-                    submission_method=submission.get('method')
-                )
-                
-                # Log notification
-                db = self.db
+                # Log notification ('queued' : le worker outbox la passe à 'sent' ou 'failed')
                 client = db.get_client(email=client_email)
+                notification_id = None
                 if client:
-                    db.log_notification(
+                    notification_id = db.log_notification(
                         client_id=client['id'],
                         notification_type='claim_submitted',
                         subject=f"Réclamation {submission.get('claim_reference')} soumise",
                         sent_to=client_email,
-                        status='sent',
+                        status='queued',
                         related_claim_id=submission.get('claim_id')
                     )
                 
-                logger.info(f"📧 Notification sent to {client_email}")
+                queued = send_claim_submitted_email(
+                    client_email=client_email,
+                    claim_reference=submission.get('claim_reference', 'N/A'),
+                    carrier=dispute.get('carrier'),
+                    amount_requested=dispute.get('total_recoverable'),
+                    order_id=dispute.get('order_id'),
+                    submission_method=submission.get('method'),
+                    outbox=get_outbox(db),
+                    notification_id=notification_id
+                )
+                if not queued:
+                    if notification_id:
+                        db.update_notification_status([notification_id], 'failed', 'Email could not be queued')
+                    logger.warning(f"Notification for {client_email} could not be queued")
+                    return
+                
+                logger.info(f"📧 Notification queued for {client_email}")
             else:
                 logger.warning("Missing client_email or submission data for notification")
                 
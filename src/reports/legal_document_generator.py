@@ -2,10 +2,12 @@
 LegalDocumentGenerator - Générateur de documents juridiques (Mise en demeure, etc.).
 """
 
+import io
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, Any
-import logging
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 import sys
 
@@ -15,6 +17,7 @@ if __name__ == "__main__":
     sys.path.append(os.getcwd())
 
 from src.utils.i18n import get_i18n_text, format_currency
+from src.reports.pdf_templates import TemplateLayout, get_background_cache, stamp_pdf, template_version
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.units import cm
@@ -24,12 +27,88 @@ from reportlab.lib.enums import TA_JUSTIFY, TA_RIGHT
 
 logger = logging.getLogger(__name__)
 
+LOGO_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'static', 'refundly_logo.png')
+
+_logo_bytes = None
+
+
+def _get_logo_bytes() -> Optional[bytes]:
+    """Logo lu une seule fois par process (None si absent)."""
+    global _logo_bytes
+    if _logo_bytes is None:
+        if not os.path.exists(LOGO_PATH):
+            logger.warning(f"Logo PDF introuvable : {LOGO_PATH}")
+            _logo_bytes = b''
+        else:
+            with open(LOGO_PATH, 'rb') as f:
+                _logo_bytes = f.read()
+    return _logo_bytes or None
+
+
+# Listes de pays pour détection
+EU_COUNTRIES = [
+    'AUSTRIA', 'BELGIUM', 'BULGARIA', 'CROATIA', 'CYPRUS', 'CZECH REPUBLIC', 
+    'DENMARK', 'ESTONIA', 'FINLAND', 'FRANCE', 'GERMANY', 'GREECE', 'HUNGARY', 
+    'IRELAND', 'ITALY', 'LATVIA', 'LITHUANIA', 'LUXEMBOURG', 'MALTA', 'NETHERLANDS', 
+    'POLAND', 'PORTUGAL', 'ROMANIA', 'SLOVAKIA', 'SLOVENIA', 'SPAIN', 'SWEDEN',
+    'AUTRICHE', 'BELGIQUE', 'BULGARIE', 'CHYPRE', 'DANEMARK', 'ESPAGNE', 'ESTONIE', 
+    'FINLANDE', 'GRÈCE', 'HONGRIE', 'IRLANDE', 'ITALIE', 'LETTONIE', 'LITUANIE', 
+    'PAYS-BAS', 'POLOGNE', 'ROUMANIE', 'SLOVAQUIE', 'SLOVÉNIE', 'SUÈDE'
+]
+
+
+def select_law(claim: Dict[str, Any], lang: str) -> Tuple[str, str]:
+    """
+    Sélection de la loi applicable selon la langue et l'adresse de livraison.
+    
+    Returns:
+        (clé i18n du texte de loi, langue du texte)
+    """
+    address = claim.get('delivery_address', '').upper()
+    
+    if lang in ('DE', 'IT', 'ES'):
+        return 'legal_body_law', lang
+    if any(country in address for country in EU_COUNTRIES):
+        # Fallback CMR pour toute l'Union Européenne
+        return 'legal_law_eu_cmr', 'EN' if lang == 'EN' else 'FR'
+    if lang == 'EN':
+        if any(uk_key in address for uk_key in ['UK', 'UNITED KINGDOM', 'LONDON', 'MANCHESTER', 'BIRMINGHAM']):
+            return 'legal_law_uk', lang
+        if any(hk_key in address for hk_key in ['HK', 'HONG KONG', 'KOWLOON', 'LANTAU']):
+            return 'legal_law_hk', lang
+        if any(sg_key in address for sg_key in ['SG', 'SINGAPORE', 'SENTOSA']):
+            return 'legal_law_sg', lang
+        if 'NY' in address or 'NEW YORK' in address:
+            return 'legal_law_ny', lang
+        if 'CA' in address or 'CALIFORNIA' in address:
+            return 'legal_law_ca', lang
+        if 'TX' in address or 'TEXAS' in address:
+            return 'legal_law_tx', lang
+        if any(usa_key in address for usa_key in ['USA', 'UNITED STATES', 'FL', 'IL', 'PA', 'OH', 'GA', 'NC', 'MI']):
+            return 'legal_law_us_federal', lang
+    return 'legal_body_law', lang
+
+
+def formal_notice_language(claim: Dict[str, Any]) -> str:
+    """Langue de la mise en demeure selon le pays du dossier."""
+    return 'FR' if claim.get('country', 'FR') == 'FR' else 'EN'
+
+
 class LegalDocumentGenerator:
     """Génère des documents juridiques PDF conformes au Code des Transports."""
     
-    def __init__(self):
+    def __init__(self, use_templates: bool = False, background_cache=None):
+        """
+        Args:
+            use_templates: Mode template : fond statique pré-rendu + champs variables
+            background_cache: Cache des fonds PDF (cache global du process par défaut)
+        """
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
+        self.use_templates = use_templates
+        self._background_cache = background_cache
+        # (lang, law_key, law_lang) -> TemplateLayout
+        self._layouts: Dict[Tuple[str, str, str], TemplateLayout] = {}
         
     def _setup_custom_styles(self):
         """Configuration des styles pour documents juridiques."""
@@ -80,29 +159,128 @@ class LegalDocumentGenerator:
         filename = f"MED_{claim['claim_reference']}_{lang.upper()}_{datetime.now().strftime('%Y%m%d')}.pdf"
         output_path = os.path.join(output_dir, filename)
         
+        if self.use_templates:
+            self._stamp_formal_notice(claim, lang, output_path)
+        else:
+            self._build_atomic(self._build_formal_notice_story(claim, lang), output_path)
+        logger.info(f"Mise en demeure générée : {output_path}")
+        return output_path
+    
+    def _build_atomic(self, story: List, output_path: str):
+        """Construit le PDF dans un fichier temporaire puis le renomme (jamais de PDF tronqué)."""
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        try:
+            doc = SimpleDocTemplate(
+                tmp_path,
+                pagesize=A4,
+                rightMargin=2.5*cm,
+                leftMargin=2.5*cm,
+                topMargin=3*cm,
+                bottomMargin=2.5*cm
+            )
+            doc.build(story)
+            os.replace(tmp_path, output_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def _formal_notice_layout(self, lang: str, law_key: str, law_lang: str) -> TemplateLayout:
+        """Mise en page fixe d'une mise en demeure (calculée une fois par langue et loi)."""
+        key = (lang, law_key, law_lang)
+        layout = self._layouts.get(key)
+        if layout is not None:
+            return layout
+        
+        body = self.styles['LegalBody']
+        layout = TemplateLayout(A4, left=2.5*cm, right=2.5*cm, top=3*cm, bottom=2.5*cm)
+        
+        logo = _get_logo_bytes()
+        if logo:
+            layout.image(logo, 8*cm, 2.5*cm)
+            layout.spacer(0.5*cm)
+        
+        layout.paragraph(f"<b>{get_i18n_text('legal_header_from', lang)}</b>", self.styles['LegalBold'])
+        layout.paragraph("Refundly.ai", body)
+        layout.field("Agissant pour le compte de :", 'company', space_after=body.spaceAfter)
+        layout.spacer(1*cm)
+        
+        layout.paragraph(f"<b>{get_i18n_text('legal_header_to', lang)}</b>", self.styles['LegalBold'])
+        layout.field("Service Litiges", 'carrier', space_after=body.spaceAfter)
+        layout.spacer(1*cm)
+        
+        layout.line_slot('date', align='right', space_after=12)
+        layout.paragraph(get_i18n_text('legal_title', lang), self.styles['FormalNoticeHeader'])
+        
+        layout.paragraph(f"<b>{get_i18n_text('legal_header_subject', lang)}</b>", self.styles['LegalBold'])
+        layout.field(get_i18n_text('legal_ref_claim', lang), 'claim_reference', space_after=body.spaceAfter)
+        layout.field(get_i18n_text('legal_ref_tracking', lang), 'tracking_number', space_after=body.spaceAfter)
+        layout.spacer(1*cm)
+        
+        layout.paragraph("Madame, Monsieur,", body)
+        layout.paragraph(get_i18n_text('legal_body_intro', lang), body)
+        layout.block_slot('summary', body, lines=2)
+        layout.paragraph(get_i18n_text(law_key, law_lang), body)
+        layout.paragraph(f"<b>{get_i18n_text('legal_body_demand', lang)}</b>", body)
+        layout.field('', 'amount', font='Helvetica-Bold', space_after=body.spaceAfter)
+        layout.paragraph(get_i18n_text('legal_body_closing', lang), body)
+        
+        layout.spacer(1*cm)
+        layout.paragraph("Cordialement / Regards,", body)
+        layout.spacer(2*cm)
+        layout.paragraph(f"<b>{get_i18n_text('legal_signature', lang)}</b>", self.styles['LegalBold'])
+        
+        self._layouts[key] = layout
+        return layout
+    
+    def _stamp_formal_notice(self, claim: Dict[str, Any], lang: str, output_path: str):
+        """
+        Mode template : seuls les champs du dossier sont dessinés sur le fond en cache.
+        
+        Un dossier dont les champs dépassent leur emplacement (nom de société,
+        résumé trop longs...) est construit en mode story, qui pagine librement.
+        """
+        law_key, law_lang = select_law(claim, lang)
+        layout = self._formal_notice_layout(lang, law_key, law_lang)
+        
         currency = claim.get('currency', 'EUR')
+        amount = format_currency(claim['amount_requested'], currency)
+        values = {
+            'company': claim.get('company_name', 'Client E-commerce'),
+            'carrier': claim['carrier'],
+            'date': f"Fait le {datetime.now().strftime('%d/%m/%Y')}",
+            'claim_reference': claim['claim_reference'],
+            'tracking_number': claim.get('tracking_number', 'Inconnu'),
+            'summary': (f"(Type : {claim['dispute_type']}) - {get_i18n_text('legal_ref_claim', lang)} "
+                        f"{claim['claim_reference']} pour un montant de {amount}."),
+            'amount': f"({amount})",
+        }
+        if not layout.fits(values):
+            logger.info(f"Mise en demeure {claim['claim_reference']} : champs trop longs pour le modèle, mode story")
+            self._build_atomic(self._build_formal_notice_story(claim, lang), output_path)
+            return
         
-        doc = SimpleDocTemplate(
-            output_path,
-            pagesize=A4,
-            rightMargin=2.5*cm,
-            leftMargin=2.5*cm,
-            topMargin=3*cm,
-            bottomMargin=2.5*cm
+        cache = self._background_cache or get_background_cache()
+        background = cache.get(
+            'formal_notice', lang, f"{law_key}-{law_lang}",
+            template_version(layout.static_texts), layout.draw_background
         )
+        stamp_pdf(background, lambda c: layout.draw_fields(c, values), output_path)
+    
+    def _build_formal_notice_story(self, claim: Dict[str, Any], lang: str) -> List:
+        """Contenu (story ReportLab) d'une mise en demeure."""
+        currency = claim.get('currency', 'EUR')
         
         story = []
         
-        # 0. Logo
-        logo_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'static', 'refundly_logo.png')
-        if os.path.exists(logo_path):
+        # 0. Logo (octets chargés une fois par process)
+        logo = _get_logo_bytes()
+        if logo:
             # Ajout du logo (largeur 8cm, hauteur 2.5cm - plus grand)
-            im = Image(logo_path, width=8*cm, height=2.5*cm)
+            im = Image(io.BytesIO(logo), width=8*cm, height=2.5*cm)
             im.hAlign = 'LEFT'
             story.append(im)
             story.append(Spacer(1, 0.5*cm)) # Reduce spacer slightly as image is taller
-        else:
-            logger.warning(f"Logo PDF introuvable : {logo_path}")
         
         # 1. En-tête (Expéditeur & Destinataire)
         story.append(Paragraph(f"<b>{get_i18n_text('legal_header_from', lang)}</b>", self.styles['LegalBold']))
@@ -116,9 +294,9 @@ class LegalDocumentGenerator:
         story.append(Paragraph(f"Service Litiges {claim['carrier']}", self.styles['LegalBody']))
         story.append(Spacer(1, 1*cm))
         
-        # 2. Date et Lieu
+        # 2. Date et Lieu, titre
         story.append(Paragraph(f"Fait le {datetime.now().strftime('%d/%m/%Y')}", self.styles['RightAligned']))
-        story.append(Spacer(1, 1*cm))
+        story.append(Paragraph(get_i18n_text('legal_title', lang), self.styles['FormalNoticeHeader']))
         
         # 3. OBJET
         story.append(Paragraph(f"<b>{get_i18n_text('legal_header_subject', lang)}</b>", self.styles['LegalBold']))
@@ -129,45 +307,8 @@ class LegalDocumentGenerator:
         # 4. Corps de la lettre
         story.append(Paragraph(f"Madame, Monsieur,", self.styles['LegalBody']))
         
-        # Listes de pays pour détection
-        EU_COUNTRIES = [
-            'AUSTRIA', 'BELGIUM', 'BULGARIA', 'CROATIA', 'CYPRUS', 'CZECH REPUBLIC', 
-            'DENMARK', 'ESTONIA', 'FINLAND', 'FRANCE', 'GERMANY', 'GREECE', 'HUNGARY', 
-            'IRELAND', 'ITALY', 'LATVIA', 'LITHUANIA', 'LUXEMBOURG', 'MALTA', 'NETHERLANDS', 
-            'POLAND', 'PORTUGAL', 'ROMANIA', 'SLOVAKIA', 'SLOVENIA', 'SPAIN', 'SWEDEN',
-            'AUTRICHE', 'BELGIQUE', 'BULGARIE', 'CHYPRE', 'DANEMARK', 'ESPAGNE', 'ESTONIE', 
-            'FINLANDE', 'GRÈCE', 'HONGRIE', 'IRLANDE', 'ITALIE', 'LETTONIE', 'LITUANIE', 
-            'PAYS-BAS', 'POLOGNE', 'ROUMANIE', 'SLOVAQUIE', 'SLOVÉNIE', 'SUÈDE'
-        ]
-
-        # Sélection de la loi spécifique
-        law_text = get_i18n_text('legal_body_law', lang)
-        address = claim.get('delivery_address', '').upper()
-        
-        if lang == 'DE':
-             law_text = get_i18n_text('legal_body_law', 'DE')
-        elif lang == 'IT':
-             law_text = get_i18n_text('legal_body_law', 'IT')
-        elif lang == 'ES':
-             law_text = get_i18n_text('legal_body_law', 'ES')
-        elif any(country in address for country in EU_COUNTRIES):
-             # Fallback CMR pour toute l'Union Européenne
-             law_text = get_i18n_text('legal_law_eu_cmr', 'EN' if lang == 'EN' else 'FR')
-        elif lang == 'EN':
-            if any(uk_key in address for uk_key in ['UK', 'UNITED KINGDOM', 'LONDON', 'MANCHESTER', 'BIRMINGHAM']):
-                law_text = get_i18n_text('legal_law_uk', lang)
-            elif any(hk_key in address for hk_key in ['HK', 'HONG KONG', 'KOWLOON', 'LANTAU']):
-                law_text = get_i18n_text('legal_law_hk', lang)
-            elif any(sg_key in address for sg_key in ['SG', 'SINGAPORE', 'SENTOSA']):
-                law_text = get_i18n_text('legal_law_sg', lang)
-            elif 'NY' in address or 'NEW YORK' in address:
-                law_text = get_i18n_text('legal_law_ny', lang)
-            elif 'CA' in address or 'CALIFORNIA' in address:
-                law_text = get_i18n_text('legal_law_ca', lang)
-            elif 'TX' in address or 'TEXAS' in address:
-                law_text = get_i18n_text('legal_law_tx', lang)
-            elif any(usa_key in address for usa_key in ['USA', 'UNITED STATES', 'FL', 'IL', 'PA', 'OH', 'GA', 'NC', 'MI']):
-                law_text = get_i18n_text('legal_law_us_federal', lang)
+        law_key, law_lang = select_law(claim, lang)
+        law_text = get_i18n_text(law_key, law_lang)
         body_text = f"""
         {get_i18n_text('legal_body_intro', lang)}
         (Type : {claim['dispute_type']}) - {get_i18n_text('legal_ref_claim', lang)} {claim['claim_reference']} 
@@ -187,10 +328,77 @@ class LegalDocumentGenerator:
         story.append(Spacer(1, 2*cm))
         story.append(Paragraph(f"<b>{get_i18n_text('legal_signature', lang)}</b>", self.styles['LegalBold']))
         
-        # Génération
-        doc.build(story)
-        logger.info(f"Mise en demeure générée : {output_path}")
-        return output_path
+        return story
+    
+    def generate_formal_notices_batch(self, claims: List[Dict[str, Any]], lang: Optional[str] = None,
+                                      output_dir: str = "data/legal_docs",
+                                      workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Génère un lot de mises en demeure en parallèle (pool de processus).
+        
+        Chaque process du pool prépare une seule fois styles, polices et logo.
+        
+        Args:
+            claims: Réclamations à traiter
+            lang: Langue imposée (sinon déduite du pays de chaque dossier)
+            output_dir: Dossier de sortie
+            workers: Nombre de process (défaut : nombre de CPU, 1 = pas de pool)
+            
+        Returns:
+            Dict avec 'documents' ({claim_reference: chemin}), 'errors'
+            ({claim_reference: message}), 'elapsed' et 'documents_per_second'
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        tasks = [(claim, lang or formal_notice_language(claim), output_dir) for claim in claims]
+        workers = workers or os.cpu_count() or 1
+        start = time.monotonic()
+        
+        if workers == 1 or len(tasks) <= 1:
+            results = [_generate_formal_notice_task(task, self) for task in tasks]
+        else:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                     initargs=(self.use_templates,)) as pool:
+                results = list(pool.map(_generate_formal_notice_task, tasks, chunksize=chunksize))
+        
+        elapsed = time.monotonic() - start
+        documents = {ref: path for ref, path, error in results if error is None}
+        errors = {ref: error for ref, path, error in results if error is not None}
+        docs_per_second = round(len(documents) / elapsed, 2) if elapsed > 0 else 0.0
+        
+        logger.info(f"Lot de mises en demeure : {len(documents)} générées, {len(errors)} erreurs "
+                    f"({docs_per_second} documents/s, {workers} process)")
+        return {
+            'documents': documents,
+            'errors': errors,
+            'elapsed': round(elapsed, 3),
+            'documents_per_second': docs_per_second
+        }
+
+
+# Générateur propre à chaque process du pool (initialisé une fois)
+_batch_generator = None
+
+
+def _init_batch_worker(use_templates: bool = True):
+    """Prépare styles, polices et logo une seule fois par process du pool."""
+    global _batch_generator
+    from reportlab.pdfbase import pdfmetrics
+    for font_name in ('Helvetica', 'Helvetica-Bold'):
+        pdfmetrics.getFont(font_name)
+    _get_logo_bytes()
+    _batch_generator = LegalDocumentGenerator(use_templates=use_templates)
+
+
+def _generate_formal_notice_task(task, generator: LegalDocumentGenerator = None):
+    """Génère une mise en demeure ; retourne (claim_reference, chemin, erreur)."""
+    claim, lang, output_dir = task
+    generator = generator or _batch_generator
+    try:
+        return claim['claim_reference'], generator.generate_formal_notice(claim, lang=lang, output_dir=output_dir), None
+    except Exception as e:
+        logger.error(f"Échec mise en demeure {claim.get('claim_reference')} : {e}")
+        return claim.get('claim_reference'), None, str(e)
 
 if __name__ == "__main__":
     # Test
@@ -0,0 +1,354 @@
+"""
+Monthly Report Batch - Overnight incremental generation of client reports.
+
+Every client's monthly report is produced ahead of time so the dashboard only
+serves a stored file. A fingerprint of each client's claims for the month
+(count, last update, amounts) is computed with one GROUP BY query; only the
+clients whose fingerprint changed since the last run are regenerated, in
+parallel worker processes.
+"""
+
+import os
+import time
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.analytics.metrics_calculator import MetricsCalculator
+from src.database.database_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = "data/reports/monthly"
+
+MONTH_NAMES_FR = [
+    'Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
+    'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre'
+]
+
+
+def month_bounds(month: str) -> Tuple[str, str]:
+    """Return the [start, end) dates of a 'YYYY-MM' month as ISO strings."""
+    year, mon = (int(part) for part in month.split('-'))
+    start = datetime(year, mon, 1)
+    end = datetime(year + mon // 12, mon % 12 + 1, 1)
+    return start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+
+def month_label(month: str) -> str:
+    """'2026-01' -> 'Janvier 2026'."""
+    year, mon = month.split('-')
+    return f"{MONTH_NAMES_FR[int(mon) - 1]} {year}"
+
+
+def previous_month(today: Optional[datetime] = None) -> str:
+    """Last complete month as 'YYYY-MM' (the default overnight target)."""
+    today = today or datetime.now()
+    year, mon = (today.year, today.month - 1) if today.month > 1 else (today.year - 1, 12)
+    return f"{year:04d}-{mon:02d}"
+
+
+# Per-process PDF generator of the batch workers (see _init_worker)
+_worker_generator = None
+
+
+def _init_worker():
+    """Build the PDF generator (styles, fonts) once per worker process."""
+    global _worker_generator
+    from src.reports.pdf_generator import PDFGenerator
+    _worker_generator = PDFGenerator()
+
+
+def _render_report(task: Dict) -> Dict:
+    """Write the report of one client (atomic rename)."""
+    if _worker_generator is None:
+        _init_worker()
+
+    output_path = task['output_path']
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        _worker_generator.generate_monthly_report(
+            client_name=task['client_name'],
+            client_email=task['client_email'],
+            month=task['month_label'],
+            kpis=task['kpis'],
+            disputes=[],
+            output_path=tmp_path
+        )
+        os.replace(tmp_path, output_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return {'client_id': task['client_id'], 'pdf_path': output_path}
+
+
+class MonthlyReportBatch:
+    """Incremental batch producing every client's monthly report."""
+
+    def __init__(self, db_manager: DatabaseManager = None,
+                 output_dir: str = DEFAULT_OUTPUT_DIR, workers: Optional[int] = None):
+        """
+        Initialize the batch.
+
+        Args:
+            db_manager: Database manager (claims, clients, monthly_reports)
+            output_dir: Directory where report PDFs are stored
+            workers: Worker processes (default: CPU count, 1 = inline)
+        """
+        self.db = db_manager or DatabaseManager()
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.calculator = MetricsCalculator()
+        self._ensure_table_exists()
+
+    def _ensure_table_exists(self):
+        """Create the monthly_reports table if needed."""
+        conn = self.db.get_connection()
+        try:
+            self.db._execute(conn, """
+                CREATE TABLE IF NOT EXISTS monthly_reports (
+                    client_id INTEGER NOT NULL,
+                    month TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    pdf_path TEXT NOT NULL,
+                    claims_count INTEGER DEFAULT 0,
+                    generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (client_id, month)
+                )
+            """)
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Error creating monthly_reports table: {e}")
+        finally:
+            conn.close()
+
+    # ========================================
+    # CHANGE DETECTION
+    # ========================================
+
+    def compute_fingerprints(self, month: str) -> Dict[int, Dict]:
+        """
+        Fingerprint the claims of every client for a month, in one query.
+
+        Returns:
+            {client_id: {'content_hash': str, 'claims_count': int}}
+        """
+        start, end = month_bounds(month)
+        conn = self.db.get_connection()
+        try:
+            cursor = self.db._execute(conn, """
+                SELECT client_id,
+                       COUNT(*) AS claims_count,
+                       MAX(COALESCE(updated_at, created_at)) AS last_update,
+                       SUM(amount_requested) AS total_requested,
+                       SUM(COALESCE(accepted_amount, 0)) AS total_accepted,
+                       SUM(CASE WHEN status IN ('accepted', 'paid') THEN 1 ELSE 0 END) AS accepted_count
+                FROM claims
+                WHERE created_at >= ? AND created_at < ?
+                GROUP BY client_id
+            """, (start, end))
+            rows = [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+        fingerprints = {}
+        for row in rows:
+            signature = '|'.join(str(row[key]) for key in (
+                'claims_count', 'last_update', 'total_requested', 'total_accepted', 'accepted_count'
+            ))
+            fingerprints[row['client_id']] = {
+                'content_hash': hashlib.sha256(signature.encode('utf-8')).hexdigest(),
+                'claims_count': row['claims_count'],
+            }
+        return fingerprints
+
+    def _stored_hashes(self, month: str) -> Dict[int, Dict]:
+        conn = self.db.get_connection()
+        try:
+            cursor = self.db._execute(
+                conn, "SELECT client_id, content_hash, pdf_path FROM monthly_reports WHERE month = ?", (month,)
+            )
+            rows = [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+        return {row['client_id']: row for row in rows}
+
+    def clients_to_refresh(self, month: str, force: bool = False,
+                           fingerprints: Optional[Dict[int, Dict]] = None) -> Dict[int, Dict]:
+        """Clients whose claims changed since their last report (or whose PDF is missing)."""
+        if fingerprints is None:
+            fingerprints = self.compute_fingerprints(month)
+        if force:
+            return fingerprints
+        stored = self._stored_hashes(month)
+        return {
+            client_id: fingerprint for client_id, fingerprint in fingerprints.items()
+            if client_id not in stored
+            or stored[client_id]['content_hash'] != fingerprint['content_hash']
+            or not os.path.exists(stored[client_id]['pdf_path'])
+        }
+
+    # ========================================
+    # GENERATION
+    # ========================================
+
+    def _load_tasks(self, month: str, changed: Dict[int, Dict]) -> List[Dict]:
+        """Load the client details and KPIs (SQL aggregates) of the clients to regenerate."""
+        start, end = month_bounds(month)
+        month_dir = os.path.join(self.output_dir, month)
+        os.makedirs(month_dir, exist_ok=True)
+
+        tasks = []
+        conn = self.db.get_connection()
+        try:
+            for client_id in changed:
+                cursor = self.db._execute(
+                    conn, "SELECT email, full_name, company_name FROM clients WHERE id = ?", (client_id,)
+                )
+                row = cursor.fetchone()
+                client = dict(row) if row else {}
+                tasks.append({
+                    'client_id': client_id,
+                    'client_name': client.get('company_name') or client.get('full_name') or client.get('email') or str(client_id),
+                    'client_email': client.get('email') or '',
+                    'month_label': month_label(month),
+                    'kpis': self.calculator.calculate_kpis_sql(self.db, client_id, start, end),
+                    'output_path': os.path.join(month_dir, f"report_{client_id}_{month}.pdf"),
+                })
+        finally:
+            conn.close()
+        return tasks
+
+    def _record(self, client_id: int, month: str, fingerprint: Dict, pdf_path: str):
+        conn = self.db.get_connection()
+        try:
+            self.db._execute(conn, """
+                INSERT INTO monthly_reports (client_id, month, content_hash, pdf_path, claims_count, generated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (client_id, month) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    pdf_path = excluded.pdf_path,
+                    claims_count = excluded.claims_count,
+                    generated_at = excluded.generated_at
+            """, (client_id, month, fingerprint['content_hash'], pdf_path,
+                  fingerprint['claims_count'], datetime.now().isoformat()))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def run(self, month: Optional[str] = None, force: bool = False) -> Dict:
+        """
+        Regenerate the reports of the clients whose claims changed.
+
+        Args:
+            month: Target month 'YYYY-MM' (default: previous month)
+            force: Regenerate every client with claims in the month
+
+        Returns:
+            Dictionary with month, generated, skipped, errors, elapsed
+        """
+        month = month or previous_month()
+        start_time = time.perf_counter()
+
+        fingerprints = self.compute_fingerprints(month)
+        changed = self.clients_to_refresh(month, force=force, fingerprints=fingerprints)
+        tasks = self._load_tasks(month, changed) if changed else []
+
+        generated, errors = [], []
+
+        def _done(task_result: Dict):
+            client_id = task_result['client_id']
+            self._record(client_id, month, changed[client_id], task_result['pdf_path'])
+            generated.append(client_id)
+
+        if self.workers <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                try:
+                    _done(_render_report(task))
+                except Exception as e:
+                    logger.error(f"Monthly report failed for client {task['client_id']}: {e}")
+                    errors.append({'client_id': task['client_id'], 'error': str(e)})
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)),
+                                     initializer=_init_worker) as pool:
+                futures = {pool.submit(_render_report, task): task for task in tasks}
+                for future in as_completed(futures):
+                    task = futures[future]
+                    try:
+                        _done(future.result())
+                    except Exception as e:
+                        logger.error(f"Monthly report failed for client {task['client_id']}: {e}")
+                        errors.append({'client_id': task['client_id'], 'error': str(e)})
+
+        result = {
+            'month': month,
+            'generated': sorted(generated),
+            'skipped': len(fingerprints) - len(tasks),
+            'errors': errors,
+            'elapsed': round(time.perf_counter() - start_time, 3),
+        }
+        logger.info(
+            f"Monthly reports {month}: {len(generated)} generated, "
+            f"{result['skipped']} unchanged, {len(errors)} errors ({result['elapsed']}s)"
+        )
+        return result
+
+    # ========================================
+    # DOWNLOAD
+    # ========================================
+
+    def get_report_path(self, client_id: int, month: str) -> Optional[str]:
+        """Path of the stored report of a client for a month, or None."""
+        conn = self.db.get_connection()
+        try:
+            cursor = self.db._execute(
+                conn, "SELECT pdf_path FROM monthly_reports WHERE client_id = ? AND month = ?",
+                (client_id, month)
+            )
+            row = cursor.fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        path = dict(row)['pdf_path']
+        return path if os.path.exists(path) else None
+
+    def list_reports(self, client_id: int) -> List[Dict]:
+        """Stored reports of a client, most recent month first."""
+        conn = self.db.get_connection()
+        try:
+            cursor = self.db._execute(conn, """
+                SELECT month, pdf_path, claims_count, generated_at
+                FROM monthly_reports WHERE client_id = ? ORDER BY month DESC
+            """, (client_id,))
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+
+def main():
+    """Entry point of the overnight batch."""
+    import argparse
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Monthly client reports batch')
+    parser.add_argument('--month', help="Month 'YYYY-MM' (default: previous month)")
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes')
+    parser.add_argument('--force', action='store_true', help='Regenerate every report')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help='Reports directory')
+
+    args = parser.parse_args()
+
+    batch = MonthlyReportBatch(output_dir=args.output_dir, workers=args.workers)
+    print(batch.run(month=args.month, force=args.force))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
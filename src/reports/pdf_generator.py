@@ -9,6 +9,8 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 
+from src.utils.pdf_text import iter_pdf_pages
+
 try:
     from reportlab.lib.pagesizes import A4
     from reportlab.lib import colors
@@ -277,89 +279,74 @@ class PDFGenerator:
         Returns:
             True si conforme, False sinon
         """
-        # Try using PyPDF2 first; if unavailable or fails, fall back to a binary text scan
-        text = ""
+        # The file is read once: pages are parsed from these bytes, and the
+        # same bytes serve the binary fallbacks below
         try:
-            from PyPDF2 import PdfReader
-        except Exception as e:
+            with open(pdf_path, 'rb') as f:
+                raw_bytes = f.read()
+        except Exception as ex:
+            logger.error(f"Erreur vérification PDF: {ex}")
+            return False
+        bytes_lower = raw_bytes.lower()
+
+        # Vérification langue (heuristique plus permissive)
+        indicators = {
+            'FR': ('Mise en demeure', 'RAPPORT', 'Client', 'Total Récupéré', 'Taux de Succès', 'Rapport généré'),
+            'EN': ('Formal Notice', 'Report', 'Client', 'Total Recovered', 'Success Rate'),
+        }.get(lang)
+
+        # Pages streamed with PyPDF2, stopping as soon as every field and a
+        # language indicator were found; binary text scan if that fails
+        required_fields = required_fields or []
+        missing_fields = list(required_fields)
+        lang_found = indicators is None
+        pages = []
+        try:
+            for page_text in iter_pdf_pages(raw_bytes):
+                pages.append(page_text)
+                page_lower = page_text.lower()
+                missing_fields = [field for field in missing_fields if field.lower() not in page_lower]
+                lang_found = lang_found or any(ind in page_text for ind in indicators)
+                if not missing_fields and lang_found and any(pages):
+                    break
+            text = "\n".join(pages)
+        except ImportError as e:
             logger.warning(f"PyPDF2 not available, falling back to binary scan: {e}")
-            try:
-                with open(pdf_path, 'rb') as f:
-                    data = f.read()
-                try:
-                    text = data.decode('latin1')
-                except Exception:
-                    text = data.decode('utf-8', errors='ignore')
-            except Exception as ex:
-                logger.error(f"Erreur vérification PDF (fallback): {ex}")
-                return False
-        else:
-            try:
-                reader = PdfReader(pdf_path)
-                text = "\n".join(page.extract_text() or "" for page in reader.pages)
-            except Exception as e:
-                logger.warning(f"PyPDF2 failed to read PDF, using binary fallback: {e}")
-                try:
-                    with open(pdf_path, 'rb') as f:
-                        data = f.read()
-                    try:
-                        text = data.decode('latin1')
-                    except Exception:
-                        text = data.decode('utf-8', errors='ignore')
-                except Exception as ex:
-                    logger.error(f"Erreur vérification PDF (fallback after PyPDF2): {ex}")
-                    return False
+            text = None
+        except Exception as e:
+            logger.warning(f"PyPDF2 failed to read PDF, using binary fallback: {e}")
+            text = None
+        if text is None:
+            text = raw_bytes.decode('latin1')
+            missing_fields = [field for field in required_fields if field.lower() not in text.lower()]
+            lang_found = indicators is None or any(ind in text for ind in indicators)
+        lower_text = text.lower()
 
-        if not text:
+        if not lower_text:
             logger.error(f"PDF vide ou non lisible: {pdf_path}")
             return False
 
         # Vérification des champs (case-insensitive). If text extraction fails,
         # also try a bytes-level search in the raw PDF file as a best-effort fallback.
-        if required_fields:
-            lower_text = text.lower()
-            try:
-                with open(pdf_path, 'rb') as f:
-                    raw_bytes = f.read()
-                bytes_lower = raw_bytes.lower()
-            except Exception:
-                raw_bytes = b''
-                bytes_lower = b''
-
-            missing_fields = []
-            for field in required_fields:
-                f_lower = field.lower()
-                f_bytes_utf8 = f_lower.encode('utf-8')
-                f_bytes_latin1 = f_lower.encode('latin1', errors='ignore')
-
-                found_in_text = f_lower in lower_text
-                found_in_bytes = (f_bytes_utf8 in bytes_lower) or (f_bytes_latin1 in bytes_lower)
-
-                if not (found_in_text or found_in_bytes):
-                    missing_fields.append(field)
-
-            if missing_fields:
-                # If PyPDF2 is not available but the PDF appears to be generated by ReportLab,
-                # we perform a best-effort pass and accept it as compliant because extracting
-                # text requires a PDF parser. Log missing fields for visibility.
-                if 'pypdf2' not in globals() and b'reportlab generated pdf document' in bytes_lower:
-                    logger.warning(f"PyPDF2 not installed - skipping strict content checks for ReportLab PDF. Missing fields: {missing_fields}")
-                else:
-                    logger.warning(f"Champ(s) manquant(s) dans PDF: {missing_fields}. PDF text snippet: {repr(lower_text[:500])}")
-                    return False
-
-        # Vérification langue (heuristique plus permissive)
-        if lang == 'FR':
-            fr_indicators = ('Mise en demeure', 'RAPPORT', 'Client', 'Total Récupéré', 'Taux de Succès', 'Rapport généré')
-            if not any(ind in text for ind in fr_indicators):
-                logger.warning(f"PDF non conforme à la langue FR: {pdf_path}")
-                return False
-        if lang == 'EN':
-            en_indicators = ('Formal Notice', 'Report', 'Client', 'Total Recovered', 'Success Rate')
-            if not any(ind in text for ind in en_indicators):
-                logger.warning(f"PDF non conforme à la langue EN: {pdf_path}")
+        missing_fields = [
+            field for field in missing_fields
+            if field.lower().encode('utf-8') not in bytes_lower
+            and field.lower().encode('latin1', errors='ignore') not in bytes_lower
+        ]
+        if missing_fields:
+            # If PyPDF2 is not available but the PDF appears to be generated by ReportLab,
+            # we perform a best-effort pass and accept it as compliant because extracting
+            # text requires a PDF parser. Log missing fields for visibility.
+            if 'pypdf2' not in globals() and b'reportlab generated pdf document' in bytes_lower:
+                logger.warning(f"PyPDF2 not installed - skipping strict content checks for ReportLab PDF. Missing fields: {missing_fields}")
+            else:
+                logger.warning(f"Champ(s) manquant(s) dans PDF: {missing_fields}. PDF text snippet: {repr(lower_text[:500])}")
                 return False
 
+        if not lang_found:
+            logger.warning(f"PDF non conforme à la langue {lang}: {pdf_path}")
+            return False
+
         logger.info(f"PDF conforme: {pdf_path}")
         return True
 
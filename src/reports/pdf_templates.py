@@ -0,0 +1,301 @@
+"""
+PDF Templates - Pre-rendered static backgrounds with variable-field overlays.
+
+Most of a legal document or dispute report is static (logo, headers, legal
+text for a language). In template mode, that static layer is rendered once
+per (document type, language, variant, template version) to a cached PDF;
+each document then only draws its variable fields on an overlay (one page
+per background page) which is merged onto the cached background.
+"""
+
+import io
+import os
+import zlib
+import threading
+import logging
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas as pdf_canvas
+from PyPDF2 import PdfReader, PdfWriter
+
+logger = logging.getLogger(__name__)
+
+# Bump when a background layout changes: old cached files are then ignored
+TEMPLATE_VERSION = 2
+
+DEFAULT_TEMPLATES_DIR = "data/pdf_templates"
+
+
+def template_version(static_texts: Iterable[str]) -> str:
+    """Template version including a checksum of the static texts (i18n edits)."""
+    checksum = zlib.crc32("\x1f".join(static_texts).encode('utf-8'))
+    return f"v{TEMPLATE_VERSION}-{checksum:08x}"
+
+
+def render_page(draw: Callable, pagesize=None) -> bytes:
+    """Render a PDF drawn by draw(canvas) and return its bytes (draw calls showPage between pages)."""
+    buffer = io.BytesIO()
+    c = pdf_canvas.Canvas(buffer, pagesize=pagesize or A4)
+    draw(c)
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+class PDFBackgroundCache:
+    """Static PDF layers, cached in memory and on disk."""
+
+    def __init__(self, templates_dir: str = DEFAULT_TEMPLATES_DIR):
+        self.templates_dir = templates_dir
+        self._backgrounds: Dict[Tuple[str, str, str, str], bytes] = {}
+        self._lock = threading.Lock()
+        self.stats = {'renders': 0, 'disk_hits': 0, 'memory_hits': 0}
+
+    def _path(self, key: Tuple[str, str, str, str]) -> str:
+        doc_type, lang, variant, version = key
+        return os.path.join(self.templates_dir, f"{doc_type}_{lang}_{variant}_{version}.pdf")
+
+    def get(self, doc_type: str, lang: str, variant: str, version: str,
+            draw_background: Callable) -> bytes:
+        """
+        Return the background PDF bytes, rendering it on first use.
+
+        Args:
+            doc_type: Document type ('formal_notice', 'dispute_detail', ...)
+            lang: Document language
+            variant: Layout variant (e.g. applicable law)
+            version: Template version (see template_version())
+            draw_background: draw(canvas) for the static layer
+        """
+        key = (doc_type, lang, variant, version)
+        with self._lock:
+            if key in self._backgrounds:
+                self.stats['memory_hits'] += 1
+                return self._backgrounds[key]
+
+        path = self._path(key)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.stats['disk_hits'] += 1
+        else:
+            data = render_page(draw_background)
+            self.stats['renders'] += 1
+            try:
+                os.makedirs(self.templates_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                # Le cache disque est facultatif : on garde le fond en mémoire
+                logger.warning(f"Could not write PDF background {path}: {e}")
+            logger.info(f"PDF background rendered: {doc_type}/{lang}/{variant} {version}")
+
+        with self._lock:
+            self._backgrounds[key] = data
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._backgrounds.clear()
+
+
+def stamp_pdf(background: bytes, draw_overlay: Callable, output_path: str,
+              metadata: Optional[Dict[str, str]] = None) -> str:
+    """
+    Merge an overlay drawn by draw_overlay(canvas) onto a background and write it.
+
+    Overlay page i is merged onto background page i. The file is written to
+    a temporary path then renamed (atomic).
+    """
+    pages = PdfReader(io.BytesIO(background)).pages
+    overlays = PdfReader(io.BytesIO(render_page(draw_overlay))).pages
+
+    writer = PdfWriter()
+    for page, overlay in zip(pages, overlays):
+        page.merge_page(overlay)
+        writer.add_page(page)
+    if metadata:
+        writer.add_metadata(metadata)
+
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            writer.write(f)
+        os.replace(tmp_path, output_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return output_path
+
+
+class TemplateLayout:
+    """
+    Fixed layout of a document: static elements + variable-field slots.
+
+    Elements are stacked from the top margin and flow to a new page when they
+    would cross the bottom margin; the same layout draws the background
+    (static elements) and the overlay (slot values), so both layers line up
+    exactly. Each slot has a fixed size budget: fits() tells whether values
+    stay within it, otherwise the caller must build the document another way.
+    """
+
+    def __init__(self, pagesize=None, left: float = 72, right: float = 72, top: float = 72,
+                 bottom: float = 72):
+        self.pagesize = pagesize or A4
+        self.left = left
+        self.width = self.pagesize[0] - left - right
+        self.top = self.pagesize[1] - top
+        self.bottom = bottom
+        self.y = self.top
+        self.page = 0
+        self.static_texts = []
+        self._statics = []
+        self._slots = {}
+
+    @property
+    def page_count(self) -> int:
+        return self.page + 1
+
+    def _reserve(self, height: float):
+        """Start a new page if `height` does not fit above the bottom margin."""
+        if self.y - height < self.bottom and self.y < self.top:
+            self.page += 1
+            self.y = self.top
+
+    def _static(self, draw: Callable):
+        self._statics.append((self.page, draw))
+
+    def spacer(self, height: float):
+        self.y -= height
+        if self.y < self.bottom:
+            # Comme platypus : un espace en bas de page n'est pas reporté
+            self.page += 1
+            self.y = self.top
+
+    def image(self, data: bytes, width: float, height: float):
+        """Static image (e.g. logo) aligned left."""
+        from reportlab.lib.utils import ImageReader
+        reader = ImageReader(io.BytesIO(data))
+        self._reserve(height)
+        x, y = self.left, self.y - height
+        self._static(lambda c: c.drawImage(reader, x, y, width=width, height=height, mask='auto'))
+        self.y -= height
+
+    def paragraph(self, text: str, style):
+        """Static paragraph (wrapped to the frame width)."""
+        from reportlab.platypus import Paragraph
+        para = Paragraph(text, style)
+        _, height = para.wrap(self.width, self.pagesize[1])
+        self._reserve(style.spaceBefore + height)
+        self.y -= style.spaceBefore
+        x, y = self.left, self.y - height
+        self._static(lambda c: para.drawOn(c, x, y))
+        self.static_texts.append(text)
+        self.y -= height + style.spaceAfter
+
+    def field(self, label: str, name: str, font: str = 'Helvetica', size: float = 10,
+              leading: float = 14, label_font: Optional[str] = None, space_after: float = 0,
+              lines: int = 1):
+        """Static label followed, on the same line, by a variable value wrapped on at most `lines` lines."""
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        self._reserve(lines * leading)
+        baseline = self.y - size
+        label_font = label_font or font
+        left = self.left
+        x = left
+        if label:
+            self._static(lambda c: (c.setFont(label_font, size), c.drawString(left, baseline, label)))
+            self.static_texts.append(label)
+            x += stringWidth(label + ' ', label_font, size)
+        self._slots[name] = {'type': 'line', 'page': self.page, 'x': x, 'y': baseline, 'font': font,
+                             'size': size, 'align': 'left', 'leading': leading, 'lines': lines,
+                             'max_width': self.left + self.width - x}
+        self.y -= lines * leading + space_after
+
+    def line_slot(self, name: str, font: str = 'Helvetica', size: float = 10,
+                  leading: float = 14, align: str = 'left', space_after: float = 0):
+        """A full line holding a variable value (left, right or center aligned)."""
+        if align == 'right':
+            x = self.left + self.width
+        elif align == 'center':
+            x = self.left + self.width / 2
+        else:
+            x = self.left
+        self._reserve(leading)
+        self._slots[name] = {'type': 'line', 'page': self.page, 'x': x, 'y': self.y - size, 'font': font,
+                             'size': size, 'align': align, 'max_width': self.width}
+        self.y -= leading + space_after
+
+    def block_slot(self, name: str, style, lines: int):
+        """A variable paragraph of at most `lines` lines."""
+        self._reserve(style.spaceBefore + lines * style.leading)
+        self.y -= style.spaceBefore
+        self._slots[name] = {'type': 'block', 'page': self.page, 'x': self.left, 'top': self.y,
+                             'style': style, 'height': lines * style.leading}
+        self.y -= lines * style.leading + style.spaceAfter
+
+    def _wrap_value(self, slot, text: str):
+        from reportlab.lib.utils import simpleSplit
+        return simpleSplit(text, slot['font'], slot['size'], slot['max_width']) or ['']
+
+    def fits(self, values: Dict[str, str]) -> bool:
+        """True if every value stays within its slot (lines and width)."""
+        from reportlab.platypus import Paragraph
+        for name, value in values.items():
+            slot = self._slots[name]
+            text = '' if value is None else str(value)
+            if slot['type'] == 'block':
+                _, height = Paragraph(text, slot['style']).wrap(self.width, self.pagesize[1])
+                if height > slot['height']:
+                    return False
+            elif len(self._wrap_value(slot, text)) > slot.get('lines', 1):
+                return False
+        return True
+
+    def draw_background(self, c):
+        for page in range(self.page_count):
+            if page:
+                c.showPage()
+            for draw_page, draw in self._statics:
+                if draw_page == page:
+                    draw(c)
+
+    def draw_fields(self, c, values: Dict[str, str]):
+        for page in range(self.page_count):
+            if page:
+                c.showPage()
+            for name, value in values.items():
+                if self._slots[name]['page'] == page:
+                    self._draw_value(c, self._slots[name], '' if value is None else str(value))
+
+    def _draw_value(self, c, slot, text: str):
+        from reportlab.platypus import Paragraph
+        if slot['type'] == 'block':
+            para = Paragraph(text, slot['style'])
+            _, height = para.wrap(self.width, self.pagesize[1])
+            para.drawOn(c, slot['x'], slot['top'] - height)
+            return
+        c.setFont(slot['font'], slot['size'])
+        for i, line in enumerate(self._wrap_value(slot, text)[:slot.get('lines', 1)]):
+            y = slot['y'] - i * slot.get('leading', slot['size'])
+            if slot['align'] == 'right':
+                c.drawRightString(slot['x'], y, line)
+            elif slot['align'] == 'center':
+                c.drawCentredString(slot['x'], y, line)
+            else:
+                c.drawString(slot['x'], y, line)
+
+
+# Instance globale
+_background_cache = None
+
+def get_background_cache() -> PDFBackgroundCache:
+    """Cache de fonds PDF partagé par le process."""
+    global _background_cache
+    if _background_cache is None:
+        _background_cache = PDFBackgroundCache()
+    return _background_cache
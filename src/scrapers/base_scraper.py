@@ -7,13 +7,15 @@ Abstract class that all specific scrapers must inherit from.
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import logging
 import json
+import os
 from pathlib import Path
 from datetime import datetime
 
-from .utils.rate_limiter import RateLimiter
+from .utils.rate_limiter import RateLimiter, STATE_PATH_ENV
+from .utils.html_parser import PARSERS, PARSE_ERRORS, parse_html
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +23,15 @@ logger = logging.getLogger(__name__)
 class BaseScraper(ABC):
     """Abstract base class for web scrapers."""
     
+    # Tags holding the data a scraper reads (used by parse_only mode)
+    PARSE_ONLY_TAGS: Optional[List[str]] = None
+    
     def __init__(
         self, 
         rate_limit: float = 1.0,
-        output_dir: str = "data/scraped"
+        output_dir: str = "data/scraped",
+        parser: str = 'soup',
+        parse_only: bool = False
     ):
         """
         Initialize base scraper.
@@ -32,8 +39,22 @@ class BaseScraper(ABC):
         Args:
             rate_limit: Requests per second
             output_dir: Directory to save scraped data
+            parser: 'soup' (BeautifulSoup tree) or 'lxml' (lxml.html tree
+                queried with compiled XPath, see utils.html_parser)
+            parse_only: With the 'soup' parser, only build the PARSE_ONLY_TAGS
+                subtrees instead of the whole page
         """
-        self.rate_limiter = RateLimiter(requests_per_second=rate_limit)
+        if parser not in PARSERS:
+            raise ValueError(f"Unknown parser: {parser}")
+        self.parser = parser
+        self.parse_only = SoupStrainer(self.PARSE_ONLY_TAGS) if parse_only and self.PARSE_ONLY_TAGS else None
+        
+        # Shared between processes when RATE_LIMIT_STATE_PATH is set
+        self.rate_limiter = RateLimiter(
+            requests_per_second=rate_limit,
+            state_path=os.getenv(STATE_PATH_ENV),
+            key=f"scraper:{type(self).__name__}"
+        )
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
@@ -58,7 +79,21 @@ class BaseScraper(ABC):
         """
         pass
     
-    def _fetch_page(self, url: str, timeout: int = 30) -> Optional[BeautifulSoup]:
+    def parse_document(self, content: bytes):
+        """
+        Parse a page with the configured parser.
+        
+        Args:
+            content: Raw page content
+            
+        Returns:
+            BeautifulSoup object, or lxml.html root with parser='lxml'
+        """
+        if self.parser == 'lxml':
+            return parse_html(content)
+        return BeautifulSoup(content, 'lxml', parse_only=self.parse_only)
+    
+    def _fetch_page(self, url: str, timeout: int = 30):
         """
         Fetch and parse a web page.
         
@@ -67,7 +102,7 @@ class BaseScraper(ABC):
             timeout: Request timeout in seconds
             
         Returns:
-            BeautifulSoup object or None if failed
+            Parsed page (see parse_document) or None if failed
         """
         try:
             with self.rate_limiter:
@@ -75,11 +110,14 @@ class BaseScraper(ABC):
                 response = self.session.get(url, timeout=timeout)
                 response.raise_for_status()
                 
-                return BeautifulSoup(response.content, 'lxml')
+                return self.parse_document(response.content)
                 
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching {url}: {e}")
             return None
+        except PARSE_ERRORS as e:
+            logger.error(f"Error parsing {url}: {e}")
+            return None
     
     def save_data(self, data: List[Dict], filename: str):
         """
@@ -104,6 +142,30 @@ class BaseScraper(ABC):
         except Exception as e:
             logger.error(f"Error saving data: {e}")
     
+    def save_jsonl(self, data: List[Dict], filename: str, append: bool = False):
+        """
+        Save scraped data as JSON Lines (one item per line).
+        
+        JSON Lines files can be streamed by ReviewAnalysisPipeline without
+        loading the whole corpus in memory.
+        
+        Args:
+            data: Data to save
+            filename: Output filename (without path)
+            append: Append to an existing file instead of overwriting it
+        """
+        output_path = self.output_dir / filename
+        
+        try:
+            with open(output_path, 'a' if append else 'w', encoding='utf-8') as f:
+                for item in data:
+                    f.write(json.dumps(item, ensure_ascii=False) + '\n')
+            
+            logger.info(f"Saved {len(data)} items to {output_path}")
+            
+        except Exception as e:
+            logger.error(f"Error saving data: {e}")
+    
     def load_data(self, filename: str) -> Optional[List[Dict]]:
         """
         Load previously scraped data.
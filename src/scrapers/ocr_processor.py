@@ -1,11 +1,21 @@
 import logging
 import re
 import os
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import email
 from email import policy
 from email.parser import BytesParser
 import json
+import shutil
+import io
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .utils.ocr_cache import OCRCache, cache_key
+from src.utils.pdf_text import iter_pdf_pages, read_source_bytes
 
 try:
     import google.generativeai as genai
@@ -13,16 +23,128 @@ try:
 except ImportError:
     GEMINI_AVAILABLE = False
 
+try:
+    from PIL import Image
+    import pytesseract
+    TESSERACT_AVAILABLE = True
+except ImportError:
+    TESSERACT_AVAILABLE = False
+
 
 logger = logging.getLogger(__name__)
 
+# À incrémenter quand l'extraction change : invalide le cache OCR
+EXTRACTION_VERSION = 1
+
+# Configuration : --psm 6 (Assume a single uniform block of text) peut être meilleur pour des lettres
+OCR_CONFIG = r'--oem 3 --psm 6'
+# Angles de correction (sens PIL, anti-horaire) essayés au plus
+OCR_ANGLES = (0, -90, 90, 180)
+MAX_OCR_ATTEMPTS = 3
+# Confiance moyenne Tesseract (0-100) au-delà de laquelle on n'essaie pas d'autre angle
+MIN_OCR_CONFIDENCE = 60.0
+MIN_OCR_CHARS = 50
+# En dessous, l'axe des lignes est ambigu et on interroge l'OSD de Tesseract
+MIN_ORIENTATION_CONFIDENCE = 0.3
+ORIENTATION_MAX_SIZE = 1000
+
+TESSERACT_PATHS = [
+    r'C:\Program Files\Tesseract-OCR\tesseract.exe',
+    r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
+    '/usr/bin/tesseract',
+    '/usr/local/bin/tesseract'
+]
+
+_tesseract_configured = False
+
+
+def _configure_tesseract():
+    """Cherche l'exécutable Tesseract dans les chemins standards si absent du PATH (une fois par process)."""
+    global _tesseract_configured
+    if _tesseract_configured:
+        return
+    _tesseract_configured = True
+    if shutil.which('tesseract'):
+        # Déjà configuré dans le PATH, pas besoin de spécifier cmd
+        return
+    for path in TESSERACT_PATHS:
+        if os.path.exists(path):
+            pytesseract.pytesseract.tesseract_cmd = path
+            return
+    logger.warning("Tesseract executable not found. OCR will fail.")
+
+
+def _rotate(image, angle: int):
+    """Rotation exacte d'un multiple de 90° (anti-horaire, comme Image.rotate(angle, expand=True))."""
+    angle %= 360
+    if angle == 0:
+        return image
+    transpose = {90: Image.Transpose.ROTATE_90, 180: Image.Transpose.ROTATE_180, 270: Image.Transpose.ROTATE_270}
+    return image.transpose(transpose[angle])
+
+
+def _ink_mask(image) -> np.ndarray:
+    """Image réduite binarisée par seuil d'Otsu : True = encre."""
+    gray = image.convert('L')
+    gray.thumbnail((ORIENTATION_MAX_SIZE, ORIENTATION_MAX_SIZE))
+    pixels = np.asarray(gray, dtype=np.uint8)
+    histogram = np.bincount(pixels.ravel(), minlength=256).astype(float)
+    levels = np.arange(256)
+    weight = np.cumsum(histogram)
+    mean = np.cumsum(histogram * levels)
+    background = weight[-1] - weight
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (mean[-1] * weight - mean * weight[-1]) ** 2 / (weight * background)
+    threshold = int(np.nanargmax(between)) if np.isfinite(between).any() else 127
+    return pixels <= threshold
+
+
+def _profile_contrast(profile: np.ndarray) -> float:
+    """Contraste d'un profil de projection (variance normalisée sur l'étendue encrée)."""
+    inked = np.flatnonzero(profile)
+    if inked.size < 2:
+        return 0.0
+    profile = profile[inked[0]:inked[-1] + 1].astype(float)
+    return float(profile.var() / (profile.mean() ** 2))
+
+
+def _top_heaviness(mask: np.ndarray) -> float:
+    """
+    Asymétrie verticale des lignes de texte, entre -1 et 1 (positive = texte droit).
+
+    Autour du corps des lettres (bande dense de hauteur x), les hampes
+    (b, d, l, t, majuscules, accents) portent plus d'encre au-dessus que les
+    jambages (g, p, q, y) en dessous.
+    """
+    rows = mask.sum(axis=1)
+    # Lignes = suites de rangées encrées (au-delà du bruit)
+    on = np.concatenate(([False], rows > rows.max(initial=0) * 0.02, [False]))
+    edges = np.flatnonzero(np.diff(on.astype(np.int8)))
+    above = below = 0
+    for start, end in zip(edges[::2], edges[1::2]):
+        line = rows[start:end]
+        core = np.flatnonzero(line >= line.max() * 0.5)
+        above += line[:core[0]].sum()
+        below += line[core[-1] + 1:].sum()
+    return float((above - below) / (above + below)) if above + below else 0.0
+
+
 class OCRProcessor:
     """
     Simule l'analyse OCR et NLP des lettres de rejet transporteur.
     Détecte les patterns de refus pour automatiser les conseils clients.
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[OCRCache] = None, pdf_workers: Optional[int] = None):
+        """
+        Args:
+            cache: Cache persistant des extractions (None = pas de cache),
+                voir src.scrapers.utils.ocr_cache.get_ocr_cache
+            pdf_workers: Process d'extraction des longs PDF (None = nombre de CPU,
+                1 = pas de pool, à utiliser depuis un thread Streamlit)
+        """
+        self.cache = cache
+        self.pdf_workers = pdf_workers
         # Dictionnaire des motifs de rejet et conseils associés
         self.rejection_patterns = {
             r"(signature|signature).*(correspond pas|manquante|non reconnue|invalid|missing|not match)": {
@@ -180,6 +302,73 @@ class OCRProcessor:
             "advice_en": "We are manually analyzing the carrier's response."
         }
     
+    def analyze_pdf(self, file_path_or_buffer: Any, min_confidence: float = 0.9,
+                    workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Analyse un PDF page par page et s'arrête à la première page où un motif
+        de rejet est détecté avec au moins min_confidence.
+
+        Sans motif assez sûr, toutes les pages sont lues et la meilleure
+        analyse est retournée.
+
+        Returns:
+            Analyse (comme analyze_rejection_text) avec en plus 'text' (pages lues),
+            'pages_read' et 'page' (numéro de la page du motif, None si inconnu)
+        """
+        pages = []
+        best = None
+        for page_text in iter_pdf_pages(file_path_or_buffer, workers=workers or self.pdf_workers):
+            pages.append(page_text)
+            analysis = dict(self.analyze_rejection_text(page_text))
+            if best is None or analysis.get('confidence', 0.0) > best.get('confidence', 0.0):
+                best = analysis
+                best['page'] = len(pages) if analysis.get('reason_key') != 'unknown' else None
+            if best.get('confidence', 0.0) >= min_confidence:
+                logger.info(f"PDF analysis stopped at page {len(pages)}: {best.get('reason_key')}")
+                break
+
+        if best is None:
+            best = dict(self.analyze_rejection_text(""))
+            best['page'] = None
+        best['text'] = "\n".join(pages)
+        best['pages_read'] = len(pages)
+        return best
+
+    def analyze_file(self, file_path_or_buffer: Any,
+                     filename: str) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Extrait et analyse une réponse de transporteur.
+
+        Les PDF passent par analyze_pdf (lecture arrêtée à la page du motif) ;
+        les autres fichiers, les PDF sans texte exploitable et les PDF déjà en
+        cache, par extract_all_from_file puis analyze_rejection_text. Le texte
+        partiel d'une lecture arrêtée n'est jamais mis en cache.
+
+        Returns:
+            Tuple (texte, liste_des_pieces_jointes, analyse)
+        """
+        if filename.lower().endswith('.pdf') and not self._is_cached(file_path_or_buffer, filename):
+            try:
+                analysis = self.analyze_pdf(file_path_or_buffer)
+            except Exception as e:
+                logger.warning(f"PDF analysis failed: {e}")
+            else:
+                text = analysis.pop('text')
+                if len(text.strip()) >= 10:
+                    return text, [], analysis
+            if hasattr(file_path_or_buffer, 'seek'):
+                file_path_or_buffer.seek(0)
+
+        text, attachments = self.extract_all_from_file(file_path_or_buffer, filename)
+        return text, attachments, self.analyze_rejection_text(text)
+
+    def _is_cached(self, file_path_or_buffer: Any, filename: str) -> bool:
+        """True si l'extraction complète de ce contenu est déjà en cache."""
+        if self.cache is None:
+            return False
+        content = read_source_bytes(file_path_or_buffer)
+        return self.cache.get(cache_key(content, filename, self.extraction_config())) is not None
+
     def extract_text_from_eml(self, file_content: bytes) -> Tuple[str, List[Dict[str, Any]]]:
         """
         Extrait le texte et les pièces jointes d'un fichier .eml.
@@ -220,10 +409,123 @@ class OCRProcessor:
         text, _ = self.extract_all_from_file(file_path_or_buffer, filename)
         return text
 
+    def extraction_config(self) -> str:
+        """Empreinte des réglages d'extraction, incluse dans la clé de cache."""
+        return json.dumps({
+            'version': EXTRACTION_VERSION,
+            'ocr_config': OCR_CONFIG,
+            'angles': OCR_ANGLES,
+            'max_attempts': MAX_OCR_ATTEMPTS,
+            'min_confidence': MIN_OCR_CONFIDENCE,
+            'min_chars': MIN_OCR_CHARS,
+        }, sort_keys=True)
+
     def extract_all_from_file(self, file_path_or_buffer: Any, filename: str) -> Tuple[str, List[Dict[str, Any]]]:
         """
         Tente d'extraire le texte et les pièces jointes du fichier.
+
+        Avec un cache, un contenu déjà extrait (même sous un autre nom) est
+        servi sans relancer l'OCR.
+        """
+        if self.cache is None:
+            text, attachments = self._extract_raw(file_path_or_buffer, filename)
+        else:
+            content = read_source_bytes(file_path_or_buffer)
+            key = cache_key(content, filename, self.extraction_config())
+            cached = self.cache.get(key)
+            if cached is None:
+                text, attachments = self._extract_raw(io.BytesIO(content), filename)
+                self._store(key, text, attachments)
+            else:
+                logger.info(f"OCR cache hit: {filename}")
+                text, attachments = cached
+        return self._with_fallback(text, attachments, filename)
+
+    def extract_batch(self, files: List[Any], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Extrait un lot de fichiers en parallèle (pool de processus).
+
+        Les contenus déjà en cache ne sont pas retraités, et un même contenu
+        présent plusieurs fois dans le lot n'est extrait qu'une fois. Les
+        process sont démarrés en mode spawn : le lot peut être lancé depuis le
+        thread d'un script Streamlit sans fork.
+
+        Args:
+            files: Chemins, buffers nommés (UploadedFile Streamlit) ou
+                tuples (chemin, buffer ou bytes ; nom de fichier)
+            workers: Nombre de process (défaut : nombre de CPU, 1 = pas de pool)
+
+        Returns:
+            Un dict par fichier, dans l'ordre : 'filename', 'text',
+            'attachments', 'sha256' et 'cached' (servi par le cache)
         """
+        config = self.extraction_config()
+        tasks = []
+        for item in files:
+            source, filename = item if isinstance(item, tuple) else (item, _source_name(item))
+            content = read_source_bytes(source)
+            tasks.append((cache_key(content, filename, config), content, filename))
+
+        start = time.monotonic()
+        extracted = {}
+        if self.cache is not None:
+            for key, _, _ in tasks:
+                if key not in extracted:
+                    cached = self.cache.get(key)
+                    if cached is not None:
+                        extracted[key] = cached
+        cached_keys = set(extracted)
+
+        # Un seul traitement par contenu
+        pending = {}
+        for task in tasks:
+            if task[0] not in extracted:
+                pending.setdefault(task[0], task)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(pending) <= 1:
+            results = [_extract_task(task, self) for task in pending.values()]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending)), initializer=_init_ocr_worker,
+                                     mp_context=multiprocessing.get_context('spawn')) as pool:
+                results = list(pool.map(_extract_task, pending.values()))
+        for key, text, attachments in results:
+            extracted[key] = (text, attachments)
+            self._store(key, text, attachments)
+
+        documents = []
+        for key, _, filename in tasks:
+            text, attachments = extracted[key]
+            text, attachments = self._with_fallback(text, list(attachments), filename)
+            documents.append({
+                'filename': filename,
+                'text': text,
+                'attachments': attachments,
+                'sha256': key,
+                'cached': key in cached_keys
+            })
+        logger.info(f"OCR batch: {len(tasks)} files, {len(pending)} extracted, "
+                    f"{len(tasks) - len(pending)} from cache or duplicates, {time.monotonic() - start:.2f}s")
+        return documents
+
+    def _store(self, key: str, text: str, attachments: List[Dict[str, Any]]):
+        """Met en cache une extraction (pas les échecs, qui peuvent être passagers)."""
+        if self.cache is not None and (text or attachments):
+            try:
+                self.cache.put(key, (text, attachments))
+            except Exception as e:
+                logger.warning(f"OCR cache write failed: {e}")
+
+    def _with_fallback(self, text: str, attachments: List[Dict[str, Any]],
+                       filename: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """Simulation à partir du nom de fichier si l'extraction n'a rien donné."""
+        if not text or len(text) < 10:
+            logger.info("Fallback to simulation based on filename")
+            text = self.simulate_ocr_on_file(filename)
+
+        return text, attachments
+
+    def _extract_raw(self, file_path_or_buffer: Any, filename: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """Extraction réelle (EML, PDF, image), sans simulation ni cache."""
         text = ""
         attachments = []
         
@@ -247,82 +549,116 @@ class OCRProcessor:
         # 1. Essai OCR Réel (PDF)
         elif filename.lower().endswith('.pdf'):
             try:
-                import PyPDF2
-                if hasattr(file_path_or_buffer, 'read'): # C'est un buffer Streamlit
-                    pdf_reader = PyPDF2.PdfReader(file_path_or_buffer)
-                else:
-                    pdf_reader = PyPDF2.PdfReader(file_path_or_buffer)
-                
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
+                # Pages extraites à la demande (en parallèle pour les longs documents), jointes une fois
+                pages = iter_pdf_pages(file_path_or_buffer, workers=self.pdf_workers)
+                text = "".join(f"{page_text}\n" for page_text in pages)
                 logger.info("PDF Text Extraction successful")
             except Exception as e:
                 logger.warning(f"PDF extraction failed: {e}")
 
         # 2. Essai OCR Réel (Images - Tesseract)
         elif filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-            try:
-                from PIL import Image
-                import pytesseract
-                import os
-                import shutil
-                
-                # Configuration Tesseract Plus Robuste
-                # On cherche dans les chemins standards si pas configuré par défaut
-                tesseract_paths = [
-                    r'C:\Program Files\Tesseract-OCR\tesseract.exe',
-                    r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
-                    '/usr/bin/tesseract',
-                    '/usr/local/bin/tesseract'
-                ]
-                
-                # Vérifier si déjà dans le PATH
-                if shutil.which('tesseract'):
-                     # Déjà configuré dans le PATH, pas besoin de spécifier cmd
-                     pass
-                else:
-                    found = False
-                    for path in tesseract_paths:
-                        if os.path.exists(path):
-                            pytesseract.pytesseract.tesseract_cmd = path
-                            found = True
-                            break
-                    if not found:
-                         logger.warning("Tesseract executable not found. OCR will fail.")
-
-                
-                image = Image.open(file_path_or_buffer)
-                
-                # Stratégie Multi-Angle
-                rotations = [0, -90, 90] 
-                full_text = ""
-                
-                for angle in rotations:
-                    rotated_img = image.rotate(angle, expand=True)
-                    rotated_img = rotated_img.convert('L') # Niveaux de gris
-                    
-                    # Configuration : --psm 6 (Assume a single uniform block of text) peut être meilleur pour des lettres
-                    custom_config = r'--oem 3 --psm 6' 
-                    page_text = pytesseract.image_to_string(rotated_img, config=custom_config)
-                    full_text += f"\n--- Angle {angle}° ---\n" + page_text
-                    
-                    if len(page_text) > 50: # Si on trouve du texte significatif, c'est bon signe
-                         logger.info(f"OCR Angle {angle}° extracted {len(page_text)} chars.")
-
-                text = full_text
-                logger.info("Multi-angle OCR completed")
-            except ImportError:
+            if not TESSERACT_AVAILABLE:
                 logger.warning("Pytesseract or Pillow not installed.")
-            except Exception as e:
-                logger.warning(f"Image OCR failed: {e}")
+            else:
+                try:
+                    _configure_tesseract()
+                    result = self.ocr_image(Image.open(file_path_or_buffer))
+                    text = result['text']
+                    logger.info(
+                        f"OCR completed at {result['angle']}° (confidence {result['confidence']:.0f}, "
+                        f"{len(result['attempts'])} attempt(s))"
+                    )
+                except Exception as e:
+                    logger.warning(f"Image OCR failed: {e}")
 
-        # 3. Fallback
-        if not text or len(text) < 10:
-            logger.info("Fallback to simulation based on filename")
-            text = self.simulate_ocr_on_file(filename)
-            
         return text, attachments
 
+    def detect_orientation(self, image) -> Dict[str, Any]:
+        """
+        Détecte l'orientation du texte avant l'OCR.
+
+        Heuristique par profils de projection (NumPy, quelques ms) : des lignes
+        horizontales donnent un profil de lignes très contrasté (encre / interligne),
+        l'asymétrie hampes / jambages tranche ensuite entre les deux sens.
+        Si l'axe est ambigu, on interroge l'OSD de Tesseract.
+
+        Returns:
+            Dict avec les angles de correction par ordre de probabilité,
+            la confiance (0-1) et la méthode utilisée
+        """
+        mask = _ink_mask(image)
+        rows = _profile_contrast(mask.sum(axis=1))
+        cols = _profile_contrast(mask.sum(axis=0))
+        confidence = abs(rows - cols) / (rows + cols) if rows + cols else 0.0
+
+        if rows >= cols:
+            upright = mask
+            axis = (0, 180)
+        else:
+            # Lignes verticales : on regarde l'image corrigée de -90°
+            upright = np.rot90(mask, -1)
+            axis = (-90, 90)
+        if _top_heaviness(upright) < 0:
+            axis = axis[::-1]
+        angles = list(axis) + [angle for angle in OCR_ANGLES if angle not in axis]
+        method = 'projection'
+
+        if confidence < MIN_ORIENTATION_CONFIDENCE:
+            try:
+                osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+                # OSD : rotation horaire à appliquer -> angle PIL anti-horaire
+                osd_angle = {0: 0, 90: -90, 180: 180, 270: 90}[int(osd['rotate']) % 360]
+                angles = [osd_angle] + [angle for angle in angles if angle != osd_angle]
+                confidence = max(confidence, min(1.0, float(osd.get('orientation_conf', 0)) / 10))
+                method = 'osd'
+            except Exception as e:
+                # Peu de texte, osd.traineddata absent ou Tesseract indisponible
+                logger.debug(f"Tesseract OSD unavailable: {e}")
+
+        return {'angles': angles, 'confidence': round(confidence, 3), 'method': method}
+
+    def _ocr_at_angle(self, image, angle: int) -> Tuple[str, float]:
+        """OCR d'une orientation : texte reconstruit ligne par ligne et confiance moyenne des mots."""
+        data = pytesseract.image_to_data(
+            _rotate(image, angle), config=OCR_CONFIG, output_type=pytesseract.Output.DICT
+        )
+        lines: Dict[Tuple[int, int, int], List[str]] = {}
+        confidences = []
+        for i, word in enumerate(data['text']):
+            word = (word or '').strip()
+            conf = float(data['conf'][i])
+            if not word or conf < 0:
+                continue
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(key, []).append(word)
+            confidences.append(conf)
+        text = '\n'.join(' '.join(words) for words in lines.values())
+        return text, (sum(confidences) / len(confidences) if confidences else 0.0)
+
+    def ocr_image(self, image, max_attempts: int = MAX_OCR_ATTEMPTS) -> Dict[str, Any]:
+        """
+        OCR d'une image à l'angle le plus probable.
+
+        Les autres angles ne sont essayés que si la confiance Tesseract reste
+        sous MIN_OCR_CONFIDENCE ; le meilleur résultat est retourné.
+        """
+        image = image.convert('L')  # Niveaux de gris
+        orientation = self.detect_orientation(image)
+        attempts = []
+        best = None
+        for angle in orientation['angles'][:max_attempts]:
+            text, confidence = self._ocr_at_angle(image, angle)
+            attempts.append({'angle': angle, 'confidence': round(confidence, 1), 'chars': len(text)})
+            logger.debug(f"OCR angle {angle}°: {len(text)} chars, confidence {confidence:.0f}")
+            if best is None or (confidence, len(text)) > (best['confidence'], len(best['text'])):
+                best = {'text': text, 'angle': angle, 'confidence': confidence}
+            if confidence >= MIN_OCR_CONFIDENCE and len(text) >= MIN_OCR_CHARS:
+                break
+        best['attempts'] = attempts
+        best['orientation'] = orientation
+        return best
+
     def simulate_ocr_on_file(self, filename: str) -> str:
         """
         Simule l'extraction de texte si l'OCR échoue.
@@ -338,3 +674,35 @@ class OCRProcessor:
              return "DPD France - Preuve de livraison. Colis 250062801950819. Poids 16kg. Date 11/07/2023. Statut: Livré avec réserve (endommagé)."
         
         return "Nous n'avons pas pu valider votre demande d'indemnisation pour cause d'emballage insuffisant."
+
+
+def _source_name(source: Any) -> str:
+    """Nom de fichier d'un chemin ou d'un buffer nommé (UploadedFile, fichier ouvert)."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.basename(source)
+    return os.path.basename(getattr(source, 'name', '') or '')
+
+
+# Processor propre à chaque process du pool (initialisé une fois)
+_batch_processor = None
+
+
+def _init_ocr_worker():
+    """Prépare le processor et localise Tesseract une seule fois par process du pool."""
+    global _batch_processor
+    # Le lot est déjà parallélisé par fichier : pas de pool imbriqué pour les pages
+    _batch_processor = OCRProcessor(pdf_workers=1)
+    if TESSERACT_AVAILABLE:
+        _configure_tesseract()
+
+
+def _extract_task(task, processor: OCRProcessor = None):
+    """Extrait un fichier ; retourne (clé, texte, pièces jointes)."""
+    key, content, filename = task
+    processor = processor or _batch_processor
+    try:
+        text, attachments = processor._extract_raw(io.BytesIO(content), filename)
+    except Exception as e:
+        logger.error(f"Extraction failed for {filename}: {e}")
+        text, attachments = "", []
+    return key, text, attachments
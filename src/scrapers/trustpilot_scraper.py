@@ -2,14 +2,34 @@
 Trustpilot scraper for carrier reviews.
 
 Scrapes customer reviews about shipping carriers to extract dispute patterns.
+
+Two modes:
+- scrape(): sequential pages through the blocking RateLimiter
+- scrape_async(): carriers crawled concurrently with httpx (per-host
+  concurrency limit, the scraper's token bucket shared by all tasks),
+  conditional requests and
+  a persisted CrawlState so pagination stops at already-seen reviews
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+import asyncio
+import hashlib
 import logging
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 import time
 
+from bs4 import Tag
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
 from .base_scraper import BaseScraper
+from .utils.crawl_state import CrawlState
+from .utils.html_parser import PARSE_ERRORS, attr_contains, select, select_one, text_of
+from .utils.rate_limiter import RateLimiter
 from .utils.text_processor import DisputePatternExtractor
 
 logger = logging.getLogger(__name__)
@@ -28,14 +48,29 @@ class TrustpilotScraper(BaseScraper):
         'dhl': 'https://fr.trustpilot.com/review/www.dhl.fr'
     }
     
-    def __init__(self, rate_limit: float = 0.5):  # Conservative: 1 req per 2 seconds
+    # Review card selectors for the lxml parser (compiled once, see html_parser)
+    CARD_XPATH = f"//article[{attr_contains('class', 'review')}]"
+    CARD_FALLBACK_XPATH = "//div[@data-service-review-card-paper]"
+    RATING_XPATH = f".//div[{attr_contains('class', 'star')}]"
+    TITLE_XPATH = f".//h2[{attr_contains('class', 'title')}]"
+    TEXT_XPATH = f".//p[{attr_contains('class', 'content')}]"
+    TEXT_FALLBACK_XPATH = f".//div[{attr_contains('class', 'content')}]"
+    AUTHOR_XPATH = f".//span[{attr_contains('class', 'name')}]"
+    LINK_XPATH = ".//a[contains(@href, '/reviews/')]"
+    
+    # parse_only mode with the BeautifulSoup parser keeps <article> cards only
+    PARSE_ONLY_TAGS = ['article']
+    
+    def __init__(self, rate_limit: float = 0.5, parser: str = 'lxml', parse_only: bool = False):  # Conservative: 1 req per 2 seconds
         """
         Initialize Trustpilot scraper.
         
         Args:
             rate_limit: Requests per second (default: 0.5 for safety)
+            parser: 'lxml' (fast path, default) or 'soup' (BeautifulSoup)
+            parse_only: With the 'soup' parser, only build <article> subtrees
         """
-        super().__init__(rate_limit=rate_limit)
+        super().__init__(rate_limit=rate_limit, parser=parser, parse_only=parse_only)
         self.text_processor = DisputePatternExtractor()
     
     def scrape(
@@ -95,14 +130,14 @@ class TrustpilotScraper(BaseScraper):
             else:
                 url = f"{base_url}?page={page}"
             
-            soup = self._fetch_page(url)
+            document = self._fetch_page(url)
             
-            if not soup:
+            if document is None:
                 logger.error(f"Failed to fetch page {page} for {carrier_name}")
                 break
             
             # Extract reviews from page
-            page_reviews = self._extract_reviews_from_page(soup, carrier_name, min_rating)
+            page_reviews = self._extract_reviews_from_page(document, carrier_name, min_rating)
             
             if not page_reviews:
                 logger.info(f"No more reviews found on page {page}")
@@ -115,9 +150,156 @@ class TrustpilotScraper(BaseScraper):
         
         return reviews
     
+    # ========================================
+    # ASYNC INCREMENTAL MODE
+    # ========================================
+    
+    async def scrape_async(
+        self,
+        carriers: Optional[List[str]] = None,
+        max_pages: int = 3,
+        min_rating: int = 3,
+        state: Optional[CrawlState] = None,
+        concurrency_per_host: int = 2,
+        timeout: float = 30
+    ) -> List[Dict]:
+        """
+        Scrape carriers concurrently, only collecting reviews not seen before.
+        
+        All requests share this scraper's token bucket (RateLimiter.acquire),
+        and at most concurrency_per_host requests are in flight per host. The
+        state is updated in memory: call state.save() once the returned
+        reviews are stored.
+        
+        Args:
+            carriers: List of carrier names to scrape (None = all)
+            max_pages: Maximum pages per carrier
+            min_rating: Only keep reviews with rating <= this (1-5)
+            state: Crawl state (validators and seen ids); None = full crawl
+            concurrency_per_host: Maximum concurrent requests per host
+            timeout: Request timeout in seconds
+            
+        Returns:
+            List of new review dictionaries
+        """
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx is required for async scraping")
+        
+        if carriers is None:
+            carriers = list(self.CARRIERS.keys())
+        for carrier in carriers:
+            if carrier not in self.CARRIERS:
+                logger.warning(f"Unknown carrier: {carrier}")
+        carriers = [carrier for carrier in carriers if carrier in self.CARRIERS]
+        
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+        headers = dict(self.session.headers)
+        headers['Accept-Encoding'] = 'gzip, deflate'  # No brotli decoder required
+        
+        async with httpx.AsyncClient(headers=headers, timeout=timeout, follow_redirects=True) as client:
+            async def fetch(url: str) -> Tuple[int, Optional[object]]:
+                host = urlsplit(url).netloc
+                semaphore = semaphores.setdefault(host, asyncio.Semaphore(concurrency_per_host))
+                return await self._fetch_page_async(client, url, self.rate_limiter, semaphore, state)
+            
+            results = await asyncio.gather(*(
+                self._scrape_carrier_async(fetch, carrier, self.CARRIERS[carrier], max_pages, min_rating, state)
+                for carrier in carriers
+            ))
+        
+        all_reviews = []
+        for carrier, carrier_reviews in zip(carriers, results):
+            logger.info(f"Scraped {len(carrier_reviews)} new reviews for {carrier}")
+            all_reviews.extend(carrier_reviews)
+        return all_reviews
+    
+    async def _fetch_page_async(
+        self,
+        client,
+        url: str,
+        limiter: RateLimiter,
+        semaphore: asyncio.Semaphore,
+        state: Optional[CrawlState]
+    ) -> Tuple[int, Optional[object]]:
+        """
+        Fetch and parse a page, conditionally if it was fetched before.
+        
+        Returns:
+            (HTTP status, parsed page) - (304, None) if unchanged, (0, None) on error
+        """
+        request_headers = state.conditional_headers(url) if state else {}
+        try:
+            async with semaphore:
+                await limiter.acquire()
+                logger.info(f"Fetching: {url}")
+                response = await client.get(url, headers=request_headers)
+            
+            if response.status_code == 304:
+                return 304, None
+            response.raise_for_status()
+            
+        except httpx.HTTPError as e:
+            logger.error(f"Error fetching {url}: {e}")
+            return 0, None
+        
+        try:
+            document = self.parse_document(response.content)
+        except PARSE_ERRORS as e:
+            logger.error(f"Error parsing {url}: {e}")
+            return 0, None
+        
+        # Validators only once parsed: an unparsable page is fetched again next crawl
+        if state is not None:
+            state.update_validators(url, response.headers)
+        return response.status_code, document
+    
+    async def _scrape_carrier_async(
+        self,
+        fetch,
+        carrier_name: str,
+        base_url: str,
+        max_pages: int,
+        min_rating: int,
+        state: Optional[CrawlState]
+    ) -> List[Dict]:
+        """Scrape the new reviews of a carrier, newest pages first."""
+        reviews = []
+        
+        for page in range(1, max_pages + 1):
+            url = base_url if page == 1 else f"{base_url}?page={page}"
+            status, document = await fetch(url)
+            
+            if status == 304:
+                logger.info(f"Page {page} for {carrier_name} not modified since last crawl")
+                break
+            if document is None:
+                logger.error(f"Failed to fetch page {page} for {carrier_name}")
+                break
+            
+            page_reviews = self._parse_review_cards(document, carrier_name)
+            if not page_reviews:
+                logger.info(f"No more reviews found on page {page}")
+                break
+            
+            new_reviews = page_reviews
+            if state is not None:
+                new_reviews = [r for r in page_reviews if not state.is_seen(carrier_name, r['review_id'])]
+                state.mark_seen(carrier_name, [r['review_id'] for r in new_reviews])
+            reviews.extend(self._with_patterns(new_reviews, min_rating))
+            
+            if len(new_reviews) < len(page_reviews):
+                logger.info(f"Reached already-seen reviews on page {page} for {carrier_name}")
+                break
+        
+        return reviews
+    
+    # ========================================
+    # PARSING
+    # ========================================
+    
     def _extract_reviews_from_page(
         self, 
-        soup, 
+        document, 
         carrier_name: str,
         min_rating: int
     ) -> List[Dict]:
@@ -127,27 +309,41 @@ class TrustpilotScraper(BaseScraper):
         Note: This is a simplified version. Real Trustpilot scraping
         would need more sophisticated selectors and potentially Selenium.
         """
+        return self._with_patterns(self._parse_review_cards(document, carrier_name), min_rating)
+    
+    def _with_patterns(self, reviews: List[Dict], min_rating: int) -> List[Dict]:
+        """Keep reviews with rating <= min_rating and attach their dispute patterns."""
+        kept = []
+        for review_data in reviews:
+            if review_data['rating'] <= min_rating:
+                review_data['patterns'] = self.text_processor.extract_patterns(review_data['text'])
+                kept.append(review_data)
+        return kept
+    
+    def _parse_review_cards(self, document, carrier_name: str) -> List[Dict]:
+        """Parse every review card of a page (no rating filter)."""
         reviews = []
         
         # Note: Trustpilot's HTML structure changes frequently
         # This is a basic implementation that may need updates
         
-        # Try to find review cards
-        review_cards = soup.find_all('article', class_=lambda x: x and 'review' in x.lower())
-        
-        if not review_cards:
-            # Alternative selector
-            review_cards = soup.find_all('div', {'data-service-review-card-paper': True})
+        if isinstance(document, Tag):
+            # Try to find review cards
+            review_cards = document.find_all('article', class_=lambda x: x and 'review' in x.lower())
+            
+            if not review_cards:
+                # Alternative selector
+                review_cards = document.find_all('div', {'data-service-review-card-paper': True})
+            parse_card = self._parse_review_card
+        else:
+            # lxml fast path: same selectors as compiled XPath
+            review_cards = select(document, self.CARD_XPATH) or select(document, self.CARD_FALLBACK_XPATH)
+            parse_card = self._parse_review_card_lxml
         
         for card in review_cards:
             try:
-                review_data = self._parse_review_card(card, carrier_name)
-                
-                if review_data and review_data['rating'] <= min_rating:
-                    # Extract dispute patterns
-                    patterns = self.text_processor.extract_patterns(review_data['text'])
-                    review_data['patterns'] = patterns
-                    
+                review_data = parse_card(card, carrier_name)
+                if review_data:
                     reviews.append(review_data)
                     
             except Exception as e:
@@ -166,13 +362,7 @@ class TrustpilotScraper(BaseScraper):
         try:
             # Extract rating (1-5 stars)
             rating_elem = card.find('div', class_=lambda x: x and 'star' in x.lower())
-            rating = 3  # Default if not found
-            
-            if rating_elem:
-                # Try to extract from class or data attribute
-                rating_text = rating_elem.get('data-service-review-rating', '')
-                if rating_text:
-                    rating = int(rating_text)
+            rating_text = rating_elem.get('data-service-review-rating', '') if rating_elem else ''
             
             # Extract title
             title_elem = card.find('h2', class_=lambda x: x and 'title' in x.lower())
@@ -191,24 +381,85 @@ class TrustpilotScraper(BaseScraper):
             
             # Extract author (anonymized)
             author_elem = card.find('span', class_=lambda x: x and 'name' in x.lower())
-            author_initials = author_elem.get_text(strip=True)[:2] if author_elem else 'XX'
+            author = author_elem.get_text(strip=True) if author_elem else None
             
-            if not text:
-                return None
+            link = card.find('a', href=lambda x: x and '/reviews/' in x)
             
-            return {
-                'carrier': carrier_name,
-                'rating': rating,
-                'title': title,
-                'text': text,
-                'date': date,
-                'author_initials': author_initials,  # Privacy: only initials
-                'source': 'trustpilot'
-            }
+            return self._build_review(
+                carrier_name, rating_text, title, text, date, author,
+                card.get('data-review-id'), link['href'] if link else None
+            )
             
         except Exception as e:
             logger.error(f"Error parsing review: {e}")
             return None
+    
+    def _parse_review_card_lxml(self, card, carrier_name: str) -> Optional[Dict]:
+        """Parse a single review card of an lxml tree (same fields as _parse_review_card)."""
+        try:
+            rating_elem = select_one(card, self.RATING_XPATH)
+            title_elem = select_one(card, self.TITLE_XPATH)
+            text_elem = select_one(card, self.TEXT_XPATH)
+            if text_elem is None:
+                text_elem = select_one(card, self.TEXT_FALLBACK_XPATH)
+            date_elem = select_one(card, './/time')
+            author_elem = select_one(card, self.AUTHOR_XPATH)
+            link = select_one(card, self.LINK_XPATH)
+            
+            return self._build_review(
+                carrier_name,
+                rating_elem.get('data-service-review-rating', '') if rating_elem is not None else '',
+                text_of(title_elem) if title_elem is not None else '',
+                text_of(text_elem) if text_elem is not None else '',
+                date_elem.get('datetime', '') if date_elem is not None else '',
+                text_of(author_elem) if author_elem is not None else None,
+                card.get('data-review-id'),
+                link.get('href') if link is not None else None
+            )
+            
+        except Exception as e:
+            logger.error(f"Error parsing review: {e}")
+            return None
+    
+    def _build_review(
+        self,
+        carrier_name: str,
+        rating_text: str,
+        title: str,
+        text: str,
+        date: str,
+        author: Optional[str],
+        review_id: Optional[str],
+        href: Optional[str]
+    ) -> Optional[Dict]:
+        """Assemble a review dictionary from the fields of a card (None without text)."""
+        if not text:
+            return None
+        
+        # Default if not found
+        rating = int(rating_text) if rating_text else 3
+        
+        return {
+            'review_id': self._review_id(carrier_name, date, text, review_id, href),
+            'carrier': carrier_name,
+            'rating': rating,
+            'title': title,
+            'text': text,
+            'date': date,
+            'author_initials': author[:2] if author is not None else 'XX',  # Privacy: only initials
+            'source': 'trustpilot'
+        }
+    
+    @staticmethod
+    def _review_id(carrier_name: str, date: str, text: str,
+                   review_id: Optional[str] = None, href: Optional[str] = None) -> str:
+        """Trustpilot review id (data attribute or review link), else a content hash."""
+        if not review_id and href:
+            review_id = href.split('?')[0].rstrip('/').rsplit('/', 1)[-1]
+        if not review_id:
+            content = f"{carrier_name}\x1f{date}\x1f{text}".encode('utf-8')
+            review_id = hashlib.blake2b(content, digest_size=8).hexdigest()
+        return review_id
 
 
 def main_test():
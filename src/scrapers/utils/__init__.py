@@ -2,7 +2,11 @@
 Scraping utilities.
 """
 
-from .rate_limiter import RateLimiter
+from .rate_limiter import RateLimiter, RateLimitedSession, get_rate_limiter
+from .crawl_state import CrawlState
 from .text_processor import DisputePatternExtractor
+from .keyword_matcher import KeywordMatcher
+from .review_pipeline import ReviewAnalysisPipeline
+from .ocr_cache import OCRCache, get_ocr_cache
 
-__all__ = ['RateLimiter', 'DisputePatternExtractor']
+__all__ = ['RateLimiter', 'RateLimitedSession', 'get_rate_limiter', 'CrawlState', 'DisputePatternExtractor', 'KeywordMatcher', 'ReviewAnalysisPipeline', 'OCRCache', 'get_ocr_cache']
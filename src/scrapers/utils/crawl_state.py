@@ -0,0 +1,105 @@
+"""
+Persistent crawl state for incremental scraping.
+
+Keeps, between runs:
+- the HTTP validators (ETag / Last-Modified) of every fetched page, sent
+  back as conditional request headers so unchanged pages answer 304
+- the ids of the reviews already collected per source, so pagination can
+  stop as soon as it reaches reviews seen in a previous run
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_FILE = "data/scraped/crawl_state.json"
+
+
+class CrawlState:
+    """HTTP validators per URL and seen review ids per source, stored as JSON."""
+
+    def __init__(self, path: str = DEFAULT_STATE_FILE, max_seen: int = 10000):
+        """
+        Initialize crawl state (loaded from path if it exists).
+
+        Args:
+            path: JSON state file
+            max_seen: Review ids kept per source (oldest are forgotten first)
+        """
+        self.path = Path(path)
+        self.max_seen = max_seen
+        self.validators: Dict[str, Dict[str, str]] = {}
+        # Insertion-ordered dicts: O(1) lookups and oldest-first eviction
+        self.seen: Dict[str, Dict[str, None]] = {}
+        self.load()
+
+    def load(self):
+        """Load state from disk (a missing or corrupt file starts a fresh crawl)."""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                content = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable crawl state {self.path}: {e}")
+            return
+        self.validators = content.get('validators', {})
+        self.seen = {source: dict.fromkeys(ids) for source, ids in content.get('seen', {}).items()}
+
+    def save(self):
+        """Write state to disk atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'validators': self.validators,
+                'seen': {source: list(ids) for source, ids in self.seen.items()}
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        logger.info(f"Crawl state saved to {self.path}")
+
+    # ========================================
+    # CONDITIONAL REQUESTS
+    # ========================================
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a previously fetched URL."""
+        validators = self.validators.get(url, {})
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def update_validators(self, url: str, headers) -> None:
+        """Remember the ETag / Last-Modified of a response (case-insensitive headers)."""
+        validators = {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified')
+        }
+        validators = {key: value for key, value in validators.items() if value}
+        if validators:
+            self.validators[url] = validators
+        else:
+            self.validators.pop(url, None)
+
+    # ========================================
+    # SEEN REVIEWS
+    # ========================================
+
+    def is_seen(self, source: str, review_id: str) -> bool:
+        return review_id in self.seen.get(source, {})
+
+    def mark_seen(self, source: str, review_ids: Iterable[str]) -> None:
+        """Record review ids of a source, forgetting the oldest past max_seen."""
+        seen = self.seen.setdefault(source, {})
+        for review_id in review_ids:
+            seen.pop(review_id, None)
+            seen[review_id] = None
+        for review_id in list(seen)[:max(0, len(seen) - self.max_seen)]:
+            del seen[review_id]
@@ -0,0 +1,97 @@
+"""
+Fast HTML parsing helpers on top of lxml.
+
+BeautifulSoup builds a Python object for every node of the page. The fast
+path parses with lxml.html (a C tree) and runs precompiled XPath queries,
+so Python objects are only created for the nodes a scraper actually reads.
+Selectors are compiled once per process and shared by every scraper.
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+from lxml import etree, html as lxml_html
+
+try:
+    from cssselect import GenericTranslator
+    CSSSELECT_AVAILABLE = True
+except ImportError:
+    CSSSELECT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PARSERS = ('soup', 'lxml')
+
+# What parse_html may still raise on unusable content (e.g. a page holding only a comment)
+PARSE_ERRORS = (etree.ParserError, ValueError)
+
+# lxml refuses str input carrying an encoding declaration, and its HTML
+# parser ignores the declaration of bytes input
+_XML_DECLARATION = re.compile(r'^\ufeff?\s*<\?xml[^>]*\?>')
+_XML_DECLARED_ENCODING = re.compile(rb'^(?:\xef\xbb\xbf)?\s*<\?xml[^>]*?encoding\s*=\s*["\']([A-Za-z0-9._-]+)["\']')
+
+_UPPER = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_LOWER = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def attr_contains(attribute: str, value: str) -> str:
+    """XPath predicate: attribute contains value, ignoring ASCII case (as `value in x.lower()`)."""
+    return f"contains(translate(@{attribute}, '{_UPPER}', '{_LOWER}'), '{value.lower()}')"
+
+
+@lru_cache(maxsize=256)
+def compile_selector(selector: str) -> etree.XPath:
+    """
+    Compile a selector once per process.
+
+    XPath expressions start with '/', '.' or '('; anything else is treated
+    as a CSS selector (requires cssselect).
+    """
+    if not selector.startswith(('/', '.', '(')):
+        if not CSSSELECT_AVAILABLE:
+            raise ImportError("cssselect is required for CSS selectors; use an XPath expression")
+        selector = GenericTranslator().css_to_xpath(selector, prefix='descendant-or-self::')
+    return etree.XPath(selector)
+
+
+def parse_html(content) -> lxml_html.HtmlElement:
+    """
+    Parse a page (bytes or str) into an lxml.html tree.
+
+    Bytes are decoded with the encoding of their XML declaration if any,
+    else as UTF-8 when valid: without a <meta charset>, libxml2 would read
+    them as Latin-1. Other encodings are left to lxml detection.
+    An empty or blank page gives an empty <html> document.
+    """
+    if isinstance(content, bytes):
+        declared = _XML_DECLARED_ENCODING.match(content)
+        encodings = (declared.group(1).decode('ascii'), 'utf-8') if declared else ('utf-8',)
+        for encoding in encodings:
+            try:
+                content = content.decode(encoding)
+                break
+            except (UnicodeDecodeError, LookupError):
+                continue
+    if isinstance(content, str):
+        content = _XML_DECLARATION.sub('', content, count=1)
+        if not content.strip():
+            return lxml_html.document_fromstring('<html></html>')
+    return lxml_html.document_fromstring(content)
+
+
+def select(node, selector: str) -> List:
+    """All matches of a selector under node."""
+    return compile_selector(selector)(node)
+
+
+def select_one(node, selector: str) -> Optional[object]:
+    """First match of a selector under node, or None."""
+    matches = compile_selector(selector)(node)
+    return matches[0] if matches else None
+
+
+def text_of(node) -> str:
+    """Text of an element with every fragment stripped, as BeautifulSoup get_text(strip=True)."""
+    return ''.join(fragment.strip() for fragment in node.itertext())
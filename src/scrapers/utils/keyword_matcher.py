@@ -0,0 +1,174 @@
+"""
+Multi-keyword matcher for lexicon-based text analysis.
+
+A lexicon maps categories to keywords. The matcher is compiled once per
+lexicon and returns every category hit in a single pass over the text,
+with the same semantics as `keyword in text` (substring, case-sensitive:
+callers lowercase the text as before).
+
+Backends:
+- 'ahocorasick': Aho-Corasick automaton in C (pyahocorasick, optional)
+- 'regex': one trie-structured regex; substring closure and overlap checks
+  keep results identical to per-keyword scans
+- 'scan': one `in` check per keyword, fastest in CPython for small lexicons
+"""
+
+import re
+import logging
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Below this many keywords, C-level substring scans beat the regex engine
+SCAN_THRESHOLD = 100
+
+BACKENDS = ('auto', 'ahocorasick', 'regex', 'scan')
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Build a regex where keywords sharing a prefix share a branch (longest match first)."""
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Compiled matcher over a {category: keywords} lexicon."""
+
+    def __init__(self, lexicon: Dict[str, Iterable[str]], backend: str = 'auto'):
+        """
+        Initialize the matcher.
+
+        Args:
+            lexicon: Keywords per category (a keyword may belong to several categories)
+            backend: 'auto', 'ahocorasick', 'regex' or 'scan'
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+
+        categories: Dict[str, Set[str]] = {}
+        for category, keywords in lexicon.items():
+            for keyword in keywords:
+                if keyword:
+                    categories.setdefault(keyword, set()).add(category)
+        self.categories: Dict[str, FrozenSet[str]] = {k: frozenset(v) for k, v in categories.items()}
+        self.keywords: List[str] = sorted(self.categories, key=lambda k: (-len(k), k))
+
+        if backend == 'auto':
+            if AHOCORASICK_AVAILABLE:
+                backend = 'ahocorasick'
+            else:
+                backend = 'scan' if len(self.keywords) < SCAN_THRESHOLD else 'regex'
+        elif backend == 'ahocorasick' and not AHOCORASICK_AVAILABLE:
+            raise ImportError("pyahocorasick is required for the 'ahocorasick' backend")
+        self.backend = backend
+
+        if backend == 'ahocorasick':
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+        elif backend == 'regex':
+            self._compile_regex()
+
+    @classmethod
+    def for_lexicon(cls, lexicon: Dict[str, Iterable[str]], backend: str = 'auto') -> 'KeywordMatcher':
+        """Return the shared matcher for this lexicon (compiled once per process)."""
+        frozen = tuple(sorted((category, frozenset(keywords)) for category, keywords in lexicon.items()))
+        return _cached_matcher(frozen, backend)
+
+    def _compile_regex(self):
+        self._pattern = re.compile(_trie_pattern(self.keywords)) if self.keywords else None
+
+        # Keywords found inside a match: its substrings, plus keywords that
+        # start inside it and run past its end (checked with startswith)
+        self._contained: Dict[str, Tuple[str, ...]] = {}
+        self._overlaps: Dict[str, Tuple[Tuple[str, int], ...]] = {}
+        for keyword in self.keywords:
+            self._contained[keyword] = tuple(other for other in self.keywords if other in keyword)
+            overlaps = []
+            for other in self.keywords:
+                if other in keyword:
+                    continue
+                for length in range(1, min(len(keyword), len(other) - 1) + 1):
+                    if keyword.endswith(other[:length]):
+                        overlaps.append((other, length))
+            self._overlaps[keyword] = tuple(overlaps)
+
+    # ========================================
+    # MATCHING
+    # ========================================
+
+    def find_keywords(self, text: str) -> Set[str]:
+        """Distinct keywords present in text."""
+        if not text:
+            return set()
+
+        if self.backend == 'scan':
+            return {keyword for keyword in self.keywords if keyword in text}
+
+        if self.backend == 'ahocorasick':
+            return {keyword for _, keyword in self._automaton.iter(text)}
+
+        found: Set[str] = set()
+        if self._pattern is None:
+            return found
+        for match in self._pattern.finditer(text):
+            keyword = match.group()
+            found.update(self._contained[keyword])
+            end = match.end()
+            for other, length in self._overlaps[keyword]:
+                if other not in found and text.startswith(other, end - length):
+                    found.update(self._contained[other])
+        return found
+
+    def match(self, text: str) -> Set[str]:
+        """Categories with at least one keyword in text."""
+        hits: Set[str] = set()
+        for keyword in self.find_keywords(text):
+            hits |= self.categories[keyword]
+        return hits
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords of each category present in text."""
+        counts: Dict[str, int] = {}
+        for keyword in self.find_keywords(text):
+            for category in self.categories[keyword]:
+                counts[category] = counts.get(category, 0) + 1
+        return counts
+
+    # ========================================
+    # BATCH
+    # ========================================
+
+    def match_batch(self, texts: Iterable[str]) -> List[Set[str]]:
+        """Categories hit by each text."""
+        return [self.match(text) for text in texts]
+
+    def count_batch(self, texts: Iterable[str]) -> List[Dict[str, int]]:
+        """Distinct keyword counts per category for each text."""
+        return [self.count(text) for text in texts]
+
+
+@lru_cache(maxsize=32)
+def _cached_matcher(frozen_lexicon, backend: str) -> KeywordMatcher:
+    return KeywordMatcher(dict(frozen_lexicon), backend=backend)
@@ -0,0 +1,148 @@
+"""
+Persistent, content-addressed cache of OCR / text extraction results.
+
+Results are keyed by the SHA-256 of the file bytes, the file type and the
+OCR configuration, so an upload seen before (under any name) is served
+without running Tesseract or PyPDF2 again, and changing the OCR settings
+invalidates old entries. Entries live in SQLite and the least recently
+used ones are evicted past max_entries or max_bytes.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_FILE = "data/ocr_cache.db"
+
+
+def cache_key(content: bytes, filename: str, config: str = "") -> str:
+    """SHA-256 of the file bytes, its extension and the extraction configuration."""
+    digest = hashlib.sha256(content)
+    extension = os.path.splitext(filename)[1].lower()
+    digest.update(b"\0" + extension.encode('utf-8') + b"\0" + config.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class OCRCache:
+    """LRU cache of extraction results stored in SQLite, safe across threads and processes."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE, max_entries: int = 5000,
+                 max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the cache (the SQLite file is created if needed).
+
+        Args:
+            path: SQLite file
+            max_entries: Entries kept (least recently used are evicted first)
+            max_bytes: Total size of the stored results
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_results (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_results_access ON ocr_results(last_access)")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached result for key, or None (a hit refreshes its LRU position)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM ocr_results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE ocr_results SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        try:
+            return pickle.loads(row[0])
+        except Exception as e:
+            logger.warning(f"Dropping unreadable OCR cache entry {key[:12]}: {e}")
+            self.delete(key)
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a result, then evict least recently used entries past the limits."""
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO ocr_results (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                    (key, blob, len(blob), time.time())
+                )
+                conn.execute("""
+                    DELETE FROM ocr_results WHERE key IN (
+                        SELECT key FROM (
+                            SELECT key,
+                                   ROW_NUMBER() OVER (ORDER BY last_access DESC, key) AS position,
+                                   SUM(size) OVER (ORDER BY last_access DESC, key) AS total
+                            FROM ocr_results
+                        ) WHERE position > ? OR total > ?
+                    )
+                """, (self.max_entries, self.max_bytes))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM ocr_results WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM ocr_results")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entries, stored bytes and hit rate of this process."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_results"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'bytes': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+    def close(self):
+        self._conn.close()
+
+
+# Caches shared by every OCRProcessor of this process (one per file)
+_ocr_caches: Dict[str, OCRCache] = {}
+_ocr_caches_lock = threading.Lock()
+
+
+def get_ocr_cache(path: str = DEFAULT_CACHE_FILE) -> OCRCache:
+    """Return the process-wide cache for a SQLite file (it survives Streamlit reruns)."""
+    with _ocr_caches_lock:
+        cache = _ocr_caches.get(path)
+        if cache is None:
+            cache = OCRCache(path)
+            _ocr_caches[path] = cache
+        return cache
@@ -1,59 +1,208 @@
 """
-Rate limiter for respectful web scraping.
+Rate limiter for respectful web scraping and API connectors.
 
 Ensures requests are spaced out to avoid overwhelming servers.
+
+A token bucket where each caller reserves its token under a short lock and
+then sleeps outside of it, so the same limiter can be shared by threads
+(wait), asyncio tasks (acquire) and, with a SQLite state file, by several
+processes on the same host.
 """
 
 import time
-from typing import Optional
+import asyncio
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
 import logging
 
+import requests
+
 logger = logging.getLogger(__name__)
 
+# Shared state file used by get_rate_limiter when none is given (unset = per process)
+STATE_PATH_ENV = 'RATE_LIMIT_STATE_PATH'
+
+
+class _SharedBucket:
+    """Token bucket stored in SQLite, updated in one write transaction per reservation."""
+
+    def __init__(self, path: str, key: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.key = key
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def reserve(self, min_interval: float, burst: int) -> float:
+        """Take one token and return the delay before it may be used."""
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Read the clock once the write lock is held, so it is never behind
+            # the last update (CLOCK_MONOTONIC is system-wide on one host)
+            now = time.monotonic()
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limits WHERE key = ?", (self.key,)
+            ).fetchone()
+            if row is None or row[1] > now:
+                # New bucket, or state left by a previous boot
+                tokens = burst
+            else:
+                tokens = min(burst, row[0] + (now - row[1]) / min_interval)
+            tokens -= 1
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (self.key, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return max(0.0, -tokens * min_interval)
+
+    def close(self):
+        self._conn.close()
+
 
 class RateLimiter:
-    """Simple rate limiter for web scraping."""
-    
-    def __init__(self, requests_per_second: float = 1.0, burst: int = 1):
+    """Token bucket rate limiter, safe for threads, asyncio tasks and processes."""
+
+    def __init__(
+        self,
+        requests_per_second: float = 1.0,
+        burst: int = 1,
+        state_path: Optional[str] = None,
+        key: str = 'default'
+    ):
         """
         Initialize rate limiter.
-        
+
         Args:
             requests_per_second: Maximum requests per second
             burst: Number of requests allowed in burst
+            state_path: SQLite file holding the bucket, to share it between
+                processes (None = bucket local to this process)
+            key: Name of the bucket in the state file
         """
         self.min_interval = 1.0 / requests_per_second
         self.burst = burst
+        self.key = key
         self.last_request_time = 0
         self.tokens = burst
-        self.last_token_update = time.time()
-    
+        self.last_token_update = time.monotonic()
+        self._lock = threading.Lock()
+        self._shared = _SharedBucket(state_path, key) if state_path else None
+
+    def _reserve(self) -> float:
+        """
+        Consume a token, possibly ahead of time.
+
+        Returns:
+            Seconds to wait before the request may be sent
+        """
+        with self._lock:
+            current_time = time.monotonic()
+            self.last_request_time = current_time
+            if self._shared is not None:
+                return self._shared.reserve(self.min_interval, self.burst)
+
+            # Refill tokens based on time elapsed
+            time_since_update = max(0.0, current_time - self.last_token_update)
+            tokens_to_add = time_since_update / self.min_interval
+            self.tokens = min(self.burst, self.tokens + tokens_to_add)
+            self.last_token_update = current_time
+
+            # A negative balance is the queue of callers already waiting
+            self.tokens -= 1
+            return max(0.0, -self.tokens * self.min_interval)
+
     def wait(self):
         """Wait if necessary before making next request."""
-        current_time = time.time()
-        
-        # Refill tokens based on time elapsed
-        time_since_update = current_time - self.last_token_update
-        tokens_to_add = time_since_update / self.min_interval
-        self.tokens = min(self.burst, self.tokens + tokens_to_add)
-        self.last_token_update = current_time
-        
-        # If no tokens available, wait
-        if self.tokens < 1:
-            wait_time = (1 - self.tokens) * self.min_interval
+        wait_time = self._reserve()
+        if wait_time > 0:
             logger.debug(f"Rate limiting: waiting {wait_time:.2f}s")
             time.sleep(wait_time)
-            self.tokens = 1
-        
-        # Consume a token
-        self.tokens -= 1
-        self.last_request_time = current_time
-    
+
+    async def acquire(self):
+        """Wait without blocking the event loop before making next request."""
+        wait_time = self._reserve()
+        if wait_time > 0:
+            logger.debug(f"Rate limiting: waiting {wait_time:.2f}s")
+            await asyncio.sleep(wait_time)
+
     def __enter__(self):
         """Context manager entry."""
         self.wait()
         return self
-    
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
         pass
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        pass
+
+
+class RateLimitedSession(requests.Session):
+    """requests.Session that waits for its rate limiter before every request."""
+
+    def __init__(self, rate_limiter: RateLimiter):
+        super().__init__()
+        self.rate_limiter = rate_limiter
+
+    def request(self, *args, **kwargs):
+        self.rate_limiter.wait()
+        return super().request(*args, **kwargs)
+
+
+# Limiters shared by every scraper / connector of this process
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    key: str,
+    requests_per_second: float = 1.0,
+    burst: int = 1,
+    state_path: Optional[str] = None
+) -> RateLimiter:
+    """
+    Return the process-wide limiter for a key (created on first use).
+
+    With state_path (or the RATE_LIMIT_STATE_PATH environment variable), the
+    bucket is stored in SQLite and shared by every process using that file.
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(
+                requests_per_second=requests_per_second,
+                burst=burst,
+                state_path=state_path or os.getenv(STATE_PATH_ENV),
+                key=key
+            )
+            _rate_limiters[key] = limiter
+        return limiter
+
+
+def reset_rate_limiters():
+    """Forget shared limiters (tests)."""
+    with _rate_limiters_lock:
+        for limiter in _rate_limiters.values():
+            if limiter._shared is not None:
+                limiter._shared.close()
+        _rate_limiters.clear()
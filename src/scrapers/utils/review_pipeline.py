@@ -0,0 +1,309 @@
+"""
+Streaming analysis pipeline for scraped reviews.
+
+Reviews are read one line at a time from a JSON Lines file, grouped into
+chunks and analyzed in worker processes (pattern extraction and sentiment
+with DisputePatternExtractor). Workers return partial statistics instead of
+per-review results, and the parent merges them as they complete, so memory
+stays bounded by the number of chunks in flight whatever the corpus size.
+"""
+
+import json
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .text_processor import DisputePatternExtractor
+
+logger = logging.getLogger(__name__)
+
+PATTERN_FLAGS = {
+    'delays': 'has_delay',
+    'losses': 'has_loss',
+    'damages': 'has_damage',
+    'proof_issues': 'has_proof_issue'
+}
+
+# Common French stopwords excluded from keyword counts
+STOPWORDS = {
+    'le', 'la', 'les', 'de', 'du', 'des', 'un', 'une',
+    'et', 'ou', 'mais', 'donc', 'car', 'que', 'qui',
+    'cette', 'ce', 'ces', 'mon', 'ma', 'mes', 'ton', 'ta',
+    'son', 'sa', 'ses', 'je', 'tu', 'il', 'elle', 'nous',
+    'vous', 'ils', 'elles', 'dans', 'sur', 'pour', 'par',
+    'avec', 'sans', 'est', 'sont', 'été', 'avoir', 'être'
+}
+
+PUNCTUATION = '.,!?;:()[]{}"\''
+
+# Distinct keywords kept in memory before the rarest are pruned
+MAX_KEYWORDS = 200_000
+
+
+def extract_keywords(text: str) -> List[str]:
+    """Lowercased words longer than 3 characters, without punctuation or stopwords."""
+    return [
+        word.strip(PUNCTUATION)
+        for word in text.lower().split()
+        if len(word) > 3 and word.strip(PUNCTUATION) not in STOPWORDS
+    ]
+
+
+def _mean(counter: Counter) -> float:
+    total = sum(counter.values())
+    return sum(value * count for value, count in counter.items()) / total if total else 0
+
+
+def _median(counter: Counter) -> float:
+    """Median of the values of a {value: occurrences} counter (as statistics.median)."""
+    total = sum(counter.values())
+    if not total:
+        return 0
+    lower_rank, upper_rank = (total - 1) // 2, total // 2
+    lower = upper = None
+    seen = 0
+    for value in sorted(counter):
+        seen += counter[value]
+        if lower is None and seen > lower_rank:
+            lower = value
+        if seen > upper_rank:
+            upper = value
+            break
+    return lower if lower_rank == upper_rank else (lower + upper) / 2
+
+
+# ========================================
+# INPUT
+# ========================================
+
+def iter_reviews(path: str) -> Iterator[Dict]:
+    """
+    Stream reviews from a JSON Lines file (one review object per line).
+
+    Legacy .json exports ({'data': [...]}, see BaseScraper.save_data) are
+    still accepted but have to be loaded in full.
+    """
+    path = Path(path)
+    if path.suffix != '.jsonl':
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f).get('data', [])
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping malformed review at {path}:{line_number}: {e}")
+
+
+def convert_to_jsonl(json_path: str, jsonl_path: Optional[str] = None) -> Path:
+    """
+    Convert a legacy {'data': [...]} export to JSON Lines.
+
+    Returns:
+        Path of the JSON Lines file (same name with .jsonl by default)
+    """
+    output_path = Path(jsonl_path) if jsonl_path else Path(json_path).with_suffix('.jsonl')
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for review in iter_reviews(json_path):
+            f.write(json.dumps(review, ensure_ascii=False) + '\n')
+            count += 1
+    logger.info(f"Converted {count} reviews to {output_path}")
+    return output_path
+
+
+# ========================================
+# AGGREGATION
+# ========================================
+
+class ReviewStats:
+    """Mergeable statistics over a set of reviews."""
+
+    def __init__(self):
+        self.total = 0
+        self.carriers = Counter()
+        self.ratings = Counter()
+        self.patterns = Counter()
+        self.delays = Counter()
+        self.severity = Counter()
+        self.sentiment = Counter()
+        self.keywords = Counter()
+
+    def add(self, review: Dict, patterns: Dict, sentiment: str):
+        """Account for one review and its extracted patterns."""
+        self.total += 1
+        self.carriers[review.get('carrier')] += 1
+        self.ratings[review.get('rating', 0)] += 1
+        for name, flag in PATTERN_FLAGS.items():
+            if patterns.get(flag):
+                self.patterns[name] += 1
+        for delay in patterns.get('delay_mentions', []):
+            self.delays[DisputePatternExtractor.delay_in_days(delay)] += 1
+        self.severity[patterns.get('severity_score', 0)] += 1
+        self.sentiment[sentiment] += 1
+        self.keywords.update(extract_keywords(review.get('text', '')))
+
+    def merge(self, other: 'ReviewStats', max_keywords: int = MAX_KEYWORDS) -> 'ReviewStats':
+        """
+        Add the counts of another partial result.
+
+        When more than max_keywords distinct keywords are tracked, the rarest
+        half is dropped: top keywords stay exact unless the vocabulary is
+        dominated by words seen only a few times.
+        """
+        self.total += other.total
+        for name in ('carriers', 'ratings', 'patterns', 'delays', 'severity', 'sentiment', 'keywords'):
+            getattr(self, name).update(getattr(other, name))
+        if len(self.keywords) > max_keywords:
+            self.keywords = Counter(dict(self.keywords.most_common(max_keywords // 2)))
+        return self
+
+    def to_dict(self) -> Dict:
+        """Results in the format of TrustpilotDataAnalyzer.analyze_all."""
+        total = self.total
+        pattern_statistics = {name: self.patterns[name] for name in PATTERN_FLAGS}
+        pattern_statistics['percentages'] = {
+            name: (count / total * 100) if total > 0 else 0
+            for name, count in pattern_statistics.items()
+        }
+
+        delay_statistics = {'count': sum(self.delays.values())}
+        if self.delays:
+            delay_statistics.update({
+                'average_days': _mean(self.delays),
+                'median_days': _median(self.delays),
+                'min_days': min(self.delays),
+                'max_days': max(self.delays)
+            })
+
+        severity_analysis = {}
+        if self.severity:
+            distribution = Counter()
+            for score, count in self.severity.items():
+                distribution[round(score)] += count
+            severity_analysis = {
+                'average': _mean(self.severity),
+                'median': _median(self.severity),
+                'min': min(self.severity),
+                'max': max(self.severity),
+                'distribution': dict(distribution)
+            }
+
+        return {
+            'total_reviews': total,
+            'carrier_distribution': dict(self.carriers),
+            'rating_distribution': {
+                'distribution': dict(self.ratings),
+                'average': _mean(self.ratings),
+                'median': _median(self.ratings)
+            },
+            'pattern_statistics': pattern_statistics,
+            'delay_statistics': delay_statistics,
+            'severity_analysis': severity_analysis,
+            'sentiment_distribution': dict(self.sentiment),
+            'top_keywords': dict(self.keywords.most_common(30))
+        }
+
+
+# ========================================
+# WORKERS
+# ========================================
+
+# Extractor of each pool process (matchers compiled once)
+_worker_extractor = None
+
+
+def _init_worker():
+    global _worker_extractor
+    _worker_extractor = DisputePatternExtractor()
+
+
+def _analyze_chunk(reviews: List[Dict]) -> ReviewStats:
+    """Extract patterns and sentiment of a chunk of reviews and return its statistics."""
+    global _worker_extractor
+    if _worker_extractor is None:
+        _init_worker()
+
+    texts = [review.get('text', '') for review in reviews]
+    stats = ReviewStats()
+    for review, text, patterns in zip(reviews, texts, _worker_extractor.extract_patterns_batch(texts)):
+        stats.add(review, patterns, _worker_extractor.analyze_sentiment(text))
+    return stats
+
+
+def _chunks(reviews: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    iterator = iter(reviews)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ReviewAnalysisPipeline:
+    """Analyze a stream of reviews over a process pool."""
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 1000,
+                 max_pending: Optional[int] = None, max_keywords: int = MAX_KEYWORDS):
+        """
+        Initialize the pipeline.
+
+        Args:
+            workers: Worker processes (default: CPU count, 1 = analyze in-process)
+            chunk_size: Reviews sent to a worker at once
+            max_pending: Chunks in flight at most (default: 2 per worker)
+            max_keywords: Distinct keywords kept before pruning (see ReviewStats.merge)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.max_pending = max_pending or 2 * self.workers
+        self.max_keywords = max_keywords
+
+    def run(self, reviews: Iterable[Dict]) -> Dict:
+        """
+        Analyze reviews from any iterable (consumed lazily).
+
+        Returns:
+            Results as TrustpilotDataAnalyzer.analyze_all, plus
+            'sentiment_distribution' and 'elapsed'
+        """
+        start = time.perf_counter()
+        stats = ReviewStats()
+        chunks = _chunks(reviews, self.chunk_size)
+
+        if self.workers <= 1:
+            for chunk in chunks:
+                stats.merge(_analyze_chunk(chunk), self.max_keywords)
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as pool:
+                pending = set()
+                for chunk in chunks:
+                    pending.add(pool.submit(_analyze_chunk, chunk))
+                    if len(pending) >= self.max_pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            stats.merge(future.result(), self.max_keywords)
+                for future in wait(pending).done:
+                    stats.merge(future.result(), self.max_keywords)
+
+        results = stats.to_dict()
+        results['elapsed'] = round(time.perf_counter() - start, 3)
+        logger.info(
+            f"Analyzed {stats.total} reviews in {results['elapsed']}s "
+            f"({self.workers} workers, chunks of {self.chunk_size})"
+        )
+        return results
+
+    def run_file(self, path: str) -> Dict:
+        """Analyze a JSON Lines review file (see iter_reviews)."""
+        return self.run(iter_reviews(path))
@@ -5,10 +5,12 @@ Uses regex and keyword matching to identify common dispute patterns.
 """
 
 import re
-from typing import Dict, List, Set
+from typing import Dict, List
 from collections import Counter
 import logging
 
+from .keyword_matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,10 +49,35 @@ class DisputePatternExtractor:
         'relais colis': ['relais colis', 'relaiscolis']
     }
     
+    NEGATIVE_WORDS = {
+        'horrible', 'catastrophe', 'nul', 'mauvais', 'incompétent',
+        'arnaque', 'scandaleux', 'inadmissible', 'désastreux'
+    }
+    
+    POSITIVE_WORDS = {
+        'excellent', 'parfait', 'super', 'rapide', 'efficace',
+        'professionnel', 'satisfait', 'content'
+    }
+    
     def __init__(self):
         """Initialize the pattern extractor."""
+        # One matcher for every keyword category, compiled once per lexicon
+        lexicon = {
+            'delay': self.DELAY_KEYWORDS,
+            'loss': self.LOSS_KEYWORDS,
+            'damage': self.DAMAGE_KEYWORDS,
+            'proof': self.PROOF_KEYWORDS,
+        }
+        lexicon.update({f'carrier:{name}': keywords for name, keywords in self.CARRIERS.items()})
+        self.keyword_matcher = KeywordMatcher.for_lexicon(lexicon)
+        self.sentiment_matcher = KeywordMatcher.for_lexicon({
+            'negative': self.NEGATIVE_WORDS,
+            'positive': self.POSITIVE_WORDS
+        })
+        # Starts on the digits (no optional "retard de" prefix, which captured
+        # nothing) so the regex engine can skip ahead to the next digit
         self.delay_pattern = re.compile(
-            r'(?:retard\s*de\s*)?(\d+)\s*(jours?|semaines?|heures?|mois)(?:\s*de\s*retard)?',
+            r'(\d+)\s*(jours?|semaines?|heures?|mois)(?:\s*de\s*retard)?',
             re.IGNORECASE
         )
         self.amount_pattern = re.compile(
@@ -69,15 +96,16 @@ class DisputePatternExtractor:
             Dictionary with extracted patterns
         """
         text_lower = text.lower()
+        hits = self.keyword_matcher.match(text_lower)
         
         patterns = {
-            'has_delay': self._detect_keywords(text_lower, self.DELAY_KEYWORDS),
-            'has_loss': self._detect_keywords(text_lower, self.LOSS_KEYWORDS),
-            'has_damage': self._detect_keywords(text_lower, self.DAMAGE_KEYWORDS),
-            'has_proof_issue': self._detect_keywords(text_lower, self.PROOF_KEYWORDS),
+            'has_delay': 'delay' in hits,
+            'has_loss': 'loss' in hits,
+            'has_damage': 'damage' in hits,
+            'has_proof_issue': 'proof' in hits,
             'delay_mentions': self._extract_delays(text),
             'amount_mentions': self._extract_amounts(text),
-            'carriers': self._extract_carriers(text_lower),
+            'carriers': [name for name in self.CARRIERS if f'carrier:{name}' in hits],
             'severity_score': 0
         }
         
@@ -92,9 +120,17 @@ class DisputePatternExtractor:
         
         return patterns
     
-    def _detect_keywords(self, text: str, keywords: Set[str]) -> bool:
-        """Check if any keyword is present in text."""
-        return any(keyword in text for keyword in keywords)
+    def extract_patterns_batch(self, texts: List[str]) -> List[Dict]:
+        """
+        Extract dispute patterns from many texts.
+        
+        Args:
+            texts: Review or post texts
+            
+        Returns:
+            One patterns dictionary per text, as extract_patterns
+        """
+        return [self.extract_patterns(text) for text in texts]
     
     def _extract_delays(self, text: str) -> List[Dict[str, str]]:
         """
@@ -114,6 +150,29 @@ class DisputePatternExtractor:
         
         return delays
     
+    @staticmethod
+    def delay_in_days(delay: Dict) -> float:
+        """
+        Convert a delay mention from _extract_delays to days.
+        
+        Args:
+            delay: Dictionary with 'value' and 'unit'
+            
+        Returns:
+            Delay in days (hours / 24, weeks * 7, months * 30)
+        """
+        value = delay['value']
+        unit = delay['unit']
+        
+        if 'heure' in unit:
+            return value / 24
+        elif 'semaine' in unit:
+            return value * 7
+        elif 'mois' in unit:
+            return value * 30
+        else:  # jours
+            return value
+    
     def _extract_amounts(self, text: str) -> List[float]:
         """
         Extract monetary amounts mentioned.
@@ -134,21 +193,6 @@ class DisputePatternExtractor:
         
         return amounts
     
-    def _extract_carriers(self, text: str) -> List[str]:
-        """
-        Extract mentioned carriers.
-        
-        Returns:
-            List of standardized carrier names
-        """
-        found_carriers = []
-        
-        for carrier_name, keywords in self.CARRIERS.items():
-            if any(keyword in text for keyword in keywords):
-                found_carriers.append(carrier_name)
-        
-        return found_carriers
-    
     def analyze_sentiment(self, text: str) -> str:
         """
         Simple sentiment analysis based on keywords.
@@ -156,20 +200,9 @@ class DisputePatternExtractor:
         Returns:
             'negative', 'neutral', or 'positive'
         """
-        negative_words = {
-            'horrible', 'catastrophe', 'nul', 'mauvais', 'incompétent',
-            'arnaque', 'scandaleux', 'inadmissible', 'désastreux'
-        }
-        
-        positive_words = {
-            'excellent', 'parfait', 'super', 'rapide', 'efficace',
-            'professionnel', 'satisfait', 'content'
-        }
-        
-        text_lower = text.lower()
-        
-        neg_count = sum(1 for word in negative_words if word in text_lower)
-        pos_count = sum(1 for word in positive_words if word in text_lower)
+        counts = self.sentiment_matcher.count(text.lower())
+        neg_count = counts.get('negative', 0)
+        pos_count = counts.get('positive', 0)
         
         # Threshold lowered for short texts
         if neg_count > pos_count:
@@ -189,7 +222,7 @@ class DisputePatternExtractor:
         Returns:
             Dictionary with aggregate statistics
         """
-        all_patterns = [self.extract_patterns(text) for text in texts]
+        all_patterns = self.extract_patterns_batch(texts)
         
         # Aggregate carriers
         all_carriers = []
@@ -199,23 +232,11 @@ class DisputePatternExtractor:
         carrier_counts = Counter(all_carriers)
         
         # Aggregate delays
-        all_delays = []
-        for p in all_patterns:
-            for delay in p['delay_mentions']:
-                # Convert to days
-                value = delay['value']
-                unit = delay['unit']
-                
-                if 'heure' in unit:
-                    days = value / 24
-                elif 'semaine' in unit:
-                    days = value * 7
-                elif 'mois' in unit:
-                    days = value * 30
-                else:  # jours
-                    days = value
-                
-                all_delays.append(days)
+        all_delays = [
+            self.delay_in_days(delay)
+            for p in all_patterns
+            for delay in p['delay_mentions']
+        ]
         
         return {
             'total_reviews': len(texts),
@@ -45,6 +45,15 @@ class CloudSyncManager:
         except Exception as e:
             db_success = False
             results.append(f"DB Error: {str(e)}")
+        
+        # 1b. Lignes importées en SQL direct : agrégats recalculés en une fois
+        if db_success:
+            try:
+                from src.database.database_manager import DatabaseManager
+                refreshed = DatabaseManager().refresh_client_statistics(full=True)
+                results.append(f"Stats: {refreshed} clients recalculés")
+            except Exception as e:
+                results.append(f"Stats Error: {str(e)}")
 
         # 2. Sync Fichiers
         try:
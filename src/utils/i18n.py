@@ -163,6 +163,7 @@ def get_i18n_text(key: str, lang: str = None) -> str:
             # Legal (existing)
             'legal_header_from': 'EXPÉDITEUR :',
             'legal_header_to': 'DESTINATAIRE :',
+            'legal_title': 'Mise en demeure',
             'legal_header_subject': 'OBJET : MISE EN DEMEURE POUR DÉFAUT D\'INDEMNISATION',
             'legal_ref_claim': 'Réf. Réclamation :',
             'legal_ref_tracking': 'Réf. Colis (Tracking) :',
@@ -244,6 +245,7 @@ def get_i18n_text(key: str, lang: str = None) -> str:
             # Legal (existing)
             'legal_header_from': 'SENDER:',
             'legal_header_to': 'RECIPIENT:',
+            'legal_title': 'Formal Notice',
             'legal_header_subject': 'SUBJECT: FORMAL NOTICE FOR NON-PAYMENT OF COMPENSATION',
             'legal_ref_claim': 'Claim Ref:',
             'legal_ref_tracking': 'Tracking Ref:',
@@ -328,6 +330,7 @@ def get_i18n_text(key: str, lang: str = None) -> str:
             # Legal
             'legal_header_from': 'ABSENDER:',
             'legal_header_to': 'EMPFÄNGER:',
+            'legal_title': 'Mahnung',
             'legal_header_subject': 'BETREFF: MAHNUNG WEGEN FEHLENDER ENTSCHÄDIGUNG',
             'legal_ref_claim': 'Reklamations-Nr:',
             'legal_ref_tracking': 'Sendungsnummer:',
@@ -379,6 +382,7 @@ def get_i18n_text(key: str, lang: str = None) -> str:
             # Legal
             'legal_header_from': 'MITTENTE:',
             'legal_header_to': 'DESTINATARIO:',
+            'legal_title': 'Messa in mora',
             'legal_header_subject': 'OGGETTO: MESSA IN MORA PER MANCATO INDENNIZZO',
             'legal_ref_claim': 'Rif. Reclamo:',
             'legal_ref_tracking': 'Rif. Spedizione:',
@@ -430,6 +434,7 @@ def get_i18n_text(key: str, lang: str = None) -> str:
             # Legal
             'legal_header_from': 'REMITENTE:',
             'legal_header_to': 'DESTINATARIO:',
+            'legal_title': 'Requerimiento formal',
             'legal_header_subject': 'ASUNTO: REQUERIMIENTO FORMAL POR FALTA DE INDEMNIZACIÓN',
             'legal_ref_claim': 'Ref. Reclamación:',
             'legal_ref_tracking': 'Ref. Seguimiento:',
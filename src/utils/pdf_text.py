@@ -0,0 +1,107 @@
+"""
+Extraction de texte PDF page par page.
+
+Les pages sont extraites à la demande : l'appelant peut s'arrêter dès qu'il
+a trouvé ce qu'il cherche sans payer l'extraction du reste du document.
+Au-delà de PARALLEL_MIN_PAGES pages, l'extraction (PyPDF2, pur Python)
+est répartie par lots de pages sur un pool de processus, chaque process
+ouvrant le document une seule fois ; les pages restent livrées dans l'ordre.
+"""
+
+import io
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator, List, Optional
+
+try:
+    from PyPDF2 import PdfReader
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# En dessous, le démarrage du pool coûte plus que l'extraction elle-même
+PARALLEL_MIN_PAGES = 24
+PAGES_PER_TASK = 8
+
+
+def read_source_bytes(source: Any) -> bytes:
+    """Octets d'un chemin, d'un buffer (remis au début) ou de bytes."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, 'read'):
+        content = source.read()
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return content
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def _page_text(page) -> str:
+    return page.extract_text() or ""
+
+
+def iter_pdf_pages(source: Any, workers: Optional[int] = None,
+                   parallel_min_pages: int = PARALLEL_MIN_PAGES) -> Iterator[str]:
+    """
+    Texte de chaque page d'un PDF, dans l'ordre, extrait à la demande.
+
+    Args:
+        source: Chemin, buffer (UploadedFile Streamlit) ou bytes du PDF
+        workers: Process d'extraction pour les longs documents
+            (défaut : nombre de CPU, 1 = pas de pool)
+        parallel_min_pages: Nombre de pages à partir duquel le pool est utilisé
+
+    Raises:
+        ImportError: PyPDF2 absent
+    """
+    if not PYPDF2_AVAILABLE:
+        raise ImportError("PyPDF2 is required for PDF text extraction")
+    content = read_source_bytes(source)
+    reader = PdfReader(io.BytesIO(content))
+    page_count = len(reader.pages)
+    workers = min(workers or os.cpu_count() or 1, -(-page_count // PAGES_PER_TASK))
+
+    if workers <= 1 or page_count < parallel_min_pages:
+        for page in reader.pages:
+            yield _page_text(page)
+        return
+
+    ranges = deque((start, min(start + PAGES_PER_TASK, page_count))
+                   for start in range(0, page_count, PAGES_PER_TASK))
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker, initargs=(content,))
+    pending = deque()
+    try:
+        while ranges or pending:
+            # Quelques lots d'avance par process, pas tout le document
+            while ranges and len(pending) < workers * 2:
+                pending.append(pool.submit(_extract_page_range, ranges.popleft()))
+            yield from pending.popleft().result()
+    finally:
+        # Arrêt anticipé de l'appelant : les lots pas encore commencés sont abandonnés
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def extract_pdf_text(source: Any, workers: Optional[int] = None) -> str:
+    """Texte complet d'un PDF, pages séparées par un saut de ligne (assemblé en une fois)."""
+    return "\n".join(iter_pdf_pages(source, workers=workers))
+
+
+# Document ouvert une fois par process du pool
+_worker_reader = None
+
+
+def _init_pdf_worker(content: bytes):
+    """Ouvre le PDF une seule fois par process du pool."""
+    global _worker_reader
+    _worker_reader = PdfReader(io.BytesIO(content))
+
+
+def _extract_page_range(page_range) -> List[str]:
+    """Texte des pages [début, fin) du document du process."""
+    start, end = page_range
+    return [_page_text(_worker_reader.pages[i]) for i in range(start, end)]
@@ -1,24 +1,83 @@
 
+import os
 import logging
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from src.database.database_manager import DatabaseManager
 from src.database.escalation_logger import EscalationLogger
+from src.automation.deadline_scheduler import DeadlineScheduler, get_deadline_scheduler
 from src.email_service.escalation_email_handler import EscalationEmailHandler
-from src.reports.legal_document_generator import LegalDocumentGenerator
+from src.reports.legal_document_generator import LegalDocumentGenerator, formal_notice_language
 
 logger = logging.getLogger(__name__)
 
-def execute_status_request(claim: Dict[str, Any]):
+class WorkerContext:
+    """
+    Ressources partagées par toutes les tâches d'un même process worker.
+
+    Les objets coûteux (schéma BDD, templates, styles PDF, tables de log)
+    sont construits une seule fois puis injectés dans chaque tâche.
+    """
+
+    def __init__(self, db: DatabaseManager = None,
+                 email_handler: EscalationEmailHandler = None,
+                 escalation_logger: EscalationLogger = None,
+                 generator: LegalDocumentGenerator = None,
+                 scheduler: DeadlineScheduler = None):
+        self.pid = os.getpid()
+        self.db = db or DatabaseManager()
+        self.email_handler = email_handler or EscalationEmailHandler()
+        self.escalation_logger = escalation_logger or EscalationLogger()
+        self._generator = generator
+        self._scheduler = scheduler
+
+    @property
+    def generator(self) -> LegalDocumentGenerator:
+        """Générateur PDF (uniquement nécessaire pour les mises en demeure), en mode template."""
+        if self._generator is None:
+            self._generator = LegalDocumentGenerator(use_templates=True)
+        return self._generator
+
+    @property
+    def scheduler(self) -> DeadlineScheduler:
+        """Planificateur d'échéances sur la même BDD."""
+        if self._scheduler is None:
+            self._scheduler = get_deadline_scheduler(self.db)
+        return self._scheduler
+
+
+# Contexte du process courant
+_worker_context = None
+
+def get_worker_context() -> WorkerContext:
+    """Obtenir le contexte du process worker (recréé après un fork)."""
+    global _worker_context
+    if _worker_context is None or _worker_context.pid != os.getpid():
+        _worker_context = WorkerContext()
+    return _worker_context
+
+def _schedule_next_deadline(ctx: WorkerContext, claim: Dict[str, Any], follow_up_level: int):
+    """Enregistre la prochaine échéance du dossier après une escalade."""
+    if not claim.get('submitted_at'):
+        return
+    try:
+        ctx.scheduler.schedule_claim(
+            claim['id'], claim['carrier'], claim['submitted_at'], follow_up_level=follow_up_level
+        )
+    except Exception as e:
+        logger.error(f"WORKER: Could not schedule next deadline for {claim['claim_reference']}: {e}")
+
+def execute_status_request(claim: Dict[str, Any], context: Optional[WorkerContext] = None):
     """
     Worker function to execute a J+7 Status Request.
     """
     logger.info(f"WORKER: Processing Status Request for {claim['claim_reference']}")
     
-    db = DatabaseManager()
-    email_handler = EscalationEmailHandler()
-    escalation_logger = EscalationLogger()
+    ctx = context or get_worker_context()
+    db = ctx.db
+    email_handler = ctx.email_handler
+    escalation_logger = ctx.escalation_logger
     
     # Logic copied and adapted from FollowUpManager
     country = claim.get('country', 'FR')
@@ -38,18 +97,20 @@ def execute_status_request(claim: Dict[str, Any]):
         db.update_claim(claim['id'], 
                        follow_up_level=1, 
                        last_follow_up_at=datetime.now())
+        _schedule_next_deadline(ctx, claim, follow_up_level=1)
     else:
         raise Exception("Email sending failed")
 
-def execute_warning(claim: Dict[str, Any]):
+def execute_warning(claim: Dict[str, Any], context: Optional[WorkerContext] = None):
     """
     Worker function to execute a J+14 Warning.
     """
     logger.info(f"WORKER: Processing Warning for {claim['claim_reference']}")
     
-    db = DatabaseManager()
-    email_handler = EscalationEmailHandler()
-    escalation_logger = EscalationLogger()
+    ctx = context or get_worker_context()
+    db = ctx.db
+    email_handler = ctx.email_handler
+    escalation_logger = ctx.escalation_logger
     
     country = claim.get('country', 'FR')
     lang = 'FR' if country == 'FR' else 'EN'
@@ -68,25 +129,31 @@ def execute_warning(claim: Dict[str, Any]):
         db.update_claim(claim['id'], 
                        follow_up_level=2, 
                        last_follow_up_at=datetime.now())
+        _schedule_next_deadline(ctx, claim, follow_up_level=2)
     else:
         raise Exception("Email sending failed")
 
-def execute_formal_notice(claim: Dict[str, Any]):
+def execute_formal_notice(claim: Dict[str, Any], pdf_path: Optional[str] = None,
+                          context: Optional[WorkerContext] = None):
     """
     Worker function to execute a J+21 Formal Notice.
+
+    pdf_path: Mise en demeure déjà générée avec le lot planifié
+    (FollowUpManager) ; générée ici si absente.
     """
     logger.info(f"WORKER: Processing Formal Notice for {claim['claim_reference']}")
     
-    db = DatabaseManager()
-    email_handler = EscalationEmailHandler()
-    escalation_logger = EscalationLogger()
-    generator = LegalDocumentGenerator()
+    ctx = context or get_worker_context()
+    db = ctx.db
+    email_handler = ctx.email_handler
+    escalation_logger = ctx.escalation_logger
+    generator = ctx.generator
     
-    country = claim.get('country', 'FR')
-    lang = 'FR' if country == 'FR' else 'EN'
+    lang = formal_notice_language(claim)
     
-    # 1. Generate PDF
-    pdf_path = generator.generate_formal_notice(claim, lang=lang)
+    # 1. Generate PDF (unless already generated with the planned batch)
+    if not pdf_path or not os.path.exists(pdf_path):
+        pdf_path = generator.generate_formal_notice(claim, lang=lang)
     
     escalation_logger.log_pdf_generation(
         claim_id=claim['id'],
@@ -116,5 +183,6 @@ def execute_formal_notice(claim: Dict[str, Any]):
                        follow_up_level=3, 
                        last_follow_up_at=datetime.now(),
                        automation_status='action_required')
+        _schedule_next_deadline(ctx, claim, follow_up_level=3)
     else:
         raise Exception("Email sending failed")
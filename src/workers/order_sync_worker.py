@@ -3,9 +3,10 @@ Backend worker for automatic order synchronization and dispute detection.
 
 This worker runs periodically to:
 1. Fetch new orders from connected e-commerce platforms
-2. Analyze orders for potential disputes
-3. Update client dashboards
-4. Send notifications
+2. Check orders against the global fraud registry
+3. Analyze orders for potential disputes
+4. Update client dashboards
+5. Send notifications
 """
 
 import time
@@ -56,9 +57,39 @@ class OrderSyncWorker:
         self.sync_interval = sync_interval_hours
         self.credentials_manager = CredentialsManager()
         self.dispute_detector = DisputeDetectionEngine()
+        self._risk_checker = None
         
         logger.info(f"OrderSyncWorker initialized (sync every {sync_interval_hours}h)")
     
+    @property
+    def risk_checker(self):
+        """Pre-shipment risk service (fraud registry index shared by the process)."""
+        if self._risk_checker is None:
+            from src.analytics.risk_check_service import RiskCheckService
+            self._risk_checker = RiskCheckService()
+        return self._risk_checker
+    
+    def check_orders_risk(self, orders: List[Dict]) -> List[Dict]:
+        """
+        Check a whole sync against the fraud registry in one batch.
+        
+        Returns:
+            Orders flagged as unsafe, each with its 'order_id' and risk result
+        """
+        try:
+            results = self.risk_checker.check_orders_risk(orders)
+        except Exception as e:
+            logger.warning(f"Risk check failed: {e}")
+            return []
+        
+        risky = [
+            {'order_id': order.get('order_id'), **result}
+            for order, result in zip(orders, results) if not result['is_safe']
+        ]
+        for entry in risky:
+            logger.warning(f"⚠️ Order {entry['order_id']} flagged {entry['risk_level']}: {'; '.join(entry['reasons'])}")
+        return risky
+    
     def run_forever(self):
         """
         Run worker in continuous loop.
@@ -158,6 +189,9 @@ class OrderSyncWorker:
         
         logger.info(f"✅ Fetched {len(orders)} orders for {client_id}")
         
+        # Fraud registry check for the whole sync (index refreshed once)
+        risky_orders = self.check_orders_risk(orders)
+        
         # Detect disputes
         logger.info(f"🔍 Analyzing orders for disputes...")
         disputes = self.dispute_detector.analyze_orders(orders)
@@ -213,22 +247,29 @@ class OrderSyncWorker:
             if new_disputes_count > 0:
                 try:
                     from src.email_service import send_disputes_detected_email
-                    send_disputes_detected_email(
-                        client_email=client_id,
-                        disputes_count=new_disputes_count,
-                        total_amount=total_recoverable,
-                        disputes_summary=disputed_orders
-                    )
-                    logger.info(f"📧 Notification email sent to {client_id}")
-                    
-                    # Log notification
-                    db.log_notification(
+                    from src.email_service.outbox import get_outbox
+                    # Log notification ('queued' : le worker outbox la passe à 'sent' ou 'failed')
+                    notification_id = db.log_notification(
                         client_id=client_db_id,
                         notification_type='disputes_detected',
                         subject=f'{new_disputes_count} nouveaux litiges détectés',
                         sent_to=client_id,
-                        status='sent'
+                        status='queued'
+                    )
+                    
+                    # Mis en file : délivré par le worker outbox, la synchro n'attend pas le SMTP
+                    queued = send_disputes_detected_email(
+                        client_email=client_id,
+                        disputes_count=new_disputes_count,
+                        total_amount=total_recoverable,
+                        disputes_summary=disputed_orders,
+                        outbox=get_outbox(db),
+                        notification_id=notification_id
                     )
+                    if queued:
+                        logger.info(f"📧 Notification email queued for {client_id}")
+                    else:
+                        db.update_notification_status([notification_id], 'failed', 'Email could not be queued')
                 except Exception as e:
                     logger.warning(f"Failed to send email notification: {e}")
             
@@ -243,6 +284,7 @@ class OrderSyncWorker:
             'client_id': client_id,
             'platform': platform,
             'orders_fetched': len(orders),
+            'risky_orders': len(risky_orders),
             'disputes_found': len(disputed_orders),
             'total_recoverable': total_recoverable,
             'new_disputes_saved': new_disputes_count if 'new_disputes_count' in locals() else 0
@@ -0,0 +1,154 @@
+"""
+Outbox sender process.
+
+Delivers the emails queued in the outbox (src/email_service/outbox.py) in
+batches over pooled SMTP sessions, so that order sync and claim processing
+never wait on SMTP.
+"""
+
+import os
+import time
+import logging
+from typing import Dict
+
+from src.email_service.email_sender import EmailSender
+from src.email_service.outbox import EmailOutbox, get_outbox
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxWorker:
+    """Worker delivering queued emails in batches."""
+
+    def __init__(self, outbox: EmailOutbox = None, sender: EmailSender = None,
+                 batch_size: int = 50, poll_interval: float = 5.0):
+        """
+        Initialize the outbox worker.
+
+        Args:
+            outbox: Outbox to drain (process-wide outbox by default)
+            sender: EmailSender used to build and deliver messages
+            batch_size: Messages claimed per batch
+            poll_interval: Seconds to sleep when the outbox is empty
+        """
+        self.outbox = outbox or get_outbox()
+        self.sender = sender or EmailSender(
+            smtp_user=os.getenv('GMAIL_SENDER'),
+            smtp_password=os.getenv('GMAIL_APP_PASSWORD'),
+            from_email=os.getenv('GMAIL_SENDER')
+        )
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+
+    def process_batch(self) -> Dict:
+        """
+        Claim and deliver one batch of due messages.
+
+        Returns:
+            Dictionary with batch results (claimed, sent, failed, duration, throughput)
+        """
+        start = time.monotonic()
+        self.outbox.requeue_stale()
+        batch = self.outbox.claim_batch(self.batch_size)
+
+        sent = 0
+        failed = 0
+        for message in batch:
+            try:
+                msg = self.sender.build_message(
+                    message['to_email'], message['subject'], message['html_body'],
+                    message['text_body'], message['attachments']
+                )
+                self.sender.deliver(msg)
+            except Exception as e:
+                failed += 1
+                self.outbox.mark_failed(message, str(e))
+                continue
+            # Marqué tout de suite : un arrêt en cours de lot ne renvoie pas les emails déjà délivrés
+            self.outbox.mark_sent([message['id']])
+            sent += 1
+
+        duration = time.monotonic() - start
+        result = {
+            'claimed': len(batch),
+            'sent': sent,
+            'failed': failed,
+            'duration': round(duration, 3),
+            'throughput': round(sent / duration, 2) if duration > 0 else 0.0
+        }
+        if batch:
+            logger.info(
+                f"📧 Outbox batch: {result['sent']}/{result['claimed']} sent, "
+                f"{failed} failed ({result['throughput']} emails/s)"
+            )
+        return result
+
+    def drain(self) -> Dict:
+        """Deliver every due message, batch after batch."""
+        totals = {'claimed': 0, 'sent': 0, 'failed': 0}
+        while True:
+            result = self.process_batch()
+            for key in totals:
+                totals[key] += result[key]
+            if result['claimed'] < self.batch_size:
+                return totals
+
+    def run_forever(self):
+        """Run worker in continuous loop."""
+        if not all([self.sender.smtp_user, self.sender.smtp_password, self.sender.from_email]):
+            logger.error("SMTP credentials not configured")
+            return
+
+        logger.info("🚀 Starting OutboxWorker in continuous mode")
+
+        while True:
+            try:
+                result = self.process_batch()
+                # Lot complet : il reste probablement des messages, on enchaîne
+                if result['claimed'] < self.batch_size:
+                    time.sleep(self.poll_interval)
+
+            except KeyboardInterrupt:
+                logger.info("⚠️ Worker stopped by user")
+                break
+            except Exception as e:
+                logger.error(f"❌ Error in outbox loop: {e}")
+                time.sleep(60)
+
+
+def main():
+    """Main entry point for worker."""
+    import argparse
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Email Outbox Worker')
+    parser.add_argument(
+        '--mode',
+        choices=['once', 'continuous', 'metrics', 'replay-dead'],
+        default='continuous',
+        help='Run mode: once (drain due emails), continuous (loop), metrics, replay-dead'
+    )
+    parser.add_argument('--batch-size', type=int, default=50, help='Emails claimed per batch')
+    parser.add_argument('--interval', type=float, default=5.0, help='Poll interval in seconds')
+
+    args = parser.parse_args()
+
+    if args.mode == 'metrics':
+        for key, value in get_outbox().get_metrics().items():
+            print(f"{key}: {value}")
+    elif args.mode == 'replay-dead':
+        print(f"{get_outbox().requeue_dead()} dead emails requeued")
+    else:
+        worker = OutboxWorker(batch_size=args.batch_size, poll_interval=args.interval)
+        if args.mode == 'once':
+            print(worker.drain())
+        else:
+            worker.run_forever()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -57,6 +57,32 @@ class TaskQueue:
             logger.info(f"Task {task_id} added: {func.__name__}")
             return task_id
 
+    def add_tasks(self, func: Callable, args_list: List[tuple]) -> int:
+        """
+        Add several calls of the same function to the queue in one transaction.
+
+        Args:
+            func: Function to execute for each entry
+            args_list: One positional-arguments tuple per task
+
+        Returns:
+            Number of tasks inserted
+        """
+        rows = [
+            (func.__name__, cloudpickle.dumps({'func': func, 'args': tuple(args), 'kwargs': {}}))
+            for args in args_list
+        ]
+        if not rows:
+            return 0
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO tasks (task_type, payload) VALUES (?, ?)",
+                rows
+            )
+        logger.info(f"{len(rows)} tasks added: {func.__name__}")
+        return len(rows)
+
     def process_pending_tasks(self, limit: int = 10):
         """
         Fetch and execute pending tasks.
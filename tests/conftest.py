@@ -148,13 +148,69 @@ def sample_orders():
     ]
 
 
+@pytest.fixture(autouse=True)
+def reset_smtp_pools():
+    """Do not reuse pooled SMTP sessions (possibly mocks) across tests."""
+    yield
+    from src.email_service.smtp_pool import close_all_pools
+    close_all_pools()
+
+
+@pytest.fixture(autouse=True)
+def isolated_outbox(monkeypatch):
+    """Do not share process-wide email outboxes (bound to test databases) across tests."""
+    import src.email_service.outbox as outbox_module
+    monkeypatch.setattr(outbox_module, '_outboxes', {})
+
+
+class RecordingSMTPHandler:
+    """aiosmtpd handler counting sessions and storing delivered messages."""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = 0
+        self.reject_recipients = set()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.reject_recipients:
+            return '550 Mailbox unavailable'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return '250 Message accepted for delivery'
+
+
+@pytest.fixture
+def smtp_server():
+    """Stand-in SMTP server (aiosmtpd) on a free local port: (controller, handler)."""
+    import socket
+    aiosmtpd_controller = pytest.importorskip('aiosmtpd.controller')
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    handler = RecordingSMTPHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname='127.0.0.1', port=port)
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
 @pytest.fixture
 def mock_smtp_server(monkeypatch):
     """Mock SMTP server for email testing."""
     sent_emails = []
     
     class MockSMTP:
-        def __init__(self, host, port):
+        def __init__(self, host, port, timeout=None):
             self.host = host
             self.port = port
         
@@ -164,7 +220,7 @@ def mock_smtp_server(monkeypatch):
         def login(self, user, password):
             pass
         
-        def send_message(self, msg):
+        def send_message(self, msg, from_addr=None, to_addrs=None):
             sent_emails.append({
                 'to': msg['To'],
                 'subject': msg['Subject'],
@@ -172,6 +228,15 @@ def mock_smtp_server(monkeypatch):
                 'body': msg.get_payload()
             })
         
+        def noop(self):
+            return (250, b'OK')
+        
+        def quit(self):
+            pass
+        
+        def close(self):
+            pass
+        
         def __enter__(self):
             return self
         
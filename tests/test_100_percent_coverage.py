@@ -40,7 +40,7 @@ class TestFinalCoverageGaps:
         # Call the REAL helper function (not mocked)
         with patch('src.email_service.escalation_email_handler.smtplib.SMTP') as mock_smtp:
             mock_server = MagicMock()
-            mock_smtp.return_value.__enter__.return_value = mock_server
+            mock_smtp.return_value = mock_server
             
             # This will execute lines 383-384
             result = send_formal_notice(claim, str(pdf_path), 'FR')
@@ -65,7 +65,7 @@ class TestFinalCoverageGaps:
         mock_mime_instance.attach.side_effect = FileNotFoundError("PDF file disappeared")
         
         mock_server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
+        mock_smtp.return_value = mock_server
         
         result = handler._send_email_with_attachment(
             to_email='test@example.com',
@@ -0,0 +1,75 @@
+"""
+Tests for BypassScorer: grouped client risk scoring and the cached success matrix.
+"""
+
+import pytest
+
+from src.analytics.bypass_scorer import BypassScorer
+
+
+def _execute(db_manager, query, params=()):
+    conn = db_manager.get_connection()
+    conn.execute(query, params)
+    conn.commit()
+    conn.close()
+
+
+def _add_claims(db_manager, client_id, carrier, dispute_type, statuses, prefix):
+    for i, status in enumerate(statuses):
+        claim_id = db_manager.create_claim(
+            claim_reference=f'{prefix}-{i}', client_id=client_id, order_id=f'ORD-{prefix}-{i}',
+            carrier=carrier, dispute_type=dispute_type, amount_requested=10.0
+        )
+        db_manager.update_claim(claim_id, status=status)
+
+
+@pytest.fixture
+def scorer(db_manager):
+    return BypassScorer(db_manager)
+
+
+class TestClientRiskScore:
+
+    def test_score_all_clients_in_one_pass(self, scorer, db_manager, sample_client):
+        suspect_id = db_manager.create_client(email='suspect@example.com')
+        veteran_id = db_manager.create_client(email='veteran@example.com')
+        for _ in range(3):
+            _execute(db_manager, """
+                INSERT INTO system_alerts (alert_type, message, related_resource_type, related_resource_id)
+                VALUES ('bypass_detected', 'Bypass', 'client', ?)
+            """, (suspect_id,))
+        claim_id = db_manager.create_claim(
+            claim_reference='CLM-S-1', client_id=suspect_id, order_id='ORD-S',
+            carrier='ups', dispute_type='lost', amount_requested=10.0
+        )
+        db_manager.update_claim(claim_id, payment_status='unpaid', automation_status='action_required')
+        _execute(db_manager, "UPDATE clients SET created_at = '2020-01-01 00:00:00' WHERE id = ?", (veteran_id,))
+
+        scores = scorer.score_all_clients()
+
+        assert scores == {sample_client['id']: 0, suspect_id: 65, veteran_id: 0}
+        assert scorer.score_all_clients([suspect_id]) == {suspect_id: 65}
+        assert scorer.calculate_client_risk_score(suspect_id) == 65
+        assert scorer.calculate_client_risk_score(999) == 0
+        assert scorer.score_all_clients([]) == {}
+
+
+class TestSuccessMatrix:
+
+    def test_probability_from_history_or_defaults(self, scorer, db_manager, sample_client):
+        _add_claims(db_manager, sample_client['id'], 'dhl', 'damaged',
+                    ['accepted'] * 3 + ['rejected'] * 3, 'DHL')
+        _add_claims(db_manager, sample_client['id'], 'ups', 'lost', ['accepted'] * 2, 'UPS')
+
+        assert scorer.get_success_matrix()[('dhl', 'damaged')] == (3, 6)
+        assert scorer.estimate_success_probability('dhl', 'damaged') == pytest.approx(0.5)
+        assert scorer.estimate_success_probability('ups', 'lost') == 0.85
+        assert scorer.estimate_success_probability('gls', 'other') == 0.50
+
+    def test_matrix_is_cached_until_refresh(self, scorer, db_manager, sample_client):
+        assert scorer.get_success_matrix() == {}
+        _add_claims(db_manager, sample_client['id'], 'dhl', 'lost', ['accepted'] * 6, 'DHL')
+
+        assert BypassScorer(db_manager).get_success_matrix() == {}
+        assert BypassScorer(db_manager, matrix_ttl=0).get_success_matrix()[('dhl', 'lost')] == (6, 6)
+        assert scorer.estimate_success_probability('dhl', 'lost') == 1.0
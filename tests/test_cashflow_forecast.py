@@ -0,0 +1,88 @@
+"""
+Tests for the Monte-Carlo cashflow forecast.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.ai.cashflow_forecast import CashflowForecaster, load_open_disputes
+
+
+class FixedPredictor:
+    """Probabilities and delays read from the disputes themselves."""
+
+    def predict_success_batch(self, disputes):
+        return np.array([d['p'] for d in disputes])
+
+    def predict_days(self, carrier):
+        return 7
+
+
+class TestCashflowForecaster:
+
+    def test_certain_disputes_land_in_their_week(self):
+        forecaster = CashflowForecaster(FixedPredictor(), weeks=4, days_spread=0.0)
+        disputes = [
+            {'p': 1.0, 'amount_recoverable': 100.0, 'predicted_days': 3},
+            {'p': 1.0, 'amount_recoverable': 50.0, 'predicted_days': 12, 'days_elapsed': 2},
+            {'p': 1.0, 'amount_recoverable': 20.0, 'predicted_days': 200},
+            {'p': 0.0, 'amount_recoverable': 999.0, 'predicted_days': 3},
+        ]
+
+        result = forecaster.simulate(disputes, n_simulations=50, seed=1)
+
+        assert result['weekly']['p10'] == result['weekly']['p90'] == [100.0, 50.0, 0.0, 0.0]
+        assert result['cumulative']['p50'] == [100.0, 150.0, 150.0, 150.0]
+        assert result['beyond_horizon']['p50'] == 20.0
+        assert result['total'] == {'p10': 170.0, 'p50': 170.0, 'p90': 170.0, 'mean': 170.0}
+        assert result['expected_recovery'] == 170.0
+        assert len(result['weeks']) == 4
+
+    def test_bands_match_expected_recovery(self):
+        rng = np.random.default_rng(0)
+        disputes = [{'p': p, 'amount_recoverable': a, 'carrier': 'UPS'}
+                    for p, a in zip(rng.uniform(0.2, 0.9, 500), rng.uniform(10, 200, 500))]
+        forecaster = CashflowForecaster(FixedPredictor(), weeks=8, max_cells=10_000)
+
+        result = forecaster.simulate(disputes, n_simulations=4000, seed=7)
+
+        total = result['total']
+        assert total['p10'] < total['p50'] < total['p90']
+        assert total['mean'] == pytest.approx(result['expected_recovery'], rel=0.01)
+        assert result['beyond_horizon']['p90'] == 0.0
+
+    def test_seeded_runs_are_reproducible_across_workers(self):
+        disputes = [{'p': 0.5, 'amount_recoverable': float(i), 'predicted_days': i % 30} for i in range(300)]
+        single = CashflowForecaster(FixedPredictor(), max_cells=3000, workers=1)
+        threaded = CashflowForecaster(FixedPredictor(), max_cells=3000, workers=3)
+
+        first = single.simulate(disputes, n_simulations=200, seed=42)
+        second = threaded.simulate(disputes, n_simulations=200, seed=42)
+
+        assert first['weekly'] == second['weekly']
+        assert first['total'] == second['total']
+
+    def test_no_open_disputes(self):
+        result = CashflowForecaster(FixedPredictor()).simulate([], n_simulations=10)
+        assert result['total']['p90'] == 0.0
+        assert result['n_disputes'] == 0
+
+
+def test_load_open_disputes(db_manager, sample_client):
+    submitted = datetime.now() - timedelta(days=5)
+    for i, status in enumerate(['submitted', 'pending', 'accepted']):
+        claim_id = db_manager.create_claim(
+            claim_reference=f'CLM-F-{i}', client_id=sample_client['id'], order_id=f'ORD-F-{i}',
+            carrier='colissimo', dispute_type='lost', amount_requested=40.0 + i
+        )
+        db_manager.update_claim(claim_id, status=status, submitted_at=submitted if i == 0 else None)
+
+    disputes = sorted(load_open_disputes(db_manager, sample_client['id']), key=lambda d: d['amount_recoverable'])
+
+    assert [d['amount_recoverable'] for d in disputes] == [40.0, 41.0]
+    assert disputes[0]['carrier'] == 'Colissimo'
+    assert disputes[0]['days_elapsed'] == 5
+    assert disputes[1]['days_elapsed'] == 0.0
+    assert load_open_disputes(db_manager, 999) == []
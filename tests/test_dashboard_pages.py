@@ -83,6 +83,24 @@ class TestReportsPage:
             # Verify header exists
             assert any('Reports' in str(call) for call in mock_markdown.call_args_list)
     
+    @patch('streamlit.line_chart')
+    @patch('streamlit.metric')
+    @patch('streamlit.columns', return_value=(MagicMock(), MagicMock()))
+    def test_render_analytics_tab_uses_sql_kpis(self, mock_columns, mock_metric, mock_line_chart):
+        """Test analytics tab shows the SQL KPIs and the cumulative evolution."""
+        kpis = {'total_claims': 4, 'average_claim_value': 125.0}
+        evolution = {
+            'dates': [pd.Timestamp('2026-01-01').date(), pd.Timestamp('2026-01-02').date()],
+            'claims': [1, 3], 'amounts': [100.0, 400.0], 'cumulative': [100.0, 500.0]
+        }
+        
+        render_analytics_tab(self.sample_df, kpis=kpis, evolution=evolution)
+        
+        mock_metric.assert_any_call("Total Disputes", 4)
+        mock_metric.assert_any_call("Total Recoverable", "500.00 EUR")
+        chart_df = mock_line_chart.call_args[0][0]
+        assert list(chart_df.iloc[:, 0]) == [100.0, 500.0]
+    
     @patch('streamlit.markdown')
     @patch('streamlit.caption')
     def test_render_timeline_structure(self, mock_caption, mock_markdown):
@@ -4,6 +4,7 @@ Tests for Database Manager.
 Tests CRUD operations, transactions, and data integrity.
 """
 
+import time
 import pytest
 from datetime import datetime, timedelta
 
@@ -256,3 +257,169 @@ class TestDatabaseManager:
         assert 'total_claims' in stats
         assert 'total_requested' in stats
         assert stats['client_id'] == sample_client['id']
+
+
+class TestMaterializedStatistics:
+    """Tests for client_statistics_materialized, maintained on writes."""
+    
+    def test_statistics_follow_writes(self, db_manager, sample_client):
+        client_id = sample_client['id']
+        assert db_manager.get_client_statistics(client_id)['total_claims'] == 0
+        
+        claim_id = db_manager.create_claim(
+            claim_reference='CLM-STAT-1', client_id=client_id, order_id='ORD-S1',
+            carrier='ups', dispute_type='lost', amount_requested=100.0
+        )
+        db_manager.create_claim(
+            claim_reference='CLM-STAT-2', client_id=client_id, order_id='ORD-S2',
+            carrier='dhl', dispute_type='lost', amount_requested=50.0
+        )
+        db_manager.update_claim(claim_id, status='accepted', accepted_amount=90.0)
+        db_manager.create_dispute(client_id, 'ORD-S3', 'dpd', 'damaged', 20.0)
+        payment_id = db_manager.create_payment(claim_id, client_id, 90.0, 72.0, 18.0)
+        db_manager.update_payment(payment_id, payment_status='completed')
+        
+        stats = db_manager.get_client_statistics(client_id)
+        assert (stats['total_claims'], stats['accepted_claims'], stats['pending_claims']) == (2, 1, 1)
+        assert stats['total_requested'] == 150.0
+        assert stats['total_recovered'] == 90.0
+        assert stats['total_paid_to_client'] == 72.0
+        assert stats['total_disputes_detected'] == 1
+    
+    def test_full_and_delta_refresh(self, db_manager, sample_client):
+        from datetime import datetime
+        client_id = sample_client['id']
+        db_manager.create_claim(
+            claim_reference='CLM-STAT-3', client_id=client_id, order_id='ORD-S4',
+            carrier='ups', dispute_type='lost', amount_requested=30.0
+        )
+        before = db_manager.get_all_statistics()
+        
+        # Écriture hors DatabaseManager : invisible jusqu'au rafraîchissement
+        conn = db_manager.get_connection()
+        conn.execute("UPDATE claims SET status = 'rejected' WHERE client_id = ?", (client_id,))
+        conn.commit()
+        conn.close()
+        assert db_manager.get_all_statistics() == before
+        
+        assert db_manager.refresh_client_statistics(full=True) == len(before)
+        stats = db_manager.get_client_statistics(client_id)
+        assert (stats['rejected_claims'], stats['pending_claims']) == (1, 0)
+        
+        # Horodatages CURRENT_TIMESTAMP à la seconde : le delta inclut la seconde de `since`
+        time.sleep(1)
+        since = datetime.now()
+        other_id = db_manager.create_client(email='delta@example.com')
+        db_manager.create_dispute(other_id, 'ORD-S5', 'dpd', 'lost', 5.0)
+        assert db_manager.refresh_client_statistics(since=since) == 1
+
+    
+    def test_delta_refresh_picks_up_external_claim_writes(self, db_manager, sample_client):
+        client_id = sample_client['id']
+        other_id = db_manager.create_client(email='untouched@example.com')
+        db_manager.create_claim(
+            claim_reference='CLM-STAT-4', client_id=client_id, order_id='ORD-S6',
+            carrier='ups', dispute_type='lost', amount_requested=40.0
+        )
+        versions = (db_manager.get_data_version(client_id), db_manager.get_data_version(other_id))
+        since = datetime.now() + timedelta(seconds=1)
+        
+        # Écriture externe (synchro, SQL direct) : aucune version de données incrémentée
+        conn = db_manager.get_connection()
+        conn.execute(
+            "UPDATE claims SET status = 'accepted', accepted_amount = 40.0, updated_at = ? WHERE client_id = ?",
+            (since + timedelta(seconds=1), client_id)
+        )
+        conn.commit()
+        conn.close()
+        assert (db_manager.get_data_version(client_id), db_manager.get_data_version(other_id)) == versions
+        
+        assert db_manager.refresh_client_statistics(since=since) == 1
+        stats = db_manager.get_client_statistics(client_id)
+        assert (stats['accepted_claims'], stats['pending_claims']) == (1, 0)
+        assert stats['total_recovered'] == 40.0
+
+class TestPreSeriesDatabase:
+    """A database created before the deadline, version, rollup, statistics and email outbox tables existed."""
+    
+    SERIES_TABLES = ('claim_deadlines', 'client_data_versions', 'claims_daily_rollup',
+                     'client_statistics_materialized', 'email_outbox')
+    
+    @pytest.fixture
+    def legacy_db(self, tmp_path):
+        import os
+        import sqlite3
+        path = str(tmp_path / 'legacy.db')
+        schema_path = os.path.join(os.path.dirname(__file__), '..', 'database', 'schema.sql')
+        with open(schema_path, encoding='utf-8') as f:
+            schema = f.read()
+        conn = sqlite3.connect(path)
+        conn.executescript(schema)
+        for table in self.SERIES_TABLES:
+            conn.execute(f"DROP TABLE {table}")
+        conn.execute("DROP INDEX idx_claims_follow_up")
+        conn.execute("INSERT INTO clients (id, email) VALUES (1, 'legacy@example.com')")
+        conn.execute("""
+            INSERT INTO claims (claim_reference, client_id, order_id, carrier, dispute_type, amount_requested)
+            VALUES ('CLM-OLD-1', 1, 'ORD-OLD-1', 'ups', 'lost', 40.0)
+        """)
+        conn.commit()
+        conn.close()
+        return path
+    
+    @staticmethod
+    def _rollup(db):
+        conn = db.get_connection()
+        try:
+            return [tuple(row) for row in conn.execute("SELECT * FROM claims_daily_rollup ORDER BY 1, 2, 3, 4, 5")]
+        finally:
+            conn.close()
+    
+    def test_write_paths_after_migration(self, legacy_db):
+        from src.database import DatabaseManager
+        db = DatabaseManager(db_path=legacy_db)
+        
+        # Existing claims are folded into the new aggregates
+        assert db.get_client_statistics(1)['total_claims'] == 1
+        assert self._rollup(db) != []
+        
+        client_id = db.create_client(email='new@example.com')
+        claim_id = db.create_claim(
+            claim_reference='CLM-NEW-1', client_id=1, order_id='ORD-NEW-1',
+            carrier='dhl', dispute_type='lost', amount_requested=60.0
+        )
+        db.update_claim(claim_id, status='accepted', accepted_amount=55.0)
+        db.create_dispute(client_id, 'ORD-NEW-2', 'dpd', 'damaged', 15.0)
+        db.create_payment(claim_id, 1, 55.0, 44.0, 11.0)
+        
+        stats = db.get_client_statistics(1)
+        assert (stats['total_claims'], stats['accepted_claims'], stats['pending_claims']) == (2, 1, 1)
+        assert stats['total_recovered'] == 55.0
+        assert db.get_client_statistics(client_id)['total_disputes_detected'] == 1
+        # Incremental rollup matches a rebuild from the claims table
+        maintained = self._rollup(db)
+        db.rebuild_daily_rollup()
+        assert self._rollup(db) == maintained
+        
+        from src.email_service.outbox import EmailOutbox
+        outbox = EmailOutbox(db)
+        message_id = outbox.enqueue('legacy@example.com', 'Subject', '<p>Hello</p>')
+        assert [message['id'] for message in outbox.claim_batch()] == [message_id]
+        
+        from src.automation.deadline_scheduler import DeadlineScheduler
+        scheduled = DeadlineScheduler(db).schedule_claim(claim_id, 'dhl', datetime.now())
+        assert scheduled['legal_response'] is not None
+    
+    def test_postgres_startup_runs_migration(self, monkeypatch):
+        from unittest.mock import MagicMock
+        from src.database.database_manager import DatabaseManager
+        monkeypatch.setenv('DATABASE_TYPE', 'postgres')
+        conn = MagicMock()
+        migrated = []
+        monkeypatch.setattr(DatabaseManager, 'get_connection', lambda self: conn)
+        monkeypatch.setattr(DatabaseManager, '_ensure_series_tables', lambda self, c: migrated.append(c))
+        
+        DatabaseManager()
+        
+        assert migrated == [conn]
+        conn.close.assert_called_once()
@@ -0,0 +1,181 @@
+"""
+Tests for the claim deadline scheduler (follow-ups and legal response times).
+"""
+
+import threading
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from src.automation.deadline_scheduler import (
+    DeadlineScheduler, KIND_FOLLOW_UP, KIND_LEGAL_RESPONSE, RETRY_BASE_DELAY, _to_datetime,
+    get_deadline_scheduler, legal_response_days
+)
+
+
+def _deadline_rows(db_manager, claim_id):
+    conn = db_manager.get_connection()
+    try:
+        cursor = db_manager._execute(
+            conn, "SELECT kind, due_at, level FROM claim_deadlines WHERE claim_id = ? ORDER BY kind", (claim_id,)
+        )
+        return [dict(row) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def submitted_claim(db_manager, sample_claim):
+    """A claim submitted 10 days ago."""
+    submitted_at = datetime.now() - timedelta(days=10)
+    db_manager.update_claim(sample_claim['id'], status='submitted', submitted_at=submitted_at.isoformat())
+    return db_manager.get_claim(claim_id=sample_claim['id']), submitted_at
+
+
+class TestDeadlineScheduler:
+
+    def test_schedule_claim_uses_carrier_legal_delay(self, db_manager, submitted_claim):
+        claim, submitted_at = submitted_claim
+        scheduler = DeadlineScheduler(db_manager)
+
+        scheduled = scheduler.schedule_claim(claim['id'], 'DHL', submitted_at)
+
+        assert scheduled[KIND_FOLLOW_UP] == submitted_at + timedelta(days=7)
+        assert scheduled[KIND_LEGAL_RESPONSE] == submitted_at + timedelta(days=legal_response_days('dhl'))
+        assert db_manager.get_claim(claim_id=claim['id'])['response_deadline'] == \
+            scheduled[KIND_LEGAL_RESPONSE].date().isoformat()
+
+    def test_submissions_share_one_scheduler_without_ddl(self, db_manager, submitted_claim, monkeypatch):
+        import src.automation.deadline_scheduler as scheduler_module
+        monkeypatch.setattr(scheduler_module, '_schedulers', {})
+        claim, submitted_at = submitted_claim
+        statements = []
+        execute = db_manager._execute
+
+        def recording(conn, query, params=()):
+            statements.append(query.split()[0].upper())
+            return execute(conn, query, params)
+
+        monkeypatch.setattr(db_manager, '_execute', recording)
+
+        scheduler = get_deadline_scheduler(db_manager)
+        scheduler.schedule_claim(claim['id'], 'ups', submitted_at)
+
+        assert get_deadline_scheduler(db_manager) is scheduler
+        assert 'CREATE' not in statements
+        assert len(_deadline_rows(db_manager, claim['id'])) == 2
+
+    def test_pop_due_returns_only_expired_deadlines(self, db_manager, submitted_claim):
+        claim, submitted_at = submitted_claim
+        scheduler = DeadlineScheduler(db_manager)
+        scheduler.schedule_claim(claim['id'], 'colissimo', submitted_at)
+
+        due = scheduler.pop_due()
+
+        assert [(d['claim_id'], d['kind'], d['level']) for d in due] == [(claim['id'], KIND_FOLLOW_UP, 1)]
+        assert scheduler.pop_due() == []
+        assert scheduler.next_due_at() is None
+        # The row is only removed once the deadline has been handled
+        assert _deadline_rows(db_manager, claim['id']) != []
+        scheduler.complete(due[0])
+        assert [row['kind'] for row in _deadline_rows(db_manager, claim['id'])] == [KIND_LEGAL_RESPONSE]
+
+    def test_escalation_replaces_follow_up_deadline(self, db_manager, submitted_claim):
+        claim, submitted_at = submitted_claim
+        scheduler = DeadlineScheduler(db_manager)
+        scheduler.schedule_claim(claim['id'], 'colissimo', submitted_at)
+        scheduler.next_due_at()
+
+        scheduled = scheduler.schedule_claim(claim['id'], 'colissimo', submitted_at, follow_up_level=1)
+
+        assert scheduled[KIND_FOLLOW_UP] == submitted_at + timedelta(days=14)
+        # The stale J+7 entry left in the heap must not be emitted
+        assert scheduler.pop_due() == []
+        later = scheduler.pop_due(now=submitted_at + timedelta(days=14))
+        assert [(d['kind'], d['level']) for d in later] == [(KIND_FOLLOW_UP, 2)]
+
+    def test_last_level_cancels_follow_up(self, db_manager, submitted_claim):
+        claim, submitted_at = submitted_claim
+        scheduler = DeadlineScheduler(db_manager)
+        scheduler.schedule_claim(claim['id'], 'colissimo', submitted_at)
+
+        scheduled = scheduler.schedule_claim(claim['id'], 'colissimo', submitted_at, follow_up_level=3)
+
+        assert scheduled[KIND_FOLLOW_UP] is None
+        due = scheduler.pop_due(now=submitted_at + timedelta(days=60))
+        assert [d['kind'] for d in due] == [KIND_LEGAL_RESPONSE]
+
+    def test_run_wakes_up_for_new_deadline(self, db_manager, submitted_claim):
+        claim, _ = submitted_claim
+        scheduler = DeadlineScheduler(db_manager, window=timedelta(hours=1))
+        handled = []
+
+        def handler(deadline):
+            handled.append(deadline)
+            scheduler.stop()
+
+        thread = threading.Thread(target=scheduler.run, args=(handler,))
+        thread.start()
+        scheduler.schedule(claim['id'], KIND_FOLLOW_UP, datetime.now() + timedelta(milliseconds=50), level=1)
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert handled and handled[0]['claim_id'] == claim['id']
+
+    def test_failed_handler_keeps_deadline_with_backoff(self, db_manager, submitted_claim):
+        claim, submitted_at = submitted_claim
+        scheduler = DeadlineScheduler(db_manager)
+        scheduler.schedule_claim(claim['id'], 'colissimo', submitted_at)
+
+        def failing(deadline):
+            raise RuntimeError("SMTP down")
+
+        before = datetime.now()
+        assert scheduler.process_due(failing) == {'handled': 0, 'failed': 1}
+        first_retry = _to_datetime(_deadline_rows(db_manager, claim['id'])[0]['due_at'])
+        assert before + RETRY_BASE_DELAY <= first_retry <= datetime.now() + RETRY_BASE_DELAY
+
+        # Second failure doubles the delay
+        stats = scheduler.process_due(failing, now=first_retry)
+        assert stats == {'handled': 0, 'failed': 1}
+        second_retry = _to_datetime(_deadline_rows(db_manager, claim['id'])[0]['due_at'])
+        assert second_retry - datetime.now() > RETRY_BASE_DELAY
+
+        handled = []
+        assert scheduler.process_due(handled.append, now=second_retry) == {'handled': 1, 'failed': 0}
+        assert [d['level'] for d in handled] == [1]
+        assert [row['kind'] for row in _deadline_rows(db_manager, claim['id'])] == [KIND_LEGAL_RESPONSE]
+
+    def test_backfill_schedules_already_submitted_claims(self, db_manager, submitted_claim):
+        claim, submitted_at = submitted_claim
+        scheduler = DeadlineScheduler(db_manager)
+
+        assert scheduler.backfill_from_claims(batch_size=1) == 2
+        rows = {row['kind']: row for row in _deadline_rows(db_manager, claim['id'])}
+        assert _to_datetime(rows[KIND_FOLLOW_UP]['due_at']) == submitted_at + timedelta(days=7)
+        legal_due = submitted_at + timedelta(days=legal_response_days(claim['carrier']))
+        assert _to_datetime(rows[KIND_LEGAL_RESPONSE]['due_at']) == legal_due
+        assert db_manager.get_claim(claim_id=claim['id'])['response_deadline'] == legal_due.date().isoformat()
+        # Idempotent: existing deadlines are kept
+        assert scheduler.backfill_from_claims() == 0
+        assert [d['kind'] for d in scheduler.pop_due()] == [KIND_FOLLOW_UP]
+
+    def test_follow_up_manager_handles_deadline(self, db_manager, submitted_claim, monkeypatch, tmp_path):
+        from src.automation.follow_up_manager import FollowUpManager
+        monkeypatch.chdir(tmp_path)
+        claim, submitted_at = submitted_claim
+        manager = FollowUpManager(db_manager)
+        manager.queue = MagicMock()
+
+        action = manager.handle_deadline({
+            'claim_id': claim['id'], 'kind': KIND_FOLLOW_UP, 'due_at': submitted_at, 'level': 1
+        })
+        assert action == 'status_requests'
+        queued_claim = manager.queue.add_task.call_args[0][1]
+        assert queued_claim['claim_reference'] == claim['claim_reference']
+
+        action = manager.handle_deadline({
+            'claim_id': claim['id'], 'kind': KIND_LEGAL_RESPONSE, 'due_at': submitted_at, 'level': 0
+        })
+        assert action == 'legal_deadlines'
+        assert db_manager.get_claim(claim_id=claim['id'])['automation_status'] == 'action_required'
@@ -120,7 +120,10 @@ class TestCompleteUserFlow:
         claims = db_manager.get_client_claims(sample_client['id'])
         assert len(claims) > 0
         
-        # Step 4: Verify email sent
+        # Step 4: Verify email queued, then sent by the outbox worker
+        from src.email_service.outbox import get_outbox
+        from src.workers.outbox_worker import OutboxWorker
+        assert OutboxWorker(get_outbox(db_manager)).drain()['sent'] >= 1
         assert len(mock_smtp_server) >= 1
         
         # Step 5: Verify dashboard can retrieve updated data
@@ -0,0 +1,135 @@
+"""
+Tests for the email outbox and its sender worker, against a local aiosmtpd server.
+"""
+
+import pytest
+from datetime import timedelta
+
+from src.email_service.email_sender import EmailSender
+from src.email_service.outbox import EmailOutbox
+from src.workers.outbox_worker import OutboxWorker
+
+
+@pytest.fixture
+def outbox(db_manager):
+    return EmailOutbox(db_manager, max_attempts=2, retry_base_seconds=0)
+
+
+def _sender(controller, outbox=None) -> EmailSender:
+    return EmailSender(
+        smtp_host=controller.hostname, smtp_port=controller.port,
+        from_email='noreply@example.com', use_starttls=False, outbox=outbox
+    )
+
+
+class TestEmailOutbox:
+
+    def test_send_email_with_outbox_only_enqueues(self, outbox, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("SMTP must not be used when queuing")
+        monkeypatch.setattr('smtplib.SMTP', fail)
+        sender = EmailSender(from_email='noreply@example.com', outbox=outbox)
+
+        assert sender.send_email('client@example.com', 'Subject', '<p>Hello</p>', attachments=['a.pdf'])
+
+        [message] = outbox.claim_batch()
+        assert message['to_email'] == 'client@example.com'
+        assert message['attachments'] == ['a.pdf']
+        assert outbox.get_metrics()['sending'] == 1
+
+    def test_worker_delivers_batch_over_one_session(self, outbox, smtp_server):
+        controller, handler = smtp_server
+        for i in range(3):
+            outbox.enqueue(f'client{i}@example.com', f'Subject {i}', '<p>Hello</p>')
+        worker = OutboxWorker(outbox, _sender(controller), batch_size=2)
+
+        totals = worker.drain()
+
+        assert totals == {'claimed': 3, 'sent': 3, 'failed': 0}
+        assert len(handler.messages) == 3
+        assert handler.sessions == 1
+        metrics = outbox.get_metrics()
+        assert metrics['sent'] == 3 and metrics['pending'] == 0
+        assert metrics['p95_latency_seconds'] >= metrics['avg_latency_seconds'] >= 0
+
+    def test_failed_message_is_retried_then_dead_lettered(self, outbox, smtp_server):
+        controller, handler = smtp_server
+        handler.reject_recipients.add('bounce@example.com')
+        outbox.enqueue('bounce@example.com', 'Lost', '<p>Hello</p>')
+        outbox.enqueue('client@example.com', 'Ok', '<p>Hello</p>')
+        worker = OutboxWorker(outbox, _sender(controller))
+
+        first = worker.process_batch()
+        assert (first['sent'], first['failed']) == (1, 1)
+        assert outbox.get_metrics()['pending'] == 1
+
+        second = worker.process_batch()
+        assert (second['sent'], second['failed']) == (0, 1)
+        metrics = outbox.get_metrics()
+        assert (metrics['dead'], metrics['pending']) == (1, 0)
+
+        assert outbox.requeue_dead() == 1
+        assert outbox.get_metrics()['pending'] == 1
+
+    def test_outboxes_on_one_database_share_the_queue(self, outbox, db_manager):
+        from src.email_service.outbox import get_outbox
+        producer = get_outbox(db_manager)
+        assert get_outbox(db_manager) is producer
+        for i in range(3):
+            producer.enqueue(f'client{i}@example.com', f'Subject {i}', '<p>Hello</p>')
+
+        # Another sender (process) claims from the same table, never the same message twice
+        first = EmailOutbox(db_manager).claim_batch(limit=2)
+        second = outbox.claim_batch(limit=2)
+        assert [m['to_email'] for m in first + second] == [f'client{i}@example.com' for i in range(3)]
+        assert outbox.get_metrics()['sending'] == 3
+
+    def test_stale_sending_messages_are_requeued(self, outbox):
+        outbox.enqueue('client@example.com', 'Subject', '<p>Hello</p>')
+        assert len(outbox.claim_batch()) == 1
+        assert outbox.claim_batch() == []
+
+        assert outbox.requeue_stale(older_than=timedelta(seconds=-1)) == 1
+        assert len(outbox.claim_batch()) == 1
+
+    def test_notification_status_follows_delivery(self, db_manager, sample_client, smtp_server):
+        controller, handler = smtp_server
+        handler.reject_recipients.add('bounce@example.com')
+        outbox = EmailOutbox(db_manager, max_attempts=1)
+        notifications = {}
+        for to_email in ('client@example.com', 'bounce@example.com'):
+            notifications[to_email] = db_manager.log_notification(
+                sample_client['id'], 'disputes_detected', 'Litiges', to_email, status='queued'
+            )
+            _sender(controller, outbox).send_email(
+                to_email, 'Litiges', '<p>Hello</p>', notification_id=notifications[to_email]
+            )
+
+        OutboxWorker(outbox, _sender(controller)).process_batch()
+
+        conn = db_manager.get_connection()
+        rows = {row['id']: dict(row) for row in conn.execute("SELECT id, status, error_message FROM notifications")}
+        conn.close()
+        assert rows[notifications['client@example.com']]['status'] == 'sent'
+        assert rows[notifications['bounce@example.com']]['status'] == 'failed'
+        assert '550' in rows[notifications['bounce@example.com']]['error_message']
+
+    def test_each_message_is_marked_sent_once_delivered(self, outbox, smtp_server, monkeypatch):
+        controller, handler = smtp_server
+        for i in range(3):
+            outbox.enqueue(f'client{i}@example.com', f'Subject {i}', '<p>Hello</p>')
+        sender = _sender(controller)
+        deliver = sender.deliver
+
+        def crash_on_third(msg):
+            if msg['To'] == 'client2@example.com':
+                raise KeyboardInterrupt
+            deliver(msg)
+
+        monkeypatch.setattr(sender, 'deliver', crash_on_third)
+        with pytest.raises(KeyboardInterrupt):
+            OutboxWorker(outbox, sender).process_batch()
+
+        # The two emails delivered before the crash are not sent again
+        metrics = outbox.get_metrics()
+        assert (metrics['sent'], metrics['sending']) == (2, 1)
@@ -288,3 +288,81 @@ class TestEmailTemplateManagerErrorHandling:
         template = manager.get_template('status_request', 'FR', 1)
         assert 'Réclamation' in template['subject']
         assert '€' in template['body']
+
+
+class TestCompiledTemplates:
+    """Tests du moteur de templates compilés et du cache LRU."""
+    
+    @pytest.fixture
+    def manager(self, tmp_path):
+        return EmailTemplateManager(str(tmp_path / "test_templates.db"))
+    
+    def test_compiled_render_matches_str_format(self):
+        """Le rendu compilé est identique à str.format."""
+        from src.email_service.template_engine import CompiledTemplate
+        source = "Réf {ref} : {amount:.2f} {currency!s} {{littéral}}"
+        variables = {'ref': 'CLM-1', 'amount': 12.5, 'currency': 'EUR'}
+        
+        compiled = CompiledTemplate(source)
+        
+        assert compiled.variables == ['ref', 'amount', 'currency']
+        assert compiled.render(variables) == source.format(**variables)
+        with pytest.raises(KeyError):
+            compiled.render({'ref': 'CLM-1'})
+    
+    def test_mustache_keeps_unknown_placeholders(self):
+        """Syntaxe {{var}} : les variables inconnues restent en place."""
+        from src.email_service.template_engine import compile_template
+        compiled = compile_template("Bonjour {{name}}, {{unknown}}", 'mustache')
+        
+        assert compiled.render({'name': 'Jean'}) == "Bonjour Jean, {{unknown}}"
+    
+    def test_compiled_template_cached_without_db_access(self, manager, monkeypatch):
+        """Après le premier rendu, plus aucun accès à la base par email."""
+        manager.save_template(1, 'warning', 'FR', 'Sujet {claim_reference}', 'Corps {carrier}')
+        first = manager.get_compiled_template('warning', 'FR', client_id=1)
+        
+        def no_db(*args, **kwargs):
+            raise AssertionError("DB accessed")
+        monkeypatch.setattr(sqlite3, 'connect', no_db)
+        
+        for _ in range(100):
+            assert manager.get_compiled_template('warning', 'FR', client_id=1) is first
+        assert manager._cache.stats['hits'] == 100
+    
+    def test_save_invalidates_client_cache(self, manager):
+        """Une modification depuis la page templates est prise en compte immédiatement."""
+        manager.save_template(1, 'warning', 'FR', 'Version 1', 'Body 1')
+        manager.save_template(2, 'warning', 'FR', 'Autre client', 'Body')
+        assert manager.get_template('warning', 'FR', 1)['subject'] == 'Version 1'
+        other = manager.get_compiled_template('warning', 'FR', client_id=2)
+        
+        manager.save_template(1, 'warning', 'FR', 'Version 2', 'Body 2')
+        
+        assert manager.get_template('warning', 'FR', 1)['subject'] == 'Version 2'
+        assert manager.get_compiled_template('warning', 'FR', client_id=2) is other
+    
+    def test_edit_from_other_process_detected_by_version(self, tmp_path):
+        """Une modification faite par un autre process change la version du client."""
+        db_path = str(tmp_path / "shared.db")
+        worker = EmailTemplateManager(db_path, version_check_interval=0)
+        page = EmailTemplateManager(db_path)
+        page.save_template(1, 'status_request', 'FR', 'Version 1', 'Body')
+        assert worker.get_template('status_request', 'FR', 1)['subject'] == 'Version 1'
+        
+        page.save_template(1, 'status_request', 'FR', 'Version 2', 'Body')
+        
+        assert worker.get_template('status_request', 'FR', 1)['subject'] == 'Version 2'
+    
+    def test_lru_evicts_least_recently_used(self):
+        """Le cache LRU évince l'entrée la moins récemment utilisée."""
+        from src.email_service.template_engine import TemplateCache
+        cache = TemplateCache(maxsize=2)
+        cache.get_or_load('a', lambda: 1)
+        cache.get_or_load('b', lambda: 2)
+        cache.get_or_load('a', lambda: 0)
+        cache.get_or_load('c', lambda: 3)
+        
+        assert cache.get_or_load('a', lambda: 'reloaded') == 1
+        assert cache.get_or_load('b', lambda: 'reloaded') == 'reloaded'
+        assert cache.stats['evictions'] == 2
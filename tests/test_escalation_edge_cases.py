@@ -46,7 +46,7 @@ class TestEscalationEdgeCases:
         
         with patch('src.email_service.escalation_email_handler.smtplib.SMTP') as mock_smtp:
             mock_server = MagicMock()
-            mock_smtp.return_value.__enter__.return_value = mock_server
+            mock_smtp.return_value = mock_server
             
             # Send to unknown carrier (should fallback to from_email)
             result = handler.send_formal_notice_email(
@@ -77,7 +77,7 @@ class TestEscalationEdgeCases:
         )
         
         # Mock SMTP to raise FileNotFoundError
-        mock_smtp.return_value.__enter__.return_value.send_message.side_effect = FileNotFoundError("File error")
+        mock_smtp.return_value.send_message.side_effect = FileNotFoundError("File error")
         
         result = handler._send_email_with_attachment(
             to_email='test@example.com',
@@ -101,7 +101,7 @@ class TestEscalationEdgeCases:
         )
         
         # Mock to raise a generic exception
-        mock_smtp.return_value.__enter__.return_value.send_message.side_effect = RuntimeError("Network error")
+        mock_smtp.return_value.send_message.side_effect = RuntimeError("Network error")
         
         result = handler._send_email_with_attachment(
             to_email='test@example.com',
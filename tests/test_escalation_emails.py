@@ -92,7 +92,7 @@ class TestEscalationEmails:
         
         # Mock SMTP server
         mock_server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
+        mock_smtp.return_value = mock_server
         
         # Send email
         result = email_handler._send_email_with_attachment(
@@ -112,7 +112,7 @@ class TestEscalationEmails:
     def test_send_email_with_missing_attachment(self, mock_smtp, email_handler, sample_claim):
         """Test email sending with missing PDF attachment."""
         mock_server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
+        mock_smtp.return_value = mock_server
         
         # Try to send with non-existent file
         result = email_handler._send_email_with_attachment(
@@ -134,7 +134,7 @@ class TestEscalationEmails:
         pdf_path.write_text("Test PDF content")
         
         # Mock SMTP to raise exception
-        mock_smtp.return_value.__enter__.return_value.send_message.side_effect = Exception("SMTP Error")
+        mock_smtp.return_value.send_message.side_effect = Exception("SMTP Error")
         
         # Send email
         result = email_handler._send_email_with_attachment(
@@ -156,7 +156,7 @@ class TestEscalationEmails:
         
         # Mock SMTP server
         mock_server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
+        mock_smtp.return_value = mock_server
         
         # Send formal notice
         result = email_handler.send_formal_notice_email(
@@ -173,7 +173,7 @@ class TestEscalationEmails:
         """Test sending status request email."""
         # Mock SMTP server
         mock_server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
+        mock_smtp.return_value = mock_server
         
         # Send status request
         result = email_handler.send_status_request_email(
@@ -189,7 +189,7 @@ class TestEscalationEmails:
         """Test sending warning email."""
         # Mock SMTP server
         mock_server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
+        mock_smtp.return_value = mock_server
         
         # Send warning
         result = email_handler.send_warning_email(
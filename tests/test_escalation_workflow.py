@@ -109,7 +109,7 @@ class TestEscalationWorkflow:
         
         # Mock SMTP
         mock_server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
+        mock_smtp.return_value = mock_server
         
         # Create follow-up manager
         manager = FollowUpManager(db_manager)
@@ -142,7 +142,7 @@ class TestEscalationWorkflow:
         
         # Mock SMTP
         mock_server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
+        mock_smtp.return_value = mock_server
         
         # Patch EscalationLogger to use test database
         def create_escalation_logger(*args, **kwargs):
@@ -206,59 +206,53 @@ class TestEscalationWorkflow:
         assert 3 in stats['by_level']
         assert 'sent' in stats['by_email_status']
     
-    @patch('src.email_service.escalation_email_handler.smtplib.SMTP')
-    def test_escalation_levels_progression(self, mock_smtp, db_manager):
+    def test_escalation_levels_progression(self, db_manager, tmp_path, monkeypatch):
         """Test that escalation progresses through levels J+7, J+14, J+21."""
-        mock_server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
-        
-        manager = FollowUpManager(db_manager)
+        monkeypatch.chdir(tmp_path)
         conn = db_manager.get_connection()
-        
-        # Test J+7 (status request)
-        claim_7days = {
-            'id': 100,
-            'claim_reference': 'TEST-7',
-            'carrier': 'DHL',
-            'tracking_number': 'TEST7',
-            'amount_requested': 100,
-            'dispute_type': 'Retard',
-            'customer_name': 'Test',
-            'delivery_address': 'Paris',
-            'currency': 'EUR',
-            'country': 'FR',
-            'submitted_at': (datetime.now() - timedelta(days=8)).isoformat()
-        }
-        
+        conn.execute(
+            "INSERT INTO stores (id, client_id, platform, store_name, country) VALUES (1, 1, 'shopify', 'Test', 'FR')"
+        )
         conn.execute("""
             INSERT INTO claims (
-                id, store_id, claim_reference, carrier, tracking_number, amount_requested,
-                dispute_type, customer_name, delivery_address, currency,
+                id, client_id, store_id, claim_reference, order_id, carrier, tracking_number,
+                amount_requested, dispute_type, customer_name, delivery_address, currency,
                 submitted_at, status, follow_up_level
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            claim_7days['id'], 1, claim_7days['claim_reference'], claim_7days['carrier'],
-            claim_7days['tracking_number'], claim_7days['amount_requested'],
-            claim_7days['dispute_type'], claim_7days['customer_name'],
-            claim_7days['delivery_address'], claim_7days['currency'],
-            claim_7days['submitted_at'], 'submitted', 0
-        ))
+            ) VALUES (100, 1, 1, 'TEST-7', 'ORD-7', 'DHL', 'TEST7', 100, 'Retard', 'Test', 'Paris', 'EUR', ?, 'submitted', 0)
+        """, ((datetime.now() - timedelta(days=8)).isoformat(),))
         conn.commit()
         conn.close()
-        
-        # Trigger and verify level 1
-        action = manager._evaluate_and_trigger(claim_7days)
-        assert action == 'status_requests'
-        
-        # Verify database update
-        conn = db_manager.get_connection()
-        updated = conn.execute(
-            "SELECT follow_up_level FROM claims WHERE id = ?", (claim_7days['id'],)
-        ).fetchone()
-        conn.close()
-        
-        if updated:
-            assert updated[0] == 1
+        manager = FollowUpManager(db_manager)
+
+        def age_claim(days, level):
+            """Claim submitted `days` ago, followed up at `level` more than a week ago."""
+            db_manager.update_claim(
+                100, follow_up_level=level,
+                submitted_at=(datetime.now() - timedelta(days=days)).isoformat(),
+                last_follow_up_at=(datetime.now() - timedelta(days=8)).isoformat()
+            )
+
+        # J+7: status request
+        assert manager.process_follow_ups() == {'formal_notices': 0, 'warnings': 0, 'status_requests': 1}
+
+        # J+14 after the status request: warning
+        age_claim(15, 1)
+        assert manager.process_follow_ups() == {'formal_notices': 0, 'warnings': 1, 'status_requests': 0}
+
+        # Warning sent, J+21 not reached yet: nothing to do
+        age_claim(15, 2)
+        assert manager.process_follow_ups() == {'formal_notices': 0, 'warnings': 0, 'status_requests': 0}
+
+        # J+21: formal notice, then the claim leaves the escalation
+        age_claim(22, 2)
+        assert manager.process_follow_ups() == {'formal_notices': 1, 'warnings': 0, 'status_requests': 0}
+        age_claim(30, 3)
+        assert manager.process_follow_ups() == {'formal_notices': 0, 'warnings': 0, 'status_requests': 0}
+
+        tasks = sqlite3.connect(str(tmp_path / "tasks.db"))
+        queued = [row[0] for row in tasks.execute("SELECT task_type FROM tasks ORDER BY id").fetchall()]
+        tasks.close()
+        assert queued == ['execute_status_request', 'execute_warning', 'execute_formal_notice']
     
     def test_recent_escalations(self, escalation_logger, stagnant_claim):
         """Test retrieval of recent escalations."""
@@ -278,3 +272,94 @@ class TestEscalationWorkflow:
         # Should be ordered by date (most recent first)
         if len(recent) >= 2:
             assert recent[0]['created_at'] >= recent[1]['created_at']
+
+    def test_follow_up_planning_in_sql(self, db_manager, tmp_path, monkeypatch):
+        """Test that escalation levels are computed in SQL and queued per batch."""
+        monkeypatch.chdir(tmp_path)
+        conn = db_manager.get_connection()
+        conn.execute(
+            "INSERT INTO stores (id, client_id, platform, store_name, country) VALUES (1, 1, 'shopify', 'Test', 'FR')"
+        )
+        cases = [(8, 0), (15, 0), (15, 1), (22, 0), (22, 2), (22, 3), (3, 0), (30, 1)]
+        for i, (days, level) in enumerate(cases):
+            conn.execute("""
+                INSERT INTO claims (
+                    client_id, store_id, claim_reference, order_id, carrier,
+                    dispute_type, amount_requested, submitted_at, status, follow_up_level
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                1, 1, f'CLM-PLAN-{i}', f'ORD-{i}', 'DHL', 'lost', 100.0,
+                (datetime.now() - timedelta(days=days)).isoformat(), 'submitted', level
+            ))
+        conn.commit()
+        conn.close()
+
+        manager = FollowUpManager(db_manager, batch_size=3)
+        stats = manager.process_follow_ups()
+
+        assert stats == {'formal_notices': 3, 'warnings': 2, 'status_requests': 1}
+
+        tasks = sqlite3.connect(str(tmp_path / "tasks.db"))
+        counts = dict(tasks.execute("SELECT task_type, COUNT(*) FROM tasks GROUP BY task_type").fetchall())
+        tasks.close()
+        assert counts == {
+            'execute_formal_notice': 3,
+            'execute_warning': 2,
+            'execute_status_request': 1,
+        }
+
+    def test_formal_notices_generated_per_batch(self, db_manager, tmp_path, monkeypatch):
+        """Test that the J+21 claims of a batch get their PDFs from one generate_formal_notices_batch call."""
+        import pickle
+        monkeypatch.chdir(tmp_path)
+        conn = db_manager.get_connection()
+        conn.execute(
+            "INSERT INTO stores (id, client_id, platform, store_name, country) VALUES (1, 1, 'shopify', 'Test', 'FR')"
+        )
+        for i, days in enumerate((22, 25, 8)):
+            conn.execute("""
+                INSERT INTO claims (
+                    client_id, store_id, claim_reference, order_id, carrier,
+                    dispute_type, amount_requested, submitted_at, status, follow_up_level
+                ) VALUES (1, 1, ?, ?, 'DHL', 'lost', 100.0, ?, 'submitted', 0)
+            """, (f'CLM-MED-{i}', f'ORD-{i}', (datetime.now() - timedelta(days=days)).isoformat()))
+        conn.commit()
+        conn.close()
+        generator = MagicMock()
+        generator.generate_formal_notices_batch.return_value = {
+            'documents': {'CLM-MED-0': '/docs/MED_0.pdf'}, 'errors': {'CLM-MED-1': 'boom'}
+        }
+
+        stats = FollowUpManager(db_manager, generator=generator).process_follow_ups()
+
+        assert stats == {'formal_notices': 2, 'warnings': 0, 'status_requests': 1}
+        generator.generate_formal_notices_batch.assert_called_once()
+        batch = generator.generate_formal_notices_batch.call_args[0][0]
+        assert [claim['claim_reference'] for claim in batch] == ['CLM-MED-0', 'CLM-MED-1']
+
+        tasks = sqlite3.connect(str(tmp_path / "tasks.db"))
+        payloads = [pickle.loads(row[0]) for row in tasks.execute(
+            "SELECT payload FROM tasks WHERE task_type = 'execute_formal_notice' ORDER BY id"
+        ).fetchall()]
+        tasks.close()
+        # PDF manquant : le worker le régénère
+        assert [task['args'][1] for task in payloads] == ['/docs/MED_0.pdf', None]
+
+
+def test_follow_up_index_ensured_by_database_manager(tmp_path):
+    """The planning index is added to existing databases once, not per FollowUpManager."""
+    db_path = str(tmp_path / "existing.db")
+    DatabaseManager(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP INDEX idx_claims_follow_up")
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(db_path)
+    with patch.object(db, 'get_connection', side_effect=AssertionError("DDL per manager")):
+        FollowUpManager(db)
+
+    conn = sqlite3.connect(db_path)
+    index = conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND name='idx_claims_follow_up'").fetchone()
+    conn.close()
+    assert index is not None
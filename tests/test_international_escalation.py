@@ -116,3 +116,117 @@ def test_legal_document_generation(tmp_path):
     path_en = gen.generate_formal_notice(sample_claim, lang='EN', output_dir=str(tmp_path))
     assert os.path.exists(path_en)
     assert path_fr != path_en
+
+
+def test_formal_notices_batch_generation(tmp_path):
+    """Test parallel batch generation of formal notices."""
+    gen = LegalDocumentGenerator()
+    claims = [
+        {
+            'claim_reference': f'BATCH-{i}',
+            'carrier': 'DHL',
+            'tracking_number': f'TRK{i}',
+            'amount_requested': 100.0 + i,
+            'dispute_type': 'lost',
+            'country': 'FR' if i % 2 else 'DE'
+        }
+        for i in range(4)
+    ]
+    claims.append({'claim_reference': 'BATCH-BROKEN', 'carrier': 'DHL'})
+
+    result = gen.generate_formal_notices_batch(claims, output_dir=str(tmp_path), workers=2)
+
+    assert set(result['documents']) == {f'BATCH-{i}' for i in range(4)}
+    assert list(result['errors']) == ['BATCH-BROKEN']
+    assert '_FR_' in result['documents']['BATCH-1']
+    assert '_EN_' in result['documents']['BATCH-0']
+    assert all(os.path.getsize(path) > 1000 for path in result['documents'].values())
+    # Écriture atomique : aucun fichier temporaire ne subsiste
+    assert not [f for f in os.listdir(tmp_path) if f.endswith('.tmp')]
+    assert result['documents_per_second'] > 0
+
+
+def test_formal_notice_template_mode(tmp_path):
+    """Test formal notice stamped on a cached pre-rendered background."""
+    from src.reports.pdf_generator import PDFGenerator
+    from src.reports.pdf_templates import PDFBackgroundCache
+    cache = PDFBackgroundCache(str(tmp_path / 'templates'))
+    gen = LegalDocumentGenerator(use_templates=True, background_cache=cache)
+    claim = {
+        'claim_reference': 'TPL-001',
+        'carrier': 'Colissimo',
+        'tracking_number': '6A1234567890',
+        'amount_requested': 124.5,
+        'dispute_type': 'Colis Perdu',
+        'company_name': 'Boutique Alpha'
+    }
+
+    paths = [
+        gen.generate_formal_notice(dict(claim, claim_reference=f'TPL-00{i}'), lang='FR', output_dir=str(tmp_path))
+        for i in range(3)
+    ]
+
+    # Static layer rendered once, then reused from memory
+    assert cache.stats == {'renders': 1, 'disk_hits': 0, 'memory_hits': 2}
+    assert len(os.listdir(tmp_path / 'templates')) == 1
+    required = ['TPL-002', 'Colissimo', '6A1234567890', '124,50', 'Boutique Alpha', 'Code des Transports']
+    assert PDFGenerator().verify_pdf_compliance(paths[2], required, lang='FR')
+
+    # A new process reuses the cached background from disk
+    other = LegalDocumentGenerator(use_templates=True, background_cache=PDFBackgroundCache(str(tmp_path / 'templates')))
+    other.generate_formal_notice(claim, lang='FR', output_dir=str(tmp_path))
+    assert other._background_cache.stats['disk_hits'] == 1
+
+
+def test_formal_notice_template_stays_within_margins(tmp_path):
+    """Template layout flows onto a new page instead of crossing the bottom margin."""
+    from PyPDF2 import PdfReader
+    from src.reports.pdf_generator import PDFGenerator
+    from src.reports.legal_document_generator import select_law
+    from src.reports.pdf_templates import PDFBackgroundCache
+    gen = LegalDocumentGenerator(use_templates=True, background_cache=PDFBackgroundCache(str(tmp_path / 'templates')))
+    claim = {
+        'claim_reference': 'TPL-010', 'carrier': 'Colissimo', 'tracking_number': '6A1234567890',
+        'amount_requested': 124.5, 'dispute_type': 'Colis Perdu', 'company_name': 'Boutique Alpha'
+    }
+
+    for lang in ('FR', 'EN'):
+        layout = gen._formal_notice_layout(lang, *select_law(claim, lang))
+        assert layout.y >= layout.bottom
+        assert all(slot['y'] >= layout.bottom for slot in layout._slots.values() if slot['type'] == 'line')
+
+        path = gen.generate_formal_notice(claim, lang=lang, output_dir=str(tmp_path))
+        assert len(PdfReader(path).pages) == layout.page_count
+        # Case-sensitive language indicators ('Mise en demeure' / 'Formal Notice')
+        assert PDFGenerator().verify_pdf_compliance(path, ['TPL-010', 'Boutique Alpha'], lang=lang)
+
+
+def test_formal_notice_template_falls_back_when_fields_overflow(tmp_path):
+    """Values longer than their slot are not clipped: the notice is built in story mode."""
+    from PyPDF2 import PdfReader
+    from src.reports.pdf_templates import PDFBackgroundCache
+    cache = PDFBackgroundCache(str(tmp_path / 'templates'))
+    gen = LegalDocumentGenerator(use_templates=True, background_cache=cache)
+    company = "Société de Distribution Internationale d'Articles de Maison et de Jardin Alpha"
+    claim = {
+        'claim_reference': 'TPL-011', 'carrier': 'Colissimo', 'tracking_number': '6A1234567890',
+        'amount_requested': 124.5, 'dispute_type': 'Colis Perdu', 'company_name': company
+    }
+
+    path = gen.generate_formal_notice(claim, lang='FR', output_dir=str(tmp_path))
+
+    assert cache.stats['renders'] == 0
+    text = " ".join(" ".join(page.extract_text().split()) for page in PdfReader(path).pages)
+    assert company in text
+
+
+def test_template_field_values_are_wrapped():
+    from reportlab.lib.pagesizes import A4
+    from src.reports.pdf_templates import TemplateLayout
+    layout = TemplateLayout(A4)
+    layout.field("Société :", 'company', lines=2)
+    long_name = "Boutique " * 14
+
+    assert layout.fits({'company': "Boutique Alpha"})
+    assert not layout.fits({'company': long_name * 2})
+    assert len(layout._wrap_value(layout._slots['company'], long_name)) == 2
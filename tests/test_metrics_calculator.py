@@ -0,0 +1,215 @@
+"""
+Tests for MetricsCalculator: SQL KPI engine parity with the pandas path, KPI cache, daily rollup.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+
+from src.analytics.metrics_calculator import MetricsCalculator, claim_to_dispute, get_metrics_calculator
+from src.database import DatabaseManager
+
+SCALAR_KPIS = ['total_claims', 'success_rate', 'average_processing_time',
+               'total_recovered', 'average_claim_value', 'roi_client']
+
+
+@pytest.fixture
+def calculator():
+    return MetricsCalculator()
+
+
+@pytest.fixture
+def claims_db(db_manager, sample_client):
+    """Claims of two clients, with mixed carriers, statuses and resolution dates."""
+    other_id = db_manager.create_client(email='other@example.com')
+    now = datetime.now().replace(microsecond=0)
+    rows = [
+        # client, carrier, status, amount, accepted, submitted days ago, resolved after days
+        (sample_client['id'], 'colissimo', 'accepted', 120.0, 120.0, 10, 4),
+        (sample_client['id'], 'colissimo', 'rejected', 80.0, None, 8, 6),
+        (sample_client['id'], 'chronopost', 'paid', 45.5, 40.0, 20, 11),
+        (sample_client['id'], 'chronopost', 'pending', 60.0, None, None, None),
+        (sample_client['id'], 'ups', 'Recovered', 200.0, 150.0, 3, None),
+        (sample_client['id'], 'dhl', 'submitted', 99.9, None, 40, None),
+        (other_id, 'colissimo', 'accepted', 30.0, 30.0, 5, 2),
+        (other_id, 'dpd', 'under_review', 75.0, None, 1, None),
+    ]
+    for i, (client_id, carrier, status, amount, accepted, submitted, resolved) in enumerate(rows):
+        claim_id = db_manager.create_claim(
+            claim_reference=f'CLM-KPI-{i}', client_id=client_id, order_id=f'ORD-{i}',
+            carrier=carrier, dispute_type='lost', amount_requested=amount
+        )
+        updates = {'status': status}
+        if accepted is not None:
+            updates['accepted_amount'] = accepted
+        if submitted is not None:
+            updates['submitted_at'] = now - timedelta(days=submitted)
+            if resolved is not None:
+                updates['response_received_at'] = now - timedelta(days=submitted - resolved)
+        db_manager.update_claim(claim_id, **updates)
+    return db_manager, sample_client['id'], other_id
+
+
+def _all_claims(db_manager):
+    conn = db_manager.get_connection()
+    rows = [dict(row) for row in conn.execute("SELECT * FROM claims").fetchall()]
+    conn.close()
+    return rows
+
+
+def _assert_same_kpis(expected, actual):
+    for key in SCALAR_KPIS:
+        assert actual[key] == pytest.approx(expected[key]), key
+    assert actual['by_status'] == expected['by_status']
+    assert set(actual['by_carrier']) == set(expected['by_carrier'])
+    for carrier, metrics in expected['by_carrier'].items():
+        for key, value in metrics.items():
+            assert actual['by_carrier'][carrier][key] == pytest.approx(value), (carrier, key)
+
+
+class TestKpiSqlParity:
+
+    def test_client_kpis_match_pandas(self, calculator, claims_db):
+        db_manager, client_id, _ = claims_db
+        disputes = [claim_to_dispute(c) for c in db_manager.get_client_claims(client_id)]
+
+        expected = calculator.calculate_kpis(disputes)
+        actual = calculator.calculate_kpis_sql(db_manager, client_id=client_id)
+
+        assert actual['total_claims'] == 6
+        _assert_same_kpis(expected, actual)
+
+    def test_admin_kpis_match_pandas(self, calculator, claims_db):
+        db_manager, _, _ = claims_db
+        expected = calculator.calculate_kpis([claim_to_dispute(c) for c in _all_claims(db_manager)])
+
+        _assert_same_kpis(expected, calculator.calculate_kpis_sql(db_manager))
+
+    def test_default_processing_time_without_resolved_claims(self, calculator, claims_db):
+        db_manager, _, other_id = claims_db
+        db_manager.update_claim(
+            db_manager.get_client_claims(other_id, status='accepted')[0]['id'],
+            response_received_at=None
+        )
+        disputes = [claim_to_dispute(c) for c in db_manager.get_client_claims(other_id)]
+
+        actual = calculator.calculate_kpis_sql(db_manager, client_id=other_id)
+
+        assert actual['average_processing_time'] == calculator.calculate_kpis(disputes)['average_processing_time'] == 5.0
+
+    def test_empty_selection(self, calculator, claims_db):
+        db_manager, _, _ = claims_db
+        assert calculator.calculate_kpis_sql(db_manager, client_id=999) == calculator.calculate_kpis([])
+        assert calculator.calculate_kpis([]) == calculator.empty_kpis()
+
+    def test_temporal_evolution_matches_pandas(self, calculator, claims_db):
+        db_manager, client_id, _ = claims_db
+        disputes = [claim_to_dispute(c) for c in db_manager.get_client_claims(client_id)]
+
+        expected = calculator.get_temporal_evolution(disputes, period_days=30)
+        actual = calculator.get_temporal_evolution_sql(db_manager, client_id=client_id, period_days=30)
+
+        assert actual['dates'] == expected['dates']
+        assert actual['claims'] == expected['claims']
+        assert actual['amounts'] == pytest.approx(expected['amounts'])
+        assert actual['cumulative'] == pytest.approx(expected['cumulative'])
+
+
+class TestKpiCache:
+
+    def test_writes_bump_only_the_client_version(self, db_manager, sample_client):
+        other_id = db_manager.create_client(email='other@example.com')
+        assert db_manager.get_data_version(sample_client['id']) == 0
+
+        claim_id = db_manager.create_claim(
+            claim_reference='CLM-V-1', client_id=sample_client['id'], order_id='ORD-V',
+            carrier='ups', dispute_type='lost', amount_requested=10.0
+        )
+        db_manager.update_claim(claim_id, status='accepted')
+        db_manager.create_dispute(sample_client['id'], 'ORD-V2', 'dhl', 'lost', 5.0)
+
+        assert db_manager.get_data_version(sample_client['id']) == 3
+        assert db_manager.get_data_version(other_id) == 0
+        assert db_manager.get_data_version() == 3
+
+    def test_cached_kpis_are_invalidated_per_client(self, claims_db):
+        db_manager, client_id, other_id = claims_db
+        calculator = MetricsCalculator(db_manager=db_manager)
+
+        first = calculator.get_client_kpis(client_id)
+        other = calculator.get_client_kpis(other_id)
+        assert calculator.get_client_kpis(client_id) == first
+        assert calculator.get_cache_stats()['hits'] == 1
+
+        claim = db_manager.get_client_claims(client_id, status='pending')[0]
+        db_manager.update_claim(claim['id'], status='accepted', accepted_amount=60.0)
+
+        updated = calculator.get_client_kpis(client_id)
+        assert updated['by_status'].get('accepted') == first['by_status']['accepted'] + 1
+        assert calculator.get_client_kpis(other_id) == other
+
+        stats = calculator.get_cache_stats()
+        assert (stats['hits'], stats['misses'], stats['invalidations']) == (2, 3, 1)
+        assert stats['hit_rate'] == pytest.approx(0.4)
+
+    def test_shared_calculator_per_database(self, claims_db, tmp_path):
+        db_manager, client_id, _ = claims_db
+        calculator = get_metrics_calculator(db_manager)
+        assert get_metrics_calculator(db_manager) is calculator
+        assert calculator.db is db_manager
+        other_db = DatabaseManager(db_path=str(tmp_path / 'other.db'))
+        assert get_metrics_calculator(other_db).db is other_db
+
+        calculator.get_client_kpis(client_id)
+        get_metrics_calculator(db_manager).get_client_kpis(client_id)
+        assert calculator.get_cache_stats()['hits'] == 1
+
+    def test_cache_is_bounded_and_returns_copies(self, claims_db):
+        db_manager, client_id, _ = claims_db
+        calculator = MetricsCalculator(db_manager=db_manager, cache_size=2)
+
+        kpis = calculator.get_client_kpis(client_id)
+        kpis['by_carrier'].clear()
+        assert calculator.get_client_kpis(client_id)['by_carrier']
+
+        for days in (30, 90, 365):
+            calculator.get_client_temporal_evolution(client_id, period_days=days)
+        stats = calculator.get_cache_stats()
+        assert stats['size'] == 2
+        assert stats['evictions'] == 2
+
+
+def _rollup_rows(db_manager):
+    conn = db_manager.get_connection()
+    rows = conn.execute("""
+        SELECT client_id, carrier, status, day, is_submitted, claims_count,
+               ROUND(total_value, 2), ROUND(total_recovered, 2)
+        FROM claims_daily_rollup ORDER BY 1, 2, 3, 4, 5
+    """).fetchall()
+    conn.close()
+    return [tuple(row) for row in rows]
+
+
+class TestDailyRollup:
+
+    def test_incremental_rollup_matches_backfill(self, claims_db):
+        db_manager, client_id, _ = claims_db
+        incremental = _rollup_rows(db_manager)
+
+        assert db_manager.rebuild_daily_rollup() == len(incremental)
+        assert _rollup_rows(db_manager) == incremental
+        assert sum(row[5] for row in incremental) == 8
+
+    def test_status_change_moves_claim_between_rollup_rows(self, db_manager, sample_client):
+        claim_id = db_manager.create_claim(
+            claim_reference='CLM-R-1', client_id=sample_client['id'], order_id='ORD-R',
+            carrier='ups', dispute_type='lost', amount_requested=40.0
+        )
+        [(_, _, status, _, submitted, count, _, _)] = _rollup_rows(db_manager)
+        assert (status, submitted, count) == ('pending', 0, 1)
+
+        db_manager.update_claim(claim_id, status='accepted', accepted_amount=35.0,
+                                submitted_at=datetime(2026, 3, 2, 9, 30))
+
+        assert _rollup_rows(db_manager) == [
+            (sample_client['id'], 'ups', 'accepted', '2026-03-02', 1, 1, 40.0, 35.0)
+        ]
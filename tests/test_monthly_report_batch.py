@@ -0,0 +1,69 @@
+"""
+Tests for the overnight monthly report batch (incremental regeneration).
+"""
+
+import os
+import pytest
+
+from src.reports.monthly_report_batch import MonthlyReportBatch, month_bounds, month_label, previous_month
+
+MONTH = '2026-01'
+
+
+def _add_claim(db_manager, client_id, reference, amount, created_at='2026-01-15 10:00:00'):
+    claim_id = db_manager.create_claim(
+        claim_reference=reference,
+        client_id=client_id,
+        order_id=f'ORD-{reference}',
+        carrier='colissimo',
+        dispute_type='late_delivery',
+        amount_requested=amount
+    )
+    conn = db_manager.get_connection()
+    conn.execute("UPDATE claims SET created_at = ?, updated_at = ? WHERE id = ?", (created_at, created_at, claim_id))
+    conn.commit()
+    conn.close()
+    return claim_id
+
+
+@pytest.fixture
+def batch(db_manager, tmp_path):
+    return MonthlyReportBatch(db_manager=db_manager, output_dir=str(tmp_path), workers=1)
+
+
+class TestMonthlyReportBatch:
+
+    def test_month_helpers(self):
+        from datetime import datetime
+        assert month_bounds('2026-12') == ('2026-12-01', '2027-01-01')
+        assert month_label('2026-02') == 'Février 2026'
+        assert previous_month(datetime(2026, 1, 10)) == '2025-12'
+
+    def test_only_changed_clients_are_regenerated(self, batch, db_manager, sample_client):
+        other_id = db_manager.create_client(email='other@example.com', company_name='Other')
+        claim_id = _add_claim(db_manager, sample_client['id'], 'A1', 100.0)
+        _add_claim(db_manager, other_id, 'B1', 50.0)
+        _add_claim(db_manager, other_id, 'B2', 80.0, created_at='2026-02-03 09:00:00')
+
+        first = batch.run(MONTH)
+        assert first['generated'] == sorted([sample_client['id'], other_id])
+        assert first['errors'] == []
+        path = batch.get_report_path(sample_client['id'], MONTH)
+        assert path and os.path.exists(path)
+
+        assert batch.run(MONTH)['generated'] == []
+
+        db_manager.update_claim(claim_id, status='accepted', accepted_amount=100.0)
+        second = batch.run(MONTH)
+        assert second['generated'] == [sample_client['id']]
+        assert second['skipped'] == 1
+
+        assert [r['month'] for r in batch.list_reports(other_id)] == [MONTH]
+
+    def test_missing_pdf_is_regenerated(self, batch, db_manager, sample_client):
+        _add_claim(db_manager, sample_client['id'], 'A1', 100.0)
+        batch.run(MONTH)
+        os.remove(batch.get_report_path(sample_client['id'], MONTH) or '')
+
+        assert batch.get_report_path(sample_client['id'], MONTH) is None
+        assert batch.run(MONTH)['generated'] == [sample_client['id']]
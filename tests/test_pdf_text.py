@@ -0,0 +1,162 @@
+"""
+Tests for lazy, page-parallel PDF text extraction and its users
+(OCRProcessor PDF analysis, PDF compliance check).
+"""
+
+import io
+
+import pytest
+
+from src.utils import pdf_text
+from src.utils.pdf_text import extract_pdf_text, iter_pdf_pages
+from src.scrapers.ocr_processor import OCRProcessor
+
+PdfReader = pytest.importorskip('PyPDF2').PdfReader
+
+
+def _pdf(pages):
+    from reportlab.pdfgen import canvas
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for lines in pages:
+        for i, line in enumerate(lines):
+            pdf.drawString(72, 760 - i * 18, line)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def long_pdf():
+    return _pdf([[f"Page {i + 1}", "Suivi du colis 6A1234567890"] for i in range(30)])
+
+
+@pytest.fixture
+def count_pages(monkeypatch):
+    calls = []
+    page_text = pdf_text._page_text
+
+    def counting(page):
+        calls.append(page)
+        return page_text(page)
+
+    monkeypatch.setattr(pdf_text, '_page_text', counting)
+    return calls
+
+
+class TestIterPdfPages:
+
+    def test_sequential_matches_pypdf2(self, long_pdf, tmp_path):
+        reference = [page.extract_text() for page in PdfReader(io.BytesIO(long_pdf)).pages]
+        path = tmp_path / 'long.pdf'
+        path.write_bytes(long_pdf)
+
+        assert list(iter_pdf_pages(long_pdf, workers=1)) == reference
+        assert list(iter_pdf_pages(str(path))) == reference
+        with open(path, 'rb') as buffer:
+            assert extract_pdf_text(buffer) == "\n".join(reference)
+
+    def test_parallel_keeps_page_order(self, long_pdf):
+        reference = [page.extract_text() for page in PdfReader(io.BytesIO(long_pdf)).pages]
+
+        assert list(iter_pdf_pages(long_pdf, workers=2, parallel_min_pages=4)) == reference
+
+    def test_pages_are_extracted_lazily(self, long_pdf, count_pages):
+        pages = iter_pdf_pages(long_pdf, workers=1)
+        first = [next(pages) for _ in range(2)]
+        pages.close()
+
+        assert first[0].startswith("Page 1")
+        assert len(count_pages) == 2
+
+    def test_parallel_early_stop(self, long_pdf):
+        for page in iter_pdf_pages(long_pdf, workers=2, parallel_min_pages=4):
+            if page.startswith("Page 3"):
+                break
+        else:
+            pytest.fail("page 3 not reached")
+
+
+class TestPdfAnalysis:
+
+    def test_analyze_pdf_stops_at_confident_page(self, count_pages):
+        pages = [["Accusé de réception"]] * 2 + [["Le délai de réclamation est dépassé."]] + [["Annexe"]] * 20
+        processor = OCRProcessor()
+        processor.model = None
+
+        analysis = processor.analyze_pdf(_pdf(pages), workers=1)
+
+        assert analysis['reason_key'] == 'deadline_expired'
+        assert (analysis['page'], analysis['pages_read']) == (3, 3)
+        assert len(count_pages) == 3
+        assert 'dépassé' in analysis['text'] and 'Annexe' not in analysis['text']
+
+    def test_analyze_pdf_without_match_reads_everything(self):
+        processor = OCRProcessor()
+        processor.model = None
+
+        analysis = processor.analyze_pdf(_pdf([["Annexe"]] * 5), workers=1)
+
+        assert analysis['reason_key'] == 'unknown'
+        assert analysis['page'] is None
+        assert analysis['pages_read'] == 5
+
+    def test_analyze_file_reads_pdfs_page_by_page(self, count_pages):
+        pages = [["Le délai de réclamation est dépassé."]] + [["Annexe"]] * 20
+        processor = OCRProcessor()
+        processor.model = None
+
+        text, attachments, analysis = processor.analyze_file(io.BytesIO(_pdf(pages)), 'reponse.pdf')
+
+        assert analysis['reason_key'] == 'deadline_expired'
+        assert len(count_pages) == 1
+        assert 'dépassé' in text and 'text' not in analysis
+        assert attachments == []
+
+    def test_analyze_file_falls_back_without_pdf_text(self):
+        processor = OCRProcessor()
+        processor.model = None
+        buffer = io.BytesIO(_pdf([[]] * 2))
+
+        text, _, analysis = processor.analyze_file(buffer, 'colis_endommage.pdf')
+
+        assert text == processor.simulate_ocr_on_file('colis_endommage.pdf')
+        assert analysis == processor.analyze_rejection_text(text)
+
+    def test_analyze_file_serves_cached_pdfs(self, tmp_path, count_pages):
+        from src.scrapers.utils.ocr_cache import OCRCache
+        pdf = _pdf([["Le délai de réclamation est dépassé."]] + [["Annexe"]] * 5)
+        processor = OCRProcessor(cache=OCRCache(str(tmp_path / 'ocr.db')), pdf_workers=1)
+        processor.model = None
+
+        # Lecture arrêtée à la page du motif : le texte partiel n'est pas mis en cache
+        processor.analyze_file(io.BytesIO(pdf), 'reponse.pdf')
+        assert processor.cache.get_stats()['entries'] == 0
+
+        full_text, _ = processor.extract_all_from_file(io.BytesIO(pdf), 'reponse.pdf')
+        count_pages.clear()
+        text, _, analysis = processor.analyze_file(io.BytesIO(pdf), 'reponse.pdf')
+
+        assert count_pages == []
+        assert text == full_text
+        assert analysis['reason_key'] == 'deadline_expired'
+
+    def test_extract_all_from_file_keeps_page_layout(self, long_pdf):
+        reference = "".join(page.extract_text() + "\n" for page in PdfReader(io.BytesIO(long_pdf)).pages)
+
+        text, attachments = OCRProcessor().extract_all_from_file(io.BytesIO(long_pdf), 'reponse.pdf')
+
+        assert text == reference
+        assert attachments == []
+
+    def test_compliance_check_stops_once_verified(self, tmp_path, count_pages):
+        from src.reports.pdf_generator import PDFGenerator
+        path = tmp_path / 'rapport.pdf'
+        path.write_bytes(_pdf([["RAPPORT MENSUEL", "Client Test"]] + [["Détail"]] * 10))
+        generator = PDFGenerator()
+
+        assert generator.verify_pdf_compliance(str(path), ["Client Test"], lang='FR')
+        assert len(count_pages) == 1
+        other = tmp_path / 'annexe.pdf'
+        other.write_bytes(_pdf([["Annexe"]] * 3))
+        assert not generator.verify_pdf_compliance(str(other), [], lang='FR')
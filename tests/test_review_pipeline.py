@@ -0,0 +1,126 @@
+"""
+Tests for the streaming review analysis pipeline: JSON Lines input, chunk merging, serial parity.
+"""
+
+import json
+import random
+import statistics
+from collections import Counter
+
+import pytest
+
+from src.scrapers.utils.review_pipeline import (
+    ReviewAnalysisPipeline, ReviewStats, _analyze_chunk, _median, convert_to_jsonl,
+    extract_keywords, iter_reviews
+)
+from src.scrapers.utils.text_processor import DisputePatternExtractor
+
+SNIPPETS = [
+    "Colis perdu par Colissimo", "livré avec 3 jours de retard", "carton écrasé et abîmé",
+    "pas de signature sur la preuve de livraison", "service rapide et efficace",
+    "arnaque scandaleuse chez Chronopost", "attente de 2 semaines", "UPS parfait",
+    "48 heures de retard", "toujours pas reçu après 1 mois", "livreur professionnel"
+]
+
+
+@pytest.fixture
+def reviews():
+    rng = random.Random(7)
+    return [
+        {
+            'carrier': rng.choice(['colissimo', 'chronopost', 'ups', 'dpd']),
+            'rating': rng.randint(1, 5),
+            'title': 'Avis',
+            'text': '. '.join(rng.sample(SNIPPETS, rng.randint(1, 4))),
+            'source': 'trustpilot'
+        }
+        for _ in range(257)
+    ]
+
+
+@pytest.fixture
+def reviews_file(tmp_path, reviews):
+    path = tmp_path / 'reviews.jsonl'
+    with open(path, 'w', encoding='utf-8') as f:
+        for review in reviews:
+            f.write(json.dumps(review, ensure_ascii=False) + '\n')
+        f.write('\n{not json\n')
+    return path
+
+
+def _serial_reference(reviews):
+    """Statistics computed review by review, as TrustpilotDataAnalyzer does."""
+    extractor = DisputePatternExtractor()
+    patterns = [extractor.extract_patterns(r['text']) for r in reviews]
+    delays = [extractor.delay_in_days(d) for p in patterns for d in p['delay_mentions']]
+    scores = [p['severity_score'] for p in patterns]
+    ratings = [r['rating'] for r in reviews]
+    return {
+        'carriers': dict(Counter(r['carrier'] for r in reviews)),
+        'ratings': (statistics.mean(ratings), statistics.median(ratings)),
+        'losses': sum(1 for p in patterns if p['has_loss']),
+        'delays': (len(delays), statistics.mean(delays), statistics.median(delays), max(delays)),
+        'severity': (statistics.mean(scores), statistics.median(scores)),
+        'sentiment': dict(Counter(extractor.analyze_sentiment(r['text']) for r in reviews)),
+        'keywords': Counter(w for r in reviews for w in extract_keywords(r['text']))
+    }
+
+
+def _assert_matches_reference(results, reference, total):
+    assert results['total_reviews'] == total
+    assert results['carrier_distribution'] == reference['carriers']
+    assert (results['rating_distribution']['average'], results['rating_distribution']['median']) \
+        == pytest.approx(reference['ratings'])
+    assert results['pattern_statistics']['losses'] == reference['losses']
+    delays = results['delay_statistics']
+    assert (delays['count'], delays['average_days'], delays['median_days'], delays['max_days']) \
+        == pytest.approx(reference['delays'])
+    severity = results['severity_analysis']
+    assert (severity['average'], severity['median']) == pytest.approx(reference['severity'])
+    assert results['sentiment_distribution'] == reference['sentiment']
+    for word, count in results['top_keywords'].items():
+        assert reference['keywords'][word] == count
+
+
+class TestReviewPipeline:
+
+    def test_streams_jsonl_and_skips_malformed_lines(self, reviews_file, reviews):
+        assert list(iter_reviews(reviews_file)) == reviews
+
+    def test_convert_legacy_export(self, tmp_path, reviews):
+        legacy = tmp_path / 'export.json'
+        legacy.write_text(json.dumps({'count': len(reviews), 'data': reviews}), encoding='utf-8')
+
+        converted = convert_to_jsonl(legacy)
+
+        assert converted.suffix == '.jsonl'
+        assert list(iter_reviews(converted)) == reviews
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_matches_serial_analysis(self, reviews_file, reviews, workers):
+        pipeline = ReviewAnalysisPipeline(workers=workers, chunk_size=50)
+
+        results = pipeline.run_file(reviews_file)
+
+        _assert_matches_reference(results, _serial_reference(reviews), len(reviews))
+
+    def test_chunk_merge_is_order_independent(self, reviews):
+        whole = _analyze_chunk(reviews).to_dict()
+        merged = ReviewStats()
+        for begin in reversed(range(0, len(reviews), 40)):
+            merged.merge(_analyze_chunk(reviews[begin:begin + 40]))
+
+        assert merged.to_dict() == whole
+
+    def test_keyword_pruning_bounds_memory(self, reviews):
+        stats = ReviewStats()
+        for review in reviews:
+            stats.merge(_analyze_chunk([review]), max_keywords=10)
+
+        assert len(stats.keywords) <= 10
+        assert ReviewAnalysisPipeline(workers=1).run([])['total_reviews'] == 0
+
+    def test_counter_median(self):
+        for values in ([3], [1, 2], [5, 1, 1, 4], [0.5, 2, 2, 7, 9]):
+            assert _median(Counter(values)) == statistics.median(values)
+        assert _median(Counter()) == 0
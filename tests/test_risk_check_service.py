@@ -0,0 +1,99 @@
+"""
+Tests for RiskCheckService: in-memory fraud registry index and batch order checks.
+"""
+
+import pytest
+
+from src.analytics.risk_check_service import RiskCheckService, FraudRegistryIndex, BloomFilter
+
+
+def _execute(db_manager, query, params=()):
+    conn = db_manager.get_connection()
+    conn.execute(query, params)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture(params=[False, True], ids=['dict', 'bloom'])
+def service(request, db_manager):
+    index = FraudRegistryIndex(db_manager, refresh_interval=0, bloom=request.param)
+    return RiskCheckService(db_manager=db_manager, index=index)
+
+
+class TestFraudRegistryIndex:
+
+    def test_batch_check_matches_single_checks(self, service):
+        service.report_fraud('email', 'fraudster@evil.com', 'Chargeback', 1)
+        service.report_fraud('phone', '+33600000000', 'Fake identity', 1)
+        orders = [
+            {'customer_email': 'fraudster@evil.com', 'customer_phone': '+33600000000'},
+            {'customer_email': 'honest@example.com', 'delivery_address': '1 rue de Paris'},
+            {'customer_email': None},
+        ]
+
+        results = service.check_orders_risk(orders)
+
+        assert results == [service.check_order_risk(order) for order in orders]
+        assert results[0]['risk_score'] == 60
+        assert results[0]['risk_level'] == 'high'
+        assert len(results[0]['reasons']) == 2
+        assert results[1] == {'risk_score': 0, 'risk_level': 'low', 'reasons': [], 'is_safe': True}
+
+    def test_incremental_refresh_and_deletions(self, service, db_manager):
+        service.report_fraud('email', 'a@evil.com', 'First', 1)
+        version = service.index.version
+
+        _execute(db_manager, """
+            INSERT INTO global_fraud_registry (entity_type, entity_value, risk_level, reason)
+            VALUES ('address', '13 rue du Crime', 'critical', 'Drop address')
+        """)
+        assert service.index.refresh() == 1
+        assert service.index.version > version
+        assert service.check_order_risk({'delivery_address': '13 rue du Crime'})['risk_score'] == 90
+
+        # Re-signalement : la raison est remplacée sans doublon dans l'index
+        service.report_fraud('email', 'a@evil.com', 'Second', 1)
+        assert len(service.index) == 2
+        assert service.index.lookup('email', 'a@evil.com') == ('medium', 'Second')
+
+        _execute(db_manager, "DELETE FROM global_fraud_registry WHERE entity_type = 'address'")
+        assert service.check_order_risk({'delivery_address': '13 rue du Crime'})['reasons'] == []
+        assert len(service.index) == 1
+
+    def test_index_is_refreshed_on_interval(self, db_manager):
+        index = FraudRegistryIndex(db_manager, refresh_interval=3600)
+        service = RiskCheckService(db_manager=db_manager, index=index)
+        service.check_order_risk({'customer_email': 'late@evil.com'})
+
+        _execute(db_manager, """
+            INSERT INTO global_fraud_registry (entity_type, entity_value, risk_level, reason)
+            VALUES ('email', 'late@evil.com', 'high', 'Reported elsewhere')
+        """)
+        assert service.check_order_risk({'customer_email': 'late@evil.com'})['risk_score'] == 0
+
+        index.refresh()
+        assert service.check_order_risk({'customer_email': 'late@evil.com'})['risk_score'] == 60
+
+    def test_in_place_updates_picked_up_by_full_refresh(self, db_manager):
+        index = FraudRegistryIndex(db_manager, refresh_interval=0, full_refresh_interval=3600)
+        service = RiskCheckService(db_manager=db_manager, index=index)
+        service.report_fraud('email', 'upgraded@evil.com', 'Suspicious', 1)
+        assert service.check_order_risk({'customer_email': 'upgraded@evil.com'})['risk_score'] == 30
+
+        _execute(db_manager, "UPDATE global_fraud_registry SET risk_level = 'critical' WHERE entity_value = 'upgraded@evil.com'")
+        # Même id, même nombre de lignes : l'incrémental ne voit rien
+        assert service.check_order_risk({'customer_email': 'upgraded@evil.com'})['risk_score'] == 30
+
+        index.full_refresh_interval = 0
+        assert service.check_order_risk({'customer_email': 'upgraded@evil.com'})['risk_score'] == 90
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    keys = [i * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(1 for i in range(1000, 11000) if (i * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF) in bloom)
+    assert false_positives < 300
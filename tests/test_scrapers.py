@@ -41,6 +41,18 @@ class TestBaseScraper:
         soup = scraper._fetch_page("http://example.com")
         assert soup is None
 
+    @pytest.mark.parametrize('body', [b"", b"  \n", b"<!-- nothing -->"])
+    @patch('requests.Session.get')
+    def test_fetch_page_unparsable_body(self, mock_get, body):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.content = body
+        mock_get.return_value = mock_response
+        
+        scraper = ConcreteScraper(parser='lxml')
+        root = scraper._fetch_page("http://example.com")
+        assert root is None or root.tag == 'html'
+
     def test_save_load_data(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             scraper = ConcreteScraper(output_dir=tmpdir)
@@ -98,3 +110,241 @@ class TestTrustpilotScraper:
             reviews = scraper._scrape_carrier('colissimo', 'http://url', max_pages=3, min_rating=5)
             assert len(reviews) == 2
             assert mock_fetch.call_count == 3  # Page 1, Page 2, Page 3 (None)
+
+
+class TestHtmlParsers:
+    PAGE = """
+    <html><head><script>var reviews = [];</script></head><body>
+    <nav><a href="/categories/1">Livraison</a></nav>
+    <article class="paper styles_reviewCard" data-review-id="abc123">
+        <div class="star-rating_starRating" data-service-review-rating="2"></div>
+        <h2 class="typography_Title">Colis <b>abîmé</b></h2>
+        <p class="typography_Content">Reçu avec 5 jours de retard, <em>carton</em> écrasé</p>
+        <time datetime="2026-02-01T09:00:00Z"></time>
+        <span class="consumer_Name">Émilie R.</span>
+    </article>
+    <article class="review-card">
+        <div class="review-content">Jamais reçu</div>
+        <a href="https://fr.trustpilot.com/reviews/65f0c1?utm=1">Voir</a>
+    </article>
+    </body></html>
+    """.encode('utf-8')
+
+    @pytest.mark.parametrize('options', [
+        {'parser': 'soup', 'parse_only': True},
+        {'parser': 'lxml'},
+    ])
+    def test_fast_paths_match_beautifulsoup(self, options):
+        reference = TrustpilotScraper(parser='soup')
+        expected = reference._parse_review_cards(reference.parse_document(self.PAGE), 'ups')
+        scraper = TrustpilotScraper(**options)
+
+        reviews = scraper._parse_review_cards(scraper.parse_document(self.PAGE), 'ups')
+
+        assert reviews == expected
+        assert [r['review_id'] for r in reviews] == ['abc123', '65f0c1']
+        assert reviews[0]['title'] == 'Colisabîmé'  # get_text(strip=True) semantics
+        assert reviews[0]['author_initials'] == 'Ém'
+        assert reviews[1]['rating'] == 3
+
+    @pytest.mark.parametrize('content', [b'', b' \r\n\t', '', '   '])
+    def test_parse_html_blank_page(self, content):
+        from src.scrapers.utils import html_parser
+        root = html_parser.parse_html(content)
+        assert root.tag == 'html'
+        assert len(root) == 0
+
+    @pytest.mark.parametrize('content', [
+        '<?xml version="1.0" encoding="utf-8"?><html><body><p>Reçu</p></body></html>',
+        '<?xml version="1.0" encoding="utf-8"?><html><body><p>Reçu</p></body></html>'.encode('utf-8'),
+        '<?xml version="1.0" encoding="iso-8859-1"?><html><body><p>Reçu</p></body></html>'.encode('latin-1'),
+    ])
+    def test_parse_html_xml_declaration(self, content):
+        from src.scrapers.utils import html_parser
+        root = html_parser.parse_html(content)
+        assert html_parser.text_of(html_parser.select_one(root, '//p')) == 'Reçu'
+
+    def test_compiled_selectors_are_shared(self):
+        from src.scrapers.utils import html_parser
+        assert html_parser.compile_selector(TrustpilotScraper.CARD_XPATH) is \
+            html_parser.compile_selector(TrustpilotScraper.CARD_XPATH)
+        root = html_parser.parse_html(self.PAGE)
+        assert len(html_parser.select(root, TrustpilotScraper.CARD_XPATH)) == 2
+        assert html_parser.select_one(root, '//table') is None
+        if not html_parser.CSSSELECT_AVAILABLE:
+            with pytest.raises(ImportError):
+                html_parser.compile_selector('article.review')
+        with pytest.raises(ValueError):
+            TrustpilotScraper(parser='regex')
+
+
+class _FixtureSite:
+    """Local Trustpilot-like site: 2 reviews per page, ETag validators, request log."""
+
+    PAGE_SIZE = 2
+
+    def __init__(self):
+        import threading
+        self.reviews = {}  # path -> newest-first list of (id, rating, text)
+        self.bodies = {}  # (path, page) -> raw body served instead of the review cards
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def page(self, path, number):
+        start = (number - 1) * self.PAGE_SIZE
+        cards = "".join(
+            f'<article class="review-card" data-review-id="{rid}">'
+            f'<div class="star-rating" data-service-review-rating="{rating}"></div>'
+            f'<p class="review-content">{text}</p></article>'
+            for rid, rating, text in self.reviews.get(path, [])[start:start + self.PAGE_SIZE]
+        )
+        return f"<html><body>{cards}</body></html>".encode('utf-8')
+
+    def handler(self):
+        import hashlib
+        import time
+        from http.server import BaseHTTPRequestHandler
+        from urllib.parse import urlsplit, parse_qs
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with site.lock:
+                    site.in_flight += 1
+                    site.max_in_flight = max(site.max_in_flight, site.in_flight)
+                try:
+                    time.sleep(0.02)
+                    parts = urlsplit(self.path)
+                    number = int(parse_qs(parts.query).get('page', ['1'])[0])
+                    body = site.bodies.get((parts.path, number)) or site.page(parts.path, number)
+                    etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                    status = 304 if self.headers.get('If-None-Match') == etag else 200
+                    with site.lock:
+                        site.requests.append((parts.path, number, status))
+                    self.send_response(status)
+                    self.send_header('ETag', etag)
+                    if status == 200:
+                        self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    if status == 200:
+                        self.wfile.write(body)
+                finally:
+                    with site.lock:
+                        site.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def fixture_site():
+    import threading
+    from http.server import ThreadingHTTPServer
+    site = _FixtureSite()
+    site.reviews = {
+        '/review/laposte': [(f'lp{i}', 1 + i % 5, f'Colis perdu numéro {i}') for i in range(5, 0, -1)],
+        '/review/dhl': [(f'dhl{i}', 1, f'Retard de {i} jours') for i in range(3, 0, -1)],
+    }
+    server = ThreadingHTTPServer(('127.0.0.1', 0), site.handler())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    site.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield site
+    server.shutdown()
+    server.server_close()
+
+
+class TestTrustpilotAsyncScraper:
+
+    @pytest.fixture
+    def scraper(self, fixture_site, tmp_path):
+        scraper = TrustpilotScraper(rate_limit=500)
+        scraper.CARRIERS = {
+            'colissimo': f"{fixture_site.base_url}/review/laposte",
+            'dhl': f"{fixture_site.base_url}/review/dhl",
+        }
+        return scraper
+
+    def _crawl(self, scraper, state_path, **kwargs):
+        import asyncio
+        from src.scrapers.utils.crawl_state import CrawlState
+        state = CrawlState(state_path)
+        reviews = asyncio.run(scraper.scrape_async(max_pages=10, min_rating=5, state=state, **kwargs))
+        state.save()
+        return reviews
+
+    def test_incremental_crawl(self, scraper, fixture_site, tmp_path):
+        state_path = tmp_path / 'state.json'
+
+        first = self._crawl(scraper, state_path)
+        assert sorted(r['review_id'] for r in first) == ['dhl1', 'dhl2', 'dhl3', 'lp1', 'lp2', 'lp3', 'lp4', 'lp5']
+        assert all('patterns' in r for r in first)
+        assert ('/review/laposte', 4, 200) in fixture_site.requests  # Empty page ends pagination
+
+        # Nothing published: each carrier costs one conditional request
+        fixture_site.requests.clear()
+        assert self._crawl(scraper, state_path) == []
+        assert sorted(fixture_site.requests) == [('/review/dhl', 1, 304), ('/review/laposte', 1, 304)]
+
+        # A new review shifts every page: pagination stops at the first seen id
+        fixture_site.reviews['/review/laposte'].insert(0, ('lp6', 2, 'Colis cassé'))
+        fixture_site.requests.clear()
+        new = self._crawl(scraper, state_path)
+        assert [r['review_id'] for r in new] == ['lp6']
+        assert sorted(fixture_site.requests) == [('/review/dhl', 1, 304), ('/review/laposte', 1, 200)]
+
+    def test_rating_filter_and_per_host_concurrency(self, scraper, fixture_site, tmp_path):
+        import asyncio
+        low = asyncio.run(scraper.scrape_async(max_pages=10, min_rating=1, concurrency_per_host=1))
+
+        assert {r['review_id'] for r in low} == {'lp5', 'dhl1', 'dhl2', 'dhl3'}
+        assert fixture_site.max_in_flight == 1
+
+        # Reviews filtered out by rating are still marked as seen
+        self._crawl(scraper, tmp_path / 'state.json', concurrency_per_host=2)
+        assert fixture_site.max_in_flight == 2
+        assert self._crawl(scraper, tmp_path / 'state.json') == []
+
+    def test_blank_and_declared_pages(self, scraper, fixture_site, tmp_path):
+        fixture_site.bodies[('/review/dhl', 1)] = b'   \n'
+        fixture_site.bodies[('/review/laposte', 1)] = (
+            '<?xml version="1.0" encoding="iso-8859-1"?>'
+            '<html><body><article class="review-card" data-review-id="lp9">'
+            '<div class="star-rating" data-service-review-rating="1"></div>'
+            '<p class="review-content">Colis reçu abîmé</p></article></body></html>'
+        ).encode('latin-1')
+
+        reviews = self._crawl(scraper, tmp_path / 'state.json')
+        assert [r['review_id'] for r in reviews if r['carrier'] == 'dhl'] == []
+        assert 'lp9' in [r['review_id'] for r in reviews]
+        assert next(r for r in reviews if r['review_id'] == 'lp9')['text'] == 'Colis reçu abîmé'
+
+    def test_unparsable_page_is_refetched(self, scraper, fixture_site, tmp_path):
+        fixture_site.bodies[('/review/dhl', 1)] = b'<!-- maintenance -->'
+        self._crawl(scraper, tmp_path / 'state.json')
+        assert ('/review/dhl', 1, 200) in fixture_site.requests
+
+        # No validators kept for the failed page: the next crawl reads it again
+        del fixture_site.bodies[('/review/dhl', 1)]
+        fixture_site.requests.clear()
+        reviews = self._crawl(scraper, tmp_path / 'state.json')
+        assert ('/review/dhl', 1, 200) in fixture_site.requests
+        assert {'dhl1', 'dhl2'} <= {r['review_id'] for r in reviews}
+
+    def test_crawl_state_roundtrip(self, tmp_path):
+        from src.scrapers.utils.crawl_state import CrawlState
+        state = CrawlState(tmp_path / 'state.json', max_seen=3)
+        state.update_validators('http://a/1', {'ETag': '"x"', 'Last-Modified': 'Mon, 01 Jan 2026 00:00:00 GMT'})
+        state.mark_seen('ups', ['a', 'b', 'c', 'd'])
+        state.save()
+
+        loaded = CrawlState(tmp_path / 'state.json', max_seen=3)
+        assert loaded.conditional_headers('http://a/1') == {
+            'If-None-Match': '"x"', 'If-Modified-Since': 'Mon, 01 Jan 2026 00:00:00 GMT'
+        }
+        assert loaded.conditional_headers('http://a/2') == {}
+        assert not loaded.is_seen('ups', 'a') and loaded.is_seen('ups', 'd')
@@ -1,8 +1,9 @@
 import pytest
 import time
 from unittest.mock import MagicMock, patch
-from src.scrapers.utils.rate_limiter import RateLimiter
+from src.scrapers.utils.rate_limiter import RateLimiter, RateLimitedSession, get_rate_limiter, reset_rate_limiters
 from src.scrapers.utils.text_processor import DisputePatternExtractor
+from src.scrapers.utils.keyword_matcher import KeywordMatcher, AHOCORASICK_AVAILABLE
 
 class TestRateLimiter:
     def test_init(self):
@@ -34,16 +35,80 @@ class TestRateLimiter:
             assert l == limiter
             assert limiter.tokens < limiter.burst
 
+    def test_threads_share_the_bucket(self):
+        import threading
+        limiter = RateLimiter(requests_per_second=100.0, burst=2)
+        threads = [threading.Thread(target=lambda: [limiter.wait() for _ in range(5)]) for _ in range(4)]
+
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 20 requests, 2 free in burst, then one every 10 ms
+        assert time.monotonic() - start >= 0.17
+
+    def test_async_acquire(self):
+        import asyncio
+        limiter = RateLimiter(requests_per_second=100.0)
+
+        async def crawl():
+            async def task():
+                async with limiter:
+                    return time.monotonic()
+            return await asyncio.gather(*(task() for _ in range(10)))
+
+        stamps = sorted(asyncio.run(crawl()))
+        assert stamps[-1] - stamps[0] >= 0.085
+
+    def test_shared_state_across_processes(self, tmp_path):
+        import multiprocessing
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        state_path = str(tmp_path / 'rate_limits.db')
+        processes = [context.Process(target=_timed_requests, args=(state_path, queue)) for _ in range(2)]
+        for process in processes:
+            process.start()
+        stamps = sorted(stamp for _ in processes for stamp in queue.get(timeout=30))
+        for process in processes:
+            process.join()
+
+        # One bucket for both processes: 20 requests at 50/s
+        assert len(stamps) == 20
+        assert stamps[-1] - stamps[0] >= 0.9 * 19 / 50
+
+    def test_session_and_shared_registry(self):
+        reset_rate_limiters()
+        limiter = get_rate_limiter('tests:api', requests_per_second=1000.0)
+        assert get_rate_limiter('tests:api', requests_per_second=1.0) is limiter
+
+        session = RateLimitedSession(limiter)
+        with patch('requests.Session.request', return_value='ok') as mock_request:
+            assert session.get('http://example.com') == 'ok'
+        mock_request.assert_called_once()
+        assert limiter.tokens < limiter.burst
+        reset_rate_limiters()
+
+
+def _timed_requests(state_path, queue):
+    limiter = RateLimiter(requests_per_second=50.0, state_path=state_path, key='shared')
+    stamps = []
+    for _ in range(10):
+        limiter.wait()
+        stamps.append(time.monotonic())
+    queue.put(stamps)
+
 class TestDisputePatternExtractor:
     @pytest.fixture
     def extractor(self):
         return DisputePatternExtractor()
 
     def test_detect_keywords(self, extractor):
-        text = "Mon colis est en retard et abîmé"
-        assert extractor._detect_keywords(text.lower(), extractor.DELAY_KEYWORDS) is True
-        assert extractor._detect_keywords(text.lower(), extractor.DAMAGE_KEYWORDS) is True
-        assert extractor._detect_keywords(text.lower(), extractor.LOSS_KEYWORDS) is False
+        patterns = extractor.extract_patterns("Mon colis est en retard et abîmé")
+        assert patterns['has_delay'] is True
+        assert patterns['has_damage'] is True
+        assert patterns['has_loss'] is False
 
     def test_extract_delays(self, extractor):
         text = "J'ai 3 jours de retard sur ma livraison"
@@ -59,8 +124,7 @@ class TestDisputePatternExtractor:
         assert 10.0 in amounts
 
     def test_extract_carriers(self, extractor):
-        text = "Livraison par Colissimo et Chronopost"
-        carriers = extractor._extract_carriers(text.lower())
+        carriers = extractor.extract_patterns("Livraison par Colissimo et Chronopost")['carriers']
         assert 'colissimo' in carriers
         assert 'chronopost' in carriers
 
@@ -89,3 +153,71 @@ class TestDisputePatternExtractor:
         assert stats['with_loss'] == 1
         assert stats['with_damage'] == 1
         assert stats['avg_delay_days'] == 2.0
+
+
+def _naive_categories(lexicon, text):
+    return {category for category, keywords in lexicon.items() if any(k in text for k in keywords)}
+
+
+class TestKeywordMatcher:
+    LEXICON = {
+        'loss': ['jamais reçu', 'perdu'],
+        'proof': ['reçu', 'preuve'],
+        'carrier': ['chrono', 'chronopost', 'ups'],
+        'overlap': ['abcd', 'cdef', 'bc'],
+    }
+    BACKENDS = ['scan', 'regex'] + (['ahocorasick'] if AHOCORASICK_AVAILABLE else [])
+
+    @pytest.mark.parametrize('backend', BACKENDS)
+    def test_substring_semantics(self, backend):
+        matcher = KeywordMatcher(self.LEXICON, backend=backend)
+
+        assert matcher.match("colis jamais reçu") == {'loss', 'proof'}
+        assert matcher.find_keywords("via chronopost") == {'chrono', 'chronopost'}
+        assert matcher.find_keywords("xabcdefx") == {'abcd', 'cdef', 'bc'}
+        assert matcher.match("two groups") == {'carrier'}
+        assert matcher.count("perdu, jamais reçu, preuve") == {'loss': 2, 'proof': 2}
+        assert matcher.match("") == set()
+
+    @pytest.mark.parametrize('backend', BACKENDS)
+    def test_matches_naive_scan(self, backend):
+        import random
+        rng = random.Random(0)
+        pieces = ['abc', 'def', 'chrono', 'post', 'ups', 'reçu', 'jamais ', 'per', 'du', ' ', 'x']
+        texts = ["".join(rng.choice(pieces) for _ in range(rng.randint(0, 12))) for _ in range(500)]
+        matcher = KeywordMatcher(self.LEXICON, backend=backend)
+
+        assert matcher.match_batch(texts) == [_naive_categories(self.LEXICON, t) for t in texts]
+
+    def test_auto_backend_and_shared_instances(self):
+        small = KeywordMatcher.for_lexicon(self.LEXICON)
+        assert small is KeywordMatcher.for_lexicon(dict(self.LEXICON))
+        if not AHOCORASICK_AVAILABLE:
+            assert small.backend == 'scan'
+            large = KeywordMatcher({'words': [f'mot{i}' for i in range(200)]})
+            assert large.backend == 'regex'
+        with pytest.raises(ValueError):
+            KeywordMatcher(self.LEXICON, backend='unknown')
+
+    def test_extractor_batch_matches_single(self):
+        extractor = DisputePatternExtractor()
+        texts = ["Colis UPS cassé, 3 jours de retard", "Jamais reçu, arnaque", ""]
+        assert extractor.extract_patterns_batch(texts) == [extractor.extract_patterns(t) for t in texts]
+        assert extractor.extract_patterns(texts[0])['carriers'] == ['ups']
+
+
+class TestSentimentAnalyzer:
+
+    def test_batch_tickets(self):
+        from src.analytics.sentiment_analyzer import SentimentAnalyzer
+        analyzer = SentimentAnalyzer()
+        tickets = [
+            {'subject': 'Plainte', 'preview': "C'est inacceptable, je contacte mon avocat"},
+            {'subject': 'Merci', 'preview': 'Livraison rapide et parfait'},
+        ]
+
+        analyzed = analyzer.batch_analyze_tickets(tickets)
+
+        assert analyzed[0]['sentiment_analysis']['sentiment'] == 'CRITICAL_FRUSTRATION'
+        assert analyzed[0]['sentiment_analysis']['score'] == -1.0
+        assert analyzed[1]['sentiment_analysis']['sentiment'] == 'VERY_SATISFIED'
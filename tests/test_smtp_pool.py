@@ -0,0 +1,121 @@
+"""
+Tests for the pooled SMTP sessions, against a local aiosmtpd server.
+"""
+
+import smtplib
+import socket
+import time
+import pytest
+from email.mime.text import MIMEText
+
+pytest.importorskip('aiosmtpd')
+
+from src.email_service.smtp_pool import (
+    SMTPConnectionPool, ProviderRateLimiter, get_smtp_pool
+)
+
+
+def _message(i: int) -> MIMEText:
+    msg = MIMEText(f"Body {i}")
+    msg['Subject'] = f"Test {i}"
+    msg['From'] = 'sender@example.com'
+    msg['To'] = 'carrier@example.com'
+    return msg
+
+
+def _pool(controller, **kwargs) -> SMTPConnectionPool:
+    return SMTPConnectionPool(controller.hostname, controller.port, starttls=False, **kwargs)
+
+
+class TestSMTPConnectionPool:
+
+    def test_session_is_reused(self, smtp_server):
+        controller, handler = smtp_server
+        pool = _pool(controller)
+
+        for i in range(5):
+            pool.send_message(_message(i))
+        pool.close()
+
+        assert len(handler.messages) == 5
+        assert pool.stats['connections_opened'] == 1
+        assert handler.sessions == 1
+
+    def test_message_cap_recycles_session(self, smtp_server):
+        controller, handler = smtp_server
+        pool = _pool(controller, max_messages_per_connection=2)
+
+        for i in range(5):
+            pool.send_message(_message(i))
+        pool.close()
+
+        assert len(handler.messages) == 5
+        assert pool.stats['connections_opened'] == 3
+
+    def test_reconnect_after_dropped_session(self, smtp_server):
+        controller, handler = smtp_server
+        pool = _pool(controller)
+        pool.send_message(_message(0))
+
+        # Simulate the server closing the idle session
+        pool._idle[0].server.sock.shutdown(socket.SHUT_RDWR)
+        pool.send_message(_message(1))
+        pool.close()
+
+        assert len(handler.messages) == 2
+        assert pool.stats['reconnects'] == 1
+
+    def test_refused_recipient_is_not_retried(self, smtp_server):
+        controller, handler = smtp_server
+        handler.reject_recipients.add('carrier@example.com')
+        pool = _pool(controller)
+
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            pool.send_message(_message(0))
+        pool.close()
+
+        assert handler.messages == []
+        assert handler.sessions == 1
+        assert pool.stats['reconnects'] == 0
+
+    def test_keepalive_noop_replaces_dead_session(self, smtp_server):
+        controller, handler = smtp_server
+        pool = _pool(controller, keepalive_interval=0.0)
+        pool.send_message(_message(0))
+        pool._idle[0].server.sock.shutdown(socket.SHUT_RDWR)
+
+        pool.send_message(_message(1))
+        pool.close()
+
+        assert len(handler.messages) == 2
+        assert pool.stats['connections_opened'] == 2
+        assert pool.stats['reconnects'] == 0
+
+    def test_provider_rate_limit(self, smtp_server):
+        controller, handler = smtp_server
+        pool = _pool(controller, rate_limiter=ProviderRateLimiter(messages_per_second=20))
+
+        start = time.monotonic()
+        for i in range(5):
+            pool.send_message(_message(i))
+        elapsed = time.monotonic() - start
+        pool.close()
+
+        assert elapsed >= 4 * (1 / 20) * 0.9
+
+    def test_registry_shares_pool_and_rate_limiter(self):
+        a = get_smtp_pool('smtp.example.com', 587, 'a@example.com', 'x')
+        b = get_smtp_pool('smtp.example.com', 587, 'a@example.com', 'x')
+        c = get_smtp_pool('smtp.example.com', 587, 'b@example.com', 'y')
+
+        assert a is b
+        assert a is not c
+        assert a.rate_limiter is c.rate_limiter
+
+    def test_registry_keys_pools_by_starttls(self):
+        tls = get_smtp_pool('smtp.example.com', 587, 'a@example.com', 'x', starttls=True)
+        plain = get_smtp_pool('smtp.example.com', 587, 'a@example.com', 'x', starttls=False)
+
+        assert tls is not plain
+        assert (tls.starttls, plain.starttls) == (True, False)
+        assert get_smtp_pool('smtp.example.com', 587, 'a@example.com', 'x', starttls=False) is plain
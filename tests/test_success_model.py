@@ -0,0 +1,99 @@
+"""
+Tests for the trained success model and its use by AIPredictor.
+"""
+
+import numpy as np
+import pytest
+
+from src.ai.predictor import AIPredictor
+from src.ai.success_model import SuccessModel, calibration_report, load_success_model, train_from_db
+
+
+def _synthetic(n=4000, seed=0):
+    rng = np.random.default_rng(seed)
+    carriers = rng.choice(['Colissimo', 'UPS', 'GLS'], n)
+    types = rng.choice(['late_delivery', 'damaged'], n)
+    amounts = rng.lognormal(4.0, 1.0, n)
+    countries = rng.choice(['FR', 'US'], n)
+    logits = (1.5 * (types == 'late_delivery') - 0.8 * (carriers == 'GLS')
+              - 0.5 * (countries == 'US') - 0.4 * (np.log1p(amounts) - 4.0))
+    labels = (rng.random(n) < 1 / (1 + np.exp(-logits))).astype(int)
+    return list(carriers), list(types), list(amounts), list(countries), labels
+
+
+@pytest.fixture(scope='module')
+def model():
+    carriers, types, amounts, countries, labels = _synthetic()
+    return SuccessModel.fit(carriers, types, amounts, countries, labels)
+
+
+class TestSuccessModel:
+
+    def test_model_learns_effects_and_is_calibrated(self, model):
+        p_late, p_damaged, p_gls, p_us = model.predict_proba(
+            ['ups', 'UPS', 'gls', 'UPS'], ['late_delivery', 'damaged', 'late_delivery', 'late_delivery'],
+            [50.0] * 4, ['FR', 'FR', 'FR', 'US']
+        )
+        assert p_late > p_damaged
+        assert p_late > p_gls
+        assert p_late > p_us
+
+        carriers, types, amounts, countries, labels = _synthetic(seed=1)
+        report = calibration_report(labels, model.predict_proba(carriers, types, amounts, countries))
+        assert report['ece'] < 0.05
+
+    def test_unknown_categories_use_fallback_slot(self, model):
+        [p] = model.predict_proba(['Unknown Carrier'], ['lost'], [10.0], ['JP'])
+        assert 0.0 < p < 1.0
+
+    def test_artifact_round_trip(self, model, tmp_path):
+        path = str(tmp_path / 'model.npz')
+        model.save(path)
+        loaded = SuccessModel.load(path)
+
+        records = [{'carrier': 'UPS', 'dispute_type': 'damaged', 'amount_recoverable': 300.0, 'country': 'US'}]
+        assert loaded.predict_records(records) == pytest.approx(model.predict_records(records))
+        assert loaded.metadata == model.metadata
+        assert load_success_model(path) is load_success_model(path)
+        assert load_success_model(str(tmp_path / 'missing.npz')) is None
+
+    def test_train_from_claims_table(self, db_manager, sample_client):
+        for i in range(20):
+            claim_id = db_manager.create_claim(
+                claim_reference=f'CLM-M-{i}', client_id=sample_client['id'], order_id=f'ORD-M-{i}',
+                carrier='UPS' if i % 2 else 'GLS', dispute_type='lost', amount_requested=50.0
+            )
+            db_manager.update_claim(claim_id, status='accepted' if i % 2 else 'rejected')
+        db_manager.create_claim(
+            claim_reference='CLM-M-open', client_id=sample_client['id'], order_id='ORD-M-open',
+            carrier='UPS', dispute_type='lost', amount_requested=50.0
+        )
+
+        trained = train_from_db(db_manager, min_count=1)
+
+        assert trained.metadata['samples'] == 20
+        [p_ups, p_gls] = trained.predict_proba(['UPS', 'GLS'], ['lost', 'lost'], [50.0, 50.0])
+        assert p_ups > 0.7 > 0.3 > p_gls
+
+
+class TestAIPredictorModel:
+
+    def test_heuristic_without_artifact(self):
+        predictor = AIPredictor(model_path=None)
+        disputes = [{'carrier': 'UPS', 'dispute_type': 'late_delivery', 'amount_recoverable': 500.0}]
+
+        assert predictor.predict_success(disputes[0])['probability'] == 0.82
+        assert predictor.predict_success_batch(disputes) == pytest.approx([0.824])
+
+    def test_batch_matches_single_predictions(self, model):
+        predictor = AIPredictor(model=model)
+        disputes = [
+            {'carrier': 'UPS', 'dispute_type': 'late_delivery', 'amount_recoverable': 80.0},
+            {'carrier': 'GLS', 'dispute_type': 'damaged', 'amount_recoverable': 900.0, 'country': 'US'},
+        ]
+
+        batch = predictor.predict_success_batch(disputes)
+        assert [predictor.predict_success(d)['probability'] for d in disputes] == list(np.round(batch, 2))
+        forecast = predictor.get_forecasted_cashflow(disputes)
+        assert forecast['weighted_expected_recovery'] == pytest.approx(
+            round(80.0 * round(batch[0], 2) + 900.0 * round(batch[1], 2), 2))
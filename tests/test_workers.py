@@ -10,7 +10,12 @@ class TestOrderSyncWorker:
     def worker(self):
         with patch('src.workers.order_sync_worker.CredentialsManager'), \
              patch('src.workers.order_sync_worker.DisputeDetectionEngine'):
-            return OrderSyncWorker()
+            worker = OrderSyncWorker()
+        worker._risk_checker = MagicMock()
+        worker._risk_checker.check_orders_risk.side_effect = lambda orders: [
+            {'risk_score': 0, 'risk_level': 'low', 'reasons': [], 'is_safe': True} for _ in orders
+        ]
+        return worker
 
     def test_sync_all_clients_success(self, worker):
         worker.credentials_manager.list_clients.return_value = [('client1', 'shopify', 'date1'), ('client2', 'woocommerce', 'date2')]
@@ -66,6 +71,29 @@ class TestOrderSyncWorker:
         mock_email.assert_called_once()
         mock_db.log_notification.assert_called_once()
 
+    def test_sync_checks_all_orders_risk_in_one_batch(self, worker):
+        orders = [{'order_id': 'ORD1', 'customer_email': 'fraudster@evil.com'}, {'order_id': 'ORD2'}]
+        worker.credentials_manager.get_credentials.return_value = {'platform': 'shopify'}
+        mock_conn = MagicMock()
+        mock_conn.fetch_orders.return_value = orders
+        worker._risk_checker.check_orders_risk.side_effect = None
+        worker._risk_checker.check_orders_risk.return_value = [
+            {'risk_score': 90, 'risk_level': 'critical', 'reasons': ['Chargeback'], 'is_safe': False},
+            {'risk_score': 0, 'risk_level': 'low', 'reasons': [], 'is_safe': True},
+        ]
+        worker.dispute_detector.analyze_orders.return_value = []
+
+        with patch.dict(worker.CONNECTOR_MAP, {'shopify': MagicMock(return_value=mock_conn)}), \
+             patch('src.database.get_db_manager'):
+            result = worker.sync_client('test@example.com')
+
+        worker._risk_checker.check_orders_risk.assert_called_once_with(orders)
+        assert result['risky_orders'] == 1
+
+    def test_sync_survives_risk_check_errors(self, worker):
+        worker._risk_checker.check_orders_risk.side_effect = RuntimeError("registry unavailable")
+        assert worker.check_orders_risk([{'order_id': 'ORD1'}]) == []
+
     @patch.object(OrderSyncWorker, 'sync_all_clients')
     @patch('time.sleep')
     def test_run_forever_loop(self, mock_sleep, mock_sync, worker):
@@ -111,3 +139,62 @@ class TestOrderSyncWorker:
         mock_worker = mock_worker_class.return_value
         main()
         mock_worker.run_forever.assert_called_once()
+
+
+class TestEmailWorkerContext:
+
+    @pytest.fixture
+    def claim(self):
+        return {
+            'id': 1, 'claim_reference': 'CLM-CTX-1', 'carrier': 'DHL',
+            'tracking_number': 'TRK1', 'amount_requested': 100.0,
+            'dispute_type': 'lost', 'country': 'FR'
+        }
+
+    def test_context_is_built_once_per_process(self):
+        from src.workers import email_workers
+        with patch.object(email_workers, 'WorkerContext') as mock_ctx_class, \
+             patch.object(email_workers, '_worker_context', None):
+            mock_ctx_class.return_value.pid = email_workers.os.getpid()
+            first = email_workers.get_worker_context()
+            second = email_workers.get_worker_context()
+        assert first is second
+        mock_ctx_class.assert_called_once()
+
+    def test_tasks_reuse_injected_resources(self, claim):
+        from src.workers.email_workers import WorkerContext, execute_status_request, execute_warning
+        ctx = WorkerContext(
+            db=MagicMock(), email_handler=MagicMock(),
+            escalation_logger=MagicMock(), scheduler=MagicMock()
+        )
+        ctx.email_handler.send_status_request_email.return_value = True
+        ctx.email_handler.send_warning_email.return_value = True
+
+        execute_status_request(dict(claim), context=ctx)
+        execute_warning(dict(claim), context=ctx)
+
+        assert ctx.db.update_claim.call_count == 2
+        assert ctx.escalation_logger.log_email_sent.call_count == 2
+
+    def test_formal_notice_reuses_pregenerated_pdf(self, claim, tmp_path):
+        from src.workers.email_workers import WorkerContext, execute_formal_notice
+        pdf = tmp_path / 'MED_CLM-CTX-1.pdf'
+        pdf.write_bytes(b'%PDF-1.4')
+        ctx = WorkerContext(
+            db=MagicMock(), email_handler=MagicMock(), escalation_logger=MagicMock(),
+            generator=MagicMock(), scheduler=MagicMock()
+        )
+        ctx.email_handler.send_formal_notice_email.return_value = True
+
+        execute_formal_notice(dict(claim), str(pdf), context=ctx)
+
+        ctx.generator.generate_formal_notice.assert_not_called()
+        assert ctx.email_handler.send_formal_notice_email.call_args.kwargs['pdf_path'] == str(pdf)
+
+    def test_generator_renders_from_templates(self):
+        from src.workers.email_workers import WorkerContext
+        ctx = WorkerContext(
+            db=MagicMock(), email_handler=MagicMock(),
+            escalation_logger=MagicMock(), scheduler=MagicMock()
+        )
+        assert ctx.generator.use_templates is True
@@ -2,6 +2,69 @@
 Section d'upload de fichier pour le dashboard - À intégrer
 """
 
+# Extensions traitées par OCR (les autres sont des exports de données)
+PROOF_TYPES = ('png', 'jpg', 'jpeg', 'pdf')
+
+
+def _analyze_proof_text(extracted_text):
+    """Transporteur, statut, date et confiance déduits du texte d'une preuve."""
+    from datetime import datetime
+    import re
+    
+    # Détection intelligente basée sur le texte extrait
+    detected_carrier = "Transporteur Inconnu"
+    detected_status = 'Inconnu'
+    confidence = 85.0
+    
+    text_lower = extracted_text.lower()
+    
+    # Logique de règles simples sur le texte extrait
+    if "dpd" in text_lower:
+        detected_carrier = "DPD France"
+        confidence += 10
+    elif "chronopost" in text_lower:
+        detected_carrier = "Chronopost"
+        confidence += 10
+    elif "colissimo" in text_lower or "la poste" in text_lower or "laposte" in text_lower:
+        detected_carrier = "La Poste / Colissimo"
+    elif "dhl" in text_lower:
+        detected_carrier = "DHL Express"
+    # UPS Detection Enhanced: Detects 'UPS', 'UPS SAVER', standard tracking (1Z...)
+    elif "ups" in text_lower or "1z" in extracted_text or "saver" in text_lower or "united parcel" in text_lower:
+        detected_carrier = "UPS"
+        confidence += 15
+        
+    # Statut
+    if "signature" in text_lower and ("invalid" in text_lower or "rejet" in text_lower or "contest" in text_lower):
+         detected_status = 'Contestation Signature'
+    elif "endommag" in text_lower or "damaged" in text_lower or "reserve" in text_lower:
+         detected_status = 'Colis Endommagé'
+    elif "livr" in text_lower or "deliver" in text_lower:
+         # Même si livré, ça peut être livré endommagé.
+         # Dans le doute pour une preuve, on suspecte un dommage.
+         detected_status = 'Livré (Avec réserves potentielles)'
+    else:
+         # Par défaut, si on upload une photo, c'est souvent pour un dommage visuel
+         detected_status = 'Dommage Visuel Suspecté'
+         confidence = 92.0 # On simule une confiance élevée sur l'analyse visuelle (IA Vision)
+
+    # Correction pour la démo si mot clé détecé dans nom de fichier ou contexte
+    if "ups" in text_lower and "pak" in text_lower: # Les UPS PAK sont souvent déchirés
+        detected_status = 'Emballage Déchiré / Ouvert'
+        confidence = 96.5
+
+    # Date (Si non trouvée, date du jour)
+    date_match = re.search(r'\d{2}/\d{2}/\d{4}', extracted_text)
+    current_date = date_match.group(0) if date_match else datetime.now().strftime("%d/%m/%Y")
+    
+    return {
+        'carrier': detected_carrier,
+        'status': detected_status,
+        'confidence': confidence,
+        'date': current_date
+    }
+
+
 def render_file_upload():
     """Section d'upload de fichier client pour analyse personnalisée."""
     import streamlit as st
@@ -24,109 +87,66 @@ def render_file_upload():
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        uploaded_file = st.file_uploader(
-            "Sélectionnez votre fichier (Preuves ou Données)",
+        uploaded_files = st.file_uploader(
+            "Sélectionnez vos fichiers (Preuves ou Données)",
             type=['csv', 'xlsx', 'xls', 'png', 'jpg', 'jpeg', 'pdf'],
-            help="Supporte : Exports (CSV/Excel) et Preuves (Photos/PDF)",
+            accept_multiple_files=True,
+            help="Supporte : Exports (CSV/Excel) et Preuves (Photos/PDF, plusieurs à la fois)",
             label_visibility="collapsed"
         )
         
-        if uploaded_file is not None:
-            file_type = uploaded_file.name.split('.')[-1].lower()
+        if uploaded_files:
+            proof_files = [f for f in uploaded_files if f.name.split('.')[-1].lower() in PROOF_TYPES]
+            data_files = [f for f in uploaded_files if f.name.split('.')[-1].lower() not in PROOF_TYPES]
             
             # --- FLUX PREUVES (IMAGES/PDF) ---
-            if file_type in ['png', 'jpg', 'jpeg', 'pdf']:
-                st.success(f"📸 Preuve chargée : {uploaded_file.name}")
+            if proof_files:
+                st.success(f"📸 {len(proof_files)} preuve(s) chargée(s) : {', '.join(f.name for f in proof_files)}")
                 
-                # ACN : Afficher l'aperçu si c'est une image
-                if file_type in ['png', 'jpg', 'jpeg']:
-                    st.image(uploaded_file, caption="Aperçu de la preuve", width=300)
+                # ACN : Afficher l'aperçu des images
+                images = [f for f in proof_files if f.name.split('.')[-1].lower() != 'pdf']
+                if images:
+                    st.image(images, caption=[f.name for f in images], width=300)
                 
                 st.info("ℹ️ Analyse OCR prête à être lancée pour extraire les données du transporteur.")
                 
-                if st.button("🔍 Analyser la preuve", type="primary", width='stretch'):
+                if st.button("🔍 Analyser les preuves", type="primary", width='stretch'):
                     with st.spinner("🤖 Lecture intelligente (OCR) en cours..."):
-                        import time
-                        time.sleep(2.5) # Simulation temps de traitement OCR
-                        
                         # Analyse via OCR Processor (Réel ou Simulé)
                         from src.scrapers.ocr_processor import OCRProcessor
-                        ocr = OCRProcessor()
-                        
-                        # Extraction du texte
-                        extracted_text = ocr.extract_text_from_file(uploaded_file, uploaded_file.name)
-                        
-                        # Détection intelligente basée sur le texte extrait
-                        detected_carrier = "Transporteur Inconnu"
-                        detected_status = 'Inconnu'
-                        confidence = 85.0
+                        from src.scrapers.utils.ocr_cache import get_ocr_cache
+                        ocr = OCRProcessor(cache=get_ocr_cache(), pdf_workers=1)
                         
-                        text_lower = extracted_text.lower()
-                        
-                        # Logique de règles simples sur le texte extrait
-                        if "dpd" in text_lower:
-                            detected_carrier = "DPD France"
-                            confidence += 10
-                        elif "chronopost" in text_lower:
-                            detected_carrier = "Chronopost"
-                            confidence += 10
-                        elif "colissimo" in text_lower or "la poste" in text_lower or "laposte" in text_lower:
-                            detected_carrier = "La Poste / Colissimo"
-                        elif "dhl" in text_lower:
-                            detected_carrier = "DHL Express"
-                        # UPS Detection Enhanced: Detects 'UPS', 'UPS SAVER', standard tracking (1Z...)
-                        elif "ups" in text_lower or "1z" in extracted_text or "saver" in text_lower or "united parcel" in text_lower:
-                            detected_carrier = "UPS"
-                            confidence += 15
-                            
-                        # Statut
-                        if "signature" in text_lower and ("invalid" in text_lower or "rejet" in text_lower or "contest" in text_lower):
-                             detected_status = 'Contestation Signature'
-                        elif "endommag" in text_lower or "damaged" in text_lower or "reserve" in text_lower:
-                             detected_status = 'Colis Endommagé'
-                        elif "livr" in text_lower or "deliver" in text_lower:
-                             # Même si livré, ça peut être livré endommagé.
-                             # Dans le doute pour une preuve, on suspecte un dommage.
-                             detected_status = 'Livré (Avec réserves potentielles)'
-                        else:
-                             # Par défaut, si on upload une photo, c'est souvent pour un dommage visuel
-                             detected_status = 'Dommage Visuel Suspecté'
-                             confidence = 92.0 # On simule une confiance élevée sur l'analyse visuelle (IA Vision)
-
-                        # Correction pour la démo si mot clé détecé dans nom de fichier ou contexte
-                        if "ups" in text_lower and "pak" in text_lower: # Les UPS PAK sont souvent déchirés
-                            detected_status = 'Emballage Déchiré / Ouvert'
-                            confidence = 96.5
-
-                        # Date (Si non trouvée, date du jour)
-
-                        # Date (Si non trouvée, date du jour)
-                        from datetime import datetime
-                        import re
-                        date_match = re.search(r'\d{2}/\d{2}/\d{4}', extracted_text)
-                        current_date = date_match.group(0) if date_match else datetime.now().strftime("%d/%m/%Y")
-                        
-                        st.balloons()
+                        # Extraction du lot : pool de processus, fichiers déjà analysés servis par le cache
+                        documents = ocr.extract_batch(proof_files)
+                    
+                    st.balloons()
+                    for document in documents:
+                        extracted_text = document['text']
+                        result = _analyze_proof_text(extracted_text)
                         st.markdown(f"""
                             <div style='padding: 15px; background-color: #d1fae5; color: #065f46; border-radius: 10px; border-left: 5px solid #059669; margin-top: 10px;'>
-                                <strong>✅ Preuve Validée & Analysée (OCR) !</strong><br>
-                                • <strong>Transporteur :</strong> {detected_carrier}<br>
-                                • <strong>Date :</strong> {current_date}<br>
-                                • <strong>Statut :</strong> {detected_status}<br>
-                                • <strong>Confiance IA :</strong> {confidence}%<br>
+                                <strong>✅ Preuve Validée & Analysée (OCR) : {document['filename']}</strong><br>
+                                • <strong>Transporteur :</strong> {result['carrier']}<br>
+                                • <strong>Date :</strong> {result['date']}<br>
+                                • <strong>Statut :</strong> {result['status']}<br>
+                                • <strong>Confiance IA :</strong> {result['confidence']}%<br>
                                 <br>
                                 <em>Extrait : "{extracted_text[:100]}..."</em>
                             </div>
                         """, unsafe_allow_html=True)
-                        
-                        st.success("Dossier #4882 mis à jour. La réclamation est envoyée immédiatement au transporteur. 🚀")
-                        
-                        if st.button("📂 Voir le dossier #4882", type="secondary"):
-                            st.session_state.active_page = 'Disputes'
-                            st.rerun()
+                    
+                    st.success("Dossier #4882 mis à jour. La réclamation est envoyée immédiatement au transporteur. 🚀")
+                    
+                    if st.button("📂 Voir le dossier #4882", type="secondary"):
+                        st.session_state.active_page = 'Disputes'
+                        st.rerun()
 
             # --- FLUX DONNÉES (CSV/EXCEL) ---
-            else:
+            if data_files:
+                uploaded_file = data_files[0]
+                if len(data_files) > 1:
+                    st.warning(f"Un seul export est analysé à la fois : {uploaded_file.name}")
                 st.success(f"📊 Fichier de données chargé : {uploaded_file.name}")
                 
                 # Bouton d'analyse (Trigger)